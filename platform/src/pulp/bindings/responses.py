@@ -112,6 +112,10 @@ class Task(object):
         self.exception = response_body['exception']
         self.traceback = response_body['traceback']
 
+        # Incremented by the server on each update of a queued or running
+        # task; None once the task is archived
+        self.version = response_body.get('version')
+
     def is_rejected(self):
         """
         Indicates if the response represents that the request was rejected.
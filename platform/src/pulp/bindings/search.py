@@ -83,6 +83,10 @@ class SearchAPI(PulpAPI):
     _FILTER_ARGS = set(_OPERATORS.keys())
     _ALL_ARGS = _CRITERIA_ARGS | _FILTER_ARGS
 
+    # number of results read per request; searches without a limit read all
+    # of the pages of results
+    PAGE_SIZE = 1000
+
     def search(self, **kwargs):
         """
         Performs a search against the server-side REST API. This depends on
@@ -92,7 +96,11 @@ class SearchAPI(PulpAPI):
         Pass in name-based parameters only that match the values accepted by
         pulp.server.db.model.criteria.Criteria.__init__
 
-        @return:    response body from the server
+        Unless a limit is given, the results are read from the server a page
+        at a time, following the continuation of each page until the last.
+
+        @return:    response body from the server; the list of all results
+                    for a paged search
         """
         if not set(kwargs.keys()) <= self._ALL_ARGS:
             # okaara should have caught this already, but this will prevent
@@ -103,8 +111,22 @@ class SearchAPI(PulpAPI):
         if filters:
             kwargs['filters'] = filters
         self._strip_criteria_kwargs(kwargs)
-        response = self.server.POST(self.PATH, {'criteria':kwargs})
-        return response.response_body
+        if kwargs.get('limit') is not None:
+            response = self.server.POST(self.PATH, {'criteria':kwargs})
+            return response.response_body
+        return self._search_pages({'criteria':kwargs, 'page_size':self.PAGE_SIZE})
+
+    def _search_pages(self, body):
+        results = []
+        while True:
+            page = self.server.POST(self.PATH, body).response_body
+            if not isinstance(page, dict) or 'continuation' not in page:
+                # the server does not page its results
+                return page
+            results.extend(page['results'])
+            if not page['continuation']:
+                return results
+            body['page_token'] = page['continuation']
 
     def _strip_criteria_kwargs(self, kwargs):
         for field_name in kwargs.keys():
@@ -12,8 +12,12 @@
 # http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
 
 import base64
+import httplib
 import locale
 import logging
+import os
+import socket
+import threading
 import urllib
 from types import NoneType
 
@@ -26,7 +30,7 @@ except ImportError:
 
 import pulp.bindings.exceptions as exceptions
 from pulp.bindings.responses import Response, Task
-from pulp.common.util import ensure_utf_8
+from pulp.common.util import closed_without_response, ensure_utf_8
 
 # -- server connection --------------------------------------------------------
 
@@ -228,50 +232,226 @@ class HTTPSServerWrapper(object):
     This abstraction is used to simplify mocking. In this implementation, the
     intricacies (read: ugliness) of invoking and getting the response from
     the HTTPConnection class are hidden in favor of a simpler API to mock.
+
+    Connections to the server are kept open and reused for later requests,
+    see L{HTTPSConnectionPool}.
     """
 
     def __init__(self, pulp_connection):
         self.pulp_connection = pulp_connection
+        self._pool = None
+        self._pool_lock = threading.Lock()
 
     def request(self, method, url, body):
 
         headers = dict(self.pulp_connection.headers) # copy so we don't affect the calling method
 
-        # Create a new connection each time since HTTPSConnection has problems
-        # reusing a connection for multiple calls (lame).
-        ssl_context = None
         if self.pulp_connection.username and self.pulp_connection.password:
             raw = ':'.join((self.pulp_connection.username, self.pulp_connection.password))
             encoded = base64.encodestring(raw)[:-1]
             headers['Authorization'] = 'Basic ' + encoded
-        elif self.pulp_connection.cert_filename:
-            ssl_context = SSL.Context('sslv3')
-            ssl_context.set_session_timeout(self.pulp_connection.timeout)
-            ssl_context.load_cert(self.pulp_connection.cert_filename)
-
-        # Can't pass in None, so need to decide between two signatures (also lame)
-        if ssl_context is not None:
-            connection = httpslib.HTTPSConnection(self.pulp_connection.host, self.pulp_connection.port, ssl_context=ssl_context)
+            cert_filename = None
         else:
-            connection = httpslib.HTTPSConnection(self.pulp_connection.host, self.pulp_connection.port)
+            cert_filename = self.pulp_connection.cert_filename
 
-        # Request against the server
-        connection.request(method, url, body=body, headers=headers)
+        pool = self.connection_pool(cert_filename)
+        connection, reused = pool.acquire()
 
         try:
-            response = connection.getresponse()
+            sent = False
+            try:
+                connection.request(method, url, body=body, headers=headers)
+                sent = True
+                response = connection.getresponse()
+            except STALE_CONNECTION_ERRORS, err:
+                # A connection the server closed while it was idle fails when
+                # the request is sent or, if the close was not noticed in
+                # time, with an empty status line. The server never got the
+                # request, so it is sent again on a new connection. Any other
+                # error may have happened after the server processed the
+                # request, which must not be run twice.
+                if not reused or (sent and not closed_without_response(err)):
+                    raise
+                pool.discard(connection)
+                connection, reused = pool.acquire(reuse=False)
+                response = self._send(connection, method, url, body, headers)
+
+            # The body must be read in full before the connection is reused
+            response_body = response.read()
         except SSL.SSLError, err:
+            pool.discard(connection)
             # Translate stale login certificate to an auth exception
             if 'sslv3 alert certificate expired' == str(err):
                 raise exceptions.PermissionsException()
             else:
                 raise exceptions.ConnectionException(None, str(err), None)
+        except:
+            pool.discard(connection)
+            raise
 
-        # Attempt to deserialize the body (should pass unless the server is busted)
-        response_body = response.read()
+        pool.release(connection, response)
 
+        # Attempt to deserialize the body (should pass unless the server is busted)
         try:
             response_body = json.loads(response_body)
         except:
             pass
         return response.status, response_body
+
+    def connection_pool(self, cert_filename):
+        """
+        Returns the pool of connections authenticated with the given client
+        certificate. The pool is replaced, and its connections closed, when
+        a different certificate is used or the certificate file changes
+        (for instance after logging in again).
+
+        :param cert_filename: client certificate file, None to connect without
+                              a client certificate
+        :type  cert_filename: str or None
+
+        :rtype: HTTPSConnectionPool
+        """
+        key = (self.pulp_connection.host, self.pulp_connection.port,
+               cert_filename, _modification_time(cert_filename))
+
+        self._pool_lock.acquire()
+        try:
+            if self._pool is None or self._pool.key != key:
+                if self._pool is not None:
+                    self._pool.close()
+                ssl_context = _create_ssl_context(cert_filename, self.pulp_connection.timeout)
+                self._pool = HTTPSConnectionPool(self.pulp_connection.host,
+                                                 self.pulp_connection.port,
+                                                 ssl_context, key=key)
+            return self._pool
+        finally:
+            self._pool_lock.release()
+
+    @staticmethod
+    def _send(connection, method, url, body, headers):
+        connection.request(method, url, body=body, headers=headers)
+        return connection.getresponse()
+
+
+# Errors raised when sending a request on a connection the server has closed
+STALE_CONNECTION_ERRORS = (httplib.BadStatusLine, httplib.CannotSendRequest,
+                           socket.error, SSL.SSLError)
+
+
+class HTTPSConnectionPool(object):
+    """
+    Thread-safe pool of persistent (keep-alive) HTTPS connections to a single
+    server, all sharing one SSL context.
+
+    The SSL session of the first connection is resumed by the connections
+    opened after it, which spares them the full handshake.
+
+    :ivar key: identifies the server and credentials the pool is for
+    :ivar max_idle: maximum number of idle connections kept open
+    :type max_idle: int
+    """
+
+    def __init__(self, host, port, ssl_context, key=None, max_idle=4):
+        self.host = host
+        self.port = port
+        self.ssl_context = ssl_context
+        self.key = key
+        self.max_idle = max_idle
+
+        self._idle = []
+        self._session = None
+        self._lock = threading.Lock()
+
+    def acquire(self, reuse=True):
+        """
+        Returns a connection for the exclusive use of the caller, who must
+        hand it back through release() or discard().
+
+        :param reuse: if False, a new connection is opened even if there are
+                      idle ones
+        :type  reuse: bool
+
+        :return: tuple of the connection and whether it was used before
+        :rtype:  tuple
+        """
+        self._lock.acquire()
+        try:
+            if reuse and self._idle:
+                return self._idle.pop(), True
+            session = self._session
+        finally:
+            self._lock.release()
+
+        connection = httpslib.HTTPSConnection(self.host, self.port, ssl_context=self.ssl_context)
+        if session is not None:
+            connection.set_session(session)
+        return connection, False
+
+    def release(self, connection, response):
+        """
+        Returns a connection, whose response has been read in full, to the
+        pool. The connection is closed instead if the server will close it.
+
+        :param connection: connection returned by acquire()
+        :param response:   response to the last request on the connection
+        :type  response:   httplib.HTTPResponse
+        """
+        if response.will_close:
+            self.discard(connection)
+            return
+
+        self._lock.acquire()
+        try:
+            if self._session is None and connection.sock is not None:
+                self._session = connection.get_session()
+            if len(self._idle) < self.max_idle:
+                self._idle.append(connection)
+                return
+        finally:
+            self._lock.release()
+
+        self.discard(connection)
+
+    def discard(self, connection):
+        """
+        Closes a connection returned by acquire() instead of returning it to
+        the pool.
+        """
+        # HTTPSConnection.close() leaves the socket open, so close it here
+        sock, connection.sock = connection.sock, None
+        if sock is not None:
+            try:
+                sock.close()
+            except Exception:
+                pass
+
+    def close(self):
+        """
+        Closes all of the idle connections.
+        """
+        self._lock.acquire()
+        try:
+            idle, self._idle = self._idle, []
+        finally:
+            self._lock.release()
+
+        for connection in idle:
+            self.discard(connection)
+
+
+def _create_ssl_context(cert_filename, timeout):
+    if cert_filename is None:
+        return SSL.Context()
+    ssl_context = SSL.Context('sslv3')
+    ssl_context.set_session_timeout(timeout)
+    ssl_context.load_cert(cert_filename)
+    return ssl_context
+
+
+def _modification_time(filename):
+    if filename is None:
+        return None
+    try:
+        return os.stat(filename).st_mtime
+    except OSError:
+        return None
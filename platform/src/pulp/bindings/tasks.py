@@ -34,17 +34,31 @@ class TasksAPI(PulpAPI):
         response = self.server.DELETE(path)
         return response
 
-    def get_task(self, task_id):
+    def get_task(self, task_id, version=None, wait=None):
         """
         Retrieves the status of the given task if it exists.
 
+        When the version of the task last retrieved is given, the server holds
+        the request until the task is updated (its state or progress changes)
+        or the given number of seconds pass, so callers following a task's
+        progress do not need to poll it repeatedly.
+
+        @param version: version attribute of the Task last retrieved
+        @type  version: int
+        @param wait: maximum number of seconds the server waits for the task
+                     to be updated; the server may cap it or not wait at all
+        @type  wait: float
+
         @return: response with a Task object in the response_body
         @rtype:  Response
 
         @raise NotFoundException: if there is no task with the given ID
         """
         path = '/v2/tasks/%s/' % task_id
-        response = self.server.GET(path)
+        queries = []
+        if version is not None:
+            queries = [('version', version), ('wait', wait or 0)]
+        response = self.server.GET(path, queries=queries)
 
         # Since it was a 200, the connection parsed the response body into a
         # Document. We know this will be task data, so convert the object here.
@@ -18,6 +18,12 @@ Contains functions for rendering the sync/publish progress reports.
 from gettext import gettext as _
 import time
 
+# -- constants ----------------------------------------------------------------
+
+# Maximum number of seconds the server is asked to hold a request for a
+# running task until its progress changes
+PROGRESS_WAIT_IN_SECONDS = 30
+
 # -- public -------------------------------------------------------------------
 
 def display_task_status(context, renderer, task_id):
@@ -101,7 +107,12 @@ def _display_status(context, renderer, task_list):
 
 def _display_task_status(context, renderer, task_id, quiet_waiting=False):
     """
-    Poll an individual task and display the progress for it.
+    Follow an individual task and display the progress for it.
+
+    Each request asks the server to wait until the task is updated, so the
+    progress is displayed as soon as it changes without polling the server
+    while nothing happens. Requests are still spaced by the configured poll
+    frequency so that frequent progress reports don't flood the server.
 
     :type renderer: pulp.client.commands.repo.sync_publish.StatusRenderer
 
@@ -116,14 +127,19 @@ def _display_task_status(context, renderer, task_id, quiet_waiting=False):
 
     while not response.response_body.is_completed():
 
-        if response.response_body.is_waiting() and not quiet_waiting:
+        task = response.response_body
+        wait = PROGRESS_WAIT_IN_SECONDS
+
+        if task.is_waiting() and not quiet_waiting:
             begin_spinner.next(_('Waiting to begin next step'))
+            # keep the spinner moving
+            wait = poll_frequency_in_seconds
         else:
-            renderer.display_report(response.response_body.progress)
+            renderer.display_report(task.progress)
 
         time.sleep(poll_frequency_in_seconds)
 
-        response = context.server.tasks.get_task(response.response_body.task_id)
+        response = context.server.tasks.get_task(task.task_id, version=task.version, wait=wait)
 
     # Even after completion, we still want to display the report one last
     # time in case there was no poll between, say, the middle of the
@@ -25,6 +25,8 @@ import sys
 
 import pkg_resources
 
+from pulp.common.compat import json
+
 _LOG = logging.getLogger(__name__)
 
 # -- constants ----------------------------------------------------------------
@@ -41,6 +43,11 @@ _ENTRY_POINTS = 'entry points'
 # name of the entry point
 ENTRY_POINT_EXTENSIONS = 'pulp.extensions.%s'
 
+# Keys in the extensions manifest
+_MANIFEST_FINGERPRINT = 'fingerprint'
+_MANIFEST_SECTIONS = 'sections'
+_MANIFEST_ALWAYS = 'always'
+
 # -- exceptions ---------------------------------------------------------------
 
 class ExtensionLoaderException(Exception):
@@ -81,7 +88,7 @@ class InvalidExtensionConfig(ExtensionLoaderException): pass
 
 # -- loading ------------------------------------------------------------------
 
-def load_extensions(extensions_dir, context, role):
+def load_extensions(extensions_dir, context, role, args=None, manifest_filename=None):
     """
     @param extensions_dir: directory in which to find extension packs
     @type  extensions_dir: str
@@ -92,6 +99,14 @@ def load_extensions(extensions_dir, context, role):
     This way we can load the modules and entry points for a given priority at
     the same time.
 
+    When a manifest file is given, only the extensions needed to run the
+    command in args are loaded. The manifest records which extensions add to
+    each top level section or command of the CLI; it is rebuilt, by loading
+    all of the extensions, whenever the installed extensions change.
+    Extensions that do not add to the CLI are always loaded. All of the
+    extensions are loaded if no args are given, if the first argument is not
+    in the manifest or when loading into the shell.
+
     @param context: pre-populated context the extensions should be given to
                     interact with the client
     @type  context: pulp.client.extensions.core.ClientContext
@@ -99,24 +114,83 @@ def load_extensions(extensions_dir, context, role):
     @param role:    name of a role, either "admin" or "consumer", so we know
                     which extensions to load
     @type  role:    str
+
+    @param args:    arguments of the command being run
+    @type  args:    list
+
+    @param manifest_filename: file in which to cache the extensions manifest;
+                              None to always load all of the extensions
+    @type  manifest_filename: str
     """
 
     # Validation
     if not os.access(extensions_dir, os.F_OK | os.R_OK):
         raise InvalidExtensionsDirectory(extensions_dir)
 
+    pack_names = _pack_names(extensions_dir)
+    entry_points = list(pkg_resources.iter_entry_points(ENTRY_POINT_EXTENSIONS % role))
+
+    if manifest_filename is None or context.cli is None:
+        _load_extensions(extensions_dir, context, pack_names, entry_points)
+        return
+
+    fingerprint = _fingerprint(extensions_dir, pack_names, entry_points, role)
+    manifest = _read_manifest(manifest_filename)
+
+    if manifest is not None and manifest[_MANIFEST_FINGERPRINT] == fingerprint:
+        if args and args[0] in manifest[_MANIFEST_SECTIONS]:
+            needed = set(manifest[_MANIFEST_SECTIONS][args[0]] + manifest[_MANIFEST_ALWAYS])
+            _load_extensions(extensions_dir, context,
+                             [p for p in pack_names if p in needed],
+                             [e for e in entry_points if _entry_point_key(e) in needed])
+        else:
+            _load_extensions(extensions_dir, context, pack_names, entry_points)
+        return
+
+    # Rebuild the manifest while loading everything; it is not written if
+    # any of the extensions fail to load, as it would miss them
+    sections = {}
+    always = []
+    _load_extensions(extensions_dir, context, pack_names, entry_points, sections, always)
+    _write_manifest(manifest_filename, {_MANIFEST_FINGERPRINT : fingerprint,
+                                        _MANIFEST_SECTIONS : sections,
+                                        _MANIFEST_ALWAYS : always})
+
+def _load_extensions(extensions_dir, context, pack_names, entry_points, sections=None, always=None):
+    """
+    Loads the given extension packs and entry points in priority order.
+
+    If the sections dict and always list are given, they are filled in with
+    the extensions manifest: the keys of the extensions adding to each top
+    level section or command, and the keys of the extensions adding nothing.
+    """
+
     # identify modules and sort them
     try:
-        unsorted_modules = _load_pack_modules(extensions_dir)
+        unsorted_modules = _load_pack_modules(extensions_dir, pack_names)
         sorted_extensions = _resolve_order(unsorted_modules)
     except ImportFailed, e:
         raise LoadFailed([e.pack_name]), None, sys.exc_info()[2]
 
-    # find extensions from entry points and add them to the sorted structure
-    for extension in pkg_resources.iter_entry_points(ENTRY_POINT_EXTENSIONS % role):
+    # add the extensions from entry points to the sorted structure
+    for extension in entry_points:
         priority = getattr(extension, PRIORITY_VAR, DEFAULT_PRIORITY)
         sorted_extensions.setdefault(priority, {}).setdefault(_ENTRY_POINTS, []).append(extension)
 
+    recording = sections is not None
+    cli_paths = None
+    if recording:
+        cli_paths = _cli_paths(context.cli.root_section)
+
+    def record(key, cli_paths):
+        new_paths = _cli_paths(context.cli.root_section)
+        roots = set(p[0] for p in new_paths - cli_paths)
+        if not roots:
+            always.append(key)
+        for root in roots:
+            sections.setdefault(root, []).append(key)
+        return new_paths
+
     error_packs = []
     for priority in sorted(sorted_extensions.keys()):
         for module in sorted_extensions[priority].get(_MODULES, []):
@@ -127,17 +201,32 @@ def load_extensions(extensions_dir, context, role):
                 # the cause will be logged by _load_pack. This method should
                 # continue to load extensions so all of the errors are logged.
                 error_packs.append(module.__name__)
+            if recording:
+                cli_paths = record(module.__name__, cli_paths)
         for entry_point in sorted_extensions[priority].get(_ENTRY_POINTS, []):
             entry_point.load()(context)
+            if recording:
+                cli_paths = record(_entry_point_key(entry_point), cli_paths)
 
     if len(error_packs) > 0:
         raise LoadFailed(error_packs)
 
-def _load_pack_modules(extensions_dir):
+def _pack_names(extensions_dir):
+    """
+    @return: sorted names of the extension packs in the extensions directory
+    @rtype:  list
+    """
+    return [p for p in sorted(os.listdir(extensions_dir)) if not p.startswith('.')]
+
+def _load_pack_modules(extensions_dir, pack_names=None):
     """
     Loads the modules for each pack in the extensions directory, taking care
     to update the system path as appropriate.
 
+    @param pack_names: names of the packs to load; defaults to all of the
+                       packs in the extensions directory
+    @type  pack_names: list
+
     @return: list of module instances loaded from the call
     @rtype:  list
 
@@ -152,10 +241,9 @@ def _load_pack_modules(extensions_dir):
 
     modules = []
 
-    pack_names = sorted(os.listdir(extensions_dir))
+    if pack_names is None:
+        pack_names = _pack_names(extensions_dir)
     for pack in pack_names:
-        if pack.startswith('.'):
-            continue
         try:
             mod = __import__(pack)
             modules.append(mod)
@@ -245,3 +333,87 @@ def _load_pack(extensions_dir, pack_module, context):
     except Exception, e:
         _LOG.exception(_('Module [%(m)s] could not be initialized' % {'m' : init_mod_name}))
         raise InitError(), None, sys.exc_info()[2]
+
+# -- manifest -----------------------------------------------------------------
+
+def _entry_point_key(entry_point):
+    return 'entry point %s' % entry_point
+
+def _fingerprint(extensions_dir, pack_names, entry_points, role):
+    """
+    Identifies the installed extensions; any change to the packs' files, or
+    the installation or upgrade of an entry point's distribution, changes it.
+    It is stored in the manifest as is and compared once read back, so it
+    only contains lists, strings and numbers.
+
+    @rtype: list
+    """
+    installed = [role]
+    for pack in pack_names:
+        pack_dir = os.path.join(extensions_dir, pack)
+        paths = [pack_dir]
+        if os.path.isdir(pack_dir):
+            paths.extend(os.path.join(pack_dir, f) for f in os.listdir(pack_dir)
+                         if not (f.endswith('.pyc') or f.endswith('.pyo')))
+        installed.append([pack, max(_mtime(p) for p in paths)])
+    for entry_point in entry_points:
+        version = None
+        if getattr(entry_point, 'dist', None) is not None:
+            version = entry_point.dist.version
+        installed.append([_entry_point_key(entry_point), version])
+    return installed
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+def _read_manifest(manifest_filename):
+    """
+    @return: the manifest, None if it does not exist or cannot be read
+    @rtype:  dict or None
+    """
+    try:
+        f = open(manifest_filename)
+        try:
+            manifest = json.load(f)
+        finally:
+            f.close()
+        for key in (_MANIFEST_FINGERPRINT, _MANIFEST_SECTIONS, _MANIFEST_ALWAYS):
+            manifest[key]
+        return manifest
+    except (IOError, ValueError, KeyError, TypeError):
+        return None
+
+def _write_manifest(manifest_filename, manifest):
+    # written to a temporary file first so a concurrent run never reads a
+    # partial manifest; failing to write it only costs loading everything
+    temp_filename = '%s.%d' % (manifest_filename, os.getpid())
+    try:
+        dirname = os.path.dirname(manifest_filename)
+        if dirname and not os.path.exists(dirname):
+            os.makedirs(dirname)
+        f = open(temp_filename, 'w')
+        try:
+            json.dump(manifest, f)
+        finally:
+            f.close()
+        os.rename(temp_filename, manifest_filename)
+    except (IOError, OSError):
+        _LOG.exception(_('Could not write the extensions manifest [%(m)s]' % {'m' : manifest_filename}))
+
+def _cli_paths(section, parent=()):
+    """
+    @return: paths, as tuples of names, of all of the subsections and
+             commands under the given section
+    @rtype:  set
+    """
+    paths = set()
+    for name, subsection in section.subsections.items():
+        path = parent + (name,)
+        paths.add(path)
+        paths.update(_cli_paths(subsection, path))
+    for name in section.commands:
+        paths.add(parent + (name,))
+    return paths
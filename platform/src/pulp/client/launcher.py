@@ -94,9 +94,19 @@ def main(config_filenames):
     extensions_dir = config['filesystem']['extensions_dir']
     extensions_dir = os.path.expanduser(extensions_dir)
 
+    # Only the extensions for the command being run are loaded; the map needs
+    # all of them
+    manifest_filename = None
+    if config.has_option('filesystem', 'extensions_manifest'):
+        manifest_filename = os.path.expanduser(config['filesystem']['extensions_manifest'])
+    command_args = args
+    if options.print_map:
+        command_args = None
+
     role = config['client']['role']
     try:
-        extensions_loader.load_extensions(extensions_dir, context, role)
+        extensions_loader.load_extensions(extensions_dir, context, role,
+                                          args=command_args, manifest_filename=manifest_filename)
     except extensions_loader.LoadFailed, e:
         prompt.write(_('The following extensions failed to load: %(f)s' % {'f' : ', '.join(e.failed_packs)}))
         prompt.write(_('More information on the failures can be found in %(l)s' % {'l' : config['logging']['filename']}))
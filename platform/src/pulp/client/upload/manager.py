@@ -18,16 +18,22 @@ download, uploading a file in multiple chunks instead of a single call, and
 client-side tracking of upload requests on the server.
 """
 
+import Queue
 import copy
 import os
 import pickle
 import sys
+import threading
+import time
 
 from pulp.client.lock import LockFile
 
 # -- constants ----------------------------------------------------------------
 
 DEFAULT_CHUNKSIZE = 1048576 # 1 MB per upload call
+DEFAULT_WINDOW = 4 # concurrent upload calls per file
+DEFAULT_FILE_CONCURRENCY = 2 # files uploaded at once by upload_many
+DEFAULT_SAVE_INTERVAL = 2 # seconds between tracker file saves while uploading
 
 # -- exceptions ---------------------------------------------------------------
 
@@ -84,7 +90,8 @@ class UploadManager(object):
     on disk state files.
     """
 
-    def __init__(self, upload_working_dir, bindings, chunk_size=DEFAULT_CHUNKSIZE):
+    def __init__(self, upload_working_dir, bindings, chunk_size=DEFAULT_CHUNKSIZE,
+                 window=DEFAULT_WINDOW, save_interval=DEFAULT_SAVE_INTERVAL):
         """
         @param upload_working_dir: directory in which to store client-side files
                to track upload requests; if it doesn't exist it will be created
@@ -97,10 +104,21 @@ class UploadManager(object):
         @param chunk_size: size in bytes of data to upload on each call to the
                server
         @type  chunk_size: int
+
+        @param window: maximum number of upload calls in progress at once for
+               a single file; 1 uploads the chunks one after the other
+        @type  window: int
+
+        @param save_interval: seconds between saves of a tracker file while
+               its upload runs; a resumed upload re-sends at most the chunks
+               uploaded in that time
+        @type  save_interval: float
         """
         self.upload_working_dir = upload_working_dir
         self.bindings = bindings
         self.chunk_size = chunk_size
+        self.window = window
+        self.save_interval = save_interval
 
         # Internal state
         self.tracker_files = {}
@@ -156,7 +174,12 @@ class UploadManager(object):
         """
         self._verify_initialized()
 
-        response = self.bindings.uploads.initialize_upload().response_body
+        # Let the server allocate the file up front
+        size = None
+        if filename and os.path.isfile(filename):
+            size = os.path.getsize(filename)
+
+        response = self.bindings.uploads.initialize_upload(size).response_body
 
         upload_id = response['upload_id']
         location = response['_href']
@@ -189,12 +212,16 @@ class UploadManager(object):
         client-side on disk tracker files will store the current offset and
         resume the upload from where it left off on the next call to this method.
 
+        Up to window chunks of the file are uploaded at once. The tracker
+        file records which chunks completed, even out of order, and is saved
+        every save_interval seconds and when the upload stops.
+
         The callback_func is used to get feedback on the upload process. After
         each successful upload segment call to the server, this function
-        will be invoked with the new offset in the file and the file size
-        (intended to be fed into a progress indicator). As this is called
-        after each upload segment call, the granularity at which it is called
-        depends on the chunk_size value for this instance.
+        will be invoked with the number of bytes of the file uploaded so far
+        and the file size (intended to be fed into a progress indicator). As
+        this is called after each upload segment call, the granularity at
+        which it is called depends on the chunk_size value for this instance.
 
         The callback_func should have a signature of (int, int).
 
@@ -238,23 +265,7 @@ class UploadManager(object):
             tracker_file.save()
 
             source_file_size = os.path.getsize(tracker_file.source_filename)
-
-            f = open(tracker_file.source_filename, 'r')
-            while True:
-                # Load the chunk to upload
-                f.seek(tracker_file.offset)
-                data = f.read(self.chunk_size)
-                if not data:
-                    break
-
-                # Server request
-                self.bindings.uploads.upload_segment(upload_id, tracker_file.offset, data)
-
-                # Status update and callback notification
-                tracker_file.offset = min(tracker_file.offset + self.chunk_size, source_file_size)
-                tracker_file.save()
-
-                callback_func(tracker_file.offset, source_file_size)
+            self._upload_segments(tracker_file, source_file_size, callback_func)
 
             tracker_file.is_finished_uploading = True
         finally:
@@ -263,6 +274,74 @@ class UploadManager(object):
             tracker_file.is_running = False
             tracker_file.save()
 
+    def upload_many(self, upload_ids, callback_func=None, force=False,
+                    concurrency=DEFAULT_FILE_CONCURRENCY):
+        """
+        Begins or resumes the upload process for several upload requests,
+        uploading up to concurrency files at once (each of them using up to
+        window concurrent upload calls). This call will not return until all
+        of the uploads are complete or have failed.
+
+        The callback_func has the same purpose as for upload() but is invoked
+        with the upload ID as the first argument; its signature should be
+        (str, int, int). It is called from the threads doing the uploads.
+
+        @param upload_ids: identifies the upload requests
+        @type  upload_ids: list
+
+        @param callback_func: optional method to be called after each upload
+               call to the server
+        @type  callback_func: func
+
+        @param force: if true will bypass the running check to prevent concurrent
+               uploads
+        @type  force: bool
+
+        @param concurrency: maximum number of files uploaded at once
+        @type  concurrency: int
+
+        @return: exception raised by upload() for each upload that failed,
+                 keyed by upload ID; empty if all of them succeeded
+        @rtype:  dict
+        """
+        self._verify_initialized()
+
+        pending = Queue.Queue()
+        for upload_id in upload_ids:
+            pending.put(upload_id)
+
+        failures = {}
+
+        def upload_files():
+            while True:
+                try:
+                    upload_id = pending.get_nowait()
+                except Queue.Empty:
+                    return
+
+                file_callback = None
+                if callback_func is not None:
+                    file_callback = lambda offset, size, i=upload_id: callback_func(i, offset, size)
+
+                try:
+                    self.upload(upload_id, file_callback, force)
+                except Exception, e:
+                    failures[upload_id] = e
+
+        threads = []
+        for i in range(min(concurrency, len(upload_ids))):
+            thread = threading.Thread(target=upload_files)
+            thread.setDaemon(True)
+            thread.start()
+            threads.append(thread)
+
+        for thread in threads:
+            # join in a loop so a KeyboardInterrupt isn't blocked
+            while thread.isAlive():
+                thread.join(1)
+
+        return failures
+
     def import_upload(self, upload_id):
         """
         Once the file is finished uploading, this call will request the server
@@ -375,6 +454,100 @@ class UploadManager(object):
     def _all_tracker_files(self):
         return self.tracker_files.values()
 
+    # -- upload utilities -----------------------------------------------------
+
+    def _upload_segments(self, tracker_file, file_size, callback_func):
+        """
+        Uploads the chunks of the file that aren't uploaded yet, keeping up to
+        window upload calls in progress. The file is read once, in order, by
+        the calling thread, so at most window chunks are held in memory.
+        """
+        upload_id = tracker_file.upload_id
+        segments = tracker_file.remaining_segments(file_size, self.chunk_size)
+
+        # Each upload call reports (start, end, exc_info) to the results queue
+        results = Queue.Queue()
+
+        requests = Queue.Queue()
+        workers = []
+        if self.window > 1:
+            for i in range(min(self.window, len(segments))):
+                worker = threading.Thread(target=self._segment_worker, args=(upload_id, requests, results))
+                worker.setDaemon(True)
+                worker.start()
+                workers.append(worker)
+
+        uploaded = tracker_file.uploaded_bytes()
+        last_save = time.time()
+        in_flight = 0
+        error = None
+
+        f = open(tracker_file.source_filename, 'r')
+        try:
+            position = 0
+            while True:
+                # Read and send chunks until the window is full
+                while error is None and segments and in_flight < max(self.window, 1):
+                    start, end = segments.pop(0)
+                    if start != position:
+                        f.seek(start)
+                    data = f.read(end - start)
+                    if not data:
+                        segments = []
+                        break
+                    position = start + len(data)
+                    in_flight += 1
+
+                    if workers:
+                        requests.put((start, position, data))
+                    else:
+                        results.put(self._upload_segment(upload_id, start, position, data))
+
+                if not in_flight:
+                    break
+
+                start, end, exc_info = _get(results)
+                in_flight -= 1
+
+                # Stop sending on the first error, but wait for the chunks
+                # already sent so the tracker knows about them
+                if exc_info is not None:
+                    error = error or exc_info
+                    continue
+
+                # Status update and callback notification
+                tracker_file.segment_uploaded(start, end)
+                uploaded += end - start
+
+                if time.time() - last_save >= self.save_interval:
+                    tracker_file.save()
+                    last_save = time.time()
+
+                if callback_func is not None:
+                    callback_func(uploaded, file_size)
+        finally:
+            f.close()
+            for worker in workers:
+                requests.put(None)
+
+        if error is not None:
+            raise error[0], error[1], error[2]
+
+    def _segment_worker(self, upload_id, requests, results):
+        while True:
+            request = requests.get()
+            if request is None:
+                return
+            start, end, data = request
+            results.put(self._upload_segment(upload_id, start, end, data))
+
+    def _upload_segment(self, upload_id, start, end, data):
+        try:
+            self.bindings.uploads.upload_segment(upload_id, start, data)
+        except Exception:
+            return start, end, sys.exc_info()
+        return start, end, None
+
     # -- misc utility ---------------------------------------------------------
 
     def _verify_initialized(self):
@@ -393,9 +566,13 @@ class UploadTracker(object):
         # Upload call information
         self.upload_id = None
         self.location = None # URL to the upload request on the server
-        self.offset = None # start of next chunk to upload
+        self.offset = None # end of the uploaded part at the start of the file
         self.source_filename = None # path on disk to the file to upload
 
+        # start -> end of chunks past offset that have been uploaded; chunks
+        # can finish out of order when several are uploaded at once
+        self.completed_segments = {}
+
         # Import call information
         self.repo_id = None
         self.unit_type_id = None
@@ -432,6 +609,54 @@ class UploadTracker(object):
     def delete(self):
         os.remove(self.filename)
 
+    def segment_uploaded(self, start, end):
+        """
+        Records that the bytes from start to end have been uploaded.
+
+        @param start: offset of the first byte of the chunk in the file
+        @type  start: int
+        @param end: offset following the last byte of the chunk
+        @type  end: int
+        """
+        self.completed_segments[start] = end
+        while self.offset in self.completed_segments:
+            self.offset = self.completed_segments.pop(self.offset)
+
+    def remaining_segments(self, file_size, chunk_size):
+        """
+        Returns the chunks of the file that still need to be uploaded.
+
+        @param file_size: size of the file being uploaded
+        @type  file_size: int
+        @param chunk_size: maximum size of a chunk
+        @type  chunk_size: int
+
+        @return: list of (start, end) offsets, in file order
+        @rtype:  list
+        """
+        segments = []
+        completed = sorted(self.completed_segments.items())
+        position = self.offset
+        while position < file_size:
+            while completed and completed[0][0] <= position:
+                start, end = completed.pop(0)
+                position = max(position, end)
+            if position >= file_size:
+                break
+            end = min(position + chunk_size, file_size)
+            if completed:
+                end = min(end, completed[0][0])
+            segments.append((position, end))
+            position = end
+        return segments
+
+    def uploaded_bytes(self):
+        """
+        @return: number of bytes of the file uploaded so far
+        @rtype:  int
+        """
+        return self.offset + sum([e - s for s, e in self.completed_segments.items()])
+
     @classmethod
     def load(cls, filename):
         """
@@ -445,4 +670,18 @@ class UploadTracker(object):
         status_file = pickle.load(f)
         f.close()
 
+        # Tracker files written before chunks were uploaded concurrently
+        if not hasattr(status_file, 'completed_segments'):
+            status_file.completed_segments = {}
+
         return status_file
+
+# -- utilities ----------------------------------------------------------------
+
+def _get(queue):
+    # A blocking get without a timeout can't be interrupted by ctrl+c
+    while True:
+        try:
+            return queue.get(True, 60)
+        except Queue.Empty:
+            pass
@@ -11,6 +11,8 @@
 # You should have received a copy of GPLv2 along with this software; if not,
 # see http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt
 
+import httplib
+
 
 def encode_unicode(path):
     """
@@ -46,3 +48,21 @@ def ensure_utf_8(s):
         s = s.decode('iso-8859-1')
     u = s.encode('utf-8')
     return u
+
+
+def closed_without_response(err):
+    """
+    Check if an error raised while reading an HTTP response reports that the
+    server closed the connection before sending a status line, which happens
+    when a persistent connection is closed by the server while it is idle.
+    httplib reports it as a BadStatusLine for an empty line, which depending
+    on the python version is '', "''" or a message.
+
+    @param err: error raised by getresponse()
+    @type  err: Exception
+    @rtype: bool
+    """
+    if not isinstance(err, httplib.BadStatusLine):
+        return False
+    line = err.line or ''
+    return line in ('', "''") or 'closed the connection' in line
@@ -12,6 +12,7 @@
 # http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
 
 from pulp.plugins.model import AssociatedUnit, Unit
+from pulp.plugins.types import database as types_db
 
 def to_pulp_unit(plugin_unit):
     """
@@ -103,3 +104,26 @@ def to_plugin_associated_unit(pulp_unit, type_def):
     u.id = unit_id
 
     return u
+
+def to_plugin_associated_units(pulp_units):
+    """
+    Lazily parses the raw dictionaries of content units associated to a
+    repository into their plugin representations. Type definitions are loaded
+    once per type as the units are read so the database isn't hammered.
+
+    @param pulp_units: raw dictionaries of unit metadata
+    @type  pulp_units: iterable of dict
+
+    @return: plugin unit representations of the given units
+    @rtype:  generator of pulp.plugins.model.AssociatedUnit
+    """
+
+    type_defs = {}
+
+    for pulp_unit in pulp_units:
+        type_id = pulp_unit['unit_type_id']
+        type_def = type_defs.get(type_id)
+        if type_def is None:
+            type_def = type_defs[type_id] = types_db.type_definition(type_id)
+
+        yield to_plugin_associated_unit(pulp_unit, type_def)
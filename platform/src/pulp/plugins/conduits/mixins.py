@@ -11,9 +11,11 @@
 # have received a copy of GPLv2 along with this software; if not, see
 # http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
 
+from contextlib import contextmanager
 from gettext import gettext as _
 import logging
 import sys
+import threading
 
 import pulp.plugins.conduits._common as common_utils
 from   pulp.plugins.model import Unit, PublishReport
@@ -30,6 +32,9 @@ from   pulp.server.db.model.criteria import UnitAssociationCriteria, Criteria
 
 _LOG = logging.getLogger(__name__)
 
+# Number of units buffered by AddUnitMixin.buffered_saves before they are saved
+DEFAULT_SAVE_BATCH_SIZE = 1000
+
 # -- exceptions ---------------------------------------------------------------
 
 class ImporterConduitException(Exception):
@@ -146,6 +151,21 @@ class SingleRepoUnitsMixin(object):
         """
         return do_get_repo_units(self.repo_id, criteria, self.exception_class)
 
+    def get_units_iter(self, criteria=None):
+        """
+        Generator variant of get_units. Units are read from the database and
+        converted in batches as they are iterated, so the full set of units is
+        never held in memory at once.
+
+        @param criteria: used to scope the returned results or the data within;
+               the Criteria class can be imported from this module
+        @type  criteria: L{UnitAssociationCriteria}
+
+        @return: generator of unit instances
+        @rtype:  generator of L{AssociatedUnit}
+        """
+        return do_get_repo_units_iter(self.repo_id, criteria, self.exception_class)
+
 
 class MultipleRepoUnitsMixin(object):
 
@@ -169,6 +189,21 @@ class MultipleRepoUnitsMixin(object):
         """
         return do_get_repo_units(repo_id, criteria, self.exception_class)
 
+    def get_units_iter(self, repo_id, criteria=None):
+        """
+        Generator variant of get_units. Units are read from the database and
+        converted in batches as they are iterated, so the full set of units is
+        never held in memory at once.
+
+        @param criteria: used to scope the returned results or the data within;
+               the Criteria class can be imported from this module
+        @type  criteria: L{UnitAssociationCriteria}
+
+        @return: generator of unit instances
+        @rtype:  generator of L{AssociatedUnit}
+        """
+        return do_get_repo_units_iter(repo_id, criteria, self.exception_class)
+
 
 class SearchUnitsMixin(object):
 
@@ -386,6 +421,11 @@ class AddUnitMixin(object):
 
         self._association_owner_id = association_owner_id
 
+        # Units waiting to be saved while in buffered mode; None otherwise
+        self._pending_units = None
+        self._pending_batch_size = DEFAULT_SAVE_BATCH_SIZE
+        self._pending_lock = threading.RLock()
+
     def init_unit(self, type_id, unit_key, metadata, relative_path):
         """
         Initializes the Pulp representation of a content unit. The conduit will
@@ -438,6 +478,39 @@ class AddUnitMixin(object):
             _LOG.exception('Exception from server requesting unit filename for relative path [%s]' % relative_path)
             raise ImporterConduitException(e), None, sys.exc_info()[2]
 
+    def init_units(self, type_id, units):
+        """
+        Batch version of init_unit for importers initializing many units of
+        the same type at once; the storage directories are created together.
+
+        @param type_id: must correspond to a type definition in Pulp
+        @type  type_id: str
+
+        @param units: (unit_key, metadata, relative_path) tuple for each unit,
+                      as described in init_unit
+        @type  units: list of tuple
+
+        @return: object representation of each unit, in the order given
+        @rtype:  list of L{Unit}
+        """
+
+        relative_paths = [u[2] for u in units if u[2] is not None]
+        try:
+            content_query_manager = manager_factory.content_query_manager()
+            paths = content_query_manager.request_content_unit_file_paths(type_id, relative_paths)
+        except Exception, e:
+            _LOG.exception('Exception from server requesting unit filenames for relative paths %s' % relative_paths)
+            raise ImporterConduitException(e), None, sys.exc_info()[2]
+
+        paths = iter(paths)
+        initialized = []
+        for unit_key, metadata, relative_path in units:
+            path = None
+            if relative_path is not None:
+                path = paths.next()
+            initialized.append(Unit(type_id, unit_key, metadata, path))
+        return initialized
+
     def save_unit(self, unit):
         """
         Performs two distinct steps on the Pulp server:
@@ -450,12 +523,26 @@ class AddUnitMixin(object):
         A reference to the provided unit is returned from this call. This call
         will populate the unit's id field with the UUID for the unit.
 
+        While in buffered mode (see buffered_saves), the unit is queued and
+        saved with the rest of its batch; its id field will not be populated
+        until the batch is flushed.
+
         @param unit: unit object returned from the init_unit call
         @type  unit: L{Unit}
 
         @return: object reference to the provided unit, its state updated from the call
         @rtype:  L{Unit}
         """
+        self._pending_lock.acquire()
+        try:
+            if self._pending_units is not None:
+                self._pending_units.append(unit)
+                if len(self._pending_units) >= self._pending_batch_size:
+                    self.flush_units()
+                return unit
+        finally:
+            self._pending_lock.release()
+
         try:
             content_query_manager = manager_factory.content_query_manager()
             content_manager = manager_factory.content_manager()
@@ -480,6 +567,135 @@ class AddUnitMixin(object):
             _LOG.exception(_('Content unit association failed [%s]' % str(unit)))
             raise ImporterConduitException(e), None, sys.exc_info()[2]
 
+    def save_units(self, units):
+        """
+        Bulk variant of save_unit. Each unit is created or updated and
+        associated to the repository being synchronized, with the same
+        semantics as calling save_unit on each in turn.
+
+        Units are grouped by type. Existing units are found with a single
+        query on their unit keys, new units and their associations are
+        inserted in batches, and the repository's unit count is updated once
+        per type rather than once per unit.
+
+        @param units: unit objects returned from the init_unit call
+        @type  units: list of L{Unit}
+
+        @return: the provided units, their id fields populated
+        @rtype:  list of L{Unit}
+        """
+        try:
+            content_query_manager = manager_factory.content_query_manager()
+            content_manager = manager_factory.content_manager()
+            association_manager = manager_factory.repo_unit_association_manager()
+
+            # Group by type, keeping the order the units were given in
+            type_ids = []
+            units_by_type = {}
+            for unit in units:
+                if unit.type_id not in units_by_type:
+                    type_ids.append(unit.type_id)
+                    units_by_type[unit.type_id] = []
+                units_by_type[unit.type_id].append(unit)
+
+            for type_id in type_ids:
+                type_units = units_by_type[type_id]
+                unit_ids = content_query_manager.get_content_unit_ids_by_keys_dicts(type_id, [u.unit_key for u in type_units])
+
+                # Units saved more than once in the same batch are added the
+                # first time and updated every time after that
+                new_units = []
+                new_units_by_key = {}
+                repeated_units = []
+                for unit, unit_id in zip(type_units, unit_ids):
+                    if unit_id is not None:
+                        unit.id = unit_id
+                        content_manager.update_content_unit(type_id, unit.id, common_utils.to_pulp_unit(unit))
+                        self._updated_count += 1
+                        continue
+
+                    key = tuple(sorted(unit.unit_key.items()))
+                    if key in new_units_by_key:
+                        repeated_units.append((unit, new_units_by_key[key]))
+                    else:
+                        new_units_by_key[key] = unit
+                        new_units.append(unit)
+
+                new_ids = content_manager.add_content_units(type_id, [common_utils.to_pulp_unit(u) for u in new_units])
+                for unit, unit_id in zip(new_units, new_ids):
+                    unit.id = unit_id
+                self._added_count += len(new_units)
+
+                for unit, first_unit in repeated_units:
+                    unit.id = first_unit.id
+                    content_manager.update_content_unit(type_id, unit.id, common_utils.to_pulp_unit(unit))
+                    self._updated_count += 1
+
+                # Associate them with the repo
+                association_manager.associate_all_by_ids(self.repo_id, type_id, [u.id for u in type_units],
+                                                         self.association_owner_type, self.association_owner_id)
+
+            return units
+        except Exception, e:
+            _LOG.exception(_('Content unit association failed for [%d] units' % len(units)))
+            raise ImporterConduitException(e), None, sys.exc_info()[2]
+
+    @contextmanager
+    def buffered_saves(self, batch_size=DEFAULT_SAVE_BATCH_SIZE):
+        """
+        Context manager that puts the conduit in buffered mode. While in this
+        mode, units passed to save_unit are queued and saved through save_units
+        once batch_size units are pending, when link_unit is called, when
+        flush_units is called, and when the block exits.
+
+        Usage::
+
+          with conduit.buffered_saves():
+              for unit in units:
+                  conduit.save_unit(unit)
+
+        The added and updated unit counts in the conduit's reports only
+        include units that have been flushed.
+
+        @param batch_size: maximum number of units queued before they are saved
+        @type  batch_size: int
+        """
+        self._pending_lock.acquire()
+        try:
+            if self._pending_units is not None:
+                raise ImporterConduitException(_('Conduit is already in buffered mode'))
+            self._pending_units = []
+            self._pending_batch_size = batch_size
+        finally:
+            self._pending_lock.release()
+
+        try:
+            yield self
+        finally:
+            self._pending_lock.acquire()
+            try:
+                try:
+                    self.flush_units()
+                finally:
+                    self._pending_units = None
+            finally:
+                self._pending_lock.release()
+
+    def flush_units(self):
+        """
+        Saves any units queued by save_unit while in buffered mode. This has no
+        effect if the conduit is not in buffered mode or no units are queued.
+        """
+        self._pending_lock.acquire()
+        try:
+            if not self._pending_units:
+                return
+            units = self._pending_units
+            self._pending_units = []
+            self.save_units(units)
+        finally:
+            self._pending_lock.release()
+
     def link_unit(self, from_unit, to_unit, bidirectional=False):
         """
         Creates a reference between two content units. The semantics of what
@@ -499,6 +715,9 @@ class AddUnitMixin(object):
         @param to_unit: will be referenced by the from_unit
         @type  to_unit: L{Unit}
         """
+        # Queued units need their ids before they can be linked
+        self.flush_units()
+
         content_manager = manager_factory.content_manager()
 
         try:
@@ -586,24 +805,25 @@ def do_get_repo_units(repo_id, criteria, exception_class):
         association_query_manager = manager_factory.repo_unit_association_query_manager()
         units = association_query_manager.get_units(repo_id, criteria=criteria)
 
-        all_units = []
+        # Convert to transfer object
+        return list(common_utils.to_plugin_associated_units(units))
 
-        # Load all type definitions in use so we don't hammer the database
-        unique_type_defs = set([u['unit_type_id'] for u in units])
-        type_defs = {}
-        for def_id in unique_type_defs:
-            type_def = types_db.type_definition(def_id)
-            type_defs[def_id] = type_def
+    except Exception, e:
+        _LOG.exception('Exception from server requesting all content units for repository [%s]' % repo_id)
+        raise exception_class(e), None, sys.exc_info()[2]
 
-        # Convert to transfer object
-        for unit in units:
-            type_id = unit['unit_type_id']
-            u = common_utils.to_plugin_associated_unit(unit, type_defs[type_id])
-            all_units.append(u)
+def do_get_repo_units_iter(repo_id, criteria, exception_class):
+    """
+    Generator variant of do_get_repo_units. Errors raised while reading the
+    units are wrapped in the given exception class as they are encountered.
+    """
+    try:
+        association_query_manager = manager_factory.repo_unit_association_query_manager()
+        units = association_query_manager.get_units_iter(repo_id, criteria=criteria)
 
-        return all_units
+        for u in common_utils.to_plugin_associated_units(units):
+            yield u
 
     except Exception, e:
         _LOG.exception('Exception from server requesting all content units for repository [%s]' % repo_id)
         raise exception_class(e), None, sys.exc_info()[2]
-
@@ -24,7 +24,6 @@ from pulp.plugins.conduits.mixins import (
     ImporterConduitException, ImporterScratchPadMixin, RepoScratchPadMixin,
     SingleRepoUnitsMixin, SearchUnitsMixin, AddUnitMixin)
 import pulp.plugins.conduits._common as common_utils
-import pulp.plugins.types.database as types_db
 import pulp.server.managers.factory as manager_factory
 
 from pulp.server.db.model.criteria import UnitAssociationCriteria # shadow for importing by plugins
@@ -139,22 +138,32 @@ class ImportUnitConduit(ImporterScratchPadMixin, RepoScratchPadMixin,
         try:
             units = self.__association_query_manager.get_units_across_types(self.source_repo_id, criteria=criteria)
 
-            all_units = []
+            # Convert to transfer object
+            return list(common_utils.to_plugin_associated_units(units))
 
-            # Load all type definitions in use so we don't hammer the database
-            unique_type_defs = set([u['unit_type_id'] for u in units])
-            type_defs = {}
-            for def_id in unique_type_defs:
-                type_def = types_db.type_definition(def_id)
-                type_defs[def_id] = type_def
+        except Exception, e:
+            _LOG.exception('Exception from server requesting all content units for repository [%s]' % self.repo_id)
+            raise UnitImportConduitException(e), None, sys.exc_info()[2]
 
-            # Convert to transfer object
-            for unit in units:
-                type_id = unit['unit_type_id']
-                u = common_utils.to_plugin_associated_unit(unit, type_defs[type_id])
-                all_units.append(u)
+    def get_source_units_iter(self, criteria=None):
+        """
+        Generator variant of get_source_units. Units are read from the database
+        and converted in batches as they are iterated, so the full set of units
+        in the source repository is never held in memory at once.
+
+        @param criteria: used to scope the returned results or the data within;
+               the Criteria class can be imported from this module
+        @type  criteria: L{Criteria}
+
+        @return: generator of unit instances
+        @rtype:  generator of L{AssociatedUnit}
+        """
+
+        try:
+            units = self.__association_query_manager.get_units_across_types_iter(self.source_repo_id, criteria=criteria)
 
-            return all_units
+            for u in common_utils.to_plugin_associated_units(units):
+                yield u
 
         except Exception, e:
             _LOG.exception('Exception from server requesting all content units for repository [%s]' % self.repo_id)
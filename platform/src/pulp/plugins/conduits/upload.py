@@ -11,15 +11,42 @@
 # have received a copy of GPLv2 along with this software; if not, see
 # http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
 
+from gettext import gettext as _
+import logging
+import sys
+
 from pulp.plugins.conduits.mixins import (
     AddUnitMixin, SingleRepoUnitsMixin, SearchUnitsMixin,
     ImporterConduitException)
+import pulp.server.managers.factory as manager_factory
+
+_LOG = logging.getLogger(__name__)
 
 class UploadConduit(AddUnitMixin, SingleRepoUnitsMixin, SearchUnitsMixin):
 
     def __init__(self, repo_id, importer_id, association_owner_type,
-                 association_owner_id):
+                 association_owner_id, upload_id=None):
         AddUnitMixin.__init__(self, repo_id, importer_id,
                               association_owner_type, association_owner_id)
         SingleRepoUnitsMixin.__init__(self, repo_id, ImporterConduitException)
         SearchUnitsMixin.__init__(self, ImporterConduitException)
+        self.upload_id = upload_id
+
+    def get_upload_checksum(self):
+        """
+        Returns the SHA-256 checksum of the uploaded file. The checksum is
+        mostly calculated while the file is uploaded, so this is cheaper
+        than reading the file again.
+
+        @return: hex digest of the SHA-256 of the uploaded file
+        @rtype:  str
+
+        @raise ImporterConduitException: wraps any exception that may occur
+               in the Pulp server
+        """
+        try:
+            upload_manager = manager_factory.content_upload_manager()
+            return upload_manager.upload_checksum(self.upload_id)
+        except Exception, e:
+            _LOG.exception(_('Error calculating the checksum of upload [%(u)s]') % {'u' : self.upload_id})
+            raise ImporterConduitException(e), None, sys.exc_info()[2]
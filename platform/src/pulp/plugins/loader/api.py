@@ -60,6 +60,8 @@ def initialize(validate=True):
     assert not _is_initialized()
 
     _create_manager()
+    # serve type definitions from memory from the start
+    database.TYPE_REGISTRY.load()
     # add plugins here in the form (path, base class, manager map)
     plugin_tuples =  ((_DISTRIBUTORS_DIR, Distributor, _MANAGER.distributors),
                       (_DISTRIBUTORS_DIR, GroupDistributor, _MANAGER.group_distributors),
@@ -267,3 +267,30 @@ class Profiler(object):
         """
         raise Exception, \
             'Applicability for: %s, not supported' % unit
+
+    def units_applicable(self, consumer, units, config, conduit):
+        """
+        Determine whether each of the content units is applicable to the
+        specified consumer. Called once per consumer with all of the requested
+        units of the profiler's types, so profilers can parse the consumer's
+        profile once rather than for every unit.
+
+        The default implementation calls unit_applicable for each unit.
+
+        @param consumer: A consumer.
+        @type consumer: L{pulp.server.plugins.model.Consumer}
+
+        @param units: A list of content units: { type_id:<str>, unit_key:<dict> }
+        @type units: list
+
+        @param config: plugin configuration
+        @type config: L{pulp.server.plugins.config.PluginCallConfiguration}
+
+        @param conduit: provides access to relevant Pulp functionality
+        @type conduit: L{pulp.plugins.conduits.profiler.ProfilerConduit}
+
+        @return: An applicability report for each unit, in the same order
+            as the units.
+        @rtype: list of L{pulp.plugins.model.ApplicabilityReport}
+        """
+        return [self.unit_applicable(consumer, u, config, conduit) for u in units]
@@ -15,19 +15,33 @@
 Responsible for the storage and retrieval of content types in the database.
 This module covers both the ContentType collection itself as well as any
 type-specific collections that exist to suit the type needs.
+
+Type definitions are read from an in-memory registry (see L{TypeRegistry})
+rather than from the database on every lookup.
 """
 
+import copy
 import logging
+import threading
+import time
 
 from pymongo import ASCENDING
 
 import pulp.server.db.connection as pulp_db
-from pulp.server.db.model.content import ContentType
+from pulp.server import response_cache
+from pulp.server.db.model.content import ContentType, ContentTypesVersion
 
 # -- constants ----------------------------------------------------------------
 
 TYPE_COLLECTION_PREFIX = 'units_'
 
+# _id of the document holding the version stamp of the type definitions
+TYPES_VERSION_ID = 'content_types'
+
+# seconds between checks of the version stamp, so changes made by other
+# processes (e.g. pulp-manage-db) are picked up
+TYPE_REGISTRY_CHECK_INTERVAL = 30
+
 LOG = logging.getLogger('db')
 
 # -- database exceptions ------------------------------------------------------
@@ -84,6 +98,7 @@ def update_database(definitions, error_on_missing_definitions=False):
 
     # Get a list of all type collections now so we can figure out which
     # previously existed but are not in the new list
+    TYPE_REGISTRY.load()
     existing_type_names = [t[len(TYPE_COLLECTION_PREFIX):] for t in all_type_collection_names()]
     update_type_ids = [t.id for t in definitions]
     missing = set(existing_type_names) - set(update_type_ids)
@@ -152,6 +167,8 @@ def clean():
     type_collection = ContentType.get_collection()
     type_collection.remove(safe=True)
 
+    _update_version()
+
 
 def type_units_collection(type_id):
     """
@@ -174,12 +191,7 @@ def all_type_ids():
              if there are no IDs in the database
     @rtype:  list of str
     """
-
-    collection = ContentType.get_collection()
-    type_id_son = list(collection.find(fields={'id' : 1}))
-    type_ids = [t['id'] for t in type_id_son]
-
-    return type_ids
+    return [t['id'] for t in TYPE_REGISTRY.definitions()]
 
 
 def all_type_collection_names():
@@ -187,15 +199,7 @@ def all_type_collection_names():
     @return: list of collection names for all types currently in the database
     @rtype:  list of str
     """
-
-    collection = ContentType.get_collection()
-    type_ids = list(collection.find(fields={'id' : 1}))
-
-    type_collection_names = []
-    for id in type_ids:
-        type_collection_names.append(unit_collection_name(id['id']))
-
-    return type_collection_names
+    return [unit_collection_name(t['id']) for t in TYPE_REGISTRY.definitions()]
 
 
 def all_type_definitions():
@@ -203,10 +207,7 @@ def all_type_definitions():
     @return: list of all type definitions in the database (mongo SON objects)
     @rtype:  list of dict
     """
-
-    coll = ContentType.get_collection()
-    types = list(coll.find())
-    return types
+    return [copy.deepcopy(t) for t in TYPE_REGISTRY.definitions()]
 
 
 def type_definition(type_id):
@@ -217,9 +218,10 @@ def type_definition(type_id):
     @return: corresponding type definition, None if not found
     @rtype: SON or None
     """
-    collection = ContentType.get_collection()
-    type_ = collection.find_one({'id': type_id})
-    return type_
+    type_ = TYPE_REGISTRY.definition(type_id)
+    if type_ is None:
+        return None
+    return copy.deepcopy(type_)
 
 
 def unit_collection_name(type_id):
@@ -246,12 +248,148 @@ def type_units_unit_key(type_id):
              content type collection
     @rtype: list of str or None
     """
-    collection = ContentType.get_collection()
-    type_def = collection.find_one({'id': type_id})
+    type_def = TYPE_REGISTRY.definition(type_id)
     if type_def is None:
         return None
     return type_def['unit_key']
 
+
+def type_search_indexes(type_id):
+    """
+    Get the search indexes for a given content type collection. If no type
+    definition is found for the given ID, None is returned
+
+    @param type_id: unique content type identifier
+    @type type_id: str
+    @return: list of indices, each a field name or a list of field names for
+             a compound index
+    @rtype: list or None
+    """
+    type_def = TYPE_REGISTRY.definition(type_id)
+    if type_def is None:
+        return None
+    return type_def['search_indexes']
+
+# -- type registry ------------------------------------------------------------
+
+class TypeRegistry(object):
+    """
+    Thread-safe, in-memory copy of the type definitions, so looking up a type
+    does not query the database.
+
+    The definitions are loaded all at once along with their version stamp and
+    are replaced, never modified, when they are reloaded. This process reloads
+    them after changing the definitions; changes made by other processes are
+    picked up by checking the version stamp every check_interval seconds and
+    whenever an unknown type is looked up. The definitions returned are
+    shared by all callers and must not be modified.
+
+    @ivar check_interval: seconds between checks of the version stamp
+    @type check_interval: float
+    """
+
+    def __init__(self, check_interval=TYPE_REGISTRY_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._checked = None
+
+    def load(self):
+        """
+        Load the type definitions from the database, replacing the ones
+        currently held.
+        """
+        self._lock.acquire()
+        try:
+            self._load()
+        finally:
+            self._lock.release()
+
+    def invalidate(self):
+        """
+        Drop the type definitions; they will be reloaded on the next lookup.
+        """
+        self._lock.acquire()
+        try:
+            self._snapshot = None
+        finally:
+            self._lock.release()
+
+    def definition(self, type_id):
+        """
+        @param type_id: unique type id
+        @type  type_id: str
+        @return: corresponding type definition, None if not found
+        @rtype:  SON or None
+        """
+        type_def = self._current().by_id.get(type_id)
+        if type_def is None:
+            type_def = self._current(check=True).by_id.get(type_id)
+        return type_def
+
+    def definitions(self):
+        """
+        @return: all type definitions, in database order
+        @rtype:  tuple of SON
+        """
+        return self._current().definitions
+
+    def _current(self, check=False):
+        snapshot = self._snapshot
+        if snapshot is not None and not check and \
+                time.time() - self._checked <= self.check_interval:
+            return snapshot
+        self._lock.acquire()
+        try:
+            if self._snapshot is None or _version() != self._snapshot.version:
+                self._load()
+            else:
+                self._checked = time.time()
+            return self._snapshot
+        finally:
+            self._lock.release()
+
+    def _load(self):
+        # the stamp is read first so a change made while the definitions
+        # are being read is seen by the next check
+        version = _version()
+        definitions = tuple(ContentType.get_collection().find())
+        self._snapshot = _TypeSnapshot(version, definitions)
+        self._checked = time.time()
+
+
+class _TypeSnapshot(object):
+    """
+    Type definitions as of a single version stamp.
+    """
+
+    def __init__(self, version, definitions):
+        self.version = version
+        self.definitions = definitions
+        self.by_id = dict((d['id'], d) for d in definitions)
+
+
+def _version():
+    stamp = ContentTypesVersion.get_collection().find_one({'_id': TYPES_VERSION_ID})
+    if stamp is None:
+        return 0
+    return stamp['version']
+
+
+def _update_version():
+    """
+    Stamp the type definitions with a new version, telling every process to
+    reload them.
+    """
+    ContentTypesVersion.get_collection().update({'_id': TYPES_VERSION_ID},
+                                                {'$inc': {'version': 1}},
+                                                upsert=True, safe=True)
+    TYPE_REGISTRY.invalidate()
+    response_cache.invalidate(response_cache.CONTENT_TYPES)
+
+
+TYPE_REGISTRY = TypeRegistry()
+
 # -- private -----------------------------------------------------------------
 
 def _create_or_update_type(type_def):
@@ -273,6 +411,7 @@ def _create_or_update_type(type_def):
         content_type._id = existing_type['_id']
     # XXX this still causes a potential race condition when 2 users are updating the same type
     content_type_collection.save(content_type, safe=True)
+    _update_version()
 
 def _update_indexes(type_def, unique):
 
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public
+# License as published by the Free Software Foundation; either version
+# 2 of the License (GPLv2) or (at your option) any later version.
+# There is NO WARRANTY for this software, express or implied,
+# including the implied warranties of MERCHANTABILITY,
+# NON-INFRINGEMENT, or FITNESS FOR A PARTICULAR PURPOSE. You should
+# have received a copy of GPLv2 along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+
+"""
+Per-process cache of the users and permissions needed to make authorization
+decisions for REST calls.
+
+Permissions are loaded into a trie keyed by resource path segments, so
+checking a user's access to a resource is a walk down the resource path
+rather than one database query per path prefix. Users are loaded as they are
+first seen.
+
+The cache is rebuilt after the configured [security] auth_cache_ttl, and must
+be explicitly invalidated whenever users, roles or permissions are changed.
+The user, role and permission CUD managers do this themselves; anything else
+that writes to those collections must call invalidate().
+"""
+
+import copy
+import logging
+import threading
+import time
+
+from pulp.server.cache import ConfiguredTTLCache
+from pulp.server.db.model.auth import Permission, User
+from pulp.server.exceptions import MissingResource
+from pulp.server.managers import factory
+
+# -- constants ----------------------------------------------------------------
+
+_LOG = logging.getLogger(__name__)
+
+# -- permission trie ----------------------------------------------------------
+
+class PermissionNode(object):
+    """
+    Node in the permission trie. Each node corresponds to a resource path and
+    holds the operations granted to each user on that resource.
+
+    @ivar children: child nodes keyed by the next resource path segment
+    @type children: dict
+    @ivar users: operations granted on the resource, keyed by user login
+    @type users: dict
+    """
+
+    __slots__ = ('children', 'users')
+
+    def __init__(self):
+        self.children = {}
+        self.users = {}
+
+
+class PermissionTrie(object):
+    """
+    Trie of permissions keyed by resource path segments; the root node is the
+    "/" resource.
+    """
+
+    def __init__(self):
+        self.root = PermissionNode()
+
+    def add(self, resource, users):
+        """
+        Add the operations granted on the given resource to the trie.
+        Resources that are not of the normalized "/a/b/" form can never be
+        matched by an authorization check and are ignored.
+        @param resource: resource path of the permission
+        @type  resource: str
+        @param users: operations granted on the resource keyed by user login
+        @type  users: dict
+        @return: True if the permission was added, False if it was ignored
+        @rtype:  bool
+        """
+        parts = _resource_parts(resource)
+        if _resource_path(parts) != resource:
+            return False
+        node = self.root
+        for part in parts:
+            node = node.children.setdefault(part, PermissionNode())
+        for login, operations in users.items():
+            node.users.setdefault(login, set()).update(operations)
+        return True
+
+    def is_authorized(self, resource, login, operation):
+        """
+        Check to see if the user has been granted the operation on the
+        resource or on any of its parent resources, including "/".
+        @param resource: resource path to check
+        @type  resource: str
+        @param login: login of the user to check
+        @type  login: str
+        @param operation: operation to be performed on the resource
+        @type  operation: int
+        @rtype:  bool
+        """
+        node = self.root
+        if operation in node.users.get(login, ()):
+            return True
+        for part in _resource_parts(resource):
+            node = node.children.get(part)
+            if node is None:
+                return False
+            if operation in node.users.get(login, ()):
+                return True
+        return False
+
+
+def _resource_parts(resource):
+    return [p for p in resource.split('/') if p]
+
+
+def _resource_path(parts):
+    if not parts:
+        return '/'
+    return '/%s/' % '/'.join(parts)
+
+# -- cache --------------------------------------------------------------------
+
+class AuthorizationCache(ConfiguredTTLCache):
+    """
+    Thread-safe cache of user documents and the permission trie, rebuilt
+    once its time to live has passed.
+    """
+
+    ttl_option = ('security', 'auth_cache_ttl')
+
+    def __init__(self, ttl=None):
+        super(AuthorizationCache, self).__init__(ttl)
+        self._lock = threading.RLock()
+        self._users = {}
+        self._trie = None
+        self._loaded = None
+
+    # -- public api -----------------------------------------------------------
+
+    def invalidate(self):
+        """
+        Drop all cached users and permissions; they will be reloaded from the
+        database on the next lookup.
+        """
+        self._lock.acquire()
+        try:
+            self._users = {}
+            self._trie = None
+            self._loaded = None
+        finally:
+            self._lock.release()
+
+    def find_by_login(self, login):
+        """
+        Cached equivalent of UserQueryManager.find_by_login; returns a copy of
+        the given user's document, or None if there is no such user.
+        @param login: login of the user
+        @type  login: str
+        @rtype:  dict or None
+        """
+        user = self._user(login)
+        if user is None:
+            return None
+        return copy.deepcopy(user)
+
+    def is_superuser(self, login):
+        """
+        Cached equivalent of UserQueryManager.is_superuser.
+        @param login: login of the user to check
+        @type  login: str
+        @rtype:  bool
+        @raise MissingResource: if there is no such user
+        """
+        user = self._user(login)
+        if user is None:
+            raise MissingResource(login)
+        return factory.role_manager().super_user_role in user['roles']
+
+    def is_authorized(self, resource, login, operation):
+        """
+        Cached equivalent of UserQueryManager.is_authorized.
+        @param resource: pulp resource path
+        @type  resource: str
+        @param login: login of the user to check
+        @type  login: str
+        @param operation: operation to be performed on resource
+        @type  operation: int
+        @rtype:  bool
+        @raise MissingResource: if there is no such user
+        """
+        if self.is_superuser(login):
+            return True
+        return self._permission_trie().is_authorized(resource, login, operation)
+
+    # -- internal -------------------------------------------------------------
+
+    def _expire(self):
+        # must be called with the lock held
+        if self._loaded is None:
+            self._loaded = time.time()
+        elif time.time() - self._loaded > self._ttl():
+            self._users = {}
+            self._trie = None
+            self._loaded = time.time()
+
+    def _user(self, login):
+        self._lock.acquire()
+        try:
+            self._expire()
+            user = self._users.get(login)
+            if user is None:
+                # missing users are not cached so they show up once created
+                user = User.get_collection().find_one({'login' : login})
+                if user is not None:
+                    self._users[login] = user
+            return user
+        finally:
+            self._lock.release()
+
+    def _permission_trie(self):
+        self._lock.acquire()
+        try:
+            self._expire()
+            if self._trie is None:
+                trie = PermissionTrie()
+                for permission in Permission.get_collection().find(fields=['resource', 'users']):
+                    trie.add(permission['resource'], permission['users'])
+                self._trie = trie
+            return self._trie
+        finally:
+            self._lock.release()
+
+# -- singleton ----------------------------------------------------------------
+
+AUTHORIZATION_CACHE = AuthorizationCache()
+
+
+def invalidate():
+    """
+    Drop the process-wide authorization cache; must be called after users,
+    roles or permissions are changed.
+    """
+    AUTHORIZATION_CACHE.invalidate()
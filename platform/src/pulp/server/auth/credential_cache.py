@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public
+# License as published by the Free Software Foundation; either version
+# 2 of the License (GPLv2) or (at your option) any later version.
+# There is NO WARRANTY for this software, express or implied,
+# including the implied warranties of MERCHANTABILITY,
+# NON-INFRINGEMENT, or FITNESS FOR A PARTICULAR PURPOSE. You should
+# have received a copy of GPLv2 along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+
+"""
+Per-process cache of credentials that have already been verified.
+
+Checking a password runs the full key derivation and checking a certificate
+parses it and verifies it against the CA; both are repeated for every REST
+call made with the same credentials. Successful verifications are remembered
+here, in a bounded LRU, for the configured [security] credential_cache_ttl.
+
+Credentials are never stored: entries are keyed by an HMAC of the credential
+using a secret generated when the process starts. Entries for a user must be
+invalidated when the user's password is changed or the user is deleted; the
+user CUD manager does this itself.
+"""
+
+import hmac
+import os
+import threading
+import time
+
+from pulp.common.util import encode_unicode
+from pulp.server.cache import ConfiguredTTLCache
+from pulp.server.compat import digestmod
+
+# -- constants ----------------------------------------------------------------
+
+DEFAULT_MAX_SIZE = 1024
+
+# -- cache --------------------------------------------------------------------
+
+class _Entry(object):
+
+    __slots__ = ('key', 'value', 'expires', 'prev', 'next')
+
+    def __init__(self, key, value, expires):
+        self.key = key
+        self.value = value
+        self.expires = expires
+        self.prev = None
+        self.next = None
+
+
+class CredentialCache(ConfiguredTTLCache):
+    """
+    Thread-safe, bounded LRU of verified credentials. Each entry maps the
+    digest of a credential to the login or consumer id it authenticated, and
+    expires after the cache's time to live.
+
+    @ivar max_size: maximum number of entries; the least recently used entry
+                    is dropped to make room for new ones
+    @type max_size: int
+    """
+
+    ttl_option = ('security', 'credential_cache_ttl')
+
+    def __init__(self, ttl=None, max_size=DEFAULT_MAX_SIZE):
+        super(CredentialCache, self).__init__(ttl)
+        self.max_size = max_size
+        self._secret = os.urandom(32)
+        self._lock = threading.Lock()
+        self._entries = {}
+        # sentinel of the circular recency list, most recently used first
+        self._head = _Entry(None, None, None)
+        self._head.prev = self._head.next = self._head
+
+    # -- public api -----------------------------------------------------------
+
+    def key(self, *parts):
+        """
+        Build the cache key for a credential. The parts should identify the
+        kind of credential as well as the credential itself, so that the same
+        value used in different ways gives different keys.
+        @param parts: strings making up the credential
+        @type  parts: str or unicode
+        @return: salted digest of the parts
+        @rtype:  str
+        """
+        mac = hmac.new(self._secret, digestmod=digestmod)
+        for part in parts:
+            part = encode_unicode(part)
+            # length prefix the parts so their boundaries are unambiguous
+            mac.update('%d:%s' % (len(part), part))
+        return mac.digest()
+
+    def get(self, key):
+        """
+        Look up a verified credential.
+        @param key: key returned by key()
+        @type  key: str
+        @return: value stored for the credential, None if it is not cached or
+                 the entry has expired
+        """
+        self._lock.acquire()
+        try:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires <= time.time():
+                self._remove(entry)
+                return None
+            self._unlink(entry)
+            self._link(entry)
+            return entry.value
+        finally:
+            self._lock.release()
+
+    def put(self, key, value, expires=None):
+        """
+        Remember a verified credential.
+        @param key: key returned by key()
+        @type  key: str
+        @param value: login or consumer id the credential authenticated
+        @type  value: str
+        @param expires: time, in seconds since the epoch, after which the
+                        credential is no longer valid; the entry expires at
+                        this time if it is earlier than the configured ttl
+        @type  expires: None or float
+        """
+        ttl = self._ttl()
+        if ttl <= 0:
+            return
+        deadline = time.time() + ttl
+        if expires is not None:
+            deadline = min(deadline, expires)
+        self._lock.acquire()
+        try:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._remove(entry)
+            entry = _Entry(key, value, deadline)
+            self._entries[key] = entry
+            self._link(entry)
+            while len(self._entries) > self.max_size:
+                self._remove(self._head.prev)
+        finally:
+            self._lock.release()
+
+    def invalidate(self, value=None):
+        """
+        Drop cached credentials.
+        @param value: only drop the credentials that authenticated this login
+                      or consumer id; None drops everything
+        @type  value: None or str
+        """
+        self._lock.acquire()
+        try:
+            if value is None:
+                self._entries = {}
+                self._head.prev = self._head.next = self._head
+                return
+            for entry in [e for e in self._entries.values() if e.value == value]:
+                self._remove(entry)
+        finally:
+            self._lock.release()
+
+    def __len__(self):
+        return len(self._entries)
+
+    # -- internal -------------------------------------------------------------
+
+    # the following must be called with the lock held
+
+    def _link(self, entry):
+        entry.prev = self._head
+        entry.next = self._head.next
+        self._head.next.prev = entry
+        self._head.next = entry
+
+    def _unlink(self, entry):
+        entry.prev.next = entry.next
+        entry.next.prev = entry.prev
+        entry.prev = entry.next = None
+
+    def _remove(self, entry):
+        self._unlink(entry)
+        del self._entries[entry.key]
+
+# -- singleton ----------------------------------------------------------------
+
+CREDENTIAL_CACHE = CredentialCache()
+
+
+def invalidate(value=None):
+    """
+    Drop verified credentials from the process-wide cache; must be called
+    when a user's password is changed or a user is deleted.
+    @param value: login whose credentials are dropped; None drops everything
+    @type  value: None or str
+    """
+    CREDENTIAL_CACHE.invalidate(value)
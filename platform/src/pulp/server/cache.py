@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public
+# License as published by the Free Software Foundation; either version
+# 2 of the License (GPLv2) or (at your option) any later version.
+# There is NO WARRANTY for this software, express or implied,
+# including the implied warranties of MERCHANTABILITY,
+# NON-INFRINGEMENT, or FITNESS FOR A PARTICULAR PURPOSE. You should
+# have received a copy of GPLv2 along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+
+"""
+Common base of the server's per-process caches whose entries are kept for a
+time to live set in the server configuration.
+"""
+
+from pulp.server.config import config
+
+# -- cache --------------------------------------------------------------------
+
+class ConfiguredTTLCache(object):
+    """
+    Base class of caches whose time to live is read from the server
+    configuration. Subclasses set ttl_option to the (section, option) tuple
+    of the configuration value; a time to live of 0 disables the cache.
+
+    @ivar ttl: time to live in seconds; None reads the configured value
+    @type ttl: None or float
+    """
+
+    ttl_option = None
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+
+    def enabled(self):
+        """
+        @return: True if the cache should be used, False if it is disabled
+        @rtype:  bool
+        """
+        return self._ttl() > 0
+
+    def _ttl(self):
+        if self.ttl is not None:
+            return self.ttl
+        section, option = self.ttl_option
+        return config.getfloat(section, option)
@@ -68,6 +68,14 @@ except ImportError:
 
 SON = _SON
 
+
+try:
+    from bson.binary import Binary as _Binary
+except ImportError:
+    from pymongo.binary import Binary as _Binary
+
+Binary = _Binary
+
 # functools wraps decorator ----------------------------------------------------
 
 def _update_wrapper(orig, wrapper):
@@ -26,6 +26,8 @@ _default_values = {
     },
     'coordinator': {
         'task_state_poll_interval': '0.1',
+        'progress_waiters': '4',
+        'progress_wait_timeout': '30',
     },
     'data_reaping': {
         'reaper_interval': '0.25',
@@ -34,6 +36,7 @@ _default_values = {
         'repo_sync_history': '60',
         'repo_publish_history': '60',
         'repo_group_publish_history': '60',
+        'stale_uploads': '7',
     },
     'database': {
         'name': 'pulp_database',
@@ -79,6 +82,8 @@ _default_values = {
         'user_cert_expiration': '7',
         'consumer_cert_expiration': '3650',
         'serial_number_path': '/var/lib/pulp/sn.dat',
+        'auth_cache_ttl': '60',
+        'credential_cache_ttl': '300',
     },
     'server': {
         'server_name': socket.gethostname(),
@@ -86,6 +91,8 @@ _default_values = {
         'default_password': 'admin',
         'debugging_mode': 'false',
         'storage_dir': '/var/lib/pulp/',
+        'storage_layout': 'flat',
+        'response_cache_ttl': '30',
     },
     'tasks': {
         'concurrency_threshold': '9',
@@ -95,6 +102,8 @@ _default_values = {
         'create_weight': '0',
         'publish_weight': '1',
         'sync_weight': '2',
+        'thread_pool_size': '0',
+        'thread_pools': '',
     },
 }
 
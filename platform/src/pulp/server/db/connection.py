@@ -12,6 +12,7 @@
 # http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
 
 import logging
+import threading
 import time
 from gettext import gettext as _
 
@@ -23,12 +24,20 @@ from pymongo.son_manipulator import AutoReference, NamespaceInjector
 from pulp.server import config
 from pulp.server.compat import wraps
 from pulp.server.exceptions import PulpException
+from pulp.server.util import batches
 
 # globals ----------------------------------------------------------------------
 
 _connection = None
 _database = None
 
+# collection name -> PulpCollection instance
+_collections = {}
+_collections_lock = threading.Lock()
+
+# default number of documents sent to the database in a single batch
+DEFAULT_BATCH_SIZE = 1000
+
 _log = logging.getLogger(__name__)
 
 # connection api ---------------------------------------------------------------
@@ -38,6 +47,8 @@ def initialize(name=None, seeds=None):
     Initialize the connection pool and top-level database for pulp.
     """
     global _connection, _database
+    # handles from a previous initialization refer to the old database
+    _clear_collection_cache()
     try:
         if not name:
             name = config.config.get('database', 'name')
@@ -131,18 +142,116 @@ class PulpCollection(Collection):
             cursor.limit(criteria.limit)
         return cursor
 
+    def insert_batch(self, docs, batch_size=DEFAULT_BATCH_SIZE, safe=True):
+        """
+        Insert documents in batches, sending each batch to the database in a
+        single message. If the connection is lost while inserting a batch, the
+        documents of the batch that were not inserted are retried.
+        @param docs: documents to insert
+        @type  docs: iterable of dicts
+        @param batch_size: maximum number of documents per batch
+        @type  batch_size: int
+        @param safe: check for errors on each batch
+        @type  safe: bool
+        @return: list of the _ids of the inserted documents
+        @rtype:  list
+        """
+        ids = []
+        for batch in batches(docs, batch_size):
+            tries = 0
+            while True:
+                try:
+                    # the unwrapped insert, retries are handled here
+                    ids.extend(Collection.insert(self, batch, safe=safe))
+                    break
+                except AutoReconnect:
+                    tries += 1
+                    if tries > self.retries:
+                        raise PulpCollectionFailure(
+                            _('insert_batch operation failed on %s: database connection still down after %d tries') %
+                            (self.full_name, tries))
+                    _log.warn(_('insert_batch operation failed on %s: tries remaining: %d') %
+                              (self.full_name, self.retries - tries + 1))
+                    time.sleep(0.3)
+                    # _ids are assigned by the client, skip what already made it
+                    batch_ids = [d['_id'] for d in batch if '_id' in d]
+                    inserted = set(d['_id'] for d in self.find({'_id': {'$in': batch_ids}}, fields=['_id']))
+                    ids.extend(i for i in batch_ids if i in inserted)
+                    batch = [d for d in batch if d.get('_id') not in inserted]
+                    if not batch:
+                        break
+        return ids
+
+    def upsert_batch(self, docs, key_fields, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Insert or update documents, matching existing documents on the values
+        of the given key fields. Each update is checked for errors, which are
+        raised as they are for update(). Upserts are idempotent, so a batch is
+        retried in its entirety if the connection is lost.
+        @param docs: documents to insert or update
+        @type  docs: iterable of dicts
+        @param key_fields: fields identifying a document
+        @type  key_fields: list or tuple of str
+        @param batch_size: maximum number of documents per batch
+        @type  batch_size: int
+        """
+        for batch in batches(docs, batch_size):
+            tries = 0
+            while True:
+                try:
+                    for doc in batch:
+                        spec = dict((k, doc[k]) for k in key_fields)
+                        document = dict((k, v) for k, v in doc.items() if k != '_id')
+                        # getLastError only reports on the last operation, so
+                        # every update has to be checked
+                        Collection.update(self, spec, {'$set': document}, upsert=True, safe=True)
+                    break
+                except AutoReconnect:
+                    tries += 1
+                    if tries > self.retries:
+                        raise PulpCollectionFailure(
+                            _('upsert_batch operation failed on %s: database connection still down after %d tries') %
+                            (self.full_name, tries))
+                    _log.warn(_('upsert_batch operation failed on %s: tries remaining: %d') %
+                              (self.full_name, self.retries - tries + 1))
+                    time.sleep(0.3)
+
 # -- public --------------------------------------------------------------------
 
 def get_collection(name, create=False):
     """
     Factory function to instantiate PulpConnection objects using configurable
-    parameters.
+    parameters. Collection instances are thread-safe and are cached by name
+    until the next call to initialize().
     """
     global _database
     if _database is None:
         raise PulpCollectionFailure(_('Cannot get collection from uninitialized database'))
-    retries = config.config.getint('database', 'operation_retries')
-    return PulpCollection(_database, name, retries=retries, create=create)
+    if not create:
+        collection = _collections.get(name)
+        if collection is not None:
+            return collection
+    _collections_lock.acquire()
+    try:
+        collection = _collections.get(name)
+        if collection is None or create:
+            retries = config.config.getint('database', 'operation_retries')
+            collection = PulpCollection(_database, name, retries=retries, create=create)
+            _collections[name] = collection
+        return collection
+    finally:
+        _collections_lock.release()
+
+
+def _clear_collection_cache():
+    """
+    Drop all cached collection instances.
+    """
+    _collections_lock.acquire()
+    try:
+        _collections.clear()
+    finally:
+        _collections_lock.release()
 
 def database():
     """
@@ -17,8 +17,10 @@ import os
 import sys
 
 from pulp.plugins.loader.api import load_content_types
+from pulp.plugins.types import database as content_types_db
 from pulp.server.db import connection
 from pulp.server.db.migrate import models
+from pulp.server.managers.content.query import ContentQueryManager
 from pulp.server import config, logs
 
 
@@ -41,6 +43,10 @@ def parse_args():
     parser.add_option('--test', action='store_true', dest='test',
                       default=False,
                       help=_('Run migration, but do not update version'))
+    parser.add_option('--relink-content', action='store_true', dest='relink_content',
+                      default=False,
+                      help=_('Relink the files of existing content units into the storage layout '
+                             'configured by [server] storage_layout'))
     options, args = parser.parse_args()
     if args:
         parser.error(_('Unknown arguments: %s') % ', '.join(args))
@@ -135,9 +141,29 @@ def _auto_manage_db(options):
     message = _('Content types loaded.')
     print message
     logger.info(message)
+
+    if options.relink_content:
+        relink_content()
     return os.EX_OK
 
 
+def relink_content():
+    """
+    Relink the files of the existing content units of all types into the storage layout configured
+    by [server] storage_layout. This is not a migration, as it needs to be done every time the
+    layout is changed.
+    """
+    query_manager = ContentQueryManager()
+    for type_id in content_types_db.all_type_ids():
+        message = _('Relinking content units of type %(t)s.') % {'t': type_id}
+        print message
+        logger.info(message)
+        relinked = query_manager.relink_content_units(type_id)
+        message = _('Relinked %(n)d content units of type %(t)s.') % {'n': relinked, 't': type_id}
+        print message
+        logger.info(message)
+
+
 def _start_logging():
     """
     Call into Pulp to get the logging started, and set up the logger to be used in this module.
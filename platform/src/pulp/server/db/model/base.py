@@ -115,5 +115,6 @@ class Model(dict):
         # collection_name
         if cls.collection_name is None:
             return None
-        # removed cached connections to handle AutoReconnect exception
+        # the connection module caches the collection instances, ensuring the
+        # indices is cheap as pymongo caches them until the collection is dropped
         return cls._get_collection_from_db()
@@ -55,3 +55,53 @@ class ContentType(Model):
         self.search_indexes = search_indexes
 
         self.referenced_types = referenced_types
+
+
+class ContentTypesVersion(Model):
+    """
+    Holds a single document whose version is incremented every time the
+    content type definitions change, so each process can tell when its
+    in-memory copy of the definitions is out of date.
+
+    @ivar version: number of changes made to the content type definitions
+    @type version: int
+    """
+
+    collection_name = 'content_types_version'
+    unique_indices = ()
+
+
+class ContentUploadSession(Model):
+    """
+    Tracks the state of an upload request while its bits are being uploaded.
+    The uploaded bits themselves are stored on disk.
+
+    @ivar upload_id: identifies the upload request
+    @type upload_id: str
+
+    @ivar size: size of the file being uploaded, if known
+    @type size: int or None
+
+    @ivar received: [start, end) byte ranges of the file received so far, in
+                    the order they were received; ranges may overlap
+    @type received: list of list
+
+    @ivar created: UTC time the upload was initialized
+    @type created: datetime.datetime
+
+    @ivar last_activity: UTC time of the last data received for the upload
+    @type last_activity: datetime.datetime
+    """
+
+    collection_name = 'content_upload_sessions'
+    unique_indices = ('upload_id',)
+    search_indices = ('last_activity',)
+
+    def __init__(self, upload_id, size, created):
+        super(ContentUploadSession, self).__init__()
+
+        self.upload_id = upload_id
+        self.size = size
+        self.received = []
+        self.created = created
+        self.last_activity = created
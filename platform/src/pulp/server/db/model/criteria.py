@@ -11,6 +11,7 @@
 # You should have received a copy of GPLv2 along with this software; if not,
 # see http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt
 
+import base64
 import copy
 import re
 import sys
@@ -19,6 +20,7 @@ from types import NoneType
 import pymongo
 
 from pulp.server import exceptions as pulp_exceptions
+from pulp.server.compat import json, json_util
 from pulp.server.db.model.base import Model
 
 # criteria model ---------------------------------------------------------------
@@ -94,6 +96,61 @@ class Criteria(Model):
         _compile_regexs_for_not(spec)
         return spec
 
+    def page(self, page_size, page_token=None):
+        """
+        Criteria for a single page of the results of this criteria.
+
+        Pages are read in the order of this criteria's sort, with the _id as
+        the last sort key, and each page starts right after the last document
+        of the previous one instead of skipping over the documents before it,
+        so reading any page costs about the same. The skip of this criteria
+        only applies to the first page.
+
+        The page criteria asks for one more document than the page size; if
+        it is returned, there is a next page, which is read by passing the
+        continuation_token() of the last document of this page.
+
+        @param page_size: maximum number of documents in the page
+        @type  page_size: int
+        @param page_token: continuation token of the previous page, None for
+                           the first page
+        @type  page_token: str or None
+        @return: criteria for the page
+        @rtype:  L{Criteria}
+        @raise InvalidValue: if the page token is not valid for this criteria
+        """
+        sort = _page_sort(self.sort)
+        filters = self.filters
+        skip = self.skip
+        if page_token is not None:
+            after_spec = _after_spec(sort, _decode_page_token(page_token, sort))
+            if filters:
+                filters = {'$and': [filters, after_spec]}
+            else:
+                filters = after_spec
+            skip = None
+        fields = self.fields
+        if fields is not None:
+            # the sort values are needed to create the continuation token
+            fields = list(fields) + [f for f, d in sort if f not in fields]
+        return Criteria(filters, sort, page_size + 1, skip, fields)
+
+    def continuation_token(self, document):
+        """
+        Create the token used to read the page that follows the given
+        document; see page().
+
+        @param document: last document of the page, as returned by this
+                         criteria
+        @type  document: dict
+        @return: opaque continuation token
+        @rtype:  str
+        """
+        sort = _page_sort(self.sort)
+        after = [_field_value(document, f) for f, d in sort]
+        data = json.dumps({'sort': sort, 'after': after}, default=json_util.default)
+        return base64.urlsafe_b64encode(data)
+
 
 class UnitAssociationCriteria(Model):
 
@@ -386,3 +443,70 @@ def _compile_regexs_for_not(spec):
             spec[key] = re.compile(value)
         _compile_regexs_for_not(value)
 
+# pagination helper functions --------------------------------------------------
+
+def _page_sort(sort):
+    """
+    The sort of a paged query: the given sort with the _id as a tie-breaker.
+    @rtype: list of [field, direction] lists
+    """
+    sort = [[f, d] for f, d in (sort or [])]
+    if '_id' not in [f for f, d in sort]:
+        sort.append(['_id', pymongo.ASCENDING])
+    return sort
+
+
+def _field_value(document, field):
+    # dotted field names are looked up in sub-documents
+    value = document
+    for name in field.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(name)
+    return value
+
+
+def _decode_page_token(page_token, sort):
+    """
+    @return: sort values of the last document of the previous page
+    @rtype:  list
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(str(page_token)),
+                          object_hook=json_util.object_hook)
+        if data['sort'] != sort or len(data['after']) != len(sort):
+            raise ValueError()
+    except (TypeError, ValueError, KeyError):
+        raise pulp_exceptions.InvalidValue(['page_token']), None, sys.exc_info()[2]
+    return data['after']
+
+
+def _after_spec(sort, after):
+    """
+    Spec matching the documents that sort after the document with the given
+    sort values: each clause matches the documents with the same values for
+    the preceding sort keys and a later value for the next one.
+    """
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        equal = dict((f, v) for (f, d), v in zip(sort[:i], after[:i]))
+        value = after[i]
+        if direction == pymongo.ASCENDING:
+            # null (and missing) values sort first
+            if value is None:
+                condition = {'$ne': None}
+            else:
+                condition = {'$gt': value}
+        else:
+            if value is None:
+                continue
+            clause = dict(equal)
+            clause[field] = None
+            clauses.append(clause)
+            condition = {'$lt': value}
+        clause = dict(equal)
+        clause[field] = condition
+        clauses.append(clause)
+    if len(clauses) == 1:
+        return clauses[0]
+    return {'$or': clauses}
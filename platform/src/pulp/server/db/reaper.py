@@ -19,6 +19,7 @@ from pulp.common import dateutils
 from pulp.server import config as pulp_config
 from pulp.server.compat import ObjectId
 from pulp.server.db.model import consumer, dispatch, repo_group, repository
+from pulp.server.managers import factory as manager_factory
 
 
 _REAPER = None
@@ -39,11 +40,15 @@ class CollectionsReaper(object):
     :type reap_interval: int or float
     :ivar collections: dictionary of collections and the time delta which constitutes an old document
     :type collections: dict
+    :ivar functions: dictionary of functions that remove old data not stored
+                     in a collection and the time delta which constitutes old data
+    :type functions: dict
     """
 
     def __init__(self, reap_interval):
         self.reap_interval = reap_interval
         self.collections = {}
+        self.functions = {}
 
         self.__exit = False
         self.__lock = threading.RLock()
@@ -71,6 +76,9 @@ class CollectionsReaper(object):
         for collection, delta in self.collections.items():
             expired_object_id = self._create_expired_object_id(delta)
             self._remove_expired_entries(collection, expired_object_id)
+        for function, delta in self.functions.items():
+            expired_datetime = datetime.now(dateutils.utc_tz()) - delta
+            function(expired_datetime)
 
     def _create_expired_object_id(self, delta):
         now = datetime.now(dateutils.utc_tz())
@@ -131,6 +139,22 @@ class CollectionsReaper(object):
         finally:
             self.__lock.release()
 
+    def add_function(self, function, **delta_kwargs):
+        """
+        Add a function, that removes data older than the datetime it is
+        passed, to be called when the reaper runs. Valid values for
+        delta_kwargs are the same as for add_collection.
+        :param function: called with the UTC datetime before which data is old
+        :type function: callable
+        :param delta_kwargs: key word arguments for time intervals
+        """
+        self.__lock.acquire()
+        try:
+            expiration_delta = dateutils.delta_from_key_value_pairs(delta_kwargs)
+            self.functions[function] = expiration_delta
+        finally:
+            self.__lock.release()
+
     def remove_collection(self, collection):
         """
         Remove a database collection from the reaper.
@@ -183,6 +207,11 @@ def initialize():
     repo_group_publish_history_lifetime = pulp_config.config.getfloat('data_reaping', 'repo_group_publish_history')
     _REAPER.add_collection(repo_group_publish_result_collection, days=repo_group_publish_history_lifetime)
 
+    # uploads that stopped receiving data
+    upload_manager = manager_factory.content_upload_manager()
+    stale_upload_lifetime = pulp_config.config.getfloat('data_reaping', 'stale_uploads')
+    _REAPER.add_function(upload_manager.delete_stale_uploads, days=stale_upload_lifetime)
+
 
 def finalize():
     """
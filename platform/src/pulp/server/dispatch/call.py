@@ -11,6 +11,7 @@
 # have received a copy of GPLv2 along with this software; if not, see
 # http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
 
+import cPickle
 import itertools
 import logging
 import pickle
@@ -21,6 +22,7 @@ from types import NoneType, TracebackType
 
 from pulp.common import dateutils
 from pulp.common.util import encode_unicode
+from pulp.server.compat import Binary
 from pulp.server.db.model.auth import User
 from pulp.server.dispatch import constants as dispatch_constants
 from pulp.server.managers import factory as managers_factory
@@ -30,6 +32,11 @@ _LOG = logging.getLogger(__name__)
 
 OBFUSCATED_VALUE = '****'
 
+# version of the serialized call request format written by serialize
+# 1: (untagged) each pickled field is a separate protocol 0 pickle
+# 2: all pickled fields are a single binary pickle in the pickled_fields field
+SERIALIZATION_FORMAT_VERSION = 2
+
 # call request class -----------------------------------------------------------
 
 class CallRequest(object):
@@ -200,20 +207,21 @@ class CallRequest(object):
         @rtype: dict
         """
 
-        data = {'callable_name': self.callable_name()}
+        data = {'callable_name': self.callable_name(),
+                'format_version': SERIALIZATION_FORMAT_VERSION}
 
         for field in self.copied_fields:
             data[field] = getattr(self, field)
 
-        for field in self.pickled_fields:
-            try:
-                data[field] = pickle.dumps(getattr(self, field))
+        pickled = tuple(getattr(self, field) for field in self.pickled_fields)
+        try:
+            data['pickled_fields'] = Binary(cPickle.dumps(pickled, cPickle.HIGHEST_PROTOCOL))
 
-            except Exception, e:
-                msg =_('Exception encountered while pickling: %(f)s') % {'f': field}
-                _LOG.error(msg)
-                _LOG.exception(e)
-                return None
+        except Exception, e:
+            msg =_('Exception encountered while pickling: %(f)s') % {'f': ', '.join(self.pickled_fields)}
+            _LOG.error(msg)
+            _LOG.exception(e)
+            return None
 
         return data
 
@@ -232,13 +240,25 @@ class CallRequest(object):
 
         constructor_kwargs = dict(data)
         constructor_kwargs.pop('callable_name') # added for search
+        format_version = constructor_kwargs.pop('format_version', 1)
+        pickled_fields = constructor_kwargs.pop('pickled_fields', None)
 
         for key, value in constructor_kwargs.items():
             constructor_kwargs[encode_unicode(key)] = constructor_kwargs.pop(key)
 
         try:
-            for field in cls.pickled_fields:
-                constructor_kwargs[field] = pickle.loads(data[field].encode('ascii'))
+            if format_version == 1:
+                for field in cls.pickled_fields:
+                    constructor_kwargs[field] = pickle.loads(data[field].encode('ascii'))
+
+            elif format_version == 2:
+                values = cPickle.loads(str(pickled_fields))
+                constructor_kwargs.update(zip(cls.pickled_fields, values))
+
+            else:
+                msg = _('Unsupported call request serialization format: %(v)s') % {'v': format_version}
+                _LOG.error(msg)
+                return None
 
         except Exception, e:
             _LOG.exception(e)
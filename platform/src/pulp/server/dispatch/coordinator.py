@@ -14,7 +14,7 @@
 import copy
 import datetime
 import logging
-import time
+import threading
 import types
 import uuid
 from gettext import gettext as _
@@ -44,14 +44,22 @@ class Coordinator(object):
     """
     Coordinator class that runs call requests in the task queue and detects and
     resolves conflicting operations on resources.
-    @ivar task_state_poll_interval: sleep interval to use while polling a "synchronous" task
+    @ivar task_state_poll_interval: no longer used, synchronous callers are
+                                    notified of task state transitions
     @type task_state_poll_interval: float
+    @ivar progress_wait_timeout: maximum number of seconds a caller waits for
+                                 a call report update
+    @type progress_wait_timeout: float
     """
 
-    def __init__(self, task_state_poll_interval=0.5):
+    def __init__(self, task_state_poll_interval=0.5, progress_waiters=4, progress_wait_timeout=30):
 
         self.task_state_poll_interval = task_state_poll_interval
+        self.progress_wait_timeout = progress_wait_timeout
+        # waiting callers each hold a web server thread
+        self.progress_waiters = threading.Semaphore(progress_waiters)
         self.call_resource_collection = CallResource.get_collection()
+        self.call_resource_index = CALL_RESOURCE_INDEX
 
     # explicit initialization --------------------------------------------------
 
@@ -62,6 +70,7 @@ class Coordinator(object):
         """
         # drop all previous knowledge of previous calls
         self.call_resource_collection.remove(safe=True)
+        self.call_resource_index.clear()
 
         # re-start interrupted tasks
         queued_call_collection = QueuedCall.get_collection()
@@ -244,6 +253,7 @@ class Coordinator(object):
                 return
 
             if call_resource_list:
+                self.call_resource_index.add(call_resource_list)
                 self.call_resource_collection.insert(call_resource_list, safe=True)
 
             for task in task_list:
@@ -336,18 +346,13 @@ class Coordinator(object):
         rejecting_call_requests = set()
         rejecting_reasons = []
 
-        call_resource_collection = CallResource.get_collection()
         call_resources = resource_dict_to_call_resources(resources)
-        or_query = filter_dicts(call_resources, ('resource_type', 'resource_id'))
-        cursor = call_resource_collection.find({'$or': or_query})
 
-        for call_resource in cursor:
+        for call_resource in self.call_resource_index.find(call_resources):
             proposed_operation = resources[call_resource['resource_type']][call_resource['resource_id']]
             queued_operation = call_resource['operation']
 
-            postponing_operations = get_postponing_operations(proposed_operation)
-
-            if queued_operation in postponing_operations:
+            if queued_operation in _POSTPONING_OPERATIONS[proposed_operation]:
                 postponing_call_requests.add(call_resource['call_request_id'])
                 reason = filter_dicts([call_resource], ('resource_type', 'resource_id'))[0]
                 reason['operation'] = queued_operation
@@ -355,9 +360,7 @@ class Coordinator(object):
                 if reason not in postponing_reasons:
                     postponing_reasons.append(reason)
 
-            rejecting_operations = get_rejecting_operations(proposed_operation)
-
-            if queued_operation in rejecting_operations:
+            if queued_operation in _REJECTING_OPERATIONS[proposed_operation]:
                 rejecting_call_requests.add(call_resource['call_request_id'])
                 reason = filter_dicts([call_resource], ('resource_type', 'resource_id'))[0]
                 reason['operation'] = queued_operation
@@ -423,14 +426,12 @@ class Coordinator(object):
         if superfluous_criteria:
             raise dispatch_exceptions.UnrecognizedSearchCriteria(*list(superfluous_criteria))
 
-        tasks = []
         task_queue = dispatch_factory._task_queue()
 
-        for task in task_queue.all_tasks():
-            if task_matches_criteria(task, criteria):
-                tasks.append(task)
+        # the task queue's indexes narrow down the tasks to check
+        candidate_tasks = task_queue.candidate_tasks(criteria)
 
-        return tasks
+        return [t for t in candidate_tasks if task_matches_criteria(t, criteria)]
 
     def find_call_reports(self, **criteria):
         """
@@ -444,12 +445,46 @@ class Coordinator(object):
          * callable_name
          * args
          * kwargs
-         * resources
+         * resources: dict of resource type to resource ids, as in
+           CallRequest.resources; matches calls using all of the resources
          * tags
         """
         tasks = self._find_tasks(**criteria)
         return [t.call_report for t in tasks]
 
+    def wait_for_call_report(self, call_request_id, version, timeout):
+        """
+        Wait for the call report of a queued or running call to be updated
+        (state transition or progress report) past the given version.
+
+        The wait is capped at progress_wait_timeout seconds. When the maximum
+        number of callers are already waiting, the call report is returned
+        immediately and the caller is expected to retry later.
+
+        @param call_request_id: id of the call
+        @type call_request_id: str
+        @param version: version of the call report last seen by the caller,
+                        None to return the call report immediately
+        @type version: int or None
+        @param timeout: maximum number of seconds to wait
+        @type timeout: float
+        @return: tuple of the call report and its version, (None, None) if the
+                 call is not in the task queue
+        @rtype:  tuple
+        """
+        task_list = self._find_tasks(call_request_id=call_request_id)
+        if not task_list:
+            return None, None
+        task = task_list[0]
+        timeout = min(timeout, self.progress_wait_timeout)
+        if version is not None and version == task.version and timeout > 0 and \
+                self.progress_waiters.acquire(False):
+            try:
+                task.wait_for_update(version, datetime.timedelta(seconds=timeout))
+            finally:
+                self.progress_waiters.release()
+        return task.call_report, task.version
+
     # control methods ----------------------------------------------------------
 
     def complete_call_success(self, call_request_id, result=None):
@@ -505,9 +540,7 @@ class Coordinator(object):
         """
         cancel_returns = {}
         task_queue = dispatch_factory._task_queue()
-        for task in task_queue.all_tasks():
-            if call_request_group_id != task.call_request.group_id:
-                continue
+        for task in task_queue.candidate_tasks({'call_request_group_id': call_request_group_id}):
             cancel_returns[task.call_request.id] = task_queue.cancel(task)
         return cancel_returns
 
@@ -524,7 +557,7 @@ class Coordinator(object):
         task_list = self._find_tasks(call_request_id=call_request_id)
         if not task_list:
             return
-        task_list[0].call_report.progress = progress
+        task_list[0]._report_progress(progress)
 
 # conflict detection utility functions -----------------------------------------
 
@@ -578,6 +611,13 @@ def get_rejecting_operations(operation):
     return rejecting
 
 
+# lookup tables of the above, keyed by proposed operation
+_POSTPONING_OPERATIONS = dict((op, tuple(get_postponing_operations(op)))
+                              for op in dispatch_constants.RESOURCE_OPERATIONS)
+_REJECTING_OPERATIONS = dict((op, tuple(get_rejecting_operations(op)))
+                             for op in dispatch_constants.RESOURCE_OPERATIONS)
+
+
 def resource_dict_to_call_resources(resource_dict):
     """
     Convert a resources dictionary to a list of task resource instances
@@ -593,6 +633,89 @@ def resource_dict_to_call_resources(resource_dict):
             call_resources.append(call_resource)
     return call_resources
 
+# call resource index ----------------------------------------------------------
+
+class CallResourceIndex(object):
+    """
+    Process-local index of the resources used by the call requests in the task
+    queue. Mirrors the contents of the CallResource collection so that conflict
+    detection does not need a database round trip; the collection itself is
+    only kept for crash recovery.
+    """
+
+    def __init__(self):
+        # (resource type, resource id) -> list of call resources
+        self.__resources = {}
+        # call request id -> list of (resource type, resource id)
+        self.__call_requests = {}
+        self.__lock = threading.RLock()
+
+    def add(self, call_resources):
+        """
+        Add call resources to the index.
+        @param call_resources: call resources with their call_request_id set
+        @type  call_resources: iterable of L{CallResource} instances
+        """
+        self.__lock.acquire()
+        try:
+            for call_resource in call_resources:
+                key = (call_resource['resource_type'], call_resource['resource_id'])
+                self.__resources.setdefault(key, []).append(call_resource)
+                self.__call_requests.setdefault(call_resource['call_request_id'], []).append(key)
+        finally:
+            self.__lock.release()
+
+    def remove(self, call_request_id):
+        """
+        Remove all the call resources for the given call request from the index.
+        @param call_request_id: id of the call request
+        @type  call_request_id: str
+        """
+        self.__lock.acquire()
+        try:
+            for key in self.__call_requests.pop(call_request_id, ()):
+                call_resources = [r for r in self.__resources.get(key, ())
+                                  if r['call_request_id'] != call_request_id]
+                if call_resources:
+                    self.__resources[key] = call_resources
+                else:
+                    self.__resources.pop(key, None)
+        finally:
+            self.__lock.release()
+
+    def find(self, call_resources):
+        """
+        Find the indexed call resources that refer to the same resources as the
+        given call resources.
+        @param call_resources: call resources to look up
+        @type  call_resources: iterable of L{CallResource} instances
+        @return: (possibly empty) list of indexed call resources
+        @rtype:  list of L{CallResource} instances
+        """
+        self.__lock.acquire()
+        try:
+            found = []
+            for call_resource in call_resources:
+                key = (call_resource['resource_type'], call_resource['resource_id'])
+                found.extend(self.__resources.get(key, ()))
+            return found
+        finally:
+            self.__lock.release()
+
+    def clear(self):
+        """
+        Remove everything from the index.
+        """
+        self.__lock.acquire()
+        try:
+            self.__resources.clear()
+            self.__call_requests.clear()
+        finally:
+            self.__lock.release()
+
+
+CALL_RESOURCE_INDEX = CallResourceIndex()
+
 # call run utility functions ---------------------------------------------------
 
 def set_call_request_id_on_call_resources(call_request_id, call_resources):
@@ -609,13 +732,15 @@ def set_call_request_id_on_call_resources(call_request_id, call_resources):
 def wait_for_task(task, states, poll_interval=0.5, timeout=None):
     """
     Wait for a task to be in a certain set of states
+    NOTE: the task notifies waiting threads of its state transitions, the
+          poll_interval is only retained for backward compatibility
     @param task: task to wait for
     @type  task: L{Task}
     @param states: set of valid states
     @type  states: list or tuple
-    @param poll_interval: time, in seconds, to wait in between polling the task
+    @param poll_interval: ignored
     @type  poll_interval: float or int
-    @param timeout: maximum amount of time to poll task, None means indefinitely
+    @param timeout: maximum amount of time to wait for the task, None means indefinitely
     @type  timeout: None or datetime.timedelta
     """
     assert isinstance(task, Task)
@@ -623,14 +748,7 @@ def wait_for_task(task, states, poll_interval=0.5, timeout=None):
     assert isinstance(poll_interval, (float, int))
     assert isinstance(timeout, (datetime.timedelta, types.NoneType))
 
-    start = datetime.datetime.now()
-    while task.call_report.state not in states:
-        time.sleep(poll_interval)
-        if timeout is None:
-            continue
-        now = datetime.datetime.now()
-        if now - start < timeout:
-            continue
+    if not task.wait_for_state(states, timeout):
         raise OperationTimedOut(timeout)
 
 # query utility functions ------------------------------------------------------
@@ -664,6 +782,11 @@ def task_matches_criteria(task, criteria):
     for t in criteria.get('tags', []):
         if t not in task.call_request.tags:
             return False
+    for resource_type, resource_ids in criteria.get('resources', {}).items():
+        resources = task.call_request.resources.get(resource_type, {})
+        for resource_id in resource_ids:
+            if resource_id not in resources:
+                return False
     return True
 
 # coordinator callbacks --------------------------------------------------------
@@ -677,6 +800,7 @@ def coordinator_dequeue_callback(call_request, call_report):
     @param call_report: call report for the call
     @type  call_report: L{call.CallReport} instance
     """
+    CALL_RESOURCE_INDEX.remove(call_request.id)
     collection = CallResource.get_collection()
     collection.remove({'call_request_id': call_request.id}, safe=True)
 
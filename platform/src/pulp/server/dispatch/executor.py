@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public
+# License as published by the Free Software Foundation; either version
+# 2 of the License (GPLv2) or (at your option) any later version.
+# There is NO WARRANTY for this software, express or implied,
+# including the implied warranties of MERCHANTABILITY,
+# NON-INFRINGEMENT, or FITNESS FOR A PARTICULAR PURPOSE. You should
+# have received a copy of GPLv2 along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+
+"""
+Executors run the tasks dispatched by the task queue.
+
+An executor only needs a submit(func) method that arranges for func to be
+called in another thread of control, a has_capacity() method telling whether a
+submitted func would start right away, and a metrics() method describing its
+load. The task queue only dispatches a task to an executor with capacity, so
+tasks that cannot start yet stay waiting, and cancelable, in the task queue.
+It routes each task to an executor by the task's callable name or call request
+tags, see L{ExecutorRouter}.
+"""
+
+import logging
+import sys
+import threading
+import traceback
+from collections import deque
+from gettext import gettext as _
+
+
+_LOG = logging.getLogger(__name__)
+
+# constants --------------------------------------------------------------------
+
+DEFAULT_POOL_NAME = 'default'
+
+# seconds an idle worker waits for work before exiting
+DEFAULT_IDLE_TIMEOUT = 60.0
+
+# thread pool ------------------------------------------------------------------
+
+class ThreadPool(object):
+    """
+    Bounded pool of reusable worker threads.
+
+    Workers are started as work is submitted, up to max_workers, and exit after
+    being idle for idle_timeout seconds. Work submitted while all the workers
+    are busy is queued and run, in submission order, as workers free up.
+
+    @ivar name: name of the pool, used in worker thread names and metrics
+    @type name: str
+    @ivar max_workers: maximum number of worker threads
+    @type max_workers: int
+    @ivar idle_timeout: seconds an idle worker waits for work before exiting
+    @type idle_timeout: float
+    @ivar capacity_callback: called, without arguments, each time a worker
+                             finishes running a function
+    @type capacity_callback: None or callable
+    """
+
+    def __init__(self, name, max_workers, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        assert max_workers > 0
+
+        self.name = name
+        self.max_workers = max_workers
+        self.idle_timeout = idle_timeout
+        self.capacity_callback = None
+
+        self.__queue = deque()
+        self.__workers = 0
+        # wake up conditions of the idle workers, most recently idle last
+        self.__idle_workers = []
+        self.__submitted = 0
+        self.__completed = 0
+        self.__worker_counter = 0
+
+        self.__lock = threading.Lock()
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Run the function, with the given arguments, in a worker thread.
+        @param func: function to run
+        @type  func: callable
+        """
+        self.__lock.acquire()
+        try:
+            self.__queue.append((func, args, kwargs))
+            self.__submitted += 1
+            if self.__idle_workers:
+                self.__idle_workers.pop().notify()
+            elif self.__workers < self.max_workers:
+                self._start_worker()
+        finally:
+            self.__lock.release()
+
+    def has_capacity(self):
+        """
+        Determine if a function submitted now would start running right away,
+        rather than being queued behind the functions already submitted.
+        NOTE: a worker counts as busy until it has finished running its
+        function, so this can be False for a moment after the function returns
+        @rtype: bool
+        """
+        self.__lock.acquire()
+        try:
+            return self.__submitted - self.__completed < self.max_workers
+        finally:
+            self.__lock.release()
+
+    def metrics(self):
+        """
+        Snapshot of the pool's load.
+        @return: dictionary of name, max_workers, workers, busy_workers,
+                 queue_depth, submitted, completed and utilization (the
+                 fraction of max_workers that are busy)
+        @rtype:  dict
+        """
+        self.__lock.acquire()
+        try:
+            busy = self.__workers - len(self.__idle_workers)
+            return {'name': self.name,
+                    'max_workers': self.max_workers,
+                    'workers': self.__workers,
+                    'busy_workers': busy,
+                    'queue_depth': len(self.__queue),
+                    'submitted': self.__submitted,
+                    'completed': self.__completed,
+                    'utilization': float(busy) / self.max_workers}
+        finally:
+            self.__lock.release()
+
+    def _start_worker(self):
+        # must be called with the lock held
+        self.__workers += 1
+        self.__worker_counter += 1
+        name = '%s-pool-%d' % (self.name, self.__worker_counter)
+        worker = threading.Thread(target=self.__work, name=name)
+        worker.setDaemon(True)
+        worker.start()
+
+    def __work(self):
+        """
+        Worker thread loop
+        """
+        self.__lock.acquire()
+        try:
+            while True:
+                if not self.__queue:
+                    condition = threading.Condition(self.__lock)
+                    self.__idle_workers.append(condition)
+                    condition.wait(self.idle_timeout)
+                    # still in the idle list means no work was submitted
+                    if condition in self.__idle_workers:
+                        self.__idle_workers.remove(condition)
+                        if not self.__queue:
+                            self.__workers -= 1
+                            return
+                    continue
+                func, args, kwargs = self.__queue.popleft()
+                self.__lock.release()
+                try:
+                    self.__call(func, *args, **kwargs)
+                finally:
+                    self.__lock.acquire()
+                    self.__completed += 1
+                callback = self.capacity_callback
+                if callback is None:
+                    continue
+                # the callback may take other locks, such as the task queue's,
+                # which are held while has_capacity is called
+                self.__lock.release()
+                try:
+                    self.__call(callback)
+                finally:
+                    self.__lock.acquire()
+        finally:
+            self.__lock.release()
+
+    def __call(self, func, *args, **kwargs):
+        """
+        Call a function in a worker thread, logging any exception it raises
+        """
+        try:
+            func(*args, **kwargs)
+        except:
+            msg = _('Exception in %(n)s thread pool worker:\n%(e)s')
+            _LOG.critical(msg % {'n': self.name, 'e': traceback.format_exception(*sys.exc_info())})
+
+# executor routing -------------------------------------------------------------
+
+class ExecutorRouter(object):
+    """
+    Selects the executor for a task.
+
+    Executors are registered for callable names (as returned by
+    CallRequest.callable_name) and for call request tags. A task's callable
+    name takes precedence over its tags; tags are matched in the order the
+    executors were added. Tasks matching neither run in the default executor.
+
+    @ivar default: executor for tasks without a more specific executor
+    @type default: executor
+    """
+
+    def __init__(self, default):
+        self.default = default
+        self.__executors = [default]
+        self.__by_call_name = {}
+        self.__by_tag = []
+
+    def add(self, executor, call_names=(), tags=()):
+        """
+        Register an executor for the given callable names and tags.
+        @param executor: executor to register
+        @type  executor: executor
+        @param call_names: callable names of call requests to route to it
+        @type  call_names: iterable of str
+        @param tags: call request tags to route to it
+        @type  tags: iterable of str
+        """
+        if executor not in self.__executors:
+            self.__executors.append(executor)
+        for name in call_names:
+            self.__by_call_name[name] = executor
+        for tag in tags:
+            self.__by_tag.append((tag, executor))
+
+    def executor(self, call_request):
+        """
+        Get the executor that should run the call request.
+        @param call_request: call request to be run
+        @type  call_request: L{pulp.server.dispatch.call.CallRequest}
+        @return: executor
+        """
+        executor = self.__by_call_name.get(call_request.callable_name())
+        if executor is not None:
+            return executor
+        for tag, executor in self.__by_tag:
+            if tag in call_request.tags:
+                return executor
+        return self.default
+
+    def executors(self):
+        """
+        @return: all of the registered executors, default first
+        @rtype:  list
+        """
+        return list(self.__executors)
+
+    def metrics(self):
+        """
+        @return: metrics of all of the registered executors, default first
+        @rtype:  list of dict
+        """
+        return [e.metrics() for e in self.__executors]
+
+# configuration ----------------------------------------------------------------
+
+def parse_pool_config(value):
+    """
+    Parse the thread_pools configuration value: a comma separated list of
+    tag=size pairs.
+    @param value: configuration value
+    @type  value: str
+    @return: list of (tag, size) tuples
+    @rtype:  list
+    @raise ValueError: if the value is malformed
+    """
+    pools = []
+    for entry in value.split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        tag, size = entry.rsplit('=', 1)
+        pools.append((tag.strip(), int(size)))
+    return pools
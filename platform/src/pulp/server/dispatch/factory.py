@@ -27,7 +27,9 @@ def _initialize_coordinator():
     assert _COORDINATOR is None
     from pulp.server.dispatch.coordinator import Coordinator
     task_state_poll_interval = pulp_config.config.getfloat('coordinator', 'task_state_poll_interval')
-    _COORDINATOR = Coordinator(task_state_poll_interval)
+    progress_waiters = pulp_config.config.getint('coordinator', 'progress_waiters')
+    progress_wait_timeout = pulp_config.config.getfloat('coordinator', 'progress_wait_timeout')
+    _COORDINATOR = Coordinator(task_state_poll_interval, progress_waiters, progress_wait_timeout)
     _COORDINATOR.start()
 
 
@@ -43,10 +45,15 @@ def _initialize_scheduler():
 def _initialize_task_queue():
     global _TASK_QUEUE
     assert _TASK_QUEUE is None
-    from pulp.server.dispatch.taskqueue import TaskQueue
+    from pulp.server.dispatch import executor
+    from pulp.server.dispatch.taskqueue import TaskQueue, default_pool_size
     concurrency_threshold = pulp_config.config.getint('tasks', 'concurrency_threshold')
     dispatch_interval = pulp_config.config.getfloat('tasks', 'dispatch_interval')
-    _TASK_QUEUE = TaskQueue(concurrency_threshold, dispatch_interval)
+    pool_size = pulp_config.config.getint('tasks', 'thread_pool_size') or default_pool_size(concurrency_threshold)
+    default_pool = executor.ThreadPool(executor.DEFAULT_POOL_NAME, pool_size)
+    _TASK_QUEUE = TaskQueue(concurrency_threshold, dispatch_interval, executor=default_pool)
+    for tag, size in executor.parse_pool_config(pulp_config.config.get('tasks', 'thread_pools')):
+        _TASK_QUEUE.add_executor(executor.ThreadPool(tag, size), tags=[tag])
     _TASK_QUEUE.start()
 
 
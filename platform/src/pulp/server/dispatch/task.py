@@ -56,9 +56,14 @@ class Task(object):
         assert isinstance(call_request, call.CallRequest)
         assert isinstance(call_report, (types.NoneType, call.CallReport))
 
+        # notified on every state transition and progress report of the call
+        # report; the version is incremented for each of them
+        self._state_condition = threading.Condition(threading.Lock())
+        self._version = 0
+
         self.call_request = call_request
         self.call_report = call_report or call.CallReport.from_call_request(call_request)
-        self.call_report.state = dispatch_constants.CALL_WAITING_STATE
+        self._set_state(dispatch_constants.CALL_WAITING_STATE)
 
         self.call_request_exit_state = None
         self.queued_call_id = None
@@ -72,13 +77,94 @@ class Task(object):
             raise TypeError('No comparison defined between task and %s' % type(other))
         return self.call_request.id == other.call_request.id
 
+    # state transitions --------------------------------------------------------
+
+    def _set_state(self, state):
+        """
+        Transition the call report to the given state and wake up any threads
+        waiting on the task's state.
+        @param state: new call state
+        @type  state: str
+        """
+        self._state_condition.acquire()
+        try:
+            self.call_report.state = state
+            self._version += 1
+            self._state_condition.notifyAll()
+        finally:
+            self._state_condition.release()
+
+    @property
+    def version(self):
+        """
+        Number of updates (state transitions and progress reports) made to the
+        task's call report.
+        """
+        return self._version
+
+    def wait_for_state(self, states, timeout=None):
+        """
+        Block until the task's call report is in one of the given states.
+        @param states: set of valid states
+        @type  states: list or tuple
+        @param timeout: maximum amount of time to wait, None means indefinitely
+        @type  timeout: None or datetime.timedelta
+        @return: True if the task reached one of the states, False on timeout
+        @rtype:  bool
+        """
+        return self._wait(lambda: self.call_report.state in states, timeout)
+
+    def wait_for_update(self, version, timeout=None):
+        """
+        Block until the task's call report is updated past the given version,
+        see L{version}.
+        @param version: last version of the call report seen by the caller
+        @type  version: int
+        @param timeout: maximum amount of time to wait, None means indefinitely
+        @type  timeout: None or datetime.timedelta
+        @return: True if the call report was updated, False on timeout
+        @rtype:  bool
+        """
+        return self._wait(lambda: self._version != version, timeout)
+
+    def _wait(self, predicate, timeout):
+        """
+        Block on the state condition until the predicate is true.
+        """
+        assert isinstance(timeout, (datetime.timedelta, types.NoneType))
+
+        deadline = None
+        if timeout is not None:
+            deadline = datetime.datetime.now() + timeout
+
+        self._state_condition.acquire()
+        try:
+            while not predicate():
+                if deadline is None:
+                    self._state_condition.wait()
+                    continue
+                remaining = deadline - datetime.datetime.now()
+                remaining = remaining.days * 86400 + remaining.seconds + remaining.microseconds / 1000000.0
+                if remaining <= 0:
+                    return False
+                self._state_condition.wait(remaining)
+            return True
+        finally:
+            self._state_condition.release()
+
     # in-context task control --------------------------------------------------
 
     def _report_progress(self, progress):
         """
         Progress report callback
         """
-        self.call_report.progress = progress
+        self._state_condition.acquire()
+        try:
+            self.call_report.progress = progress
+            self._version += 1
+            self._state_condition.notifyAll()
+        finally:
+            self._state_condition.release()
 
     def _set_cancel_control_hook(self, hook):
         self.call_request.add_control_hook(dispatch_constants.CALL_CANCEL_CONTROL_HOOK, hook)
@@ -96,18 +182,26 @@ class Task(object):
 
         self._complete(dispatch_constants.CALL_SKIPPED_STATE)
 
-    def run(self):
+    def run(self, executor=None):
         """
-        Public wrapper to kick off the call in the call_request in a new thread.
+        Public wrapper to kick off the call in the call_request in another
+        thread.
+        @param executor: executor to run the call in, see
+                         L{pulp.server.dispatch.executor}; None runs the call
+                         in a new thread
+        @type  executor: executor or None
         """
         assert self.call_report.state in dispatch_constants.CALL_READY_STATES
 
         # NOTE using run wrapper so that state transition is protected by the
         # task queue lock and doesn't occur in another thread
-        self.call_report.state = dispatch_constants.CALL_RUNNING_STATE
+        self._set_state(dispatch_constants.CALL_RUNNING_STATE)
 
-        task_thread = threading.Thread(target=self._run)
-        task_thread.start()
+        if executor is None:
+            task_thread = threading.Thread(target=self._run)
+            task_thread.start()
+        else:
+            executor.submit(self._run)
 
         # I'm fairly certain these will always be called *before* the context
         # switch to the task_thread
@@ -118,13 +212,16 @@ class Task(object):
         Run the call in the call request.
         Generally the target of a new thread.
         """
+        if not self._runnable():
+            return
+
         # used for calling _run directly during testing
         principal_manager = managers_factory.principal_manager()
         principal_manager.set_principal(self.call_request.principal)
 
         # generally set in the wrapper, but not when called directly
         if self.call_report.state in dispatch_constants.CALL_READY_STATES:
-            self.call_report.state = dispatch_constants.CALL_RUNNING_STATE
+            self._set_state(dispatch_constants.CALL_RUNNING_STATE)
 
         self.call_report.start_time = datetime.datetime.now(dateutils.utc_tz())
 
@@ -149,6 +246,19 @@ class Task(object):
             principal_manager.clear_principal()
             dispatch_context.CONTEXT.clear_task_attributes()
 
+    def _runnable(self):
+        """
+        Determine if the call should still be run: a task that was canceled
+        after being handed to its executor, but before the executor started
+        it, has already completed and must not be run.
+        @rtype: bool
+        """
+        state = self.call_report.state
+        if state in dispatch_constants.CALL_READY_STATES or state == dispatch_constants.CALL_RUNNING_STATE:
+            return True
+        _LOG.info(_('NOT RUN: %(t)s is %(s)s') % {'t': str(self), 's': state})
+        return False
+
     def _succeeded(self, result=None):
         """
         Mark the task completion as successful.
@@ -194,7 +304,7 @@ class Task(object):
         self._call_complete_callback()
 
         # don't set the state to complete in the report until the task is actually complete
-        self.call_report.state = state
+        self._set_state(state)
 
         self.call_life_cycle_callbacks(dispatch_constants.CALL_COMPLETE_LIFE_CYCLE_CALLBACK)
         if not self.call_request.archive:
@@ -297,6 +407,8 @@ class AsyncTask(Task):
         Run the call in the call request.
         Generally the target of a new thread.
         """
+        if not self._runnable():
+            return
 
         # used for calling _run directly during testing
         principal_manager = managers_factory.principal_manager()
@@ -304,7 +416,7 @@ class AsyncTask(Task):
 
         # usually set in the wrapper, unless called directly
         if self.call_report.state in dispatch_constants.CALL_READY_STATES:
-            self.call_report.state = dispatch_constants.CALL_RUNNING_STATE
+            self._set_state(dispatch_constants.CALL_RUNNING_STATE)
 
         self.call_report.start_time = datetime.datetime.now(dateutils.utc_tz())
 
@@ -11,18 +11,20 @@
 # have received a copy of GPLv2 along with this software; if not, see
 # http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
 
+import heapq
 import itertools
 import logging
 import sys
 import threading
 import traceback
+from collections import deque
 from datetime import datetime, timedelta
 from gettext import gettext as _
 
 from pulp.common import dateutils
 from pulp.server.db.model.dispatch import QueuedCall
 from pulp.server.dispatch import constants as dispatch_constants
-from pulp.server.util import subdict
+from pulp.server.dispatch.executor import DEFAULT_POOL_NAME, ExecutorRouter, ThreadPool
 
 
 _LOG = logging.getLogger(__name__)
@@ -34,30 +36,75 @@ class TaskQueue(object):
     TaskQueue class
     Manager and dispatcher of concurrent, asynchronous task execution
 
+    Waiting tasks are indexed by call request id and tracked by a reverse
+    dependency index (blocking call request id -> dependent call request ids).
+    Tasks with no outstanding dependencies are kept in per-weight heaps ordered
+    by enqueue sequence, so finding the ready tasks never requires a scan of
+    the waiting tasks. The dispatcher is woken up by enqueue and completion
+    events instead of waiting for the next dispatch interval.
+
+    Ready tasks are run by executors, by default a bounded pool of reusable
+    threads. Additional executors can be added for specific callables or call
+    request tags with add_executor.
+
+    All of the tasks in the queue, including the cached completed tasks, are
+    also indexed by call request group id, schedule id, callable name, tag and
+    resource, so that searches (see candidate_tasks) do not need to scan the
+    whole queue.
+
     @ivar concurrency_threshold: measurement of total allowed concurrency
     @type concurrency_threshold: int
-    @ivar dispatch_interval: time, in seconds, between checks for ready tasks
+    @ivar dispatch_interval: maximum time, in seconds, between dispatcher passes
+                             when no enqueue or completion events occur
     @type dispatch_interval: float
     @ivar completed_task_cache_life: time, in seconds, to cache completed tasks
     @type completed_task_cache_life: float
+    @ivar executors: selects the executor each ready task is run in
+    @type executors: L{ExecutorRouter}
     """
 
     def __init__(self,
                  concurrency_threshold,
                  dispatch_interval=0.5,
-                 completed_task_cache_life=20.0):
+                 completed_task_cache_life=20.0,
+                 executor=None):
 
         self.concurrency_threshold = concurrency_threshold
         self.dispatch_interval = dispatch_interval
         self.completed_task_cache_life = timedelta(seconds=completed_task_cache_life)
 
+        if executor is None:
+            executor = ThreadPool(DEFAULT_POOL_NAME, default_pool_size(concurrency_threshold))
+        executor.capacity_callback = self._executor_capacity_freed
+        self.executors = ExecutorRouter(executor)
+
         self.queued_call_collection = QueuedCall.get_collection()
 
-        self.__waiting_tasks = []
-        self.__running_tasks = []
-        self.__completed_tasks = []
+        # call request id -> task
+        self.__waiting_tasks = {}
+        self.__running_tasks = {}
+        self.__completed_tasks = {}
+        # completed tasks in ascending order of finish time
+        self.__completed_task_cache = deque()
+
+        # call request id -> enqueue sequence number
+        self.__sequence_numbers = {}
+        self.__sequence_counter = itertools.count()
+        # blocking call request id -> set of dependent call request ids
+        self.__dependents = {}
+        # weight -> heap of (sequence number, task) for unblocked waiting tasks
+        self.__ready_heaps = {}
+        # call request id -> completion sequence number of completed tasks
+        self.__completion_numbers = {}
+        self.__completion_counter = itertools.count()
+
+        # index name -> key -> set of call request ids
+        self.__indexes = dict((name, {}) for name in _INDEXED_CRITERIA)
+        # call request id -> list of (index name, key) the task is indexed by
+        self.__index_entries = {}
 
         self.__running_weight = 0
+        self.__dispatch_pending = False
         self.__exit = False
 
         self.__lock = threading.RLock()
@@ -73,7 +120,9 @@ class TaskQueue(object):
         self.__lock.acquire()
         while True:
             try:
-                self.__condition.wait(timeout=self.dispatch_interval)
+                if not self.__dispatch_pending:
+                    self.__condition.wait(timeout=self.dispatch_interval)
+                self.__dispatch_pending = False
                 if self.__exit:
                     if self.__lock is not None:
                         self.__lock.release()
@@ -86,38 +135,128 @@ class TaskQueue(object):
                 msg = _('Exception in task queue dispatcher thread:\n%(e)s')
                 _LOG.critical(msg % {'e': traceback.format_exception(*sys.exc_info())})
 
+    def _notify_dispatcher(self):
+        """
+        Wake up the dispatcher thread to look for ready tasks.
+        NOTE: must be called with the task queue lock held
+        """
+        self.__dispatch_pending = True
+        self.__condition.notify()
+
     def _get_ready_tasks(self):
         """
         Algorithm at the heart of the task dispatcher. Gets the tasks that are
         ready to run (i.e. not blocked) within the limits of the available
-        concurrency threshold and returns them. Note that this algorithm checks
-        all the tasks as some may have a weight of 0.
+        concurrency threshold and returns them, in the order they were queued.
+        Note that tasks with a weight greater than the remaining available
+        weight are passed over so that later tasks with a smaller weight
+        (including 0) can still be run.
         """
         self.__lock.acquire()
         try:
             tasks = []
+            entries = []
             available_weight = self.concurrency_threshold - self.__running_weight
-            for task in self.__waiting_tasks:
-                if task.call_request.dependencies:
-                    continue
-                if task.call_request.weight > available_weight:
-                    continue
+            while True:
+                entry = self._pop_ready_entry(available_weight)
+                if entry is None:
+                    break
+                entries.append(entry)
+                task = entry[1]
                 available_weight -= task.call_request.weight
                 tasks.append(task)
+            # this is a query: the tasks remain ready until they are actually run
+            for entry in entries:
+                self._push_ready_entry(entry)
             return tasks
         finally:
             self.__lock.release()
 
+    def _is_ready(self, task):
+        """
+        Determine if a task is waiting and has no outstanding dependencies
+        @param task: task to check
+        @type  task: pulp.server.dispatch.task.Task
+        @rtype: bool
+        """
+        if self.__waiting_tasks.get(task.call_request.id) is not task:
+            return False
+        return not task.call_request.dependencies
+
+    def _push_ready_entry(self, entry):
+        """
+        Add a (sequence number, task) entry to the ready heap for its weight
+        @param entry: ready heap entry
+        @type  entry: tuple
+        """
+        heap = self.__ready_heaps.setdefault(entry[1].call_request.weight, [])
+        heapq.heappush(heap, entry)
+
+    def _make_ready(self, task):
+        """
+        Place a waiting task, whose dependencies have all been met, into the
+        ready heaps and wake up the dispatcher.
+        @param task: task that is ready to run
+        @type  task: pulp.server.dispatch.task.Task
+        """
+        sequence_number = self.__sequence_numbers[task.call_request.id]
+        self._push_ready_entry((sequence_number, task))
+        self._notify_dispatcher()
+
+    def _pop_ready_entry(self, available_weight):
+        """
+        Remove and return the earliest queued ready heap entry whose task's
+        weight fits in the available weight. Entries for tasks that are no
+        longer ready are lazily discarded.
+        @param available_weight: remaining concurrency weight
+        @type  available_weight: int
+        @return: ready heap entry or None if there are no eligible tasks
+        @rtype: tuple or None
+        """
+        best_heap = None
+        for weight, heap in self.__ready_heaps.items():
+            if weight > available_weight:
+                continue
+            while heap and not self._is_ready(heap[0][1]):
+                heapq.heappop(heap)
+            if not heap:
+                self.__ready_heaps.pop(weight)
+                continue
+            if best_heap is None or heap[0][0] < best_heap[0][0]:
+                best_heap = heap
+        if best_heap is None:
+            return None
+        return heapq.heappop(best_heap)
+
     def _run_ready_task(self, task):
         """
-        Run a ready task in a new thread
+        Run a ready task in its executor, if the executor can start it right
+        away; otherwise the task is left waiting, so that it can still be
+        canceled, and is run once the executor has capacity
+        @return: True if the task was run, False if it was left waiting
+        @rtype: bool
         """
         self.__lock.acquire()
         try:
-            self.__waiting_tasks.remove(task)
-            self.__running_tasks.append(task)
+            executor = self.executors.executor(task.call_request)
+            if not executor.has_capacity():
+                return False
+            self.__waiting_tasks.pop(task.call_request.id, None)
+            self.__running_tasks[task.call_request.id] = task
             self.__running_weight += task.call_request.weight
-            task.run()
+            task.run(executor)
+            return True
+        finally:
+            self.__lock.release()
+
+    def _executor_capacity_freed(self):
+        """
+        Executor capacity callback: wake up the dispatcher to run the ready
+        tasks that were waiting for the executor
+        """
+        self.__lock.acquire()
+        try:
+            self._notify_dispatcher()
         finally:
             self.__lock.release()
 
@@ -126,13 +265,56 @@ class TaskQueue(object):
         Purge expired tasks from the completed tasks cache.
         """
         expired_cutoff = datetime.now(dateutils.utc_tz()) - self.completed_task_cache_life
-        index = 0 # index of the first non-expired cached task
         # the tasks stored in the cache are in ascending order of finish time
-        for i, task in enumerate(self.__completed_tasks):
+        while self.__completed_task_cache:
+            task = self.__completed_task_cache[0]
             if task.call_report.finish_time > expired_cutoff:
-                index = i
                 break
-        self.__completed_tasks = self.__completed_tasks[index:]
+            self.__completed_task_cache.popleft()
+            self.__completed_tasks.pop(task.call_request.id, None)
+            self.__completion_numbers.pop(task.call_request.id, None)
+            self._unindex(task)
+
+    def _index(self, task):
+        """
+        Add a task to the secondary indexes
+        NOTE: must be called with the task queue lock held
+        @param task: task to index
+        @type  task: pulp.server.dispatch.task.Task
+        """
+        call_request_id = task.call_request.id
+        if call_request_id in self.__index_entries:
+            return
+        entries = _index_entries(task)
+        for name, key in entries:
+            self.__indexes[name].setdefault(key, set()).add(call_request_id)
+        self.__index_entries[call_request_id] = entries
+
+    def _unindex(self, task):
+        """
+        Remove a task from the secondary indexes
+        NOTE: must be called with the task queue lock held
+        @param task: task to remove
+        @type  task: pulp.server.dispatch.task.Task
+        """
+        call_request_id = task.call_request.id
+        for name, key in self.__index_entries.pop(call_request_id, ()):
+            call_request_ids = self.__indexes[name].get(key)
+            if call_request_ids is None:
+                continue
+            call_request_ids.discard(call_request_id)
+            if not call_request_ids:
+                del self.__indexes[name][key]
+
+    def _sorted_tasks(self, tasks):
+        """
+        Sort tasks in the order they were enqueued
+        @param tasks: tasks to sort
+        @type  tasks: iterable of pulp.server.dispatch.task.Task
+        @rtype: list of pulp.server.dispatch.task.Task
+        """
+        sequence_numbers = self.__sequence_numbers
+        return sorted(tasks, key=lambda t: sequence_numbers.get(t.call_request.id, -1))
 
     # queue control methods ----------------------------------------------------
 
@@ -164,6 +346,33 @@ class TaskQueue(object):
         if clear_queued_calls:
             self.queued_call_collection.remove(safe=True)
 
+    def add_executor(self, executor, call_names=(), tags=()):
+        """
+        Run tasks for the given callables, or with any of the given call
+        request tags, in the executor instead of the default one.
+        @param executor: executor to run the tasks in
+        @type  executor: executor
+        @param call_names: callable names, as returned by CallRequest.callable_name
+        @type  call_names: iterable of str
+        @param tags: call request tags
+        @type  tags: iterable of str
+        """
+        self.__lock.acquire()
+        try:
+            executor.capacity_callback = self._executor_capacity_freed
+            self.executors.add(executor, call_names, tags)
+        finally:
+            self.__lock.release()
+
+    def executor_metrics(self):
+        """
+        Get the load of the task queue's executors.
+        @return: list of metrics dictionaries, default executor first; see
+                 L{ThreadPool.metrics}
+        @rtype:  list of dict
+        """
+        return self.executors.metrics()
+
     def lock(self):
         """
         Externally lock the task queue
@@ -188,7 +397,10 @@ class TaskQueue(object):
         """
         self.__lock.acquire()
         try:
-            map(self.enqueue, task_list)
+            # persist all of the queued calls in one round trip
+            queued_calls = map(self._queued_call, task_list)
+            self.queued_call_collection.insert_batch(queued_calls)
+            map(self._enqueue, task_list)
         finally:
             self.__lock.release()
 
@@ -200,14 +412,43 @@ class TaskQueue(object):
         """
         self.__lock.acquire()
         try:
-            queued_call = QueuedCall(task.call_request)
-            task.queued_call_id = queued_call['_id']
-            self.queued_call_collection.save(queued_call, safe=True)
+            self.queued_call_collection.insert(self._queued_call(task), safe=True)
+            self._enqueue(task)
+        finally:
+            self.__lock.release()
+
+    def _queued_call(self, task):
+        """
+        Build the queued call that persists the task's call request.
+        NOTE: the queued call must be acknowledged by the database before the
+        task is run, or its removal on completion may reach the database first
+        and the call would be run again on restart
+        @param task: task being enqueued
+        @type  task: pulp.server.dispatch.task.Task
+        @rtype: L{QueuedCall}
+        """
+        queued_call = QueuedCall(task.call_request)
+        task.queued_call_id = queued_call['_id']
+        return queued_call
+
+    def _enqueue(self, task):
+        """
+        Add a task, whose queued call has been stored, to the task queue.
+        @param task: task to be run
+        @type  task: pulp.server.dispatch.task.Task
+        """
+        self.__lock.acquire()
+        try:
             task.complete_callback = self._complete
             self._validate_call_request_dependencies(task)
-            self.__waiting_tasks.append(task)
+            self.__waiting_tasks[task.call_request.id] = task
+            self.__sequence_numbers[task.call_request.id] = self.__sequence_counter.next()
+            self._index(task)
+            for blocking_id in task.call_request.dependencies:
+                self.__dependents.setdefault(blocking_id, set()).add(task.call_request.id)
             task.call_life_cycle_callbacks(dispatch_constants.CALL_ENQUEUE_LIFE_CYCLE_CALLBACK)
-            self.__condition.notify()
+            if not task.call_request.dependencies:
+                self._make_ready(task)
         finally:
             self.__lock.release()
 
@@ -221,13 +462,12 @@ class TaskQueue(object):
         """
         self.__lock.acquire()
         try:
-            valid_call_request_dependency_ids = []
-            for potential_blocking_task in itertools.chain(self.__running_tasks, self.__waiting_tasks):
-                if potential_blocking_task.call_request.id not in task.call_request.dependencies:
-                    continue
-                valid_call_request_dependency_ids.append(potential_blocking_task.call_request.id)
             # DANGER this ignores valid call complete states of dependencies!!
-            task.call_request.dependencies = subdict(task.call_request.dependencies, valid_call_request_dependency_ids)
+            dependencies = task.call_request.dependencies
+            for call_request_id in dependencies.keys():
+                if call_request_id in self.__running_tasks or call_request_id in self.__waiting_tasks:
+                    continue
+                dependencies.pop(call_request_id)
         finally:
             self.__lock.release()
 
@@ -243,10 +483,11 @@ class TaskQueue(object):
             task.complete_callback = None
             self.queued_call_collection.remove({'_id': task.queued_call_id}, safe=True)
             task.queued_call_id = None
-            if task in self.__waiting_tasks:
-                self.__waiting_tasks.remove(task)
-            if task in self.__running_tasks:
-                self.__running_tasks.remove(task)
+            self.__waiting_tasks.pop(task.call_request.id, None)
+            self.__running_tasks.pop(task.call_request.id, None)
+            self.__sequence_numbers.pop(task.call_request.id, None)
+            if task.call_request.id not in self.__completed_tasks:
+                self._unindex(task)
             self._unblock_tasks(task)
             task.call_life_cycle_callbacks(dispatch_constants.CALL_DEQUEUE_LIFE_CYCLE_CALLBACK)
         finally:
@@ -260,7 +501,14 @@ class TaskQueue(object):
         """
         self.__lock.acquire()
         try:
-            for potentially_blocked_task in self.__waiting_tasks[:]:
+            dependent_ids = self.__dependents.pop(task.call_request.id, ())
+
+            for dependent_id in dependent_ids:
+
+                potentially_blocked_task = self.__waiting_tasks.get(dependent_id)
+
+                if potentially_blocked_task is None:
+                    continue
 
                 if task.call_request.id not in potentially_blocked_task.call_request.dependencies:
                     continue
@@ -274,6 +522,8 @@ class TaskQueue(object):
                 else:
                     # remove the task from the blocking_tasks dict
                     potentially_blocked_task.call_request.dependencies.pop(task.call_request.id)
+                    if not potentially_blocked_task.call_request.dependencies:
+                        self._make_ready(potentially_blocked_task)
 
         finally:
             self.__lock.release()
@@ -288,16 +538,23 @@ class TaskQueue(object):
         """
         self.__lock.acquire()
         try:
-            self.__running_weight -= task.call_request.weight
+            if task.call_request.id in self.__running_tasks:
+                self.__running_weight -= task.call_request.weight
             self.dequeue(task)
-            self.__completed_tasks.append(task)
+            if task.call_request.id not in self.__completed_tasks:
+                self.__completed_tasks[task.call_request.id] = task
+                self.__completed_task_cache.append(task)
+                self.__completion_numbers[task.call_request.id] = self.__completion_counter.next()
+                self._index(task)
+            # freed concurrency weight may allow waiting tasks to run
+            self._notify_dispatcher()
         finally:
             self.__lock.release()
 
     def skip(self, task):
         self.__lock.acquire()
         try:
-            if task not in self.__waiting_tasks:
+            if task.call_request.id not in self.__waiting_tasks:
                 return
             return task.skip()
         finally:
@@ -327,12 +584,12 @@ class TaskQueue(object):
         """
         self.__lock.acquire()
         try:
-            for task in itertools.chain(self.__completed_tasks,
-                                        self.__running_tasks,
-                                        self.__waiting_tasks):
-                if task.call_request.id != call_request_id:
-                    continue
-                return task
+            for task_map in (self.__completed_tasks,
+                             self.__running_tasks,
+                             self.__waiting_tasks):
+                task = task_map.get(call_request_id)
+                if task is not None:
+                    return task
             return None
         finally:
             self.__lock.release()
@@ -345,21 +602,69 @@ class TaskQueue(object):
         @return: (potentially empty) list of tasks with matching tags
         @rtype:  list of pulp.server.dispatch.task.Task
         """
+        return self.candidate_tasks({'tags': tags})
+
+    def candidate_tasks(self, criteria):
+        """
+        Use the secondary indexes to narrow down the tasks that may match the
+        given search criteria (see Coordinator.find_call_reports). The indexed
+        criteria (call_request_id, call_request_group_id, schedule_id, state,
+        callable_name, tags and resources) are matched exactly; the caller is
+        responsible for matching any other criteria against the returned tasks.
+        @param criteria: search criteria
+        @type  criteria: dict
+        @return: (potentially empty) list of tasks in the same order as all_tasks
+        @rtype:  list of pulp.server.dispatch.task.Task
+        """
         self.__lock.acquire()
         try:
+            if 'call_request_id' in criteria:
+                call_request_ids = set([criteria['call_request_id']])
+            else:
+                call_request_ids = None
+
+            for name, key in _criteria_index_entries(criteria):
+                matching_ids = self.__indexes[name].get(key, ())
+                if call_request_ids is None:
+                    call_request_ids = set(matching_ids)
+                else:
+                    call_request_ids.intersection_update(matching_ids)
+                if not call_request_ids:
+                    return []
+
+            # the task maps double as an index on the call state, as a task is
+            # moved into the completed tasks right before its state is changed
+            # to a complete state
+            task_maps = [self.__completed_tasks]
+            state = criteria.get('state', None)
+            if state is None or state in dispatch_constants.CALL_INCOMPLETE_STATES:
+                task_maps.append(self.__running_tasks)
+                task_maps.append(self.__waiting_tasks)
+
             tasks = []
-            for task in itertools.chain(self.__completed_tasks,
-                                        self.__running_tasks,
-                                        self.__waiting_tasks):
-                for tag in tags:
-                    if tag not in task.call_request.tags:
-                        break
+            for rank, task_map in enumerate(task_maps):
+                if call_request_ids is None:
+                    matches = task_map.values()
                 else:
-                    tasks.append(task)
-            return tasks
+                    matches = [task_map[i] for i in call_request_ids if i in task_map]
+                if state is not None:
+                    matches = [t for t in matches if t.call_report.state == state]
+                tasks.extend((rank, self._sequence_number(t), t) for t in matches)
+            tasks.sort(key=lambda t: t[:2])
+            return [t[2] for t in tasks]
         finally:
             self.__lock.release()
 
+    def _sequence_number(self, task):
+        """
+        Sequence number of a task within its task map: completion order for
+        completed tasks, enqueue order for the others
+        """
+        call_request_id = task.call_request.id
+        if call_request_id in self.__completed_tasks:
+            return self.__completion_numbers.get(call_request_id, -1)
+        return self.__sequence_numbers.get(call_request_id, -1)
+
     def waiting_tasks(self):
         """
         List all of the tasks waiting to be executed
@@ -368,7 +673,7 @@ class TaskQueue(object):
         """
         self.__lock.acquire()
         try:
-            return self.__waiting_tasks[:]
+            return self._sorted_tasks(self.__waiting_tasks.values())
         finally:
             self.__lock.release()
 
@@ -380,7 +685,7 @@ class TaskQueue(object):
         """
         self.__lock.acquire()
         try:
-            return self.__running_tasks[:]
+            return self._sorted_tasks(self.__running_tasks.values())
         finally:
             self.__lock.release()
 
@@ -392,8 +697,8 @@ class TaskQueue(object):
         """
         self.__lock.acquire()
         try:
-            return itertools.chain(self.__running_tasks[:],
-                                   self.__waiting_tasks[:])
+            return itertools.chain(self.running_tasks(),
+                                   self.waiting_tasks())
         finally:
             self.__lock.release()
 
@@ -405,7 +710,7 @@ class TaskQueue(object):
         """
         self.__lock.acquire()
         try:
-            return self.__completed_tasks[:]
+            return list(self.__completed_task_cache)
         finally:
             self.__lock.release()
 
@@ -417,8 +722,61 @@ class TaskQueue(object):
         """
         self.__lock.acquire()
         try:
-            return itertools.chain(self.__completed_tasks[:],
-                                   self.__running_tasks[:],
-                                   self.__waiting_tasks[:])
+            return itertools.chain(self.completed_tasks(),
+                                   self.running_tasks(),
+                                   self.waiting_tasks())
         finally:
             self.__lock.release()
+
+# index utility functions ------------------------------------------------------
+
+_INDEXED_CRITERIA = ('call_request_group_id', 'schedule_id', 'callable_name', 'tags', 'resources')
+
+
+def _index_entries(task):
+    """
+    Get the secondary index entries for a task.
+    @param task: task to index
+    @type  task: pulp.server.dispatch.task.Task
+    @return: list of (index name, key) tuples
+    @rtype:  list
+    """
+    call_request = task.call_request
+    entries = [('call_request_group_id', call_request.group_id),
+               ('schedule_id', task.call_report.schedule_id),
+               ('callable_name', call_request.callable_name())]
+    entries.extend(('tags', t) for t in set(call_request.tags))
+    for resource_type, resources in call_request.resources.items():
+        entries.extend(('resources', (resource_type, r)) for r in resources)
+    return entries
+
+
+def _criteria_index_entries(criteria):
+    """
+    Get the secondary index entries all the tasks matching the search criteria
+    are indexed by.
+    @param criteria: search criteria
+    @type  criteria: dict
+    @return: list of (index name, key) tuples
+    @rtype:  list
+    """
+    entries = []
+    for name in ('call_request_group_id', 'schedule_id', 'callable_name'):
+        if name in criteria:
+            entries.append((name, criteria[name]))
+    entries.extend(('tags', t) for t in criteria.get('tags', ()))
+    for resource_type, resources in criteria.get('resources', {}).items():
+        entries.extend(('resources', (resource_type, r)) for r in resources)
+    return entries
+
+# utility functions ------------------------------------------------------------
+
+def default_pool_size(concurrency_threshold):
+    """
+    Size of the default thread pool when none is configured: enough threads
+    for the concurrency threshold plus headroom for weightless tasks.
+    @param concurrency_threshold: task queue concurrency threshold
+    @type  concurrency_threshold: int
+    @rtype: int
+    """
+    return max(concurrency_threshold, 1) * 2
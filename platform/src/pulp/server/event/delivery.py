@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public
+# License as published by the Free Software Foundation; either version
+# 2 of the License (GPLv2) or (at your option) any later version.
+# There is NO WARRANTY for this software, express or implied,
+# including the implied warranties of MERCHANTABILITY,
+# NON-INFRINGEMENT, or FITNESS FOR A PARTICULAR PURPOSE. You should
+# have received a copy of GPLv2 along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+
+"""
+Asynchronous delivery of notifications to their destinations.
+
+Notifiers put the messages they need to send on the delivery queue of their
+destination (e.g. an HTTP server or the SMTP server) instead of sending them
+from the thread firing the event. Each queue is bounded and has a single
+worker thread, started on demand, that delivers queued messages in batches
+over the destination's connection and retries failed deliveries with an
+exponential backoff.
+
+A destination is any object with the following methods:
+
+deliver(messages)
+  Deliver the list of messages, in order, removing each message from the list
+  once it is delivered. Raising an exception retries the messages remaining
+  in the list.
+
+close()
+  Release any resources held by the destination, such as an open connection.
+  Called when the queue's worker goes idle.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from gettext import gettext as _
+
+# -- constants ----------------------------------------------------------------
+
+_LOG = logging.getLogger(__name__)
+
+# maximum number of messages waiting in a queue; the oldest are dropped
+DEFAULT_MAX_SIZE = 1000
+
+# maximum number of messages handed to a destination at a time
+DEFAULT_BATCH_SIZE = 50
+
+# number of times a failed delivery is retried and the delay, in seconds,
+# before the first retry; the delay doubles for each following retry
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RETRY_DELAY = 1.0
+
+# seconds the worker waits for messages before releasing the destination
+DEFAULT_IDLE_TIMEOUT = 30.0
+
+# -- delivery queue -----------------------------------------------------------
+
+class DeliveryQueue(object):
+    """
+    Bounded queue of messages for a single destination.
+
+    @ivar name: identifies the destination in logs and metrics
+    @type name: str
+    @ivar destination: destination the messages are delivered to
+    @type destination: object
+    """
+
+    def __init__(self, name, destination,
+                 max_size=DEFAULT_MAX_SIZE,
+                 batch_size=DEFAULT_BATCH_SIZE,
+                 max_retries=DEFAULT_MAX_RETRIES,
+                 retry_delay=DEFAULT_RETRY_DELAY,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT):
+
+        self.name = name
+        self.destination = destination
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.idle_timeout = idle_timeout
+
+        # (time queued, message)
+        self.__queue = deque()
+        self.__worker = None
+
+        self.__delivered = 0
+        self.__failed = 0
+        self.__dropped = 0
+        self.__retries = 0
+        self.__total_latency = 0.0
+        self.__max_latency = 0.0
+
+        self.__lock = threading.Lock()
+        self.__condition = threading.Condition(self.__lock)
+
+    def put(self, message):
+        """
+        Queue a message for delivery. If the queue is full, the oldest message
+        is dropped to make room.
+        @param message: message, in the format expected by the destination
+        """
+        self.__lock.acquire()
+        try:
+            if len(self.__queue) >= self.max_size:
+                self.__queue.popleft()
+                self.__dropped += 1
+                _LOG.warn(_('Delivery queue for %(n)s is full; dropping the oldest message') % {'n': self.name})
+            self.__queue.append((time.time(), message))
+            if self.__worker is None:
+                self.__worker = threading.Thread(target=self.__work, name='delivery-%s' % self.name)
+                self.__worker.setDaemon(True)
+                self.__worker.start()
+            else:
+                self.__condition.notify()
+        finally:
+            self.__lock.release()
+
+    def metrics(self):
+        """
+        Snapshot of the queue's state.
+        @return: dictionary of name, queue_depth, delivered, failed (gave up
+                 after retrying), dropped (queue full), retries,
+                 average_latency and max_latency (seconds between a message
+                 being queued and delivered)
+        @rtype:  dict
+        """
+        self.__lock.acquire()
+        try:
+            average_latency = 0.0
+            if self.__delivered:
+                average_latency = self.__total_latency / self.__delivered
+            return {'name': self.name,
+                    'queue_depth': len(self.__queue),
+                    'delivered': self.__delivered,
+                    'failed': self.__failed,
+                    'dropped': self.__dropped,
+                    'retries': self.__retries,
+                    'average_latency': average_latency,
+                    'max_latency': self.__max_latency}
+        finally:
+            self.__lock.release()
+
+    def __work(self):
+        """
+        Worker thread loop
+        """
+        self.__lock.acquire()
+        try:
+            while True:
+                if not self.__queue:
+                    self.__condition.wait(self.idle_timeout)
+                    if not self.__queue:
+                        self.__worker = None
+                        self._close()
+                        return
+                batch = []
+                while self.__queue and len(batch) < self.batch_size:
+                    batch.append(self.__queue.popleft())
+                self.__lock.release()
+                try:
+                    delivered, retries = self._deliver([m for t, m in batch])
+                finally:
+                    self.__lock.acquire()
+                now = time.time()
+                for queued, message in batch[:delivered]:
+                    latency = now - queued
+                    self.__total_latency += latency
+                    self.__max_latency = max(self.__max_latency, latency)
+                self.__delivered += delivered
+                self.__failed += len(batch) - delivered
+                self.__retries += retries
+        finally:
+            self.__lock.release()
+
+    def _deliver(self, messages):
+        """
+        Deliver the messages, retrying with backoff.
+        @return: tuple of the number of messages delivered and the number of
+                 retries it took
+        @rtype:  tuple
+        """
+        count = len(messages)
+        retries = 0
+        while messages:
+            try:
+                self.destination.deliver(messages)
+                break
+            except Exception:
+                _LOG.exception(_('Error delivering to %(n)s') % {'n': self.name})
+                self._close()
+                if retries >= self.max_retries:
+                    _LOG.error(_('Giving up on %(c)d messages for %(n)s') %
+                               {'c': len(messages), 'n': self.name})
+                    break
+                time.sleep(self.retry_delay * (2 ** retries))
+                retries += 1
+        return count - len(messages), retries
+
+    def _close(self):
+        try:
+            self.destination.close()
+        except Exception:
+            _LOG.exception(_('Error closing %(n)s') % {'n': self.name})
+
+# -- queue registry -----------------------------------------------------------
+
+_QUEUES = {}
+_QUEUES_LOCK = threading.Lock()
+
+
+def get_queue(name, destination_factory):
+    """
+    Get the delivery queue for a destination, creating it if needed.
+    @param name: unique name of the destination
+    @type  name: str
+    @param destination_factory: called, with no arguments, to create the
+                                destination if there is no queue for it yet
+    @type  destination_factory: callable
+    @rtype: L{DeliveryQueue}
+    """
+    _QUEUES_LOCK.acquire()
+    try:
+        queue = _QUEUES.get(name)
+        if queue is None:
+            queue = _QUEUES[name] = DeliveryQueue(name, destination_factory())
+        return queue
+    finally:
+        _QUEUES_LOCK.release()
+
+
+def metrics():
+    """
+    @return: metrics of all of the delivery queues, see L{DeliveryQueue.metrics}
+    @rtype:  list of dict
+    """
+    _QUEUES_LOCK.acquire()
+    try:
+        queues = _QUEUES.values()
+    finally:
+        _QUEUES_LOCK.release()
+    return [q.metrics() for q in queues]
+
+
+def reset():
+    """
+    Forget all of the delivery queues. Messages still queued are delivered by
+    their existing workers. Should only need to be called in unit tests.
+    """
+    _QUEUES_LOCK.acquire()
+    try:
+        _QUEUES.clear()
+    finally:
+        _QUEUES_LOCK.release()
@@ -25,40 +25,27 @@ Eventually this should be enhanced to support authentication credentials as well
 import base64
 import httplib
 import logging
-import threading
 
+from pulp.common.util import closed_without_response
 from pulp.server.compat import json
+from pulp.server.event import delivery
 
 # -- constants ----------------------------------------------------------------
 
 TYPE_ID = 'http'
 
+# seconds to wait on the server, so that a hung server cannot block the
+# delivery of later events to it indefinitely
+DEFAULT_TIMEOUT = 30
+
 LOG = logging.getLogger(__name__)
 
 # -- framework hook -----------------------------------------------------------
 
 def handle_event(notifier_config, event):
-    # fire the actual http push function off in a separate thread to keep
+    # the POST is made by the delivery queue of the receiving server to keep
     # pulp from blocking or deadlocking due to the tasking subsystem
 
-    data = event.data()
-
-    LOG.info(data)
-
-    body = json.dumps(data)
-
-    thread = threading.Thread(target=_send_post, args=[notifier_config, body])
-    thread.setDaemon(True)
-    thread.start()
-
-# -- private ------------------------------------------------------------------
-
-def _send_post(notifier_config, body):
-
-    # Basic headers
-    headers = {'Accept': 'application/json',
-               'Content-Type': 'application/json'}
-
     # Parse the URL for the pieces we need
     if 'url' not in notifier_config or not notifier_config['url']:
         LOG.warn('HTTP notifier configured without a URL; cannot fire event')
@@ -72,7 +59,15 @@ def _send_post(notifier_config, body):
         LOG.warn('Improperly configured post_sync_url: %(u)s' % {'u': url})
         return
 
-    connection = _create_connection(scheme, server)
+    data = event.data()
+
+    LOG.info(data)
+
+    body = json.dumps(data)
+
+    # Basic headers
+    headers = {'Accept': 'application/json',
+               'Content-Type': 'application/json'}
 
     # Process authentication
     if 'username' in notifier_config and 'password' in notifier_config:
@@ -80,16 +75,75 @@ def _send_post(notifier_config, body):
         encoded = base64.encodestring(raw)[:-1]
         headers['Authorization'] = 'Basic ' + encoded
 
-    connection.request('POST', '/' + path, body=body, headers=headers)
-    response = connection.getresponse()
-    if response.status != httplib.OK:
-        error_msg = response.read()
-        LOG.warn('Error response from HTTP notifier: %(e)s' % {'e': error_msg})
-    connection.close()
+    # one queue, and so one connection, per server
+    queue = delivery.get_queue('%s//%s' % (scheme, server),
+                               lambda: HTTPDestination(scheme, server))
+    queue.put(('/' + path, headers, body))
+
+# -- delivery -----------------------------------------------------------------
+
+class HTTPDestination(object):
+    """
+    Delivery queue destination that POSTs event bodies to a single server,
+    reusing a persistent connection for consecutive requests. Messages are
+    (path, headers, body) tuples.
+
+    An event is only sent again if the server cannot have received it: if
+    sending the request failed, or if the server closed a reused connection
+    without responding. Errors reading the response otherwise fail the event,
+    as the server may have acted on it.
+    """
+
+    def __init__(self, scheme, server):
+        self.scheme = scheme
+        self.server = server
+        self.connection = None
+
+    def deliver(self, messages):
+        while messages:
+            path, headers, body = messages[0]
+            reused = self.connection is not None
+            if not reused:
+                self.connection = _create_connection(self.scheme, self.server)
+            try:
+                self.connection.request('POST', path, body=body, headers=headers)
+            except Exception:
+                self.close()
+                if reused:
+                    # the server closed the idle connection; try a new one
+                    continue
+                # raised for the delivery queue to retry
+                raise
+            try:
+                response = self.connection.getresponse()
+                # the response must be read in full before the connection can
+                # be used for the next request
+                response_body = response.read()
+            except Exception, e:
+                self.close()
+                if reused and closed_without_response(e):
+                    continue
+                LOG.exception('Error reading the response from HTTP notifier %(s)s; '
+                              'the event is not sent again' % {'s': self.server})
+                messages.pop(0)
+                continue
+            if response.status != httplib.OK:
+                # the server received the event; retrying will not help
+                LOG.warn('Error response from HTTP notifier: %(e)s' % {'e': response_body})
+            if response.will_close:
+                self.close()
+            messages.pop(0)
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+# -- private ------------------------------------------------------------------
 
 def _create_connection(scheme, server):
     if scheme.startswith('https'):
-        connection = httplib.HTTPSConnection(server)
+        connection = httplib.HTTPSConnection(server, timeout=DEFAULT_TIMEOUT)
     else:
-        connection = httplib.HTTPConnection(server)
+        connection = httplib.HTTPConnection(server, timeout=DEFAULT_TIMEOUT)
     return connection
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public
+# License as published by the Free Software Foundation; either version
+# 2 of the License (GPLv2) or (at your option) any later version.
+# There is NO WARRANTY for this software, express or implied,
+# including the implied warranties of MERCHANTABILITY,
+# NON-INFRINGEMENT, or FITNESS FOR A PARTICULAR PURPOSE. You should
+# have received a copy of GPLv2 along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+
+"""
+Per-process cache of the event listener table, so firing an event does not
+query the database.
+
+The event listener manager invalidates the cache whenever a listener is
+created, updated or deleted; anything else that writes to the listener
+collection must call invalidate(). The table is also reloaded every
+LISTENER_CACHE_TTL seconds to pick up changes made by other processes.
+"""
+
+import threading
+import time
+
+from pulp.server.db.model.event import EventListener
+
+# -- constants ----------------------------------------------------------------
+
+LISTENER_CACHE_TTL = 60
+
+# -- cache --------------------------------------------------------------------
+
+class ListenerCache(object):
+    """
+    Thread-safe cache of the event listeners, indexed by event type.
+
+    @ivar ttl: seconds the table is used before it is reloaded
+    @type ttl: float
+    """
+
+    def __init__(self, ttl=LISTENER_CACHE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._listeners = None
+        self._by_event_type = {}
+        self._loaded = None
+
+    def find(self, event_type):
+        """
+        Find the listeners for the given event type, including the listeners
+        registered for all event types ("*"). The listener documents are
+        shared by all callers and must not be modified.
+        @param event_type: type of the event being fired
+        @type  event_type: str
+        @return: listener documents, in database order
+        @rtype:  list of dict
+        """
+        self._lock.acquire()
+        try:
+            if self._listeners is None or time.time() - self._loaded > self.ttl:
+                self._listeners = list(EventListener.get_collection().find())
+                self._by_event_type = {}
+                self._loaded = time.time()
+            listeners = self._by_event_type.get(event_type)
+            if listeners is None:
+                listeners = [l for l in self._listeners if _matches(l, event_type)]
+                self._by_event_type[event_type] = listeners
+            return listeners
+        finally:
+            self._lock.release()
+
+    def invalidate(self):
+        """
+        Drop the cached listeners; they will be reloaded on the next find.
+        """
+        self._lock.acquire()
+        try:
+            self._listeners = None
+            self._by_event_type = {}
+        finally:
+            self._lock.release()
+
+
+def _matches(listener, event_type):
+    event_types = listener['event_types']
+    # same semantics as querying the field, which may hold a single type
+    if isinstance(event_types, basestring):
+        event_types = [event_types]
+    return event_type in event_types or '*' in event_types
+
+# -- singleton ----------------------------------------------------------------
+
+LISTENER_CACHE = ListenerCache()
+
+
+def invalidate():
+    """
+    Drop the process-wide listener cache; must be called after event
+    listeners are changed.
+    """
+    LISTENER_CACHE.invalidate()
@@ -13,7 +13,6 @@
 
 import logging
 import smtplib
-import threading
 
 try:
     from email.mime.text import MIMEText
@@ -23,6 +22,7 @@ except ImportError:
 
 from pulp.server.compat import json
 from pulp.server.config import config
+from pulp.server.event import delivery
 
 TYPE_ID = 'email'
 logger = logging.getLogger(__name__)
@@ -47,44 +47,64 @@ def handle_event(notifier_config, event):
     subject = notifier_config['subject']
     addresses = notifier_config['addresses']
 
+    # sent from the SMTP server's delivery queue, over a single connection
+    host = config.get('email', 'host')
+    port = config.getint('email', 'port')
+    queue = delivery.get_queue('smtp://%s:%s' % (host, port),
+                               lambda: SMTPDestination(host, port))
     for address in addresses:
-        thread = threading.Thread(target=_send_email, args=(subject, body, address))
-        thread.daemon = True
-        thread.start()
+        queue.put((subject, body, address))
 
-def _send_email(subject, body, to_address):
+def _build_message(subject, body, from_address, to_address):
     """
-    Send a text email to one recipient
+    Build a text email to one recipient
 
-    :param subject: email subject
-    :type  subject: basestring
-    :param body:    text body of the email
-    :type  body:    basestring
-    :param to_address:  email address to send to
-    :type  to_address:  basestring
-
-    :return: None
+    :return: email message
+    :rtype:  email.mime.text.MIMEText
     """
-    host = config.get('email', 'host')
-    port = config.getint('email', 'port')
-    from_address = config.get('email', 'from')
-
     message = MIMEText(body)
     message['Subject'] = subject
     message['From'] = from_address
     message['To'] = to_address
+    return message
 
-    try:
-        connection = smtplib.SMTP(host=host, port=port)
-    except smtplib.SMTPConnectError:
-        logger.exception('SMTP connection failed to %s on %s' % (host, port))
-        return
+class SMTPDestination(object):
+    """
+    Delivery queue destination that sends emails through an SMTP server,
+    reusing one SMTP session for all of the emails in a batch and for the
+    batches that follow while the queue is busy.
+
+    Messages are (subject, body, to_address) tuples. Connection failures and
+    disconnects are raised so the delivery queue retries the remaining
+    emails; any other SMTP error only fails the email that caused it.
+    """
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.connection = None
+
+    def deliver(self, messages):
+        from_address = config.get('email', 'from')
+        while messages:
+            subject, body, to_address = messages[0]
+            message = _build_message(subject, body, from_address, to_address)
+            if self.connection is None:
+                self.connection = smtplib.SMTP(host=self.host, port=self.port)
+            try:
+                self.connection.sendmail(from_address, to_address, message.as_string())
+            except smtplib.SMTPServerDisconnected:
+                self.connection = None
+                raise
+            except smtplib.SMTPException:
+                logger.exception('Error sending mail to %s' % to_address)
+            messages.pop(0)
 
-    try:
-        connection.sendmail(from_address, to_address, message.as_string())
-    except smtplib.SMTPException, e:
-        try:
-            logger.exception('Error sending mail.')
-        except AttributeError:
-            logger.error('SMTP error while sending mail')
-    connection.quit()
+    def close(self):
+        if self.connection is not None:
+            connection, self.connection = self.connection, None
+            try:
+                connection.quit()
+            except Exception:
+                # the server may already have dropped the session
+                pass
@@ -9,6 +9,7 @@
 # have received a copy of GPLv2 along with this software; if not, see
 # http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
 
+import calendar
 import logging
 
 import oauth2
@@ -16,6 +17,7 @@ import oauth2
 from pulp.server.db.model.consumer import Consumer
 from pulp.server.managers import factory
 from pulp.server.auth import ldap_connection
+from pulp.server.auth.credential_cache import CREDENTIAL_CACHE
 from pulp.server.config import config
 from pulp.server.exceptions import PulpException
 
@@ -60,9 +62,13 @@ class AuthenticationManager(object):
             return None
     
         if password is not None:
-            if not factory.password_manager().check_password(user['password'], password):
-                _LOG.debug('Password for user [%s] was incorrect' % username)
-                return None
+            # the stored hash is part of the key so a changed password misses
+            key = CREDENTIAL_CACHE.key('password', username, password, user['password'])
+            if CREDENTIAL_CACHE.get(key) is None:
+                if not factory.password_manager().check_password(user['password'], password):
+                    _LOG.debug('Password for user [%s] was incorrect' % username)
+                    return None
+                CREDENTIAL_CACHE.put(key, user['login'])
     
         return user
     
@@ -129,6 +135,12 @@ class AuthenticationManager(object):
         :rtype: str or None
         :return: user login corresponding to the credentials
         """
+        key = CREDENTIAL_CACHE.key('user-cert', cert_pem)
+        username = CREDENTIAL_CACHE.get(key)
+        if username is not None:
+            # the user may have been removed since the certificate was issued
+            return self.check_username_password(username)
+
         cert = factory.certificate_manager(content=cert_pem)
         subject = cert.subject()
         encoded_user = subject.get('CN', None)
@@ -147,7 +159,10 @@ class AuthenticationManager(object):
         except PulpException:
             return None
     
-        return self.check_username_password(username)
+        login = self.check_username_password(username)
+        if login is not None:
+            CREDENTIAL_CACHE.put(key, login, _cert_expiration(cert))
+        return login
     
     def check_consumer_cert(self, cert_pem):
         """
@@ -160,6 +175,11 @@ class AuthenticationManager(object):
         :rtype: str or None
         :return: id of a consumer corresponding to the credentials
         """
+        key = CREDENTIAL_CACHE.key('consumer-cert', cert_pem)
+        consumerid = CREDENTIAL_CACHE.get(key)
+        if consumerid is not None:
+            return consumerid
+
         cert = factory.certificate_manager(content=cert_pem)
         subject = cert.subject()
         consumerid = subject.get('CN', None)
@@ -173,6 +193,7 @@ class AuthenticationManager(object):
                        consumerid)
             return None
     
+        CREDENTIAL_CACHE.put(key, consumerid, _cert_expiration(cert))
         return consumerid
     
     # oauth authentication --------------------------------------------------------
@@ -235,3 +256,13 @@ class AuthenticationManager(object):
             return consumer['id'], is_consumer
 
         return None, is_consumer
+
+
+# -- utilities ----------------------------------------------------------------
+
+def _cert_expiration(cert):
+    """
+    :rtype: int
+    :return: time the certificate expires, in seconds since the epoch
+    """
+    return calendar.timegm(cert.validRange().end().utctimetuple())
@@ -15,8 +15,13 @@
 Password Manager
 
 Functions taken from stackoverflow.com : http://tinyurl.com/2f6gx7s
+
+Passwords are hashed with PBKDF2-HMAC-SHA256 (RFC 2898) and stored as
+"pbkdf2_sha256$<iterations>$<base64 salt>$<base64 hash>". Entries in the
+older "<base64 salt>,<base64 hash>" format are still checked.
 """
 
+import hashlib
 import random
 from hmac import HMAC
 
@@ -26,6 +31,11 @@ from pulp.server.compat import digestmod
 
 NUM_ITERATIONS = 5000
 
+PBKDF2_ALGORITHM = 'pbkdf2_sha256'
+
+# hashlib only provides pbkdf2_hmac as of python 2.7.8
+_pbkdf2_hmac = getattr(hashlib, 'pbkdf2_hmac', None)
+
 # -- classes ------------------------------------------------------------------
 
 class PasswordManager(object):
@@ -37,23 +47,47 @@ class PasswordManager(object):
         return "".join(chr(random.randrange(256)) for i in xrange(num_bytes))
 
     def pbkdf_sha256(self, password, salt, iterations):
+        """
+        Key derivation used by password entries in the legacy format.
+        """
         result = password
         for i in xrange(iterations):
             result = HMAC(result, salt, digestmod).digest() # use HMAC to apply the salt
         return result
 
+    def pbkdf2_sha256(self, password, salt, iterations):
+        """
+        PBKDF2-HMAC-SHA256 with a derived key the size of the digest. Uses the
+        C implementation in hashlib where it is available.
+        """
+        if _pbkdf2_hmac is not None:
+            return _pbkdf2_hmac('sha256', password, salt, iterations)
+        mac = HMAC(password, None, digestmod)
+        def prf(data):
+            h = mac.copy()
+            h.update(data)
+            return h.digest()
+        # one block is enough for a key the size of the digest
+        u = prf(salt + '\x00\x00\x00\x01')
+        result = long(u.encode('hex'), 16)
+        for i in xrange(iterations - 1):
+            u = prf(u)
+            result ^= long(u.encode('hex'), 16)
+        return ('%0*x' % (len(u) * 2, result)).decode('hex')
+
     def hash_password(self, plain_password):
         salt = self.random_bytes(8) # 64 bits
-        hashed_password = self.pbkdf_sha256(str(plain_password), salt, NUM_ITERATIONS)
-        # return the salt and hashed password, encoded in base64 and split with ","
-        return salt.encode("base64").strip() + "," + hashed_password.encode("base64").strip()
+        hashed_password = self.pbkdf2_sha256(str(plain_password), salt, NUM_ITERATIONS)
+        return '$'.join((PBKDF2_ALGORITHM, str(NUM_ITERATIONS),
+                         salt.encode("base64").strip(), hashed_password.encode("base64").strip()))
 
     def check_password(self, saved_password_entry, plain_password):
-        salt, hashed_password = saved_password_entry.split(",")
-        salt = salt.decode("base64")
-        hashed_password = hashed_password.decode("base64")
-        pbkdbf = self.pbkdf_sha256(plain_password, salt, NUM_ITERATIONS)
-        return hashed_password == pbkdbf
+        plain_password = str(plain_password)
+        if saved_password_entry.startswith(PBKDF2_ALGORITHM + '$'):
+            algorithm, iterations, salt, hashed_password = saved_password_entry.split('$')
+            pbkdbf = self.pbkdf2_sha256(plain_password, salt.decode("base64"), int(iterations))
+        else:
+            salt, hashed_password = saved_password_entry.split(",")
+            pbkdbf = self.pbkdf_sha256(plain_password, salt.decode("base64"), NUM_ITERATIONS)
+        return hashed_password.decode("base64") == pbkdbf
     
-
-
@@ -20,6 +20,7 @@ import logging
 from gettext import gettext as _
 
 from pulp.server.auth.authorization import _get_operations
+from pulp.server.auth import authorization_cache
 from pulp.server.db.model.auth import Permission, User
 from pulp.server.exceptions import (
     DuplicateResource, InvalidValue, MissingResource, PulpDataException,
@@ -62,6 +63,7 @@ class PermissionManager(object):
         # Creation
         create_me = Permission(resource=resource_uri)
         Permission.get_collection().save(create_me, safe=True)
+        authorization_cache.invalidate()
 
         # Retrieve the permission to return the SON object
         created = Permission.get_collection().find_one({'resource' : resource_uri})
@@ -97,6 +99,7 @@ class PermissionManager(object):
             raise PulpDataException(_("Update Keyword [%s] is not supported" % key))
 
         Permission.get_collection().save(found, safe=True)
+        authorization_cache.invalidate()
 
     def delete_permission(self, resource_uri):
         """
@@ -118,6 +121,7 @@ class PermissionManager(object):
             raise MissingResource(resource_uri)
 
         Permission.get_collection().remove({'resource' : resource_uri}, safe=True)
+        authorization_cache.invalidate()
 
     def grant(self, resource, login, operations):
         """
@@ -156,6 +160,7 @@ class PermissionManager(object):
             current_ops.append(o)
 
         Permission.get_collection().save(permission, safe=True)
+        authorization_cache.invalidate()
 
     def revoke(self, resource, login, operations):
         """
@@ -201,6 +206,7 @@ class PermissionManager(object):
             return
 
         Permission.get_collection().save(permission, safe=True)
+        authorization_cache.invalidate()
 
     def grant_automatic_permissions_for_resource(self, resource):
         """
@@ -273,4 +279,5 @@ class PermissionManager(object):
             else:
                 # Delete entire permission if there are no more users
                 Permission.get_collection().remove({'resource':permission['resource']}, safe=True)
+        authorization_cache.invalidate()
 
@@ -23,6 +23,7 @@ import re
 from pulp.server.util import Delta
 from pulp.server.db.model.auth import Role, User
 from pulp.server.auth.authorization import _operations_not_granted_by_roles
+from pulp.server.auth import authorization_cache
 from pulp.server.exceptions import DuplicateResource, InvalidValue, MissingResource, PulpDataException
 from pulp.server.managers import factory
 
@@ -72,6 +73,7 @@ class RoleManager(object):
         # Creation
         create_me = Role(id=role_id, display_name=display_name, description=description)
         Role.get_collection().save(create_me, safe=True)
+        authorization_cache.invalidate()
 
         # Retrieve the role to return the SON object
         created = Role.get_collection().find_one({'id' : role_id})
@@ -112,6 +114,7 @@ class RoleManager(object):
             raise PulpDataException(_("Update Keyword [%s] is not supported" % key))
         
         Role.get_collection().save(role, safe=True)
+        authorization_cache.invalidate()
          
         # Retrieve the user to return the SON object
         updated = Role.get_collection().find_one({'id' : role_id})
@@ -156,6 +159,7 @@ class RoleManager(object):
             factory.user_manager().update_user(user['login'], Delta(user, 'roles'))
       
         Role.get_collection().remove({'id' : role_id}, safe=True)
+        authorization_cache.invalidate()
 
 
     def add_permissions_to_role(self, role_id, resource, operations):
@@ -191,6 +195,7 @@ class RoleManager(object):
             factory.permission_manager().grant(resource, user['login'], operations)
             
         Role.get_collection().save(role, safe=True)
+        authorization_cache.invalidate()
 
     def remove_permissions_from_role(self, role_id, resource, operations):
         """
@@ -235,6 +240,7 @@ class RoleManager(object):
             del role['permissions'][resource]
         
         Role.get_collection().save(role, safe=True)
+        authorization_cache.invalidate()
         
     
     def add_user_to_role(self, role_id, login):
@@ -266,6 +272,7 @@ class RoleManager(object):
 
         user['roles'].append(role_id)
         User.get_collection().save(user, safe=True)
+        authorization_cache.invalidate()
         
         for resource, operations in role['permissions'].items():
             factory.permission_manager().grant(resource, login, operations)
@@ -305,6 +312,7 @@ class RoleManager(object):
         
         user['roles'].remove(role_id)
         User.get_collection().save(user, safe=True)
+        authorization_cache.invalidate()
 
         for resource, operations in role['permissions'].items():
             other_roles = factory.role_query_manager().get_other_roles(role, user['roles'])
@@ -325,6 +333,7 @@ class RoleManager(object):
             pm = factory.permission_manager()
             role['permissions'] = {'/':[pm.CREATE, pm.READ, pm.UPDATE, pm.DELETE, pm.EXECUTE]}
             Role.get_collection().save(role, safe=True)
+            authorization_cache.invalidate()
 
 # -- functions ----------------------------------------------------------------
 
@@ -22,6 +22,7 @@ import logging
 import re
 
 from pulp.server import config
+from pulp.server.auth import authorization_cache, credential_cache
 from pulp.server.db.model.auth import User
 from pulp.server.exceptions import PulpDataException, DuplicateResource, InvalidValue, MissingResource
 from pulp.server.managers import factory
@@ -87,6 +88,7 @@ class UserManager(object):
         # Creation
         create_me = User(login=login, password=hashed_password, name=name, roles=roles)
         User.get_collection().save(create_me, safe=True)
+        authorization_cache.invalidate()
         
         # Grant permissions
         permission_manager = factory.permission_manager()
@@ -155,6 +157,9 @@ class UserManager(object):
             raise InvalidValue(invalid_values)
 
         User.get_collection().save(user, safe=True)
+        authorization_cache.invalidate()
+        if 'password' in delta:
+            credential_cache.invalidate(login)
 
         # Retrieve the user to return the SON object
         updated = User.get_collection().find_one({'login' : login})
@@ -192,6 +197,8 @@ class UserManager(object):
         permission_manager.revoke_all_permissions_from_user(login)
         
         User.get_collection().remove({'login' : login}, safe=True)
+        authorization_cache.invalidate()
+        credential_cache.invalidate(login)
 
 
     def ensure_admin(self):
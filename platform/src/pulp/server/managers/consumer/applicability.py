@@ -23,10 +23,14 @@ from pulp.plugins.model import Consumer as ProfiledConsumer
 from pulp.plugins.conduits.profiler import ProfilerConduit
 from pulp.plugins.loader import api as plugin_api
 from pulp.plugins.loader import exceptions as plugin_exceptions
+from pulp.server.util import batches
 from logging import getLogger
 
 _LOG = getLogger(__name__)
 
+# number of consumers whose profiles are loaded at a time
+_BATCH_SIZE = 1000
+
 
 class ApplicabilityManager(object):
 
@@ -43,22 +47,51 @@ class ApplicabilityManager(object):
             {consumer_id:[<ApplicabilityReport>]}
         @rtype: list
         """
-        result = {}
+        return dict(self.units_applicable_iter(criteria, units))
+
+    def units_applicable_iter(self, criteria, units):
+        """
+        Detemine which of the specified content units is applicable to
+        consumers specified by the I{criteria}, one consumer at a time.
+        Profiles are loaded in batches of consumers and each profiler is
+        called once per consumer with all of the units of its types.
+        @param criteria: The consumer selection criteria.
+        @type criteria: list
+        @param units: A list of content units to be installed.
+        @type units: list of:
+            { type_id:<str>, unit_key:<dict> }
+        @return: A generator of:
+            (consumer_id, [<ApplicabilityReport>]) with a report for
+            each unit, in the same order as the units.
+        @rtype: generator
+        """
         conduit = ProfilerConduit()
+        # unit indexes grouped by type, in order of first appearance
+        unit_groups = []
+        by_type = {}
+        for index, unit in enumerate(units):
+            typeid = unit['type_id']
+            if typeid not in by_type:
+                by_type[typeid] = []
+                unit_groups.append((typeid, by_type[typeid]))
+            by_type[typeid].append(index)
+        profilers = dict([(t, self.__profiler(t)) for t, i in unit_groups])
         manager = managers.consumer_query_manager()
         ids = [c['id'] for c in manager.find_by_criteria(criteria)]
         manager = managers.consumer_profile_manager()
-        profiles = manager.find_profiles(ids)
-        for id in ids:
-            for unit in units:
-                typeid = unit['type_id']
-                profiler, cfg = self.__profiler(typeid)
-                pc = self.__profiled_consumer(id)
-                report = profiler.unit_applicable(pc, unit, cfg, conduit)
-                report.unit = unit
-                ulist = result.setdefault(id, [])
-                ulist.append(report)
-        return result
+        for batch in batches(ids, _BATCH_SIZE):
+            profiles = manager.find_profiles(batch)
+            for id in batch:
+                pc = ProfiledConsumer(id, profiles[id])
+                reports = [None] * len(units)
+                for typeid, indexes in unit_groups:
+                    profiler, cfg = profilers[typeid]
+                    typed_units = [units[i] for i in indexes]
+                    typed_reports = profiler.units_applicable(pc, typed_units, cfg, conduit)
+                    for i, report in zip(indexes, typed_reports):
+                        report.unit = units[i]
+                        reports[i] = report
+                yield id, reports
 
     def __profiler(self, typeid):
         """
@@ -75,19 +108,3 @@ class ApplicabilityManager(object):
             plugin = Profiler()
             cfg = {}
         return PluginWrapper(plugin), cfg
-
-    def __profiled_consumer(self, id):
-        """
-        Get a profiler consumer model object.
-        @param id: A consumer ID.
-        @type id: str
-        @return: A populated profiler consumer model object.
-        @rtype: L{ProfiledConsumer}
-        """
-        profiles = {}
-        manager = managers.consumer_profile_manager()
-        for p in manager.get_profiles(id):
-            typeid = p['content_type']
-            profile = p['profile']
-            profiles[typeid] = profile
-        return ProfiledConsumer(id, profiles)
@@ -19,6 +19,7 @@ from logging import getLogger
 
 from pymongo.errors import DuplicateKeyError
 
+from pulp.server import response_cache
 from pulp.server.db.model.consumer import Bind
 from pulp.server.exceptions import MissingResource
 from pulp.server.managers import factory
@@ -69,6 +70,7 @@ class BindManager(object):
         try:
             bind = Bind(consumer_id, repo_id, distributor_id)
             collection.save(bind, safe=True)
+            response_cache.invalidate(response_cache.BINDINGS)
         except DuplicateKeyError:
             self.__reset_bind(consumer_id, repo_id, distributor_id)
         # fetch the inserted/updated bind
@@ -96,6 +98,7 @@ class BindManager(object):
         query['deleted'] = True
         update = {'$set':{'deleted':False, 'consumer_actions':[]}}
         collection.update(query, update, safe=True)
+        response_cache.invalidate(response_cache.BINDINGS)
 
     def unbind(self, consumer_id, repo_id, distributor_id):
         """
@@ -135,6 +138,7 @@ class BindManager(object):
         collection = Bind.get_collection()
         query = dict(consumer_id=consumer_id)
         collection.remove(query)
+        response_cache.invalidate(response_cache.BINDINGS)
 
 # --- finders ----------------------------------------------------------------------------
 
@@ -249,6 +253,7 @@ class BindManager(object):
         collection = Bind.get_collection()
         query = self.bind_id(consumer_id, repo_id, distributor_id)
         collection.update(query, {'$set':{'deleted':True}}, safe=True)
+        response_cache.invalidate(response_cache.BINDINGS)
 
     def delete(self, consumer_id, repo_id, distributor_id, force=False):
         """
@@ -275,6 +280,7 @@ class BindManager(object):
         if not force:
             query['deleted'] = True
         collection.remove(query, safe=True)
+        response_cache.invalidate(response_cache.BINDINGS)
 
 # --- consumer actions -------------------------------------------------------------------
 
@@ -303,6 +309,7 @@ class BindManager(object):
             status=Bind.Status.PENDING)
         update = {'$push':{'consumer_actions':entry}}
         collection.update(bind_id, update, safe=True)
+        response_cache.invalidate(response_cache.BINDINGS)
 
     def action_succeeded(self, consumer_id, repo_id, distributor_id, action_id):
         """
@@ -332,6 +339,7 @@ class BindManager(object):
             {'consumer_actions':{'timestamp':{'$lt':action['timestamp']}}}
         }
         collection.update(bind_id, update, safe=True)
+        response_cache.invalidate(response_cache.BINDINGS)
 
     def action_failed(self, consumer_id, repo_id, distributor_id, action_id):
         """
@@ -350,6 +358,7 @@ class BindManager(object):
         query['consumer_actions.id'] = action_id
         update = {'$set':{'consumer_actions.$.status':Bind.Status.FAILED}}
         collection.update(query, update, safe=True)
+        response_cache.invalidate(response_cache.BINDINGS)
 
     def find_action(self, action_id):
         """
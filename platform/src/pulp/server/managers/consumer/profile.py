@@ -18,11 +18,15 @@ Contains profile management classes
 from pulp.server.exceptions import MissingResource
 from pulp.server.db.model.consumer import UnitProfile
 from pulp.server.managers import factory
+from pulp.server.util import batches
 from logging import getLogger
 
 
 _LOG = getLogger(__name__)
 
+# maximum number of consumer IDs in a single profile query
+_BATCH_SIZE = 1000
+
 
 class ProfileManager(object):
     """
@@ -122,7 +126,7 @@ class ProfileManager(object):
 
     def find_profiles(self, consumer_ids):
         """
-        Get all profiles associated with lost of consumers.
+        Get all profiles associated with a list of consumers.
         @param consumer_ids: A list of consumer IDs.
         @type consumer_ids: list
         @return: A dict of:
@@ -131,10 +135,11 @@ class ProfileManager(object):
         """
         profiles = dict([(c, {}) for c in consumer_ids])
         collection = UnitProfile.get_collection()
-        for p in collection.find({'id':{'$in':profiles.keys()}}):
-            key = p['consumer_id']
-            typeid = p['content_type']
-            profile = p['profile']
-            entry = profiles[key]
-            entry[typeid] = profile
+        for ids in batches(profiles.keys(), _BATCH_SIZE):
+            for p in collection.find({'consumer_id':{'$in':ids}}):
+                key = p['consumer_id']
+                typeid = p['content_type']
+                profile = p['profile']
+                entry = profiles[key]
+                entry[typeid] = profile
         return profiles
\ No newline at end of file
@@ -42,6 +42,30 @@ class ContentManager(object):
         collection.insert(unit_doc, safe=True)
         return unit_id
 
+    def add_content_units(self, content_type, units_metadata):
+        """
+        Add multiple content units and their metadata to the corresponding pulp
+        db collection using batched inserts. Ids are generated for all of the
+        units.
+        @param content_type: unique id of content collection
+        @type content_type: str
+        @param units_metadata: content unit metadata for each unit to add
+        @type units_metadata: list of dict's
+        @return: list of generated unit ids, in the same order as units_metadata
+        @rtype: list of str's
+        """
+        collection = content_types_db.type_units_collection(content_type)
+        unit_ids = []
+        unit_docs = []
+        for unit_metadata in units_metadata:
+            unit_id = str(uuid.uuid4())
+            unit_doc = {'_id': unit_id, '_content_type_id': content_type}
+            unit_doc.update(unit_metadata)
+            unit_ids.append(unit_id)
+            unit_docs.append(unit_doc)
+        collection.insert_batch(unit_docs, safe=True)
+        return unit_ids
+
     def update_content_unit(self, content_type, unit_id, unit_metadata_delta):
         """
         Update a content unit's stored metadata.
@@ -13,21 +13,87 @@
 
 import logging
 import os
+import Queue
 import re
 import shutil
+import threading
 from gettext import gettext as _
 
+import pymongo
+
 from pulp.server import config as pulp_config
 from pulp.plugins.types import database as content_types_db
 from pulp.server import exceptions as pulp_exceptions
 from pulp.server.db.model.repository import RepoContentUnit
+from pulp.server.dispatch import factory as dispatch_factory
 from pulp.server.managers import factory as manager_factory
+from pulp.server.managers.content import query as content_query
 
 
 _LOG = logging.getLogger(__name__)
 
+# number of content units checked for associations, and deleted, at a time;
+# bounds both the memory used and the size of the queries sent to the database
+ORPHAN_BATCH_SIZE = 1000
+
+# maximum number of threads removing orphaned files from disk at the same time
+ORPHAN_FILE_DELETE_THREADS = 4
+
+# unit fields holding the paths of the files to delete along with the unit
+_STORAGE_PATH_FIELDS = ['_storage_path', '_legacy_storage_paths']
+
 
 class OrphanManager(object):
+    """
+    Finds and deletes orphaned content units, i.e. units that are not
+    associated with any repository.
+
+    Orphans are found by walking the units of a type in _id order, a batch at
+    a time, and looking up which of the batch's units are associated with a
+    repository (an anti-join against the repo content units, using their
+    (unit_type_id, unit_id) index). Memory use is bounded by the batch size
+    regardless of the number of units.
+    """
+
+    def generate_all_orphans(self, fields=None):
+        """
+        Generate all content units that are not associated with a repository.
+        @param fields: unit fields to retrieve, None for all of them
+        @type  fields: list or None
+        @return: generator of content units
+        @rtype:  generator
+        """
+        content_query_manager = manager_factory.content_query_manager()
+        content_types = content_query_manager.list_content_types()
+        for content_type in content_types:
+            for orphan in self.generate_orphans_by_type(content_type, fields):
+                yield orphan
+
+    def generate_orphans_by_type(self, content_type, fields=None):
+        """
+        Generate the content units of a given type that are not associated
+        with a repository, in _id order. Units can safely be deleted while
+        the generator is being consumed.
+        @param content_type: content type of orphaned units
+        @type  content_type: str
+        @param fields: unit fields to retrieve, None for all of them
+        @type  fields: list or None
+        @return: generator of content units of the given type
+        @rtype:  generator
+        """
+        units_collection = content_types_db.type_units_collection(content_type)
+        spec = {}
+        while True:
+            cursor = units_collection.find(spec, fields=fields)
+            units = list(cursor.sort('_id', pymongo.ASCENDING).limit(ORPHAN_BATCH_SIZE))
+            if not units:
+                return
+            unit_ids = [u['_id'] for u in units]
+            associated_unit_ids = self._associated_unit_ids(content_type, unit_ids)
+            for unit in units:
+                if unit['_id'] not in associated_unit_ids:
+                    yield unit
+            spec = {'_id': {'$gt': unit_ids[-1]}}
 
     def list_all_orphans(self):
         """
@@ -35,15 +101,7 @@ class OrphanManager(object):
         @return: list of content units
         @rtype:  list
         """
-
-        # iterate through all types and get the orphaned units for each
-        orphaned_units = []
-        content_query_manager = manager_factory.content_query_manager()
-        content_types = content_query_manager.list_content_types()
-        for content_type in content_types:
-            orphaned_units_of_type = self.list_orphans_by_type(content_type)
-            orphaned_units.extend(orphaned_units_of_type)
-        return orphaned_units
+        return list(self.generate_all_orphans())
 
     def list_orphans_by_type(self, content_type):
         """
@@ -53,17 +111,7 @@ class OrphanManager(object):
         @return: list of content units of the given type
         @rtype:  list
         """
-
-        # find units of this type that are associated with one or more repositories
-        associated_collection = RepoContentUnit.get_collection()
-        associated_units = associated_collection.find({'unit_type_id': content_type}, fields=['unit_id'])
-        associated_unit_ids = set(d['unit_id'] for d in associated_units)
-
-        # find units that are not associated with any repositories
-        units_collection = content_types_db.type_units_collection(content_type)
-        spec = {'_id': {'$nin': list(associated_unit_ids)}}
-        orphaned_units = units_collection.find(spec)
-        return list(orphaned_units)
+        return list(self.generate_orphans_by_type(content_type))
 
     def get_orphan(self, content_type, content_id):
         """
@@ -73,48 +121,71 @@ class OrphanManager(object):
         @param content_id: content id of the orphan
         @type  content_id: str
         """
-        orphans = self.list_orphans_by_type(content_type)
-        for orphan in orphans:
-            if content_id != orphan['_id']:
-                continue
-            return orphan
-        raise pulp_exceptions.MissingResource(content_type=content_type, content_id=content_id)
+        units_collection = content_types_db.type_units_collection(content_type)
+        orphan = units_collection.find_one({'_id': content_id})
+        if orphan is None or self._associated_unit_ids(content_type, [content_id]):
+            raise pulp_exceptions.MissingResource(content_type=content_type, content_id=content_id)
+        return orphan
 
     def delete_all_orphans(self):
         """
         Delete all orphaned content units.
+        @return: number of orphaned content units deleted, by content type
+        @rtype:  dict
         """
 
         # iterate through the types and delete all orphans of each type
         content_query_manager = manager_factory.content_query_manager()
         content_types = content_query_manager.list_content_types()
+        progress = {}
         for content_type in content_types:
-            self.delete_orphans_by_type(content_type)
+            self.delete_orphans_by_type(content_type, progress)
+        return progress
 
-    def delete_orphans_by_type(self, content_type):
+    def delete_orphans_by_type(self, content_type, progress=None):
         """
         Delete all orphaned content units of the given content type.
+
+        The orphans are deleted a batch at a time. After each batch, the
+        number of units deleted so far is reported as the progress of the
+        task running the deletion, if any.
+
         @param content_type: content type of the orphans to delete
         @type  content_type: str
+        @param progress: number of units deleted so far by content type; it
+                         is updated and reported as progress
+        @type  progress: dict or None
+        @return: number of orphaned content units deleted
+        @rtype:  int
         """
+        if progress is None:
+            progress = {}
+        progress.setdefault(content_type, 0)
 
-        orphaned_units = self.list_orphans_by_type(content_type)
-        if not orphaned_units:
-            return
-        collection = content_types_db.type_units_collection(content_type)
-        spec = {'_id': {'$in': [o['_id'] for o in orphaned_units]}}
-        collection.remove(spec, safe=True)
-        orphaned_paths = [o['_storage_path'] for o in orphaned_units if o['_storage_path'] is not None]
-        for path in orphaned_paths:
-            self.delete_orphaned_file(path)
+        batch = []
+        for orphan in self.generate_orphans_by_type(content_type, fields=_STORAGE_PATH_FIELDS):
+            batch.append(orphan)
+            if len(batch) < ORPHAN_BATCH_SIZE:
+                continue
+            progress[content_type] += self._delete_orphan_batch(content_type, batch)
+            _report_progress(progress)
+            batch = []
+
+        if batch:
+            progress[content_type] += self._delete_orphan_batch(content_type, batch)
+            _report_progress(progress)
+
+        return progress[content_type]
 
     def delete_orphans_by_id(self, orphans):
         """
         Delete a list of orphaned content units by their content type and unit ids.
+        Units that have been associated with a repository are not deleted.
         @param orphans: list of documents with 'content_type' and 'content_id' keys
         @type  orphans: list
+        @return: number of orphaned content units deleted
+        @rtype:  int
         """
-        # XXX this does no validation of the orphans
 
         # munge the orphans into something more programmatic-ly convenient
         orphans_by_id = {}
@@ -124,25 +195,97 @@ class OrphanManager(object):
             id_list = orphans_by_id.setdefault(o['content_type_id'], [])
             id_list.append(o['unit_id'])
 
-        # iterate through the types and ids
-        content_query_manager = manager_factory.content_query_manager()
+        # iterate through the types and batches of ids
+        deleted = 0
         for content_type, content_id_list in orphans_by_id.items():
+            collection = content_types_db.type_units_collection(content_type)
+            for i in range(0, len(content_id_list), ORPHAN_BATCH_SIZE):
+                id_batch = content_id_list[i:i + ORPHAN_BATCH_SIZE]
+                spec = {'_id': {'$in': id_batch}}
+                content_units = list(collection.find(spec, fields=_STORAGE_PATH_FIELDS))
+                missing_ids = set(id_batch).difference(u['_id'] for u in content_units)
+                if missing_ids:
+                    raise pulp_exceptions.MissingResource(content_type=content_type, content_id=missing_ids.pop())
+                deleted += self._delete_orphan_batch(content_type, content_units)
+        return deleted
 
-            # build a list of the on-disk contents
-            orphaned_paths = []
-            for unit_id in content_id_list:
-                content_unit = content_query_manager.get_content_unit_by_id(content_type, unit_id, model_fields=['_storage_path'])
-                if content_unit['_storage_path'] is not None:
-                    orphaned_paths.append(content_unit['_storage_path'])
+    def _associated_unit_ids(self, content_type, unit_ids):
+        """
+        Find which of the given content units are associated with a repository.
+        @param content_type: content type of the units
+        @type  content_type: str
+        @param unit_ids: ids of the units to check
+        @type  unit_ids: list
+        @return: ids of the units associated with one or more repositories
+        @rtype:  set
+        """
+        associated_collection = RepoContentUnit.get_collection()
+        spec = {'unit_type_id': content_type, 'unit_id': {'$in': unit_ids}}
+        associated_units = associated_collection.find(spec, fields=['unit_id'])
+        return set(d['unit_id'] for d in associated_units)
 
-            # remove the orphans from the db
-            collection = content_types_db.type_units_collection(content_type)
-            spec = {'_id': {'$in': content_id_list}}
-            collection.remove(spec, safe=True)
+    def _delete_orphan_batch(self, content_type, orphans):
+        """
+        Delete a batch of orphaned content units from the database, then
+        their files from disk. Units associated with a repository since they
+        were found to be orphans are skipped.
+        @param content_type: content type of the orphans
+        @type  content_type: str
+        @param orphans: orphaned units, with their _storage_path and
+                        _legacy_storage_paths
+        @type  orphans: list of dict
+        @return: number of units deleted
+        @rtype:  int
+        """
+        associated_unit_ids = self._associated_unit_ids(content_type, [o['_id'] for o in orphans])
+        orphans = [o for o in orphans if o['_id'] not in associated_unit_ids]
+        if not orphans:
+            return 0
+
+        collection = content_types_db.type_units_collection(content_type)
+        spec = {'_id': {'$in': [o['_id'] for o in orphans]}}
+        collection.remove(spec, safe=True)
+
+        orphaned_paths = []
+        for orphan in orphans:
+            if orphan.get('_storage_path') is not None:
+                orphaned_paths.append(orphan['_storage_path'])
+            # links left at former paths when the storage layout was changed
+            orphaned_paths.extend(orphan.get('_legacy_storage_paths', ()))
+        self.delete_orphaned_files(orphaned_paths)
+        return len(orphans)
 
-            # delete the on-disk contents
-            for path in orphaned_paths:
-                self.delete_orphaned_file(path)
+    def delete_orphaned_files(self, paths):
+        """
+        Delete orphaned files, in parallel. Errors are logged and do not stop
+        the deletion of the other files.
+        @param paths: absolute paths to the files to delete
+        @type  paths: list of str
+        """
+        path_queue = Queue.Queue()
+        for path in paths:
+            path_queue.put(path)
+
+        def _delete_files():
+            while True:
+                try:
+                    path = path_queue.get_nowait()
+                except Queue.Empty:
+                    return
+                try:
+                    self.delete_orphaned_file(path)
+                except Exception:
+                    _LOG.exception(_('Error deleting orphaned file: %(p)s') % {'p': path})
+
+        thread_count = min(ORPHAN_FILE_DELETE_THREADS, len(paths))
+        if thread_count <= 1:
+            _delete_files()
+            return
+        threads = [threading.Thread(target=_delete_files) for i in range(thread_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
 
     def delete_orphaned_file(self, path):
         """
@@ -166,6 +309,7 @@ class OrphanManager(object):
             os.unlink(path)
         elif os.path.isdir(path):
             shutil.rmtree(path)
+            content_query.forget_content_dir(path)
 
         # delete parent directories on the path as long as they fall empty
         storage_dir = pulp_config.config.get('server', 'storage_dir')
@@ -174,10 +318,25 @@ class OrphanManager(object):
             path = os.path.dirname(path)
             if root_content_regex.match(path):
                 break
-            contents = os.listdir(path)
-            if contents:
-                break
-            if not os.access(path, os.W_OK):
+            # another thread deleting a file in the same directory may have
+            # removed it, or added to it, concurrently
+            try:
+                contents = os.listdir(path)
+                if contents:
+                    break
+                if not os.access(path, os.W_OK):
+                    break
+                os.rmdir(path)
+                content_query.forget_content_dir(path)
+            except OSError:
                 break
-            os.rmdir(path)
 
+# -- utilities ----------------------------------------------------------------
+
+def _report_progress(progress):
+    """
+    Report the number of orphans deleted so far by content type as the
+    progress of the current task; does nothing outside of a task.
+    """
+    context = dispatch_factory.context()
+    context.report_progress(dict(progress))
@@ -11,6 +11,8 @@
 # have received a copy of GPLv2 along with this software; if not, see
 # http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
 
+import errno
+import hashlib
 import os
 from gettext import gettext as _
 from pprint import pformat
@@ -18,6 +20,19 @@ from pprint import pformat
 from pulp.server import config as pulp_config
 from pulp.plugins.types import database as content_types_db
 from pulp.server.exceptions import InvalidValue, MissingResource
+from pulp.server.util import batches
+
+# Maximum number of keys dictionaries in a single $or query
+_BATCH_SIZE = 1000
+
+# Content units are stored at <storage_dir>/content/<type>/<relative path>;
+# the sharded layout adds two levels of directories, taken from a hash of the
+# relative path, so no directory grows too large
+STORAGE_LAYOUT_FLAT = 'flat'
+STORAGE_LAYOUT_SHARDED = 'sharded'
+
+# Maximum number of directories remembered as existing
+_KNOWN_DIRS_MAX = 100000
 
 class ContentQueryManager(object):
     """
@@ -245,6 +260,36 @@ class ContentQueryManager(object):
         ids = tuple(d.pop('_id') for d in dicts)
         return (ids, dicts)
 
+    def get_content_unit_ids_by_keys_dicts(self, content_type, unit_keys_dicts):
+        """
+        Look up the ids of the content units that exactly match each of the
+        given unique keys dictionaries. Units are found with a single $or query
+        per batch of keys dictionaries rather than one query per unit.
+        @param content_type: unique id of content collection
+        @type content_type: str
+        @param unit_keys_dicts: list of keys dictionaries that uniquely identify
+                                content units in the given content type collection
+        @type unit_keys_dicts: list of dict's
+        @return: list of the same length as unit_keys_dicts; each entry is the
+                 id of the matching content unit or None if there isn't one
+        @rtype: list of str's and None's
+        @raise ValueError if any of the keys dictionaries are invalid
+        """
+        key_fields = _validate_keys_dicts(content_type, unit_keys_dicts)
+        collection = content_types_db.type_units_collection(content_type)
+        fields = ['_id']
+        fields.extend(key_fields)
+
+        def _key_values(d):
+            return tuple(d.get(k) for k in key_fields)
+
+        ids_by_key = {}
+        for keys_dicts_batch in batches(unit_keys_dicts, _BATCH_SIZE):
+            cursor = collection.find({'$or': keys_dicts_batch}, fields=fields)
+            for unit in cursor:
+                ids_by_key[_key_values(unit)] = unit['_id']
+        return [ids_by_key.get(_key_values(d)) for d in unit_keys_dicts]
+
     def get_root_content_dir(self, content_type):
         """
         Get the full path to Pulp's root conent directory for a given content
@@ -254,15 +299,15 @@ class ContentQueryManager(object):
         @return: file system path for content type's root directory
         @rtype: str
         """
-        # I'm partitioning the content on the file system based on content type
-        storage_dir = pulp_config.config.get('server', 'storage_dir')
-        root = os.path.join(storage_dir, 'content', content_type)
-        if not os.path.exists(root):
-            os.makedirs(root)
+        root = _root_content_dir(content_type)
+        _make_dirs(root)
         return root
 
-    def request_content_unit_file_path(self, content_type, relative_path):
+    def content_unit_file_path(self, content_type, relative_path):
         """
+        Get the full path at which a content unit with the given relative path
+        is stored, according to the configured storage layout, without
+        touching the file system.
         @param content_type: unique id of content collection
         @type content_type: str
         @param relative_path: on disk path of a content unit relative to the
@@ -271,18 +316,81 @@ class ContentQueryManager(object):
         @return: full file system path for given relative path
         @rtype: str
         """
-
         # Strip off the leading / if it exists; the importer may be sloppy and
         # hand it in and its presence breaks makedirs
         if relative_path.startswith('/'):
             relative_path = relative_path[1:]
 
-        unit_path = os.path.join(self.get_root_content_dir(content_type), relative_path)
-        unit_dir = os.path.dirname(unit_path)
-        if not os.path.exists(unit_dir):
-            os.makedirs(unit_dir)
+        root = _root_content_dir(content_type)
+        if pulp_config.config.get('server', 'storage_layout') == STORAGE_LAYOUT_SHARDED:
+            return os.path.join(root, _shard(relative_path), relative_path)
+        return os.path.join(root, relative_path)
+
+    def request_content_unit_file_path(self, content_type, relative_path):
+        """
+        @param content_type: unique id of content collection
+        @type content_type: str
+        @param relative_path: on disk path of a content unit relative to the
+                              root directory for the given content type
+        @type relative_path: str
+        @return: full file system path for given relative path
+        @rtype: str
+        """
+        unit_path = self.content_unit_file_path(content_type, relative_path)
+        _make_dirs(os.path.dirname(unit_path))
         return unit_path
 
+    def request_content_unit_file_paths(self, content_type, relative_paths):
+        """
+        Batch version of request_content_unit_file_path; each parent directory
+        is only checked, and created, once.
+        @param content_type: unique id of content collection
+        @type content_type: str
+        @param relative_paths: on disk paths of content units relative to the
+                               root directory for the given content type
+        @type relative_paths: list of str
+        @return: full file system paths, in the order of the relative paths
+        @rtype: list of str
+        """
+        unit_paths = [self.content_unit_file_path(content_type, p) for p in relative_paths]
+        for unit_dir in set(os.path.dirname(p) for p in unit_paths):
+            _make_dirs(unit_dir)
+        return unit_paths
+
+    def relink_content_units(self, content_type):
+        """
+        Hard link the files of the content units of the given type that are
+        not stored at the path given by the configured storage layout to that
+        path, and point the units at their new path. The old links are left in
+        place as published repositories may refer to them; they are recorded
+        in the units' _legacy_storage_paths, so that the orphan manager deletes
+        them along with the units. Units stored as directories, and units
+        whose files are missing, are left where they are.
+        @param content_type: unique id of content collection
+        @type content_type: str
+        @return: number of units relinked
+        @rtype: int
+        """
+        root = _root_content_dir(content_type) + '/'
+        collection = content_types_db.type_units_collection(content_type)
+        relinked = 0
+        for unit in collection.find({'_storage_path': {'$ne': None}}, fields=['_storage_path']):
+            old_path = unit['_storage_path']
+            if not old_path.startswith(root) or not os.path.isfile(old_path):
+                continue
+            new_path = self.content_unit_file_path(content_type, old_path[len(root):])
+            if new_path == old_path:
+                continue
+            _make_dirs(os.path.dirname(new_path))
+            if not os.path.exists(new_path):
+                os.link(old_path, new_path)
+            collection.update({'_id': unit['_id']},
+                              {'$set': {'_storage_path': new_path},
+                               '$addToSet': {'_legacy_storage_paths': old_path}},
+                              safe=True)
+            relinked += 1
+        return relinked
+
 # utility methods --------------------------------------------------------------
 
 def _flatten_keys(flat_keys, nested_keys):
@@ -330,6 +438,31 @@ def _build_multi_keys_spec(content_type, unit_keys_dicts):
     # explain when the spec will fail to find a document for an arbitrary keys
     # dict.
 
+    key_fields = _validate_keys_dicts(content_type, unit_keys_dicts)
+    # spec document valid keys and valid values, used as template to generate
+    # actual spec document for mongo db queries
+    spec_template = dict([(f, set()) for f in key_fields])
+    for keys_dict in unit_keys_dicts:
+        # validation passed, store the keys and values in the template
+        for k, v in keys_dict.items():
+            spec_template[k].add(v)
+    spec = dict([(k, {'$in': list(v)}) for k, v in spec_template.items()])
+    return spec
+
+
+def _validate_keys_dicts(content_type, unit_keys_dicts):
+    """
+    Validate that each of the given key dictionaries contains exactly the
+    unique fields of the given content type collection.
+    @param content_type: unique id of the content type collection
+    @type content_type: str
+    @param unit_keys_dicts: list of key dictionaries to validate
+    @type unit_keys_dicts: list of dict's
+    @return: flattened list of the unique fields for the content type
+    @rtype: list of str's
+    @raise: ValueError if any of the key dictionaries do not match the unique
+            fields of the collection
+    """
     # keys dicts validation constants
     key_fields = []
     _flatten_keys(key_fields, content_types_db.type_units_unit_key(content_type))
@@ -337,11 +470,7 @@ def _build_multi_keys_spec(content_type, unit_keys_dicts):
     extra_keys_msg = _('keys dictionary found with superfluous keys %(a)s, valid keys are %(b)s')
     missing_keys_msg = _('keys dictionary missing keys %(a)s, required keys are %(b)s')
     keys_errors = []
-    # spec document valid keys and valid values, used as template to generate
-    # actual spec document for mongo db queries
-    spec_template = dict([(f, set()) for f in key_fields])
     for keys_dict in unit_keys_dicts:
-        # keys dict validation
         keys_dict_set = set(keys_dict)
         extra_keys = keys_dict_set.difference(key_fields_set)
         if extra_keys:
@@ -349,13 +478,54 @@ def _build_multi_keys_spec(content_type, unit_keys_dicts):
         missing_keys = key_fields_set.difference(keys_dict_set)
         if missing_keys:
             keys_errors.append(missing_keys_msg % {'a': ','.join(missing_keys), 'b': ','.join(key_fields)})
-        if extra_keys or missing_keys:
-            continue
-        # validation passed, store the keys and values in the template
-        for k, v in keys_dict.items():
-            spec_template[k].add(v)
     if keys_errors:
         value_error_msg = '\n'.join(keys_errors)
         raise ValueError(value_error_msg)
-    spec = dict([(k, {'$in': list(v)}) for k, v in spec_template.items()])
-    return spec
+    return key_fields
+
+
+def _root_content_dir(content_type):
+    # I'm partitioning the content on the file system based on content type
+    storage_dir = pulp_config.config.get('server', 'storage_dir')
+    return os.path.join(storage_dir, 'content', content_type)
+
+
+def _shard(relative_path):
+    """
+    @return: the two shard directories for the given relative path
+    @rtype:  str
+    """
+    if isinstance(relative_path, unicode):
+        relative_path = relative_path.encode('utf-8')
+    digest = hashlib.sha1(relative_path).hexdigest()
+    return os.path.join(digest[0:2], digest[2:4])
+
+# Directories known to exist, so they are not checked for again on every unit
+_known_dirs = set()
+
+
+def _make_dirs(path):
+    """
+    Create the given directory, and its parents, unless it is known to exist.
+    """
+    if path in _known_dirs:
+        return
+    try:
+        os.makedirs(path)
+    except OSError, e:
+        # created by someone else in the meantime
+        if e.errno != errno.EEXIST:
+            raise
+    if len(_known_dirs) >= _KNOWN_DIRS_MAX:
+        _known_dirs.clear()
+    _known_dirs.add(path)
+
+
+def forget_content_dir(path):
+    """
+    Remove a directory from the directories known to exist; call this when
+    deleting a directory under the content root.
+    @param path: absolute path of the deleted directory
+    @type  path: str
+    """
+    _known_dirs.discard(path)
@@ -11,16 +11,22 @@
 # have received a copy of GPLv2 along with this software; if not, see
 # http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
 
+import hashlib
 import logging
 import os
 import sys
+import threading
+from cStringIO import StringIO
+from datetime import datetime
 from uuid import uuid4
 
+from pulp.common import dateutils
 from pulp.plugins.conduits.upload import UploadConduit
 from pulp.plugins.loader import api as plugin_api
 from pulp.plugins.loader import exceptions as plugin_exceptions
 from pulp.plugins.config import PluginCallConfiguration
 from pulp.server import config as pulp_config
+from pulp.server.db.model.content import ContentUploadSession
 from pulp.server.db.model.repository import RepoContentUnit
 from pulp.server.exceptions import PulpDataException, MissingResource, PulpExecutionException, PulpException
 import pulp.server.managers.factory as manager_factory
@@ -30,13 +36,16 @@ import pulp.server.managers.repo._common as repo_common_utils
 
 _LOG = logging.getLogger(__name__)
 
+# size of the blocks copied from a request body to an upload file
+STREAM_BLOCK_SIZE = 65536
+
 # -- manager ------------------------------------------------------------------
 
 class ContentUploadManager(object):
 
     # -- uploading bits functionality -----------------------------------------
 
-    def initialize_upload(self):
+    def initialize_upload(self, size=None):
         """
         Informs the Pulp server that a new file is about to be uploaded, allowing
         it to do any preparation it needs to do to store or track the upload.
@@ -44,15 +53,15 @@ class ContentUploadManager(object):
         The ID returned from this call is used to track this specific uploaded
         file for the remainder of its life.
 
+        @param size: size of the file that will be uploaded, if known; the
+                     file is allocated up front so segments can be written
+                     at any offset without growing it
+        @type  size: int or None
+
         @return: unique ID to refer to this upload request in the future
         @rtype:  str
         """
 
-        # Eventually I can see this method keeping track of uploads in the
-        # database so a user can later query the server to find incomplete
-        # uploaded files, stats on usage of existing uploaded files, and a
-        # way to know which should be deleted to clean up.
-
         upload_id = str(uuid4())
 
         # Initialize the file, the main benefit being that if the server cannot
@@ -60,8 +69,14 @@ class ContentUploadManager(object):
         # before attempting to write bits.
         file_path = self._upload_file_path(upload_id)
         f = open(file_path, 'w')
+        if size:
+            f.truncate(size)
         f.close()
 
+        # Track the upload so stale uploads can be found and cleaned up
+        session = ContentUploadSession(upload_id, size, _now())
+        ContentUploadSession.get_collection().save(session, safe=True)
+
         return upload_id
 
     def save_data(self, upload_id, offset, data):
@@ -80,6 +95,32 @@ class ContentUploadManager(object):
         @param data: content to write to the file
         @type  data: str
         """
+        self.save_data_stream(upload_id, offset, StringIO(data), len(data))
+
+    def save_data_stream(self, upload_id, offset, stream, length):
+        """
+        Saves bits read from a stream, such as a request body, into the given
+        upload request starting at an offset value. The bits are copied in
+        blocks and never held in memory all at once.
+
+        Segments that arrive in order are added to the upload's running
+        checksum as they are written, see upload_checksum.
+
+        @param upload_id: upload request ID
+        @type  upload_id: str
+
+        @param offset: area in the uploaded file to start writing at
+        @type  offset: int
+
+        @param stream: file-like object to read the content from
+        @type  stream: file
+
+        @param length: number of bytes to read from the stream
+        @type  length: int
+
+        @return: number of bytes written
+        @rtype:  int
+        """
 
         file_path = self._upload_file_path(upload_id)
 
@@ -87,10 +128,98 @@ class ContentUploadManager(object):
         if not os.path.exists(file_path):
             raise MissingResource(upload_request=upload_id)
 
-        f = open(file_path, 'r+')
-        f.seek(offset)
-        f.write(data)
-        f.close()
+        hasher = _RUNNING_CHECKSUMS.claim(upload_id, offset)
+        written = 0
+
+        try:
+            f = open(file_path, 'r+b')
+            try:
+                f.seek(offset)
+                while written < length:
+                    block = stream.read(min(STREAM_BLOCK_SIZE, length - written))
+                    if not block:
+                        break
+                    f.write(block)
+                    if hasher is not None:
+                        hasher.update(block)
+                    written += len(block)
+            finally:
+                f.close()
+        finally:
+            _RUNNING_CHECKSUMS.written(upload_id, offset, offset + written, hasher is not None, file_path)
+
+        spec = {'upload_id' : upload_id}
+        update = {'$set' : {'last_activity' : _now()}}
+        if written:
+            update['$push'] = {'received' : [offset, offset + written]}
+        ContentUploadSession.get_collection().update(spec, update, safe=True)
+
+        return written
+
+    def upload_checksum(self, upload_id):
+        """
+        Returns the SHA-256 checksum of the uploaded file. Only the parts of
+        the file that were not added to the running checksum as they were
+        uploaded (for instance because they arrived out of order, or before
+        the server was restarted) are read from disk.
+
+        @param upload_id: upload request ID
+        @type  upload_id: str
+
+        @return: hex digest of the SHA-256 of the file
+        @rtype:  str
+
+        @raise MissingResource: if the upload does not exist
+        """
+        file_path = self._upload_file_path(upload_id)
+        if not os.path.exists(file_path):
+            raise MissingResource(upload_request=upload_id)
+
+        hasher, offset = _RUNNING_CHECKSUMS.snapshot(upload_id)
+
+        f = open(file_path, 'rb')
+        try:
+            f.seek(offset)
+            _hash_file(hasher, f, None)
+        finally:
+            f.close()
+
+        return hasher.hexdigest()
+
+    def upload_status(self, upload_id):
+        """
+        Returns the state of the given upload request.
+
+        @param upload_id: upload request ID
+        @type  upload_id: str
+
+        @return: dict of upload_id, size (None if unknown), received (list of
+                 merged [start, end) ranges received so far), received_bytes,
+                 created and last_activity (UTC datetimes)
+        @rtype:  dict
+
+        @raise MissingResource: if the upload does not exist
+        """
+        file_path = self._upload_file_path(upload_id)
+        if not os.path.exists(file_path):
+            raise MissingResource(upload_request=upload_id)
+
+        session = ContentUploadSession.get_collection().find_one({'upload_id' : upload_id})
+        if session is None:
+            # Uploads initialized before sessions were tracked
+            mtime = _from_timestamp(os.path.getmtime(file_path))
+            file_size = os.path.getsize(file_path)
+            session = {'size' : None, 'received' : file_size and [[0, file_size]] or [],
+                       'created' : mtime, 'last_activity' : mtime}
+
+        received = _merge_ranges(session['received'])
+        status = {'upload_id' : upload_id,
+                  'size' : session['size'],
+                  'received' : received,
+                  'received_bytes' : sum([e - s for s, e in received]),
+                  'created' : session['created'],
+                  'last_activity' : session['last_activity']}
+        return status
 
     def delete_upload(self, upload_id):
         """
@@ -106,6 +235,44 @@ class ContentUploadManager(object):
         if os.path.exists(file_path):
             os.remove(file_path)
 
+        ContentUploadSession.get_collection().remove({'upload_id' : upload_id}, safe=True)
+        _RUNNING_CHECKSUMS.discard(upload_id)
+
+    def delete_stale_uploads(self, inactive_since):
+        """
+        Deletes the upload requests that have not received any data since
+        the given time.
+
+        @param inactive_since: UTC time; uploads without any activity after
+                               it are deleted
+        @type  inactive_since: datetime.datetime
+
+        @return: IDs of the deleted uploads
+        @rtype:  list
+        """
+        collection = ContentUploadSession.get_collection()
+        active = set([s['upload_id'] for s in
+                      collection.find({'last_activity' : {'$gt' : inactive_since}}, fields=['upload_id'])])
+        tracked = set([s['upload_id'] for s in collection.find(fields=['upload_id'])])
+
+        deleted = []
+        for upload_id in self.list_upload_ids():
+            if upload_id in active:
+                continue
+            if upload_id not in tracked:
+                # Uploads initialized before sessions were tracked
+                last_modified = _from_timestamp(os.path.getmtime(self._upload_file_path(upload_id)))
+                if last_modified > _naive_utc(inactive_since):
+                    continue
+            _LOG.info('Deleting stale upload [%s]' % upload_id)
+            self.delete_upload(upload_id)
+            deleted.append(upload_id)
+
+        # Sessions whose file is already gone
+        collection.remove({'last_activity' : {'$lte' : inactive_since}}, safe=True)
+
+        return deleted
+
     def read_upload(self, upload_id):
         """
         Utility method for reading and returning the contents of an upload
@@ -114,7 +281,7 @@ class ContentUploadManager(object):
         segmented files per upload.
 
         This call is meant for testing purposes only and shouldn't be used
-        for large files.
+        for large files; see open_upload and iter_upload.
 
         @param upload_id: upload request ID
         @type  upload_id: str
@@ -130,6 +297,49 @@ class ContentUploadManager(object):
 
         return contents
 
+    def open_upload(self, upload_id):
+        """
+        Opens the contents of an upload request for reading. The caller is
+        responsible for closing the returned file.
+
+        @param upload_id: upload request ID
+        @type  upload_id: str
+
+        @return: file opened for reading in binary mode
+        @rtype:  file
+
+        @raise MissingResource: if the upload does not exist
+        """
+        file_path = self._upload_file_path(upload_id)
+        if not os.path.exists(file_path):
+            raise MissingResource(upload_request=upload_id)
+        return open(file_path, 'rb')
+
+    def iter_upload(self, upload_id, block_size=STREAM_BLOCK_SIZE):
+        """
+        Generates the contents of an upload request in blocks, without
+        loading the whole file in memory.
+
+        @param upload_id: upload request ID
+        @type  upload_id: str
+
+        @param block_size: maximum size of the generated blocks
+        @type  block_size: int
+
+        @return: generator of str
+
+        @raise MissingResource: if the upload does not exist
+        """
+        f = self.open_upload(upload_id)
+        try:
+            while True:
+                block = f.read(block_size)
+                if not block:
+                    break
+                yield block
+        finally:
+            f.close()
+
     def list_upload_ids(self):
         """
         Returns a list of IDs for all in progress uploads.
@@ -214,7 +424,8 @@ class ContentUploadManager(object):
             raise MissingResource(repo_id), None, sys.exc_info()[2]
 
         # Assemble the data needed for the import
-        conduit = UploadConduit(repo_id, repo_importer['id'], RepoContentUnit.OWNER_TYPE_USER, manager_factory.principal_manager().get_principal()['login'])
+        conduit = UploadConduit(repo_id, repo_importer['id'], RepoContentUnit.OWNER_TYPE_USER,
+                                manager_factory.principal_manager().get_principal()['login'], upload_id)
 
         call_config = PluginCallConfiguration(plugin_config, repo_importer['config'], None)
         transfer_repo = repo_common_utils.to_transfer_repo(repo)
@@ -261,3 +472,155 @@ class ContentUploadManager(object):
         storage_dir = pulp_config.config.get('server', 'storage_dir')
         upload_storage_dir = os.path.join(storage_dir, 'uploads')
         return upload_storage_dir
+
+# -- running checksums --------------------------------------------------------
+
+class _RunningChecksum(object):
+
+    def __init__(self):
+        self.hasher = hashlib.sha256()
+        self.offset = 0 # end of the part of the file that has been hashed
+        self.busy = False # a segment is being hashed
+        self.pending = {} # start -> end of segments written past offset
+
+
+class _RunningChecksums(object):
+    """
+    SHA-256 checksums of the uploads being received by this process, updated
+    as their bits are written so the file doesn't need to be read again when
+    it is imported.
+
+    The segment starting where the checksum stops is hashed while it is
+    written. Segments arriving out of order are hashed, by reading them back
+    from disk, once the gap before them has been filled.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checksums = {}
+
+    def claim(self, upload_id, offset):
+        """
+        @return: the hasher to update with the segment's bits, if the segment
+                 is next in the checksum; None otherwise
+        """
+        self._lock.acquire()
+        try:
+            checksum = self._checksums.setdefault(upload_id, _RunningChecksum())
+            if checksum.busy or checksum.offset != offset:
+                return None
+            checksum.busy = True
+            return checksum.hasher
+        finally:
+            self._lock.release()
+
+    def written(self, upload_id, start, end, claimed, file_path):
+        """
+        Records that the bits from start to end have been written.
+        """
+        self._lock.acquire()
+        try:
+            checksum = self._checksums.get(upload_id)
+            if checksum is None:
+                return
+            if claimed:
+                checksum.offset = end
+                checksum.busy = False
+            elif end > start:
+                checksum.pending[start] = max(end, checksum.pending.get(start, end))
+            if checksum.busy:
+                return
+
+            # Catch up on the segments received out of order
+            while True:
+                end = checksum.offset
+                for pending_start in [s for s in checksum.pending if s <= checksum.offset]:
+                    end = max(end, checksum.pending.pop(pending_start))
+                if end <= checksum.offset:
+                    return
+                checksum.busy = True
+                self._lock.release()
+                try:
+                    f = open(file_path, 'rb')
+                    try:
+                        f.seek(checksum.offset)
+                        _hash_file(checksum.hasher, f, end - checksum.offset)
+                    finally:
+                        f.close()
+                finally:
+                    self._lock.acquire()
+                    checksum.busy = False
+                checksum.offset = end
+        finally:
+            self._lock.release()
+
+    def snapshot(self, upload_id):
+        """
+        @return: tuple of a copy of the upload's hasher and the offset up to
+                 which it has hashed the file
+        """
+        self._lock.acquire()
+        try:
+            checksum = self._checksums.get(upload_id)
+            if checksum is None or checksum.busy:
+                return hashlib.sha256(), 0
+            return checksum.hasher.copy(), checksum.offset
+        finally:
+            self._lock.release()
+
+    def discard(self, upload_id):
+        self._lock.acquire()
+        try:
+            self._checksums.pop(upload_id, None)
+        finally:
+            self._lock.release()
+
+
+_RUNNING_CHECKSUMS = _RunningChecksums()
+
+# -- utilities ----------------------------------------------------------------
+
+def _hash_file(hasher, f, length):
+    """
+    Updates the hasher with length bytes of the file, or all of the rest of
+    the file if length is None.
+    """
+    while length is None or length > 0:
+        size = STREAM_BLOCK_SIZE
+        if length is not None:
+            size = min(size, length)
+            length -= size
+        block = f.read(size)
+        if not block:
+            break
+        hasher.update(block)
+
+
+def _merge_ranges(ranges):
+    """
+    Merges overlapping and adjacent [start, end) ranges.
+
+    @rtype: list of list
+    """
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def _now():
+    return datetime.now(dateutils.utc_tz())
+
+
+def _from_timestamp(timestamp):
+    # naive UTC, like the datetimes returned by the database
+    return datetime.utcfromtimestamp(timestamp)
+
+
+def _naive_utc(dt):
+    if dt.tzinfo is None:
+        return dt
+    return dt.astimezone(dateutils.utc_tz()).replace(tzinfo=None)
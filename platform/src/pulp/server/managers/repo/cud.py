@@ -26,6 +26,7 @@ import sys
 
 import pymongo
 
+from pulp.server import response_cache
 from pulp.server.db.model.repository import Repo, RepoDistributor, RepoImporter, RepoContentUnit, RepoSyncResult, RepoPublishResult
 from pulp.server.dispatch import factory as dispatch_factory
 import pulp.server.managers.factory as manager_factory
@@ -84,6 +85,7 @@ class RepoManager(object):
         # Creation
         create_me = Repo(repo_id, display_name, description, notes)
         Repo.get_collection().save(create_me, safe=True)
+        response_cache.invalidate(response_cache.REPOSITORIES)
 
         # Retrieve the repo to return the SON object
         created = Repo.get_collection().find_one({'id' : repo_id})
@@ -270,6 +272,7 @@ class RepoManager(object):
         except Exception, e:
             _LOG.exception('Error updating one or more database collections while removing repo [%s]' % repo_id)
             error_tuples.append( (_('Database Removal Error'), e.args))
+        response_cache.invalidate(response_cache.REPOSITORIES)
 
         # remove the repo from any groups it was a member of
         group_manager = manager_factory.repo_group_manager()
@@ -330,6 +333,7 @@ class RepoManager(object):
             repo['notes'] = existing_notes
 
         repo_coll.save(repo, safe=True)
+        response_cache.invalidate(response_cache.REPOSITORIES)
 
         return repo
 
@@ -354,6 +358,7 @@ class RepoManager(object):
             except pymongo.errors.OperationFailure:
                 message = 'There was a problem updating repository %s' % repo_id
                 raise PulpExecutionException(message), None, sys.exc_info()[2]
+            response_cache.invalidate(response_cache.REPOSITORIES)
 
     def update_repo_and_plugins(self, repo_id, repo_delta, importer_config,
                                 distributor_configs):
@@ -16,6 +16,7 @@ import re
 import sys
 import uuid
 
+from pulp.server import response_cache
 from pulp.server.db.model.repository import Repo, RepoDistributor
 from pulp.plugins.loader import api as plugin_api
 from pulp.plugins.config import PluginCallConfiguration
@@ -205,6 +206,7 @@ class RepoDistributorManager(object):
         # Database Update
         distributor = RepoDistributor(repo_id, distributor_id, distributor_type_id, clean_config, auto_publish)
         distributor_coll.save(distributor, safe=True)
+        response_cache.invalidate(response_cache.REPOSITORIES)
 
         return distributor
 
@@ -247,6 +249,7 @@ class RepoDistributorManager(object):
 
         # Update the database to reflect the removal
         distributor_coll.remove(repo_distributor, safe=True)
+        response_cache.invalidate(response_cache.REPOSITORIES)
 
     def update_distributor_config(self, repo_id, distributor_id, distributor_config):
         """
@@ -340,6 +343,7 @@ class RepoDistributorManager(object):
         # If we got this far, the new config is valid, so update the database
         repo_distributor['config'] = merged_config
         distributor_coll.save(repo_distributor, safe=True)
+        response_cache.invalidate(response_cache.REPOSITORIES)
 
         return repo_distributor
 
@@ -433,6 +437,7 @@ class RepoDistributorManager(object):
         # Update
         repo_distributor['scratchpad'] = contents
         distributor_coll.save(repo_distributor, safe=True)
+        response_cache.invalidate(response_cache.REPOSITORIES)
 
     def add_publish_schedule(self, repo_id, distributor_id, schedule_id):
         """
@@ -450,6 +455,7 @@ class RepoDistributorManager(object):
         collection.update({'_id': distributor['_id']},
                           {'$push': {'scheduled_publishes': schedule_id}},
                           safe=True)
+        response_cache.invalidate(response_cache.REPOSITORIES)
 
     def remove_publish_schedule(self, repo_id, distributor_id, schedule_id):
         """
@@ -467,6 +473,7 @@ class RepoDistributorManager(object):
         collection.update({'_id': distributor['_id']},
                           {'$pull': {'scheduled_publishes': schedule_id}},
                           safe=True)
+        response_cache.invalidate(response_cache.REPOSITORIES)
 
     def list_publish_schedules(self, repo_id, distributor_id):
         """
@@ -14,6 +14,7 @@
 import logging
 import sys
 
+from pulp.server import response_cache
 from pulp.server.db.model.repository import Repo, RepoImporter
 from pulp.plugins.loader import api as plugin_api
 from pulp.plugins.config import PluginCallConfiguration
@@ -172,6 +173,7 @@ class RepoImporterManager(object):
 
         importer = RepoImporter(repo_id, importer_id, importer_type_id, clean_config)
         importer_coll.save(importer, safe=True)
+        response_cache.invalidate(response_cache.REPOSITORIES)
 
         return importer
 
@@ -212,6 +214,7 @@ class RepoImporterManager(object):
 
         # Update the database to reflect the removal
         importer_coll.remove({'repo_id' : repo_id}, safe=True)
+        response_cache.invalidate(response_cache.REPOSITORIES)
 
     def update_importer_config(self, repo_id, importer_config):
         """
@@ -301,6 +304,7 @@ class RepoImporterManager(object):
         # If we got this far, the new config is valid, so update the database
         repo_importer['config'] = merged_config
         importer_coll.save(repo_importer, safe=True)
+        response_cache.invalidate(response_cache.REPOSITORIES)
 
         return repo_importer
 
@@ -351,6 +355,7 @@ class RepoImporterManager(object):
         # Update
         repo_importer['scratchpad'] = contents
         importer_coll.save(repo_importer, safe=True)
+        response_cache.invalidate(response_cache.REPOSITORIES)
 
     def add_sync_schedule(self, repo_id, schedule_id):
         """
@@ -368,6 +373,7 @@ class RepoImporterManager(object):
         collection.update({'_id': importer['_id']},
                           {'$push': {'scheduled_syncs': schedule_id}},
                           safe=True)
+        response_cache.invalidate(response_cache.REPOSITORIES)
 
     def remove_sync_schedule(self, repo_id, schedule_id):
         """
@@ -385,6 +391,7 @@ class RepoImporterManager(object):
         collection.update({'_id': importer['_id']},
                           {'$pull': {'scheduled_syncs': schedule_id}},
                           safe=True)
+        response_cache.invalidate(response_cache.REPOSITORIES)
 
     def list_sync_schedules(self, repo_id):
         """
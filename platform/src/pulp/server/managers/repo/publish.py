@@ -31,6 +31,7 @@ from pulp.plugins.loader import exceptions as plugin_exceptions
 from pulp.plugins.model import PublishReport
 from pulp.plugins.conduits.repo_publish import RepoPublishConduit
 from pulp.plugins.config import PluginCallConfiguration
+from pulp.server import response_cache
 from pulp.server.db.model.repository import Repo, RepoDistributor, RepoPublishResult
 from pulp.server.dispatch import factory as dispatch_factory
 from pulp.server.exceptions import MissingResource, PulpExecutionException
@@ -127,6 +128,7 @@ class RepoPublishManager(object):
             repo_distributor = distributor_coll.find_one({'repo_id' : repo_id, 'id' : distributor_id})
             repo_distributor['last_publish'] = publish_end_timestamp
             distributor_coll.save(repo_distributor, safe=True)
+            response_cache.invalidate(response_cache.REPOSITORIES)
 
             # Add a publish history entry for the run
             result = RepoPublishResult.error_result(repo_id, repo_distributor['id'], repo_distributor['distributor_type_id'],
@@ -142,6 +144,7 @@ class RepoPublishManager(object):
         repo_distributor = distributor_coll.find_one({'repo_id' : repo_id, 'id' : distributor_id})
         repo_distributor['last_publish'] = _now_timestamp()
         distributor_coll.save(repo_distributor, safe=True)
+        response_cache.invalidate(response_cache.REPOSITORIES)
 
         # Add a publish entry
         if publish_report is not None and isinstance(publish_report, PublishReport):
@@ -33,7 +33,7 @@ from pulp.plugins.loader import exceptions as plugin_exceptions
 from pulp.plugins.conduits.repo_sync import RepoSyncConduit
 from pulp.plugins.config import PluginCallConfiguration
 from pulp.plugins.model import SyncReport
-from pulp.server import config as pulp_config
+from pulp.server import config as pulp_config, response_cache
 from pulp.server.db.model.repository import Repo, RepoContentUnit, RepoImporter, RepoSyncResult
 from pulp.server.dispatch import constants as dispatch_constants
 from pulp.server.dispatch import factory as dispatch_factory
@@ -153,6 +153,7 @@ class RepoSyncManager(object):
             repo_importer = importer_coll.find_one({'repo_id' : repo_id})
             repo_importer['last_sync'] = sync_end_timestamp
             importer_coll.save(repo_importer, safe=True)
+            response_cache.invalidate(response_cache.REPOSITORIES)
 
             # Add a sync history entry for this run
             result = RepoSyncResult.error_result(repo_id, repo_importer['id'], repo_importer['importer_type_id'],
@@ -168,6 +169,7 @@ class RepoSyncManager(object):
         repo_importer = importer_coll.find_one({'repo_id' : repo_id})
         repo_importer['last_sync'] = sync_end_timestamp
         importer_coll.save(repo_importer, safe=True)
+        response_cache.invalidate(response_cache.REPOSITORIES)
 
         # Add a sync history entry for this run. Need to be safe here in case
         # the plugin is incorrect in its return
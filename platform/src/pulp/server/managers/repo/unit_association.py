@@ -30,6 +30,7 @@ from pulp.server.db.model.repository import RepoContentUnit
 import pulp.server.managers.factory as manager_factory
 import pulp.server.exceptions as exceptions
 import pulp.server.managers.repo._common as common_utils
+from pulp.server.util import batches
 
 # -- constants ----------------------------------------------------------------
 
@@ -56,6 +57,9 @@ SORT_DESCENDING = pymongo.DESCENDING
 
 _VALID_DIRECTIONS = (SORT_ASCENDING, SORT_DESCENDING)
 
+# Maximum number of unit IDs in a single $in query or insert
+_BATCH_SIZE = 1000
+
 # -- manager ------------------------------------------------------------------
 
 class RepoUnitAssociationManager(object):
@@ -159,17 +163,39 @@ class RepoUnitAssociationManager(object):
         @raise InvalidType: if the given owner type is not of the valid enumeration
         """
 
-        # There may be a way to batch this in mongo which would be ideal for a
-        # bulk operation like this. But for deadline purposes, this call will
-        # simply loop and call the single method.
+        if owner_type not in _OWNER_TYPES:
+            raise exceptions.InvalidValue(['owner_type'])
 
-        unique_count = 0
+        # preserve the given order, but only consider each unit once
+        unique_unit_ids = []
+        seen = set()
         for unit_id in unit_id_list:
-            if not self.association_exists(repo_id, unit_id, unit_type_id):
-                unique_count += 1
-            self.associate_unit_by_id(repo_id, unit_type_id, unit_id, owner_type, owner_id, False)
+            if unit_id in seen:
+                continue
+            seen.add(unit_id)
+            unique_unit_ids.append(unit_id)
+
+        collection = RepoContentUnit.get_collection()
+
+        # units associated with the repo by anyone and by this owner
+        associated_unit_ids = set()
+        owned_unit_ids = set()
+        for unit_id_batch in batches(unique_unit_ids, _BATCH_SIZE):
+            spec = {'repo_id': repo_id,
+                    'unit_type_id': unit_type_id,
+                    'unit_id': {'$in': unit_id_batch}}
+            fields = ['unit_id', 'owner_type', 'owner_id']
+            for association in collection.find(spec, fields=fields):
+                associated_unit_ids.add(association['unit_id'])
+                if association['owner_type'] == owner_type and association['owner_id'] == owner_id:
+                    owned_unit_ids.add(association['unit_id'])
+
+        new_associations = (RepoContentUnit(repo_id, unit_id, unit_type_id, owner_type, owner_id)
+                            for unit_id in unique_unit_ids if unit_id not in owned_unit_ids)
+        collection.insert_batch(new_associations, batch_size=_BATCH_SIZE, safe=True)
 
         # update the count of associated units on the repo object
+        unique_count = len(unique_unit_ids) - len(associated_unit_ids)
         if unique_count:
             manager_factory.repo_manager().update_unit_count(
                 repo_id, unique_count)
@@ -363,15 +389,25 @@ class RepoUnitAssociationManager(object):
         repo_manager = manager_factory.repo_manager()
 
         for unit_type_id, unit_ids in unit_map.items():
-            spec = {'repo_id': repo_id,
-                    'unit_type_id': unit_type_id,
-                    'unit_id': {'$in': unit_ids},
-                    'owner_type': owner_type,
-                    'owner_id': owner_id}
-            collection.remove(spec, safe=True)
-
-            unique_count = sum(1 for unit_id in unit_ids
-                               if not self.association_exists(repo_id, unit_id, unit_type_id))
+            unit_ids = list(set(unit_ids))
+            still_associated = set()
+
+            for unit_id_batch in batches(unit_ids, _BATCH_SIZE):
+                spec = {'repo_id': repo_id,
+                        'unit_type_id': unit_type_id,
+                        'unit_id': {'$in': unit_id_batch},
+                        'owner_type': owner_type,
+                        'owner_id': owner_id}
+                collection.remove(spec, safe=True)
+
+                # associations made by other owners keep the unit in the repo
+                spec = {'repo_id': repo_id,
+                        'unit_type_id': unit_type_id,
+                        'unit_id': {'$in': unit_id_batch}}
+                for association in collection.find(spec, fields=['unit_id']):
+                    still_associated.add(association['unit_id'])
+
+            unique_count = len(unit_ids) - len(still_associated)
             if not unique_count:
                 continue
 
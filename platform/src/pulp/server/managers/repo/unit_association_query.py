@@ -22,6 +22,7 @@ import pymongo
 import pulp.plugins.types.database as types_db
 from pulp.server.db.model.criteria import UnitAssociationCriteria
 from pulp.server.db.model.repository import RepoContentUnit
+from pulp.server.util import batches
 
 # -- constants ----------------------------------------------------------------
 
@@ -41,6 +42,9 @@ SORT_DESCENDING = pymongo.DESCENDING
 
 _VALID_DIRECTIONS = (SORT_ASCENDING, SORT_DESCENDING)
 
+# Maximum number of unit IDs in a single $in query against a unit collection
+_BATCH_SIZE = 1000
+
 # -- manager ------------------------------------------------------------------
 
 class RepoUnitAssociationQueryManager(object):
@@ -117,6 +121,30 @@ class RepoUnitAssociationQueryManager(object):
         else:
             return self.get_units_across_types(repo_id, criteria=criteria)
 
+    def get_units_iter(self, repo_id, criteria=None):
+        """
+        Generator variant of get_units. Units are yielded as they are merged
+        with their metadata instead of being collected into a single list.
+
+        @param repo_id: identifies the repository
+        @type  repo_id: str
+
+        @param criteria: if specified will drive the query
+        @type  criteria: L{UnitAssociationCriteria}
+
+        @return: generator of unit association dicts
+        @rtype:  generator
+        """
+
+        if criteria is not None and\
+           criteria.type_ids is not None and\
+           len(criteria.type_ids) == 1:
+
+            type_id = criteria.type_ids[0]
+            return self.get_units_by_type_iter(repo_id, type_id, criteria=criteria)
+        else:
+            return self.get_units_across_types_iter(repo_id, criteria=criteria)
+
     def get_units_across_types(self, repo_id, criteria=None):
         """
         Retrieves data describing units associated with the given repository
@@ -139,6 +167,22 @@ class RepoUnitAssociationQueryManager(object):
         @param criteria: if specified will drive the query
         @type  criteria: L{UnitAssociationCriteria}
         """
+        return list(self.get_units_across_types_iter(repo_id, criteria=criteria))
+
+    def get_units_across_types_iter(self, repo_id, criteria=None):
+        """
+        Generator variant of get_units_across_types. Unit metadata is looked up
+        and merged in batches as the associations are iterated.
+
+        @param repo_id: identifies the repository
+        @type  repo_id: str
+
+        @param criteria: if specified will drive the query
+        @type  criteria: L{UnitAssociationCriteria}
+
+        @return: generator of unit association dicts
+        @rtype:  generator
+        """
 
         # For simplicity, create a criteria if one is not provided and use its defaults
         if criteria is None:
@@ -180,13 +224,15 @@ class RepoUnitAssociationQueryManager(object):
         if criteria.skip is not None:
             cursor.skip(criteria.skip)
 
-        # Finally do the query and assemble the associations structure
-        units = list(cursor)
+        units = cursor
 
         # -- remove multiple associations -------------------------------------
 
+        # Duplicates can only be found by looking at every association, so in
+        # that case the associations (but not the unit metadata) are loaded
+        # up front.
         if criteria.remove_duplicates:
-            units = self._remove_duplicate_associations(units)
+            units = self._remove_duplicate_associations(list(units))
 
         # -- unit lookups -----------------------------------------------------
 
@@ -194,12 +240,10 @@ class RepoUnitAssociationQueryManager(object):
         # We simply need to look up the unit metadata itself and merge it into the
         # combined association and unit metadata dictionary.
 
-        for u in units:
-            type_collection = types_db.type_units_collection(u['unit_type_id'])
-            metadata = type_collection.find_one({'_id' : u['unit_id']})
-            u['metadata'] = metadata
-
-        return units
+        for unit_batch in batches(units, _BATCH_SIZE):
+            self._merge_unit_metadata(unit_batch)
+            for u in unit_batch:
+                yield u
 
     def get_units_by_type(self, repo_id, type_id, criteria=None):
         """
@@ -223,6 +267,27 @@ class RepoUnitAssociationQueryManager(object):
         @param criteria: if specified will drive the query
         @type  criteria: L{UnitAssociationCriteria}
         """
+        return list(self.get_units_by_type_iter(repo_id, type_id, criteria=criteria))
+
+    def get_units_by_type_iter(self, repo_id, type_id, criteria=None):
+        """
+        Generator variant of get_units_by_type. When sorting on association
+        fields, unit metadata is looked up and merged in batches as the
+        associations are iterated; otherwise the units cursor is merged with
+        the association data as it is read.
+
+        @param repo_id: identifies the repository
+        @type  repo_id: str
+
+        @param type_id: limits returned units to the given type
+        @type  type_id: str
+
+        @param criteria: if specified will drive the query
+        @type  criteria: L{UnitAssociationCriteria}
+
+        @return: generator of unit association dicts
+        @rtype:  generator
+        """
 
         # For simplicity, create a criteria if one is not provided and use its defaults
         if criteria is None:
@@ -261,19 +326,18 @@ class RepoUnitAssociationQueryManager(object):
             if criteria.skip is not None:
                 cursor.skip(criteria.skip)
 
-        unit_associations = list(cursor)
+        unit_associations = cursor
 
         # -- remove multiple associations -------------------------------------
 
         if criteria.remove_duplicates:
-            unit_associations = self._remove_duplicate_associations(unit_associations)
+            unit_associations = self._remove_duplicate_associations(list(unit_associations))
 
         # -- unit lookups -----------------------------------------------------
 
         # If the sorting was not done on association fields, we do it here. If
         # specified, we can use those fields. If not, we default to the unit key.
 
-        type_collection = types_db.type_units_collection(type_id)
         unit_spec = criteria.unit_filters
 
         # Depending on where the sort occurs, the algorithm proceeds in
@@ -285,13 +349,10 @@ class RepoUnitAssociationQueryManager(object):
             # The units are already sorted, so we have to maintain the order in
             # the units list.
 
-            for u in unit_associations:
-                spec = copy.copy(unit_spec)
-                spec['_id'] = u['unit_id']
-                metadata = type_collection.find_one(spec, fields=criteria.unit_fields)
-                u['metadata'] = metadata
-
-            return unit_associations
+            for association_batch in batches(unit_associations, _BATCH_SIZE):
+                self._merge_unit_metadata(association_batch, unit_spec, criteria.unit_fields)
+                for u in association_batch:
+                    yield u
 
         else:
             # Sorting will be done in the units collection. Since the type is
@@ -303,6 +364,8 @@ class RepoUnitAssociationQueryManager(object):
             # so we have a list of all unit IDs to pass as a filter.
             associations_by_id = dict([(u['unit_id'], u) for u in unit_associations])
 
+            type_collection = types_db.type_units_collection(type_id)
+
             # We only want to return units with an association, so add in all of
             # the unit IDs we found earlier.
             unit_spec['_id'] = {'$in' : associations_by_id.keys()}
@@ -326,18 +389,56 @@ class RepoUnitAssociationQueryManager(object):
             if criteria.skip is not None:
                 cursor.skip(criteria.skip)
 
-            # This will load all of the units and they will be filtered,
-            # limited, and sorted.
-            units = list(cursor)
-
-            # Now we just need to merge in the association data
-            merged_units = []
-            for u in units:
+            # The units come back filtered, limited, and sorted, so we just need
+            # to merge in the association data as they are read.
+            for u in cursor:
                 association = associations_by_id[u['_id']]
                 association['metadata'] = u
-                merged_units.append(association)
+                yield association
+
+    def _merge_unit_metadata(self, associations, unit_spec=None, unit_fields=None):
+        """
+        Looks up the unit metadata for each of the given associations and
+        stores it under the association's "metadata" key. Lookups are grouped
+        by unit type and made with one $in query per batch of unit IDs rather
+        than one query per association. The order of the associations is not
+        affected; associations whose unit cannot be found (or does not match
+        the unit spec) will have their metadata set to None.
+
+        @param associations: unit association dicts retrieved from the database
+        @type  associations: list of dict
+
+        @param unit_spec: optional additional filters the unit must match
+        @type  unit_spec: dict
+
+        @param unit_fields: if specified, only the given fields from the unit
+               are retrieved
+        @type  unit_fields: list of str
+        """
 
-            return merged_units
+        unit_ids_by_type = {}
+        for u in associations:
+            unit_ids_by_type.setdefault(u['unit_type_id'], set()).add(u['unit_id'])
+
+        metadata_by_unit = {}
+        for type_id, unit_ids in unit_ids_by_type.items():
+            type_collection = types_db.type_units_collection(type_id)
+            for unit_id_batch in batches(unit_ids, _BATCH_SIZE):
+                spec = copy.copy(unit_spec or {})
+                spec['_id'] = {'$in' : unit_id_batch}
+                for metadata in type_collection.find(spec, fields=unit_fields):
+                    metadata_by_unit[(type_id, metadata['_id'])] = metadata
+
+        # A unit associated more than once gets its own copy of the metadata
+        # for each association, as it would from individual lookups.
+        merged = set()
+        for u in associations:
+            key = (u['unit_type_id'], u['unit_id'])
+            metadata = metadata_by_unit.get(key)
+            if metadata is not None and key in merged:
+                metadata = copy.deepcopy(metadata)
+            merged.add(key)
+            u['metadata'] = metadata
 
     def _remove_duplicate_associations(self, units):
         """
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public
+# License as published by the Free Software Foundation; either version
+# 2 of the License (GPLv2) or (at your option) any later version.
+# There is NO WARRANTY for this software, express or implied,
+# including the implied warranties of MERCHANTABILITY,
+# NON-INFRINGEMENT, or FITNESS FOR A PARTICULAR PURPOSE. You should
+# have received a copy of GPLv2 along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+
+"""
+Per-process cache of the serialized responses of read-heavy REST calls, such
+as repository listings, and of the ETags clients use to tell whether a
+response has changed since they last fetched it.
+
+Each cached response depends on one or more scopes, such as all repositories.
+Every scope has a version that is changed when the data in the scope is
+changed; responses cached for an older version are dropped and the ETags
+computed for it no longer match. Versions also change after the configured
+[server] response_cache_ttl, which bounds how long changes made outside of
+this process can go unnoticed.
+
+The repo, importer, distributor, sync, publish and bind managers, and the
+content types database, invalidate their scopes themselves; anything else
+that writes to the collections of a scope must call invalidate().
+"""
+
+import hashlib
+import os
+import threading
+import time
+
+from pulp.server.cache import ConfiguredTTLCache
+
+# -- constants ----------------------------------------------------------------
+
+DEFAULT_MAX_SIZE = 256
+
+# Scopes of cached responses
+REPOSITORIES = 'repositories' # repositories, importers and distributors
+BINDINGS = 'bindings' # consumer bindings
+CONTENT_TYPES = 'content_types' # content type definitions
+
+# -- cache --------------------------------------------------------------------
+
+class ResponseCache(ConfiguredTTLCache):
+    """
+    Thread-safe, bounded cache of response bodies keyed by ETag. The ETag of
+    a response is derived from its request key and the current versions of
+    its scopes, so it is known without building the response. A scope's
+    version is changed once the cache's time to live has passed.
+
+    @ivar max_size: maximum number of cached responses; the cache is emptied
+                    when it is full
+    @type max_size: int
+    """
+
+    ttl_option = ('server', 'response_cache_ttl')
+
+    def __init__(self, ttl=None, max_size=DEFAULT_MAX_SIZE):
+        super(ResponseCache, self).__init__(ttl)
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        # scope -> (version, time the version was created)
+        self._versions = {}
+        # etag -> (scopes, body)
+        self._entries = {}
+
+    # -- public api -----------------------------------------------------------
+
+    def etag(self, key, scopes):
+        """
+        @param key: identifies the request, such as its path and query
+        @type  key: str
+        @param scopes: scopes of the data in the response
+        @type  scopes: tuple of str
+        @return: quoted ETag of the response for the current versions of its
+                 scopes
+        @rtype:  str
+        """
+        self._lock.acquire()
+        try:
+            versions = [self._version(s) for s in scopes]
+        finally:
+            self._lock.release()
+        digest = hashlib.sha1(key)
+        for version in versions:
+            digest.update(version)
+        return '"%s"' % digest.hexdigest()
+
+    def get(self, etag):
+        """
+        @param etag: ETag returned by etag()
+        @type  etag: str
+        @return: cached response body, None if it is not cached
+        @rtype:  str or None
+        """
+        entry = self._entries.get(etag)
+        if entry is None:
+            return None
+        return entry[1]
+
+    def put(self, key, scopes, etag, body):
+        """
+        Cache a response body; it is not cached if one of its scopes has been
+        invalidated since the given ETag was computed.
+        @param key: request key the ETag was computed for
+        @type  key: str
+        @param scopes: scopes the ETag was computed for
+        @type  scopes: tuple of str
+        @param etag: ETag returned by etag() before the response was built
+        @type  etag: str
+        @param body: serialized response
+        @type  body: str
+        """
+        if self.etag(key, scopes) != etag:
+            return
+        self._lock.acquire()
+        try:
+            if len(self._entries) >= self.max_size:
+                self._entries.clear()
+            self._entries[etag] = (scopes, body)
+        finally:
+            self._lock.release()
+
+    def invalidate(self, scope):
+        """
+        Change the version of the given scope and drop the responses cached
+        for it.
+        @param scope: one of the scope constants in this module
+        @type  scope: str
+        """
+        self._lock.acquire()
+        try:
+            self._versions.pop(scope, None)
+            self._drop(scope)
+        finally:
+            self._lock.release()
+
+    def clear(self):
+        """
+        Drop all cached responses and change the versions of all scopes.
+        """
+        self._lock.acquire()
+        try:
+            self._versions.clear()
+            self._entries.clear()
+        finally:
+            self._lock.release()
+
+    # -- internal -------------------------------------------------------------
+
+    def _version(self, scope):
+        # must be called with the lock held
+        now = time.time()
+        version = self._versions.get(scope)
+        if version is None or now - version[1] > self._ttl():
+            if version is not None:
+                self._drop(scope)
+            # random, so versions of other processes or earlier runs never
+            # produce the same ETags
+            version = (os.urandom(16), now)
+            self._versions[scope] = version
+        return version[0]
+
+    def _drop(self, scope):
+        # must be called with the lock held
+        for etag, entry in self._entries.items():
+            if scope in entry[0]:
+                del self._entries[etag]
+
+# -- singleton ----------------------------------------------------------------
+
+RESPONSE_CACHE = ResponseCache()
+
+
+def invalidate(scope):
+    """
+    Drop the process-wide cached responses for the given scope; must be
+    called after the data in the scope is changed.
+    @param scope: one of the scope constants in this module
+    @type  scope: str
+    """
+    RESPONSE_CACHE.invalidate(scope)
@@ -154,6 +154,29 @@ def topological_sort(graph):
 
     return sorted_vertices
 
+# batching ---------------------------------------------------------------------
+
+def batches(iterable, batch_size):
+    """
+    Split an iterable into lists of at most batch_size items, useful for
+    bounding the size of bulk database operations (e.g. $in queries).
+    @param iterable: items to split
+    @type  iterable: iterable
+    @param batch_size: maximum number of items per list
+    @type  batch_size: int
+    @return: generator of lists
+    @rtype:  generator
+    """
+    assert batch_size > 0
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
 # legacy delta -----------------------------------------------------------------
 
 class Delta(dict):
@@ -13,6 +13,7 @@
 
 import logging
 import sys
+from cStringIO import StringIO
 from gettext import gettext as _
 
 import web
@@ -25,6 +26,9 @@ from pulp.server.webservices import http, serialization
 
 _log = logging.getLogger(__name__)
 
+# size, in bytes, of the pieces a streamed response body is written in
+STREAM_CHUNK_SIZE = 64 * 1024
+
 
 class JSONController(object):
     """
@@ -71,6 +75,21 @@ class JSONController(object):
         """
         return web.data()
 
+    def data_stream(self):
+        """
+        Get binary POST/PUT payload as a stream, so it can be read in pieces
+        instead of being loaded in memory all at once.
+        @return: tuple of a file-like object and the payload's length
+        """
+        if 'data' in web.ctx:
+            # already read by web.data()
+            return StringIO(web.ctx.data), len(web.ctx.data)
+        try:
+            length = int(web.ctx.env.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            length = 0
+        return web.ctx.env['wsgi.input'], length
+
     def filters(self, valid):
         """
         Fetch any parameters passed on the url
@@ -133,6 +152,15 @@ class JSONController(object):
         http.header('Content-Length', len(body))
         return body
 
+    def _output_stream(self, items):
+        """
+        JSON encode the items into a list, written in pieces as the items are
+        produced, and set the appropriate headers. The length of the body is
+        not known up front, so it is sent without a Content-Length.
+        """
+        http.header('Content-Type', 'application/json')
+        return _json_list_chunks(items)
+
     def _error_dict(self, msg, code=None):
         """
         Standardized error returns
@@ -154,6 +182,20 @@ class JSONController(object):
         http.status_ok()
         return self._output(data)
 
+    def ok_stream(self, items):
+        """
+        Return an ok response whose body is the list of the given items,
+        encoded and sent as they are produced instead of being built in
+        memory first. Errors raised while producing the first piece of the
+        body are reported as usual; later errors cut the response short.
+        @type items: iterable
+        @param items: items of the list returned in the body of the response,
+                      such as the documents of a database cursor
+        @return: generator of the JSON encoded response
+        """
+        http.status_ok()
+        return self._output_stream(items)
+
     def created(self, location, data):
         """
         Return a created response.
@@ -203,6 +245,14 @@ class JSONController(object):
         http.status_bad_request()
         return self._output(msg)
 
+    def not_modified(self):
+        """
+        Return a not modified response, without a body.
+        @return: empty response body
+        """
+        http.status_not_modified()
+        return ''
+
     def unauthorized(self, msg=None):
         """
         Return an unauthorized error.
@@ -266,3 +316,24 @@ class JSONController(object):
         """
         http.status_not_implemented()
         return self._output(msg)
+
+
+def _json_list_chunks(items, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Generator of the JSON encoding of a list of the items, in pieces of about
+    chunk_size bytes.
+    """
+    chunk = ['[']
+    size = 1
+    separator = ''
+    for item in items:
+        encoded = separator + json.dumps(item, default=json_util.default)
+        separator = ', '
+        chunk.append(encoded)
+        size += len(encoded)
+        if size >= chunk_size:
+            yield ''.join(chunk)
+            chunk = []
+            size = 0
+    chunk.append(']')
+    yield ''.join(chunk)
@@ -21,7 +21,7 @@ from web.webapi import BadRequest
 # Pulp
 import pulp.server.managers.factory as managers
 from pulp.common.tags import action_tag, resource_tag
-from pulp.server import config as pulp_config
+from pulp.server import config as pulp_config, response_cache
 from pulp.server.auth.authorization import READ, CREATE, UPDATE, DELETE
 from pulp.server.db.model.criteria import Criteria
 from pulp.server.dispatch import constants as dispatch_constants
@@ -35,7 +35,7 @@ from pulp.server.itineraries.bind import (
     bind_itinerary, unbind_itinerary, forced_unbind_itinerary)
 from pulp.server.webservices.controllers.search import SearchController
 from pulp.server.webservices.controllers.base import JSONController
-from pulp.server.webservices.controllers.decorators import auth_required
+from pulp.server.webservices.controllers.decorators import auth_required, cached_response
 from pulp.server.webservices import execution
 from pulp.server.webservices import serialization
 
@@ -210,6 +210,7 @@ class Bindings(JSONController):
     """
 
     #@auth_required(READ)
+    @cached_response(response_cache.BINDINGS, response_cache.REPOSITORIES)
     def GET(self, consumer_id, repo_id=None):
         """
         Fetch all bind objects referencing the
@@ -267,6 +268,7 @@ class Binding(JSONController):
     """
 
     @auth_required(READ)
+    @cached_response(response_cache.BINDINGS, response_cache.REPOSITORIES)
     def GET(self, consumer_id, repo_id, distributor_id):
         """
         Fetch a specific bind object which represents a specific association
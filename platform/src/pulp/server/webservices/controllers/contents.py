@@ -15,23 +15,31 @@ from gettext import gettext as _
 
 import web
 
+from pulp.common import dateutils
 from pulp.common.tags import action_tag, resource_tag
+from pulp.server import response_cache
 from pulp.server.auth.authorization import CREATE, READ, UPDATE, DELETE, EXECUTE
 from pulp.server.db.model.criteria import Criteria
 from pulp.server.dispatch import constants as dispatch_constants
 from pulp.server.dispatch.call import CallRequest
 from pulp.server.exceptions import MissingResource, InvalidValue
 from pulp.server.managers import factory
+from pulp.server.util import batches
 from pulp.server.webservices import execution, serialization
 from pulp.server.webservices.controllers.base import JSONController
-from pulp.server.webservices.controllers.decorators import auth_required
+from pulp.server.webservices.controllers.decorators import auth_required, cached_response
 
 # content types controller classes ---------------------------------------------
 from pulp.server.webservices.controllers.search import SearchController
 
+# number of units whose repository memberships are looked up at a time when
+# units are streamed
+MEMBERSHIP_BATCH_SIZE = 500
+
 class ContentTypesCollection(JSONController):
 
     @auth_required(READ)
+    @cached_response(response_cache.CONTENT_TYPES)
     def GET(self):
         """
         List the available content types.
@@ -49,6 +57,7 @@ class ContentTypesCollection(JSONController):
 class ContentTypeResource(JSONController):
 
     @auth_required(READ)
+    @cached_response(response_cache.CONTENT_TYPES)
     def GET(self, type_id):
         """
         Return information about a content type.
@@ -78,11 +87,15 @@ class ContentUnitsCollection(JSONController):
     @auth_required(READ)
     def GET(self, type_id):
         """
-        List all the available content units.
+        List all the available content units. Like a search, the units are
+        returned a page at a time if the 'page_size' query parameter is
+        passed, and are otherwise streamed.
         """
-        cqm = factory.content_query_manager()
-        units = cqm.find_by_criteria(type_id, Criteria())
-        return self.ok([self.process_unit(unit) for unit in units])
+        params = web.input()
+        search = ContentUnitsSearch()
+        search._type_id = type_id
+        search._set_page(params.get('page_size'), params.get('page_token'))
+        return search._units_response(Criteria(), False)
 
 
 class ContentUnitsSearch(SearchController):
@@ -160,12 +173,8 @@ class ContentUnitsSearch(SearchController):
         @type  type_id: basestring
         """
         self._type_id = type_id
-        raw_units = self._get_query_results_from_get(ignore_fields=('include_repos',))
-        units = [ContentUnitsCollection.process_unit(unit) for unit in raw_units]
-        if web.input().get('include_repos'):
-            self._add_repo_memberships(units, type_id)
-
-        return self.ok(units)
+        criteria = self._get_criteria_from_get(ignore_fields=('include_repos',))
+        return self._units_response(criteria, web.input().get('include_repos'))
 
     @auth_required(READ)
     def POST(self, type_id):
@@ -180,12 +189,39 @@ class ContentUnitsSearch(SearchController):
         @type  type_id: basestring
         """
         self._type_id = type_id
-        raw_units = self._get_query_results_from_post()
-        units = [ContentUnitsCollection.process_unit(unit) for unit in raw_units]
-        if self.params().get('include_repos'):
-            self._add_repo_memberships(units, type_id)
+        criteria = self._get_criteria_from_post()
+        return self._units_response(criteria, self.params().get('include_repos'))
 
-        return self.ok(units)
+    def _units_response(self, criteria, include_repos):
+        """
+        Run the search and return the units found. A page of units is returned
+        as usual; otherwise, the units are streamed from the database cursor
+        so they are never all held in memory.
+
+        :param criteria:        search to run
+        :type  criteria:        pulp.server.db.model.criteria.Criteria
+        :param include_repos:   if True, add the "repository_memberships"
+                                attribute to each unit
+        :type  include_repos:   bool
+        """
+        if self._page_size is not None:
+            units = [ContentUnitsCollection.process_unit(unit) for unit in self._query(criteria)]
+            if include_repos:
+                self._add_repo_memberships(units, self._type_id)
+            return self.ok(units)
+        return self.ok_stream(self._process_units(self.query_method(criteria), include_repos))
+
+    def _process_units(self, raw_units, include_repos):
+        """
+        Generator of the serialized units; repository memberships are looked
+        up a batch of units at a time.
+        """
+        for batch in batches(raw_units, MEMBERSHIP_BATCH_SIZE):
+            units = [ContentUnitsCollection.process_unit(unit) for unit in batch]
+            if include_repos:
+                self._add_repo_memberships(units, self._type_id)
+            for unit in units:
+                yield unit
 
 
 class ContentUnitResource(JSONController):
@@ -222,8 +258,18 @@ class UploadsCollection(JSONController):
 
     @auth_required(CREATE)
     def POST(self):
+        # The size of the file is optional and lets the server allocate it
+        size = self.params().get('size', None)
+        if size is not None:
+            try:
+                size = int(size)
+            except (TypeError, ValueError):
+                raise InvalidValue(['size'])
+            if size < 0:
+                raise InvalidValue(['size'])
+
         upload_manager = factory.content_upload_manager()
-        upload_id = upload_manager.initialize_upload()
+        upload_id = upload_manager.initialize_upload(size)
         location = serialization.link.child_link_obj(upload_id)
         return self.created(location['_href'], {'_href' : location['_href'], 'upload_id' : upload_id})
 
@@ -231,8 +277,20 @@ class UploadsCollection(JSONController):
 class UploadResource(JSONController):
 
     # Scope:  Resource
+    # GET:    Retrieve the state of an upload request
     # DELETE: Delete an uploaded file
 
+    @auth_required(READ)
+    def GET(self, upload_id):
+        upload_manager = factory.content_upload_manager()
+        status = upload_manager.upload_status(upload_id)
+
+        for field in ('created', 'last_activity'):
+            utc_time = status[field].replace(tzinfo=dateutils.utc_tz())
+            status[field] = dateutils.format_iso8601_datetime(utc_time)
+
+        return self.ok(status)
+
     @auth_required(DELETE)
     def DELETE(self, upload_id):
         upload_manager = factory.content_upload_manager()
@@ -257,9 +315,10 @@ class UploadSegmentResource(JSONController):
         except ValueError:
             raise InvalidValue(['offset'])
 
+        # Stream the body into the upload instead of loading it in memory
         upload_manager = factory.content_upload_manager()
-        data = self.data()
-        upload_manager.save_data(upload_id, offset, data)
+        stream, length = self.data_stream()
+        upload_manager.save_data_stream(upload_id, offset, stream, length)
 
         return self.ok(None)
 
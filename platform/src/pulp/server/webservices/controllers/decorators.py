@@ -20,11 +20,15 @@ that certain other methods will exist.
 import logging
 from gettext import gettext as _
 
+import web
+
 from pulp.common.util import encode_unicode
+from pulp.server.auth.authorization_cache import AUTHORIZATION_CACHE
 from pulp.server.config import config
 from pulp.server.compat import wraps
 from pulp.server.managers import factory
 from pulp.server.managers.auth.permission.cud import PermissionManager
+from pulp.server.response_cache import RESPONSE_CACHE
 from pulp.server.webservices import http
 
 # -- constants ----------------------------------------------------------------
@@ -209,7 +213,13 @@ def auth_required(operation=None, super_user_only=False):
             # Check Authorization
             
             principal_manager = factory.principal_manager()
-            user_query_manager = factory.user_query_manager()
+
+            # Users and permissions are looked up in memory unless the cache
+            # has been disabled; the cache provides the same query calls
+            if AUTHORIZATION_CACHE.enabled():
+                user_query_manager = AUTHORIZATION_CACHE
+            else:
+                user_query_manager = factory.user_query_manager()
 
             if super_user_only and not user_query_manager.is_superuser(userid):
                 return self.unauthorized(AUTHOR_FAIL_MSG)
@@ -234,3 +244,67 @@ def auth_required(operation=None, super_user_only=False):
 
         return _auth_decorator
     return _auth_required
+
+
+def cached_response(*scopes):
+    """
+    Controller GET method wrapper that serves the method's response from the
+    response cache, and answers requests whose If-None-Match header matches
+    the response's ETag with a not modified response, while the data in the
+    given scopes is unchanged.
+
+    This must be applied below auth_required so authorization is checked for
+    every request; the response must not depend on the principal.
+
+    :type scopes: str
+    :param scopes: scopes, from pulp.server.response_cache, of the data in
+                   the response
+    """
+    def _cached_response(method):
+        """
+        Closure method for decorator.
+        """
+        @wraps(method)
+        def _cache_decorator(self, *args, **kwargs):
+            if not RESPONSE_CACHE.enabled():
+                return method(self, *args, **kwargs)
+
+            key = '%s?%s' % (http.uri_path(), http.request_info('QUERY_STRING') or '')
+            etag = RESPONSE_CACHE.etag(key, scopes)
+            if _etag_matches(etag, http.request_info('HTTP_IF_NONE_MATCH')):
+                http.header('ETag', etag)
+                return self.not_modified()
+
+            body = RESPONSE_CACHE.get(etag)
+            if body is not None:
+                http.status_ok()
+                http.header('Content-Type', 'application/json')
+                http.header('Content-Length', len(body))
+                http.header('ETag', etag)
+                return body
+
+            body = method(self, *args, **kwargs)
+            # only complete, successful responses are cached
+            if web.ctx.status.startswith('200') and isinstance(body, str):
+                RESPONSE_CACHE.put(key, scopes, etag, body)
+                http.header('ETag', etag)
+            return body
+
+        return _cache_decorator
+    return _cached_response
+
+
+def _etag_matches(etag, if_none_match):
+    """
+    :return: True if the If-None-Match header lists the given ETag
+    :rtype:  bool
+    """
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag in (etag, '*'):
+            return True
+    return False
@@ -21,7 +21,7 @@ from pulp.server.auth import authorization
 from pulp.server.db.model.dispatch import QueuedCall
 from pulp.server.dispatch import factory as dispatch_factory
 from pulp.server.dispatch import history as dispatch_history
-from pulp.server.exceptions import MissingResource, PulpExecutionException
+from pulp.server.exceptions import InvalidValue, MissingResource, PulpExecutionException
 from pulp.server.webservices import serialization
 from pulp.server.webservices.controllers.base import JSONController
 from pulp.server.webservices.controllers.decorators import auth_required
@@ -90,10 +90,23 @@ class TaskResource(JSONController):
     @auth_required(authorization.READ)
     def GET(self, call_request_id):
         link = serialization.link.link_obj('/pulp/api/v2/tasks/%s/' % call_request_id)
+        # long poll: given the version of the call report last seen, wait up
+        # to "wait" seconds for it to be updated before returning it
+        filters = self.filters(['version', 'wait'])
+        version = None
+        wait = 0
+        try:
+            if 'version' in filters:
+                version = int(filters['version'][0])
+            if 'wait' in filters:
+                wait = float(filters['wait'][0])
+        except ValueError:
+            raise InvalidValue(filters.keys())
         coordinator = dispatch_factory.coordinator()
-        call_reports = coordinator.find_call_reports(call_request_id=call_request_id)
-        if call_reports:
-            serialized_call_report = call_reports[0].serialize()
+        call_report, version = coordinator.wait_for_call_report(call_request_id, version, wait)
+        if call_report is not None:
+            serialized_call_report = call_report.serialize()
+            serialized_call_report['version'] = version
             serialized_call_report.update(link)
             return self.ok(serialized_call_report)
         archived_calls = dispatch_history.find_archived_calls(call_request_id=call_request_id)
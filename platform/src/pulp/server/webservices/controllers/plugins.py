@@ -19,11 +19,12 @@ import web
 
 # Pulp
 from pulp.server.auth.authorization import READ
+from pulp.server import response_cache
 from pulp.server.exceptions import MissingResource
 import pulp.server.managers.factory as manager_factory
 from pulp.server.webservices.serialization import link
 from pulp.server.webservices.controllers.base import JSONController
-from pulp.server.webservices.controllers.decorators import auth_required
+from pulp.server.webservices.controllers.decorators import auth_required, cached_response
 
 # -- constants ----------------------------------------------------------------
 
@@ -36,6 +37,7 @@ class Types(JSONController):
     # GET: Return all type definitions
 
     @auth_required(READ)
+    @cached_response(response_cache.CONTENT_TYPES)
     def GET(self):
         manager = manager_factory.plugin_manager()
         type_defs = manager.types()
@@ -71,6 +73,7 @@ class Importers(JSONController):
     # GET: Return all importers present in the server
 
     @auth_required(READ)
+    @cached_response(response_cache.CONTENT_TYPES)
     def GET(self):
         manager = manager_factory.plugin_manager()
         importers = manager.importers()
@@ -106,6 +109,7 @@ class Distributors(JSONController):
     # GET: Return all distributors present in the server
 
     @auth_required(READ)
+    @cached_response(response_cache.CONTENT_TYPES)
     def GET(self):
         manager = manager_factory.plugin_manager()
         distributors = manager.distributors()
@@ -26,7 +26,7 @@ from pulp.server.itineraries.repository import (
     distributor_update_itinerary,
 )
 from pulp.common.tags import action_tag, resource_tag
-from pulp.server import config as pulp_config
+from pulp.server import config as pulp_config, response_cache
 from pulp.server.auth.authorization import CREATE, READ, DELETE, EXECUTE, UPDATE
 from pulp.server.db.model.criteria import UnitAssociationCriteria
 from pulp.server.db.model.repository import RepoContentUnit, Repo
@@ -38,7 +38,7 @@ from pulp.server.itineraries.repo import (
 from pulp.server.webservices import execution
 from pulp.server.webservices import serialization
 from pulp.server.webservices.controllers.base import JSONController
-from pulp.server.webservices.controllers.decorators import auth_required
+from pulp.server.webservices.controllers.decorators import auth_required, cached_response
 from pulp.server.webservices.controllers.search import SearchController
 
 # -- constants ----------------------------------------------------------------
@@ -129,6 +129,7 @@ class RepoCollection(JSONController):
         return repos
 
     @auth_required(READ)
+    @cached_response(response_cache.REPOSITORIES)
     def GET(self):
         """
         Looks for query parameters 'importers' and 'distributors', and will add
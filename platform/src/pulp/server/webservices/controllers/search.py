@@ -19,8 +19,19 @@ import pulp.server.exceptions as exceptions
 from pulp.server.webservices.controllers.base import JSONController
 from pulp.server.webservices.controllers.decorators import auth_required
 
+# largest number of results a client can ask for in a single page
+MAX_PAGE_SIZE = 5000
+
 
 class SearchController(JSONController):
+    """
+    Searches are paged when the client passes a 'page_size', as a query
+    parameter or next to the 'criteria' in the body. The response body is then
+    {'results': [...], 'continuation': <token>} where the continuation token,
+    passed back as 'page_token', reads the next page; it is None on the last
+    page. See L{Criteria.page}.
+    """
+
     def __init__(self, query_method):
         """
         @param query_method:    method that will be used for the search
@@ -29,6 +40,9 @@ class SearchController(JSONController):
         """
         super(SearchController, self).__init__()
         self.query_method = query_method
+        self._page_size = None
+        self._page_token = None
+        self._continuation = None
 
     @auth_required(READ)
     def GET(self):
@@ -58,6 +72,15 @@ class SearchController(JSONController):
 
         return self.ok(self._get_query_results_from_post())
 
+    def ok(self, data):
+        """
+        Return an ok response; the results of a paged search are returned
+        along with the continuation token of the next page.
+        """
+        if self._page_size is not None:
+            data = {'results': data, 'continuation': self._continuation}
+        return super(SearchController, self).ok(data)
+
     def _get_query_results_from_get(self, ignore_fields=None, is_user_search=False):
         """
         Looks for query parameters that define a Criteria, and returns the
@@ -78,10 +101,31 @@ class SearchController(JSONController):
                     for the collection associated with this controller
         @rtype:     list
         """
+        return self._query(self._get_criteria_from_get(ignore_fields, is_user_search))
+
+    def _get_query_results_from_post(self, is_user_search=False):
+        """
+        Looks for a Criteria passed as a POST parameter on ket 'criteria', and
+        returns the results of a search based on that Criteria.
+
+        @return:    list of documents from the DB that match the given criteria
+                    for the collection associated with this controller
+        @rtype:     list
+        """
+        return self._query(self._get_criteria_from_post(is_user_search))
+
+    def _get_criteria_from_get(self, ignore_fields=None, is_user_search=False):
+        """
+        Builds the Criteria defined by the query parameters, and reads the
+        paging parameters; see _get_query_results_from_get.
+
+        @rtype: pulp.server.db.model.criteria.Criteria
+        """
         input = self._ensure_input_encoding(web.input(field=[]))
         if ignore_fields:
             for field in ignore_fields:
                 input.pop(field, None)
+        self._set_page(input.pop('page_size', None), input.pop('page_token', None))
 
         # rename this to 'fields' within the dict, and omit it if empty so we
         # default to getting all fields
@@ -93,26 +137,64 @@ class SearchController(JSONController):
                 fields.append('login')
             input['fields'] = fields
 
-        criteria = Criteria.from_client_input(input)
-        return list(self.query_method(criteria))
+        return self._check_page(Criteria.from_client_input(input))
 
-    def _get_query_results_from_post(self, is_user_search=False):
+    def _get_criteria_from_post(self, is_user_search=False):
         """
-        Looks for a Criteria passed as a POST parameter on ket 'criteria', and
-        returns the results of a search based on that Criteria.
+        Builds the Criteria passed as a POST parameter on key 'criteria', and
+        reads the paging parameters; see _get_query_results_from_post.
 
-        @return:    list of documents from the DB that match the given criteria
-                    for the collection associated with this controller
-        @rtype:     list
+        @rtype: pulp.server.db.model.criteria.Criteria
         """
+        params = self.params()
         try:
-            criteria_param = self.params()['criteria']
+            criteria_param = params['criteria']
         except KeyError:
             raise exceptions.MissingValue(['criteria'])
+        self._set_page(params.get('page_size'), params.get('page_token'))
         criteria = Criteria.from_client_input(criteria_param)
         if criteria.fields:
             if not is_user_search and 'id' not in criteria.fields and u'id' not in criteria.fields:
                 criteria.fields.append('id')
             if is_user_search and 'login' not in criteria.fields and u'login' not in criteria.fields:
                 criteria.fields.append('login')
-        return list(self.query_method(criteria))
+        return self._check_page(criteria)
+
+    def _set_page(self, page_size, page_token):
+        if page_size is None:
+            if page_token is not None:
+                raise exceptions.MissingValue(['page_size'])
+            return
+        try:
+            if isinstance(page_size, bool):
+                raise TypeError()
+            page_size = int(page_size)
+        except (TypeError, ValueError):
+            raise exceptions.InvalidValue(['page_size'])
+        if not 0 < page_size <= MAX_PAGE_SIZE:
+            raise exceptions.InvalidValue(['page_size'])
+        self._page_size = page_size
+        self._page_token = page_token
+
+    def _check_page(self, criteria):
+        # a page size and a limit cannot be combined
+        if self._page_size is not None and criteria.limit is not None:
+            raise exceptions.InvalidValue(['limit'])
+        return criteria
+
+    def _query(self, criteria):
+        """
+        Runs the search, reading a single page of the results if paging was
+        requested.
+
+        @type  criteria:    pulp.server.db.model.criteria.Criteria
+        @rtype:             list
+        """
+        if self._page_size is None:
+            return list(self.query_method(criteria))
+        page_criteria = criteria.page(self._page_size, self._page_token)
+        items = list(self.query_method(page_criteria))
+        if len(items) > self._page_size:
+            del items[self._page_size:]
+            self._continuation = page_criteria.continuation_token(items[-1])
+        return items
@@ -22,6 +22,7 @@ from pulp.common.tags import action_tag, resource_tag
 from pulp.server import config as pulp_config
 import pulp.server.managers.factory as managers
 from pulp.server.auth.authorization import READ, CREATE, UPDATE, DELETE
+from pulp.server.auth import authorization_cache
 from pulp.server.webservices import execution
 from pulp.server.db.model.auth import Permission
 from pulp.server.dispatch import constants as dispatch_constants
@@ -147,6 +148,7 @@ class UserResource(JSONController):
         user_link = serialization.link.current_link_obj()['_href']
         if Permission.get_collection().find_one({'resource' : user_link}):
             Permission.get_collection().remove({'resource' : user_link}, safe=True)
+            authorization_cache.invalidate()
 
         return self.ok(result)
 
@@ -335,6 +335,13 @@ def status_accepted():
     _status(httplib.ACCEPTED)
 
 
+def status_not_modified():
+    """
+    Set response code to not modified
+    """
+    _status(httplib.NOT_MODIFIED)
+
+
 def status_bad_request():
     """
     Set the response code to bad request
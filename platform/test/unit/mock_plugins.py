@@ -223,6 +223,8 @@ def install():
             mock.Mock(side_effect=lambda i,u,o,c,x: sorted(u))
         profiler.unit_applicable = \
             mock.Mock(side_effect=lambda i,u,c,x: ApplicabilityReport(u, False, 'mocked'))
+        profiler.units_applicable = \
+            mock.Mock(side_effect=lambda i,u,c,x,p=profiler: [p.unit_applicable(i,unit,c,x) for unit in u])
 
 def reset():
     """
@@ -25,6 +25,7 @@ sys.path.insert(0, srcdir)
 
 from pulp.common.compat import json
 from pulp.server import config
+from pulp.server.response_cache import RESPONSE_CACHE
 from pulp.server.db import connection
 from pulp.server.db.model.auth import User
 from pulp.server.dispatch import constants as dispatch_constants
@@ -78,6 +79,9 @@ class PulpServerTests(unittest.TestCase):
         self._mocks = {}
         self.config = PulpServerTests.CONFIG # shadow for simplicity
         self.clean()
+        # responses cached by earlier tests may be stale, their data having
+        # been removed directly from the database
+        RESPONSE_CACHE.clear()
 
     def tearDown(self):
         super(PulpServerTests, self).tearDown()
@@ -294,6 +298,9 @@ class TaskQueue:
     def all_tasks(self):
         return list(self.__queue)
 
+    def candidate_tasks(self, criteria):
+        return list(self.__queue)
+
     def lock(self):
         pass
 
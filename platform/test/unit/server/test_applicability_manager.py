@@ -11,6 +11,8 @@
 # have received a copy of GPLv2 along with this software; if not, see
 # http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
 
+import mock
+
 import base
 import mock_plugins
 
@@ -96,6 +98,35 @@ class ApplicabilityManagerTests(base.PulpServerTests):
                 self.assertEquals(args[call][3].__class__, ProfilerConduit)
                 call += 1
 
+    def test_applicability_iter(self):
+        # Setup
+        self.populate()
+        units = [
+            {'type_id':'mock-type', 'unit_key':{'name':'abc'}},
+            {'type_id':'rpm', 'unit_key':{'name':'zsh'}},
+            {'type_id':'mock-type', 'unit_key':{'name':'def'}},
+        ]
+        # Test
+        manager = factory.consumer_applicability_manager()
+        profile_manager = factory.consumer_profile_manager()
+        with mock.patch.object(profile_manager.__class__, 'get_profiles') as get_profiles:
+            applicability = list(manager.units_applicable_iter(self.CRITERIA, units))
+            # profiles are loaded in bulk, not per consumer
+            self.assertEquals(get_profiles.call_count, 0)
+        # Verify
+        self.assertEquals([c[0] for c in applicability], self.CONSUMER_IDS)
+        for id, reports in applicability:
+            self.assertEquals([r.unit for r in reports], units)
+            self.assertEquals([r.applicable for r in reports], [False, True, False])
+        # each profiler is called once per consumer with all of its units
+        profiler, cfg = plugins.get_profiler_by_type('rpm')
+        self.assertEquals(profiler.units_applicable.call_count, 2)
+        profiler, cfg = plugins.get_profiler_by_type('mock-type')
+        self.assertEquals(profiler.units_applicable.call_count, 2)
+        args = profiler.units_applicable.call_args[0]
+        self.assertEquals(args[0].profiles, {'rpm':self.PROFILE})
+        self.assertEquals(args[1], [units[0], units[2]])
+
     def test_profiler_exception(self):
         # Setup
         self.populate()
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public
+# License as published by the Free Software Foundation; either version
+# 2 of the License (GPLv2) or (at your option) any later version.
+# There is NO WARRANTY for this software, express or implied,
+# including the implied warranties of MERCHANTABILITY,
+# NON-INFRINGEMENT, or FITNESS FOR A PARTICULAR PURPOSE. You should
+# have received a copy of GPLv2 along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+
+import unittest
+
+import mock
+
+import base
+
+from pulp.server.auth import authorization
+from pulp.server.auth.authorization_cache import AuthorizationCache, PermissionTrie
+from pulp.server.db.model.auth import Permission, Role, User
+from pulp.server.managers import factory as manager_factory
+import pulp.server.exceptions as exceptions
+
+# -- test cases ---------------------------------------------------------------
+
+class PermissionTrieTests(unittest.TestCase):
+
+    def setUp(self):
+        self.trie = PermissionTrie()
+
+    def test_exact_resource(self):
+        self.trie.add('/v2/repositories/', {'fred' : [authorization.READ]})
+
+        self.assertTrue(self.trie.is_authorized('/v2/repositories/', 'fred', authorization.READ))
+        self.assertFalse(self.trie.is_authorized('/v2/repositories/', 'fred', authorization.UPDATE))
+        self.assertFalse(self.trie.is_authorized('/v2/repositories/', 'barney', authorization.READ))
+
+    def test_parent_resource(self):
+        self.trie.add('/v2/repositories/', {'fred' : [authorization.READ]})
+
+        self.assertTrue(self.trie.is_authorized('/v2/repositories/foo/importers/', 'fred', authorization.READ))
+        self.assertFalse(self.trie.is_authorized('/v2/consumers/', 'fred', authorization.READ))
+        self.assertFalse(self.trie.is_authorized('/v2/', 'fred', authorization.READ))
+
+    def test_root_resource(self):
+        self.trie.add('/', {'fred' : [authorization.READ]})
+
+        self.assertTrue(self.trie.is_authorized('/', 'fred', authorization.READ))
+        self.assertTrue(self.trie.is_authorized('/v2/consumers/bar/', 'fred', authorization.READ))
+
+    def test_unnormalized_resource(self):
+        # the REST resource paths are always checked in the /a/b/ form
+        self.assertFalse(self.trie.add('/v2/repositories', {'fred' : [authorization.READ]}))
+        self.assertFalse(self.trie.add('v2/repositories/', {'fred' : [authorization.READ]}))
+
+        self.assertFalse(self.trie.is_authorized('/v2/repositories/', 'fred', authorization.READ))
+
+
+class AuthorizationCacheTests(base.PulpServerTests):
+
+    def setUp(self):
+        super(AuthorizationCacheTests, self).setUp()
+
+        self.user_manager = manager_factory.user_manager()
+        self.role_manager = manager_factory.role_manager()
+        self.permission_manager = manager_factory.permission_manager()
+
+        self.role_manager.ensure_super_user_role()
+        self.user_manager.create_user('fred', 'fred')
+
+        self.cache = AuthorizationCache(ttl=60)
+
+    def clean(self):
+        super(AuthorizationCacheTests, self).clean()
+        User.get_collection().remove()
+        Role.get_collection().remove()
+        Permission.get_collection().remove()
+
+    def test_find_by_login(self):
+        user = self.cache.find_by_login('fred')
+        self.assertEqual('fred', user['login'])
+
+        # callers get their own copy
+        user['roles'].append('mangled')
+        self.assertEqual([], self.cache.find_by_login('fred')['roles'])
+
+        self.assertEqual(None, self.cache.find_by_login('missing'))
+
+    def test_is_superuser(self):
+        self.assertFalse(self.cache.is_superuser('fred'))
+        self.assertRaises(exceptions.MissingResource, self.cache.is_superuser, 'missing')
+
+        self.role_manager.add_user_to_role(self.role_manager.super_user_role, 'fred')
+        self.cache.invalidate()
+
+        self.assertTrue(self.cache.is_superuser('fred'))
+        self.assertTrue(self.cache.is_authorized('/v2/anything/', 'fred', authorization.DELETE))
+
+    def test_is_authorized(self):
+        resource = '/v2/repositories/foo/'
+        self.assertFalse(self.cache.is_authorized(resource, 'fred', authorization.READ))
+
+        self.permission_manager.grant('/v2/repositories/', 'fred', [authorization.READ])
+        self.cache.invalidate()
+
+        self.assertTrue(self.cache.is_authorized(resource, 'fred', authorization.READ))
+        self.assertFalse(self.cache.is_authorized(resource, 'fred', authorization.UPDATE))
+
+    def test_cached_lookups(self):
+        self.permission_manager.grant('/v2/repositories/', 'fred', [authorization.READ])
+
+        # Prime the cache, then make sure further checks don't hit the database
+        self.cache.is_authorized('/v2/repositories/', 'fred', authorization.READ)
+
+        with mock.patch.object(User, 'get_collection') as user_collection:
+            with mock.patch.object(Permission, 'get_collection') as permission_collection:
+                for i in range(10):
+                    self.assertTrue(self.cache.is_authorized('/v2/repositories/%d/' % i, 'fred', authorization.READ))
+                self.assertEqual(0, user_collection.call_count)
+                self.assertEqual(0, permission_collection.call_count)
+
+    @mock.patch('time.time')
+    def test_ttl(self, mock_time):
+        mock_time.return_value = 1000
+        self.assertFalse(self.cache.is_authorized('/v2/', 'fred', authorization.READ))
+
+        # Changes made outside of the managers are only seen once the ttl expires
+        Permission.get_collection().save(Permission('/v2/', users={'fred' : [authorization.READ]}), safe=True)
+        self.assertFalse(self.cache.is_authorized('/v2/', 'fred', authorization.READ))
+
+        mock_time.return_value = 1061
+        self.assertTrue(self.cache.is_authorized('/v2/', 'fred', authorization.READ))
+
+    def test_manager_invalidation(self):
+        # the managers invalidate the process-wide cache
+        with mock.patch('pulp.server.auth.authorization_cache.AUTHORIZATION_CACHE') as mock_cache:
+            self.permission_manager.grant('/v2/', 'fred', [authorization.READ])
+            self.role_manager.add_user_to_role(self.role_manager.super_user_role, 'fred')
+            self.user_manager.update_user('fred', {'name' : 'Fred'})
+
+            self.assertTrue(mock_cache.invalidate.call_count >= 3)
+
+    def test_disabled(self):
+        self.assertFalse(AuthorizationCache(ttl=0).enabled())
+        self.assertTrue(self.cache.enabled())
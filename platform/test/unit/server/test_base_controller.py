@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public
+# License as published by the Free Software Foundation; either version
+# 2 of the License (GPLv2) or (at your option) any later version.
+# There is NO WARRANTY for this software, express or implied,
+# including the implied warranties of MERCHANTABILITY,
+# NON-INFRINGEMENT, or FITNESS FOR A PARTICULAR PURPOSE. You should
+# have received a copy of GPLv2 along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+
+import unittest
+
+import mock
+
+from pulp.server.compat import json
+from pulp.server.webservices.controllers import base
+
+
+class TestJSONListChunks(unittest.TestCase):
+    def test_empty(self):
+        self.assertEqual(list(base._json_list_chunks(iter([]))), ['[]'])
+
+    def test_chunks(self):
+        items = [{'id': i} for i in range(10)]
+        chunks = list(base._json_list_chunks(iter(items), chunk_size=30))
+        self.assertTrue(len(chunks) > 1)
+        self.assertEqual(json.loads(''.join(chunks)), items)
+
+    def test_lazy(self):
+        # items are only read as the body is written
+        items = mock.MagicMock()
+        items.__iter__.return_value = iter([1, 2])
+        chunks = base._json_list_chunks(items)
+        self.assertEqual(items.__iter__.call_count, 0)
+        self.assertEqual(chunks.next(), '[1, 2]')
+
+
+class TestOkStream(unittest.TestCase):
+    @mock.patch('pulp.server.webservices.http.header')
+    @mock.patch('pulp.server.webservices.http.status_ok')
+    def test_ok_stream(self, mock_status_ok, mock_header):
+        body = base.JSONController().ok_stream(iter(['a']))
+        self.assertEqual(mock_status_ok.call_count, 1)
+        mock_header.assert_called_once_with('Content-Type', 'application/json')
+        self.assertEqual(''.join(body), '["a"]')
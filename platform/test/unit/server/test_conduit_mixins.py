@@ -140,6 +140,48 @@ class SingleRepoUnitsMixinTests(unittest.TestCase):
         # Test
         self.assertRaises(mixins.DistributorConduitException, self.mixin.get_units)
 
+    @mock.patch('pulp.plugins.types.database.type_definition')
+    @mock.patch('pulp.server.managers.repo.unit_association_query.RepoUnitAssociationQueryManager.get_units_iter')
+    def test_get_units_iter(self, mock_query_call, mock_type_def_call):
+        # Setup
+        mock_query_call.return_value = iter([
+            {'unit_type_id' : 'type-1', 'metadata' : {'m' : 'm1', 'k1' : 'v1'}},
+            {'unit_type_id' : 'type-1', 'metadata' : {'m' : 'm1', 'k1' : 'v2'}},
+            {'unit_type_id' : 'type-2', 'metadata' : {'m' : 'm1', 'k1' : 'v3'}},
+        ])
+
+        mock_type_def_call.return_value = {
+            'id' : 'mock-type-def',
+            'unit_key' : ['k1']
+        }
+
+        fake_criteria = 'fake-criteria'
+
+        # Test
+        units = self.mixin.get_units_iter(criteria=fake_criteria)
+
+        # Verify
+        self.assertFalse(isinstance(units, list))
+
+        units = list(units)
+        self.assertEqual(3, len(units))
+        self.assertEqual('v3', units[2].unit_key['k1'])
+        self.assertEqual(1, mock_query_call.call_count)
+        self.assertEqual(mock_query_call.call_args[0][0], self.repo_id)
+        self.assertEqual(mock_query_call.call_args[1]['criteria'], fake_criteria)
+
+        # One lookup per type, not per unit
+        self.assertEqual(2, mock_type_def_call.call_count)
+
+    @mock.patch('pulp.server.managers.repo.unit_association_query.RepoUnitAssociationQueryManager.get_units_iter')
+    def test_get_units_iter_server_error(self, mock_query_call):
+        # Setup
+        mock_query_call.side_effect = Exception()
+
+        # Test
+        units = self.mixin.get_units_iter()
+        self.assertRaises(mixins.DistributorConduitException, units.next)
+
 
 class MultipleRepoUnitsMixinTests(unittest.TestCase):
 
@@ -182,6 +224,32 @@ class MultipleRepoUnitsMixinTests(unittest.TestCase):
         # Test
         self.assertRaises(mixins.ImporterConduitException, self.mixin.get_units, 'foo')
 
+    @mock.patch('pulp.plugins.types.database.type_definition')
+    @mock.patch('pulp.server.managers.repo.unit_association_query.RepoUnitAssociationQueryManager.get_units_iter')
+    def test_get_units_iter(self, mock_query_call, mock_type_def_call):
+        # Setup
+        mock_query_call.return_value = iter([
+                {'unit_type_id' : 'type-1', 'metadata' : {'m' : 'm1', 'k1' : 'v1'}},
+                {'unit_type_id' : 'type-2', 'metadata' : {'m' : 'm1', 'k1' : 'v2'}},
+        ])
+
+        mock_type_def_call.return_value = {
+            'id' : 'mock-type-def',
+            'unit_key' : ['k1']
+        }
+
+        fake_criteria = 'fake-criteria'
+
+        # Test
+        repo_id = 'mr-repo'
+        units = list(self.mixin.get_units_iter(repo_id, criteria=fake_criteria))
+
+        # Verify
+        self.assertEqual(2, len(units))
+        self.assertEqual(1, mock_query_call.call_count)
+        self.assertEqual(mock_query_call.call_args[0][0], repo_id)
+        self.assertEqual(mock_query_call.call_args[1]['criteria'], fake_criteria)
+
 
 class SearchUnitsMixinTests(unittest.TestCase):
 
@@ -403,6 +471,22 @@ class AddUnitMixinTests(unittest.TestCase):
 
         self.assertEqual(no_path_unit.storage_path, None)
 
+    @mock.patch('pulp.server.managers.content.query.ContentQueryManager.request_content_unit_file_paths')
+    def test_init_units(self, mock_file_paths_call):
+        # Setup
+        mock_file_paths_call.return_value = ['/tmp/a', '/tmp/c']
+
+        # Test
+        units = self.mixin.init_units('t', [({'k' : 'a'}, {}, 'a'),
+                                            ({'k' : 'b'}, {}, None),
+                                            ({'k' : 'c'}, {'m' : 'm1'}, 'c')])
+
+        # Verify
+        mock_file_paths_call.assert_called_once_with('t', ['a', 'c'])
+        self.assertEqual([u.unit_key for u in units], [{'k' : 'a'}, {'k' : 'b'}, {'k' : 'c'}])
+        self.assertEqual([u.storage_path for u in units], ['/tmp/a', None, '/tmp/c'])
+        self.assertEqual(units[2].metadata, {'m' : 'm1'})
+
     @mock.patch('pulp.server.managers.content.query.ContentQueryManager.request_content_unit_file_path')
     def test_init_unit_server_error(self, mock_call):
         # Setup
@@ -468,6 +552,82 @@ class AddUnitMixinTests(unittest.TestCase):
         # Test
         self.assertRaises(mixins.ImporterConduitException, self.mixin.save_unit, None)
 
+    @mock.patch('pulp.server.managers.content.query.ContentQueryManager.get_content_unit_ids_by_keys_dicts')
+    @mock.patch('pulp.server.managers.content.cud.ContentManager.update_content_unit')
+    @mock.patch('pulp.server.managers.content.cud.ContentManager.add_content_units')
+    @mock.patch('pulp.server.managers.repo.unit_association.RepoUnitAssociationManager.associate_all_by_ids')
+    def test_save_units(self, mock_associate, mock_add, mock_update, mock_get):
+        # Setup
+        units = [Unit('t1', {'k' : 'new'}, {}, None),
+                 Unit('t1', {'k' : 'existing'}, {}, None),
+                 Unit('t2', {'k' : 'new'}, {}, None),
+                 Unit('t1', {'k' : 'new'}, {'m' : 'm2'}, None)]
+        mock_get.side_effect = lambda t, keys: [k['k'] == 'existing' and 'existing' or None for k in keys]
+        mock_add.side_effect = lambda t, docs: ['%s-%d' % (t, i) for i in range(len(docs))]
+
+        # Test
+        saved = self.mixin.save_units(units)
+
+        # Verify
+        self.assertEqual(['t1-0', 'existing', 't2-0', 't1-0'], [u.id for u in saved])
+
+        #   One lookup, insert and association call per type
+        self.assertEqual(2, mock_get.call_count)
+        self.assertEqual(2, mock_add.call_count)
+        self.assertEqual(2, mock_associate.call_count)
+        self.assertEqual(mock_associate.call_args_list[0][0],
+                         (self.repo_id, 't1', ['t1-0', 'existing', 't1-0'],
+                          self.association_owner_type, self.association_owner_id))
+
+        #   The existing unit and the repeated new unit are updates
+        self.assertEqual(2, mock_update.call_count)
+        self.assertEqual(2, self.mixin._added_count)
+        self.assertEqual(2, self.mixin._updated_count)
+
+    @mock.patch('pulp.server.managers.content.query.ContentQueryManager.get_content_unit_ids_by_keys_dicts')
+    def test_save_units_with_error(self, mock_get):
+        # Setup
+        mock_get.side_effect = Exception()
+
+        # Test
+        self.assertRaises(mixins.ImporterConduitException, self.mixin.save_units, [Unit('t', {'k' : 'v'}, {}, None)])
+
+    @mock.patch('pulp.plugins.conduits.mixins.AddUnitMixin.save_units')
+    def test_buffered_saves(self, mock_save_units):
+        # Setup
+        units = [Unit('t', {'k' : str(i)}, {}, None) for i in range(5)]
+
+        # Test
+        with self.mixin.buffered_saves(batch_size=2):
+            for u in units:
+                self.mixin.save_unit(u)
+
+            #   Full batches are saved as they fill up
+            self.assertEqual(2, mock_save_units.call_count)
+
+        # Verify
+        self.assertEqual(3, mock_save_units.call_count)
+        self.assertEqual([units[4]], mock_save_units.call_args[0][0])
+        self.assertEqual(None, self.mixin._pending_units)
+
+    @mock.patch('pulp.server.managers.content.cud.ContentManager.link_referenced_content_units')
+    @mock.patch('pulp.plugins.conduits.mixins.AddUnitMixin.save_units')
+    def test_buffered_saves_link_unit(self, mock_save_units, mock_link):
+        # Setup
+        from_unit = Unit('t1', {'k' : 'v1'}, {'m' : 'm'}, 'p')
+        to_unit = Unit('t2', {'k' : 'v2'}, {'m' : 'm'}, 'p')
+
+        # Test
+        with self.mixin.buffered_saves():
+            self.mixin.save_unit(from_unit)
+            self.mixin.save_unit(to_unit)
+            self.mixin.link_unit(from_unit, to_unit)
+
+            # Verify
+            self.assertEqual(1, mock_save_units.call_count)
+            self.assertEqual([from_unit, to_unit], mock_save_units.call_args[0][0])
+            self.assertEqual(1, mock_link.call_count)
+
     @mock.patch('pulp.server.managers.content.cud.ContentManager.link_referenced_content_units')
     def test_link_unit(self, mock_link):
         # Setup
@@ -12,13 +12,19 @@
 # have received a copy of GPLv2 along with this software; if not, see
 # http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
 
+import os
+import shutil
+import tempfile
+
 import mock
 
 import base
 from pulp.plugins.types import database, model
+from pulp.server import config as pulp_config
 from pulp.server.db.connection import PulpCollection
 from pulp.server.db.model.criteria import Criteria
 from pulp.server.managers.content.cud import ContentManager
+from pulp.server.managers.content import query
 from pulp.server.managers.content.query import ContentQueryManager
 
 # constants --------------------------------------------------------------------
@@ -73,6 +79,15 @@ class PulpContentCUDTests(PulpContentTests):
         units = self.query_manager.list_content_units(TYPE_1_DEF.id)
         self.assertEqual(len(units), 1)
 
+    def test_add_content_units(self):
+        unit_ids = self.cud_manager.add_content_units(TYPE_1_DEF.id, TYPE_1_UNITS)
+        self.assertEqual(len(unit_ids), len(TYPE_1_UNITS))
+        self.assertEqual(len(set(unit_ids)), len(TYPE_1_UNITS))
+        for unit_id, unit_model in zip(unit_ids, TYPE_1_UNITS):
+            unit = self.query_manager.get_content_unit_by_id(TYPE_1_DEF.id, unit_id)
+            self.assertEqual(unit['key-1'], unit_model['key-1'])
+            self.assertEqual(unit['_content_type_id'], TYPE_1_DEF.id)
+
     def test_update_content_unit(self):
         unit_id = self.cud_manager.add_content_unit(TYPE_1_DEF.id, None, TYPE_1_UNITS[0])
         unit = self.query_manager.get_content_unit_by_id(TYPE_1_DEF.id, unit_id)
@@ -175,6 +190,18 @@ class PulpContentQueryTests(PulpContentTests):
         units = self.query_manager.get_multiple_units_by_keys_dicts(TYPE_2_DEF.id, key_dicts)
         self.assertEqual(len(units), len(self.type_2_ids))
 
+    def test_ids_by_keys_dicts(self):
+        # the unit matching the "cross product" of the requested keys must not
+        # be reported, nor shift the ids of the units that were requested
+        self.cud_manager.add_content_unit(TYPE_2_DEF.id, None, {'key-2a': 'B', 'key-2b': 'B'})
+        keys_dicts = TYPE_2_UNITS[1:3] + [{'key-2a': 'C', 'key-2b': 'C'}]
+        unit_ids = self.query_manager.get_content_unit_ids_by_keys_dicts(TYPE_2_DEF.id, keys_dicts)
+        self.assertEqual(unit_ids, self.type_2_ids[1:3] + [None])
+
+    def test_ids_by_keys_dicts_invalid(self):
+        self.assertRaises(ValueError, self.query_manager.get_content_unit_ids_by_keys_dicts,
+                          TYPE_2_DEF.id, [{'key-2a': 'A'}])
+
     def __test_keys_dicts_query(self):
         # XXX this test proves my multi-dict query wrong, need to fix it
         new_unit = {'key-2a': 'B', 'key-2b': 'B'}
@@ -182,3 +209,76 @@ class PulpContentQueryTests(PulpContentTests):
         keys_dicts = TYPE_2_UNITS[1:3]
         units = self.query_manager.get_multiple_units_by_keys_dicts(TYPE_2_DEF.id, keys_dicts)
         self.assertEqual(len(units), 2)
+
+# storage unit tests -----------------------------------------------------------
+
+class PulpContentStorageTests(PulpContentTests):
+
+    def setUp(self):
+        super(PulpContentStorageTests, self).setUp()
+        self.storage_dir = tempfile.mkdtemp(prefix='content-storage-')
+        self.original_storage_dir = pulp_config.config.get('server', 'storage_dir')
+        pulp_config.config.set('server', 'storage_dir', self.storage_dir)
+        query._known_dirs.clear()
+
+    def tearDown(self):
+        super(PulpContentStorageTests, self).tearDown()
+        pulp_config.config.set('server', 'storage_dir', self.original_storage_dir)
+        pulp_config.config.set('server', 'storage_layout', query.STORAGE_LAYOUT_FLAT)
+        shutil.rmtree(self.storage_dir)
+
+    def test_flat_path(self):
+        path = self.query_manager.content_unit_file_path(TYPE_1_DEF.id, '/a/b.rpm')
+        self.assertEqual(path, os.path.join(self.storage_dir, 'content', 'type-1', 'a', 'b.rpm'))
+        self.assertFalse(os.path.exists(os.path.dirname(path)))
+
+    def test_sharded_path(self):
+        pulp_config.config.set('server', 'storage_layout', query.STORAGE_LAYOUT_SHARDED)
+        path = self.query_manager.content_unit_file_path(TYPE_1_DEF.id, '/a/b.rpm')
+        # sha1('a/b.rpm') starts with 193c
+        self.assertEqual(path, os.path.join(self.storage_dir, 'content', 'type-1', '19', '3c', 'a', 'b.rpm'))
+        self.assertEqual(self.query_manager.content_unit_file_path(TYPE_1_DEF.id, u'a/b.rpm'), path)
+
+    def test_request_paths(self):
+        pulp_config.config.set('server', 'storage_layout', query.STORAGE_LAYOUT_SHARDED)
+        paths = self.query_manager.request_content_unit_file_paths(TYPE_1_DEF.id, ['a/b.rpm', 'c.rpm'])
+        self.assertEqual(paths, [self.query_manager.content_unit_file_path(TYPE_1_DEF.id, 'a/b.rpm'),
+                                 self.query_manager.content_unit_file_path(TYPE_1_DEF.id, 'c.rpm')])
+        for path in paths:
+            self.assertTrue(os.path.isdir(os.path.dirname(path)))
+
+    @mock.patch('os.makedirs')
+    def test_known_dirs(self, mock_makedirs):
+        self.query_manager.request_content_unit_file_path(TYPE_1_DEF.id, 'a/b.rpm')
+        self.query_manager.request_content_unit_file_path(TYPE_1_DEF.id, 'a/c.rpm')
+        self.assertEqual(mock_makedirs.call_count, 1)
+
+        # directories deleted by the orphan manager are created again
+        query.forget_content_dir(os.path.join(self.storage_dir, 'content', 'type-1', 'a'))
+        self.query_manager.request_content_unit_file_path(TYPE_1_DEF.id, 'a/d.rpm')
+        self.assertEqual(mock_makedirs.call_count, 2)
+
+    def test_relink(self):
+        old_path = self.query_manager.request_content_unit_file_path(TYPE_1_DEF.id, 'a/b.rpm')
+        open(old_path, 'w').write('rpm')
+        unit_id = self.cud_manager.add_content_unit(TYPE_1_DEF.id, None, {'key-1': 'A'})
+        self.cud_manager.update_content_unit(TYPE_1_DEF.id, unit_id, {'_storage_path': old_path})
+        self.cud_manager.add_content_unit(TYPE_1_DEF.id, None, {'key-1': 'B'})
+
+        # Test
+        pulp_config.config.set('server', 'storage_layout', query.STORAGE_LAYOUT_SHARDED)
+        relinked = self.query_manager.relink_content_units(TYPE_1_DEF.id)
+
+        # Verify
+        self.assertEqual(relinked, 1)
+        new_path = self.query_manager.content_unit_file_path(TYPE_1_DEF.id, 'a/b.rpm')
+        unit = self.query_manager.get_content_unit_by_id(TYPE_1_DEF.id, unit_id)
+        self.assertEqual(unit['_storage_path'], new_path)
+        self.assertEqual(open(new_path).read(), 'rpm')
+        # published repositories may still link to the old path, which is
+        # recorded so that it is deleted along with the unit
+        self.assertTrue(os.path.exists(old_path))
+        self.assertEqual(unit['_legacy_storage_paths'], [old_path])
+
+        # already in place
+        self.assertEqual(self.query_manager.relink_content_units(TYPE_1_DEF.id), 0)
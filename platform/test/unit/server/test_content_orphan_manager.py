@@ -17,6 +17,8 @@ import string
 import tempfile
 import traceback
 
+import mock
+
 import base
 
 from pulp.server import exceptions as pulp_exceptions
@@ -24,6 +26,7 @@ from pulp.plugins.types import database as content_type_db
 from pulp.plugins.types.model import TypeDefinition
 from pulp.server.db.model.repository import RepoContentUnit
 from pulp.server.managers import factory as manager_factory
+from pulp.server.managers.content import orphan as orphan_module
 from pulp.server.managers.content.orphan import OrphanManager
 
 import mock_plugins
@@ -162,6 +165,23 @@ class OrphanManagerTests(base.PulpServerTests):
                           self.orphan_manager.get_orphan,
                           PHONY_TYPE_1.id, 'non-existent')
 
+    def test_get_associated_unit(self):
+        unit = gen_content_unit(PHONY_TYPE_1.id, self.content_root)
+        associate_content_unit_with_repo(unit)
+        self.assertRaises(pulp_exceptions.MissingResource,
+                          self.orphan_manager.get_orphan,
+                          PHONY_TYPE_1.id, unit['_id'])
+
+    @mock.patch.object(orphan_module, 'ORPHAN_BATCH_SIZE', 2)
+    def test_generate_orphans_in_batches(self):
+        units = [gen_content_unit(PHONY_TYPE_1.id, self.content_root) for i in range(5)]
+        associate_content_unit_with_repo(units[1])
+        associate_content_unit_with_repo(units[2])
+        orphans = list(self.orphan_manager.generate_orphans_by_type(PHONY_TYPE_1.id, fields=['name']))
+        expected_ids = sorted(u['_id'] for u in (units[0], units[3], units[4]))
+        self.assertEqual([o['_id'] for o in orphans], expected_ids)
+        self.assertTrue('_storage_path' not in orphans[0])
+
     def test_associated_unit(self):
         unit = gen_content_unit(PHONY_TYPE_1.id, self.content_root)
         associate_content_unit_with_repo(unit)
@@ -187,6 +207,18 @@ class OrphanManagerTests(base.PulpServerTests):
         self.assertTrue(len(orphans) == 0)
         self.assertTrue(self.number_of_files_in_content_root() == 0)
 
+    def test_delete_orphan_with_legacy_path(self):
+        unit = gen_content_unit(PHONY_TYPE_1.id, self.content_root)
+        legacy_path = os.path.join(self.content_root, 'legacy-' + unit['name'])
+        os.link(unit['_storage_path'], legacy_path)
+        content_manager = manager_factory.content_manager()
+        content_manager.update_content_unit(PHONY_TYPE_1.id, unit['_id'],
+                                            {'_legacy_storage_paths': [legacy_path]})
+        self.orphan_manager.delete_all_orphans()
+        self.assertFalse(os.path.exists(unit['_storage_path']))
+        self.assertFalse(os.path.exists(legacy_path))
+        self.assertTrue(self.number_of_files_in_content_root() == 0)
+
     def test_delete_by_type(self):
         unit_1 = gen_content_unit(PHONY_TYPE_1.id, self.content_root)
         unit_2 = gen_content_unit(PHONY_TYPE_2.id, self.content_root)
@@ -197,6 +229,48 @@ class OrphanManagerTests(base.PulpServerTests):
         self.assertFalse(os.path.exists(unit_1['_storage_path']))
         self.assertTrue(os.path.exists(unit_2['_storage_path']))
 
+    @mock.patch.object(orphan_module, 'ORPHAN_BATCH_SIZE', 2)
+    @mock.patch.object(orphan_module, '_report_progress')
+    def test_delete_in_batches(self, mock_report_progress):
+        units = [gen_content_unit(PHONY_TYPE_1.id, self.content_root) for i in range(5)]
+        associate_content_unit_with_repo(units[0])
+        deleted = self.orphan_manager.delete_orphans_by_type(PHONY_TYPE_1.id)
+        self.assertEqual(deleted, 4)
+        self.assertEqual(self.number_of_files_in_content_root(), 1)
+        self.assertTrue(os.path.exists(units[0]['_storage_path']))
+        progress = [c[0][0] for c in mock_report_progress.call_args_list]
+        self.assertEqual(progress, [{PHONY_TYPE_1.id: 2}, {PHONY_TYPE_1.id: 4}])
+
+    def test_delete_all_orphans_result(self):
+        gen_content_unit(PHONY_TYPE_1.id, self.content_root)
+        gen_content_unit(PHONY_TYPE_2.id, self.content_root)
+        gen_content_unit(PHONY_TYPE_2.id, self.content_root)
+        result = self.orphan_manager.delete_all_orphans()
+        self.assertEqual(result, {PHONY_TYPE_1.id: 1, PHONY_TYPE_2.id: 2})
+
+    def test_delete_orphaned_files_in_parallel(self):
+        units = [gen_content_unit(PHONY_TYPE_1.id, self.content_root) for i in range(10)]
+        paths = [u['_storage_path'] for u in units]
+        paths.append(os.path.join(self.content_root, 'missing'))
+        self.orphan_manager.delete_orphaned_files(paths)
+        self.assertEqual(self.number_of_files_in_content_root(), 0)
+
+    def test_delete_by_id_skips_associated(self):
+        unit = gen_content_unit(PHONY_TYPE_1.id, self.content_root)
+        associate_content_unit_with_repo(unit)
+        json_obj = {'content_type_id': unit['_content_type_id'],
+                    'unit_id': unit['_id']}
+        deleted = self.orphan_manager.delete_orphans_by_id([json_obj])
+        self.assertEqual(deleted, 0)
+        self.assertTrue(os.path.exists(unit['_storage_path']))
+
+    def test_delete_by_id_missing(self):
+        json_obj = {'content_type_id': PHONY_TYPE_1.id,
+                    'unit_id': 'non-existent'}
+        self.assertRaises(pulp_exceptions.MissingResource,
+                          self.orphan_manager.delete_orphans_by_id,
+                          [json_obj])
+
     def test_delete_by_id(self):
         unit = gen_content_unit(PHONY_TYPE_1.id, self.content_root)
         json_obj = {'content_type_id': unit['_content_type_id'],
@@ -12,8 +12,11 @@
 # have received a copy of GPLv2 along with this software; if not, see
 # http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
 
+import datetime
+import hashlib
 import os
 import shutil
+from cStringIO import StringIO
 
 import base
 import mock_plugins
@@ -21,9 +24,11 @@ import mock_plugins
 from   pulp.plugins.conduits.upload import UploadConduit
 from   pulp.plugins.model import Repository
 from   pulp.server.db.model.auth import User
+from   pulp.server.db.model.content import ContentUploadSession
 from   pulp.server.db.model.repository import Repo, RepoImporter
 from   pulp.server.exceptions import MissingResource, PulpDataException, PulpExecutionException, InvalidValue
 import pulp.server.managers.factory as manager_factory
+import pulp.server.managers.content.upload as manager_module
 from   pulp.server.managers.repo.unit_association import OWNER_TYPE_USER
 
 class ContentUploadManagerTests(base.PulpServerTests):
@@ -50,6 +55,7 @@ class ContentUploadManagerTests(base.PulpServerTests):
         base.PulpServerTests.clean(self)
         Repo.get_collection().remove()
         RepoImporter.get_collection().remove()
+        ContentUploadSession.get_collection().remove()
 
     # -- uploading bits functionality -----------------------------------------
 
@@ -126,6 +132,116 @@ class ContentUploadManagerTests(base.PulpServerTests):
         # Verify
         self.assertTrue(not os.path.exists(uploaded_filename))
 
+    def test_save_data_stream(self):
+
+        # Setup
+        data = os.urandom(200000)
+        upload_id = self.upload_manager.initialize_upload()
+
+        # Test
+        self.upload_manager.save_data_stream(upload_id, 0, StringIO(data), 150000)
+        self.upload_manager.save_data_stream(upload_id, 150000, StringIO(data[150000:]), 50000)
+
+        # Verify
+        self.assertEqual(data, self.upload_manager.read_upload(upload_id))
+        self.assertEqual(data, ''.join(self.upload_manager.iter_upload(upload_id, 4096)))
+
+    def test_save_data_stream_short(self):
+
+        # Setup
+        upload_id = self.upload_manager.initialize_upload()
+
+        # Test - a truncated body only records what was received
+        written = self.upload_manager.save_data_stream(upload_id, 0, StringIO('abc'), 10)
+
+        # Verify
+        self.assertEqual(3, written)
+        self.assertEqual([[0, 3]], self.upload_manager.upload_status(upload_id)['received'])
+
+    def test_initialize_upload_size(self):
+
+        # Test
+        upload_id = self.upload_manager.initialize_upload(size=1024)
+
+        # Verify
+        uploaded_filename = self.upload_manager._upload_file_path(upload_id)
+        self.assertEqual(1024, os.path.getsize(uploaded_filename))
+
+        status = self.upload_manager.upload_status(upload_id)
+        self.assertEqual(1024, status['size'])
+        self.assertEqual([], status['received'])
+        self.assertEqual(0, status['received_bytes'])
+
+    def test_upload_status(self):
+
+        # Setup
+        upload_id = self.upload_manager.initialize_upload(size=10)
+
+        # Test
+        self.upload_manager.save_data(upload_id, 5, 'fghij')
+        self.upload_manager.save_data(upload_id, 0, 'abc')
+        self.upload_manager.save_data(upload_id, 3, 'de')
+
+        # Verify
+        status = self.upload_manager.upload_status(upload_id)
+        self.assertEqual(upload_id, status['upload_id'])
+        self.assertEqual([[0, 10]], status['received'])
+        self.assertEqual(10, status['received_bytes'])
+        self.assertTrue(status['last_activity'] >= status['created'])
+
+        self.assertRaises(MissingResource, self.upload_manager.upload_status, 'foo')
+
+    def test_upload_checksum(self):
+
+        # Setup
+        data = os.urandom(100000)
+        segments = [(60000, 100000), (0, 30000), (30000, 60000)]
+        upload_id = self.upload_manager.initialize_upload(size=len(data))
+
+        # Test - out of order segments are caught up once the gap is filled
+        for start, end in segments:
+            self.upload_manager.save_data(upload_id, start, data[start:end])
+
+        # Verify
+        expected = hashlib.sha256(data).hexdigest()
+        self.assertEqual(expected, self.upload_manager.upload_checksum(upload_id))
+
+        conduit = UploadConduit('repo-u', 'mock-importer', {}, 'test-user', upload_id=upload_id)
+        self.assertEqual(expected, conduit.get_upload_checksum())
+
+    def test_upload_checksum_without_running_state(self):
+
+        # Setup
+        upload_id = self.upload_manager.initialize_upload()
+        self.upload_manager.save_data(upload_id, 0, 'fus ro dah')
+        manager_module._RUNNING_CHECKSUMS.discard(upload_id)
+
+        # Test
+        checksum = self.upload_manager.upload_checksum(upload_id)
+
+        # Verify
+        self.assertEqual(hashlib.sha256('fus ro dah').hexdigest(), checksum)
+
+    def test_delete_stale_uploads(self):
+
+        # Setup
+        stale_id = self.upload_manager.initialize_upload()
+        active_id = self.upload_manager.initialize_upload()
+        self.upload_manager.save_data(active_id, 0, 'fus ro dah')
+
+        past = datetime.datetime.utcnow() - datetime.timedelta(days=8)
+        ContentUploadSession.get_collection().update({'upload_id' : stale_id},
+            {'$set' : {'last_activity' : past}}, safe=True)
+
+        # Test
+        deleted = self.upload_manager.delete_stale_uploads(
+            datetime.datetime.utcnow() - datetime.timedelta(days=7))
+
+        # Verify
+        self.assertEqual([stale_id], deleted)
+        self.assertEqual([active_id], self.upload_manager.list_upload_ids())
+        self.assertEqual(None, ContentUploadSession.get_collection().find_one({'upload_id' : stale_id}))
+
     def test_list_upload_ids(self):
 
         # Test - Empty
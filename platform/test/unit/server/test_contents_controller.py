@@ -18,6 +18,7 @@ import mock
 
 import base
 import dummy_plugins
+from pulp.server.db.model.content import ContentUploadSession
 from pulp.server.db.model.repository import Repo, RepoImporter
 import pulp.server.managers.factory as manager_factory
 from pulp.server.webservices.controllers.contents import ContentUnitsCollection, ContentUnitsSearch
@@ -53,6 +54,25 @@ class TestContentUnitsCollection(base.PulpWebserviceTests):
         self.assertEqual(status, 200)
         mock_process_unit.assert_called_once_with('IAmAUnit')
 
+    @mock.patch(
+        'pulp.server.managers.content.query.ContentQueryManager.find_by_criteria',
+        return_value=[{'_id':'u1'}, {'_id':'u2'}])
+    def test_get_paged(self, mock_find_by_criteria):
+        status, body = self.get('/v2/content/units/deb/?page_size=1')
+        self.assertEqual(status, 200)
+        self.assertEqual([u['_id'] for u in body['results']], ['u1'])
+        self.assertTrue(body['continuation'])
+        criteria = mock_find_by_criteria.call_args[0][1]
+        self.assertEqual(criteria.limit, 2)
+
+        mock_find_by_criteria.return_value = [{'_id':'u2'}]
+        status, body = self.get('/v2/content/units/deb/?page_size=1&page_token=%s' % body['continuation'])
+        self.assertEqual(status, 200)
+        self.assertEqual([u['_id'] for u in body['results']], ['u2'])
+        self.assertTrue(body['continuation'] is None)
+        criteria = mock_find_by_criteria.call_args[0][1]
+        self.assertEqual(criteria.filters, {'_id': {'$gt': 'u1'}})
+
 
 class TestContentUnitsSearch(base.PulpWebserviceTests):
     @mock.patch('pulp.server.managers.content.query.ContentQueryManager.get_content_unit_collection')
@@ -114,6 +134,19 @@ class TestContentUnitsSearch(base.PulpWebserviceTests):
         self.assertEqual(len(body), 1)
         self.assertEqual(body[0].get('repository_memberships'), ['repo1'])
 
+    @mock.patch(
+        'pulp.server.managers.content.query.ContentQueryManager.find_by_criteria',
+        return_value=[{'_id':'foo'}])
+    @mock.patch('pulp.server.managers.repo.unit_association_query.RepoUnitAssociationQueryManager.find_by_criteria')
+    def test_post_paged(self, mock_find_assoc, mock_find_unit):
+        mock_find_assoc.return_value = [{'unit_id':'foo', 'repo_id':'repo1'}]
+        post_body = {'criteria': {}, 'include_repos':True, 'page_size': 10}
+        status, body = self.post('/v2/content/units/rpm/search/', post_body)
+        self.assertEqual(status, 200)
+        self.assertEqual(len(body['results']), 1)
+        self.assertEqual(body['results'][0].get('repository_memberships'), ['repo1'])
+        self.assertTrue(body['continuation'] is None)
+
     @mock.patch(
         'pulp.server.managers.content.query.ContentQueryManager.find_by_criteria',
         return_value=[{'_id':'foo'}])
@@ -174,6 +207,7 @@ class BaseUploadTest(base.PulpWebserviceTests):
         super(BaseUploadTest, self).clean()
         Repo.get_collection().remove()
         RepoImporter.get_collection().remove()
+        ContentUploadSession.get_collection().remove()
 
 class UploadsCollectionTests(BaseUploadTest):
 
@@ -213,8 +247,46 @@ class UploadsCollectionTests(BaseUploadTest):
         upload_file = self.upload_manager._upload_file_path(body['upload_id'])
         self.assertTrue(os.path.exists(upload_file))
 
+    def test_post_size(self):
+        # Test
+        status, body = self.post('/v2/content/uploads/', {'size' : 1024})
+
+        # Verify
+        self.assertEqual(201, status)
+        upload_file = self.upload_manager._upload_file_path(body['upload_id'])
+        self.assertEqual(1024, os.path.getsize(upload_file))
+
+    def test_post_invalid_size(self):
+        # Test
+        status, body = self.post('/v2/content/uploads/', {'size' : 'foo'})
+
+        # Verify
+        self.assertEqual(400, status)
+
 class UploadResourceTests(BaseUploadTest):
 
+    def test_get(self):
+        # Setup
+        upload_id = self.upload_manager.initialize_upload(size=10)
+        self.upload_manager.save_data(upload_id, 0, 'abc')
+
+        # Test
+        status, body = self.get('/v2/content/uploads/%s/' % upload_id)
+
+        # Verify
+        self.assertEqual(200, status)
+        self.assertEqual(10, body['size'])
+        self.assertEqual([[0, 3]], body['received'])
+        self.assertEqual(3, body['received_bytes'])
+        self.assertTrue(body['last_activity'] is not None)
+
+    def test_get_missing(self):
+        # Test
+        status, body = self.get('/v2/content/uploads/foo/')
+
+        # Verify
+        self.assertEqual(404, status)
+
     def test_delete(self):
         # Setup
         upload_id = self.upload_manager.initialize_upload()
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public
+# License as published by the Free Software Foundation; either version
+# 2 of the License (GPLv2) or (at your option) any later version.
+# There is NO WARRANTY for this software, express or implied,
+# including the implied warranties of MERCHANTABILITY,
+# NON-INFRINGEMENT, or FITNESS FOR A PARTICULAR PURPOSE. You should
+# have received a copy of GPLv2 along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+
+import datetime
+import unittest
+
+import mock
+
+import base
+
+from pulp.server.auth.credential_cache import CredentialCache
+from pulp.server.db.model.auth import User
+from pulp.server.managers import factory as manager_factory
+from pulp.server.managers.auth.cert.certificate import GMT
+
+# -- test cases ---------------------------------------------------------------
+
+class CredentialCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = CredentialCache(ttl=60, max_size=3)
+
+    def test_key(self):
+        self.assertEqual(self.cache.key('password', 'fred', 'x'), self.cache.key('password', 'fred', 'x'))
+        self.assertEqual(self.cache.key(u'password'), self.cache.key('password'))
+        self.assertNotEqual(self.cache.key('password', 'fred', 'x'), self.cache.key('password', 'fredx'))
+
+        # keys are salted per cache
+        self.assertNotEqual(self.cache.key('password'), CredentialCache().key('password'))
+
+    def test_get_put(self):
+        self.assertEqual(None, self.cache.get('a'))
+        self.cache.put('a', 'fred')
+        self.assertEqual('fred', self.cache.get('a'))
+
+    def test_lru(self):
+        for key in ('a', 'b', 'c'):
+            self.cache.put(key, key)
+        self.cache.get('a')
+        self.cache.put('d', 'd')
+
+        self.assertEqual(3, len(self.cache))
+        self.assertEqual(None, self.cache.get('b'))
+        for key in ('a', 'c', 'd'):
+            self.assertEqual(key, self.cache.get(key))
+
+    @mock.patch('time.time')
+    def test_expiration(self, mock_time):
+        mock_time.return_value = 1000
+        self.cache.put('a', 'fred')
+        self.cache.put('b', 'fred', expires=1010)
+
+        mock_time.return_value = 1010
+        self.assertEqual('fred', self.cache.get('a'))
+        self.assertEqual(None, self.cache.get('b'))
+
+        mock_time.return_value = 1060
+        self.assertEqual(None, self.cache.get('a'))
+        self.assertEqual(0, len(self.cache))
+
+    def test_invalidate(self):
+        self.cache.put('a', 'fred')
+        self.cache.put('b', 'barney')
+        self.cache.put('c', 'fred')
+
+        self.cache.invalidate('fred')
+        self.assertEqual(None, self.cache.get('a'))
+        self.assertEqual(None, self.cache.get('c'))
+        self.assertEqual('barney', self.cache.get('b'))
+
+        self.cache.invalidate()
+        self.assertEqual(0, len(self.cache))
+
+    def test_disabled(self):
+        cache = CredentialCache(ttl=0)
+        self.assertFalse(cache.enabled())
+        cache.put('a', 'fred')
+        self.assertEqual(None, cache.get('a'))
+
+
+class CachedAuthenticationTests(base.PulpServerTests):
+
+    def setUp(self):
+        super(CachedAuthenticationTests, self).setUp()
+        self.user_manager = manager_factory.user_manager()
+        self.auth_manager = manager_factory.authentication_manager()
+        self.user_manager.create_user('fred', 'fred')
+
+        self.cache = CredentialCache(ttl=60)
+        self.patch = mock.patch('pulp.server.managers.auth.authentication.CREDENTIAL_CACHE', self.cache)
+        self.patch.start()
+
+    def tearDown(self):
+        super(CachedAuthenticationTests, self).tearDown()
+        self.patch.stop()
+
+    def clean(self):
+        super(CachedAuthenticationTests, self).clean()
+        User.get_collection().remove()
+
+    def test_password(self):
+        self.assertEqual('fred', self.auth_manager.check_username_password('fred', 'fred'))
+
+        with mock.patch.object(manager_factory, 'password_manager') as mock_password_manager:
+            mock_password_manager.return_value.check_password.return_value = False
+            self.assertEqual('fred', self.auth_manager.check_username_password('fred', 'fred'))
+            self.assertEqual(None, self.auth_manager.check_username_password('fred', 'wrong'))
+            self.assertEqual(1, mock_password_manager.return_value.check_password.call_count)
+
+    def test_password_change(self):
+        self.assertEqual('fred', self.auth_manager.check_username_password('fred', 'fred'))
+
+        with mock.patch('pulp.server.auth.credential_cache.CREDENTIAL_CACHE', self.cache):
+            self.user_manager.update_user('fred', {'password' : 'barney'})
+        self.assertEqual(0, len(self.cache))
+
+        self.assertEqual(None, self.auth_manager.check_username_password('fred', 'fred'))
+        self.assertEqual('fred', self.auth_manager.check_username_password('fred', 'barney'))
+
+    @mock.patch('pulp.server.managers.factory.cert_generation_manager')
+    @mock.patch('pulp.server.managers.factory.certificate_manager')
+    def test_consumer_cert(self, mock_certificate_manager, mock_cert_generation_manager):
+        cert = mock_certificate_manager.return_value
+        cert.subject.return_value = {'CN' : 'consumer-1'}
+        cert.validRange.return_value.end.return_value = datetime.datetime(2000, 1, 1, tzinfo=GMT())
+        mock_cert_generation_manager.return_value.verify_cert.return_value = True
+
+        with mock.patch('time.time') as mock_time:
+            mock_time.return_value = 946684700 # 100 seconds before the cert expires
+            self.assertEqual('consumer-1', self.auth_manager.check_consumer_cert('pem'))
+            self.assertEqual('consumer-1', self.auth_manager.check_consumer_cert('pem'))
+            self.assertEqual(1, mock_certificate_manager.call_count)
+
+            # expired certificates are verified again
+            mock_time.return_value = 946684800
+            self.assertEqual('consumer-1', self.auth_manager.check_consumer_cert('pem'))
+            self.assertEqual(2, mock_certificate_manager.call_count)
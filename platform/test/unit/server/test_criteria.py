@@ -13,6 +13,7 @@
 
 import unittest
 
+from pulp.server.compat import ObjectId
 from pulp.server.db.model import criteria
 from pulp.server import exceptions
 
@@ -259,3 +260,55 @@ class TestValidateFields(unittest.TestCase):
         self.assertRaises(exceptions.InvalidValue, criteria._validate_fields,
             input)
 
+
+
+class TestPage(unittest.TestCase):
+    def test_first_page(self):
+        c = criteria.Criteria(filters={'name': 'a'}, skip=5, fields=['name'])
+        page = c.page(10)
+        self.assertEqual(page.filters, {'name': 'a'})
+        self.assertEqual(page.sort, [['_id', 1]])
+        self.assertEqual(page.limit, 11)
+        self.assertEqual(page.skip, 5)
+        self.assertEqual(page.fields, ['name', '_id'])
+
+    def test_next_page(self):
+        c = criteria.Criteria(filters={'name': 'a'}, skip=5)
+        token = c.page(10).continuation_token({'_id': 'u10', 'name': 'a'})
+        page = c.page(10, token)
+        self.assertEqual(page.filters, {'$and': [{'name': 'a'}, {'_id': {'$gt': 'u10'}}]})
+        self.assertTrue(page.skip is None)
+
+    def test_next_page_sorted(self):
+        c = criteria.Criteria(sort=[('version', -1), ('arch', 1)])
+        token = c.continuation_token({'_id': 'u1', 'version': '2', 'arch': 'noarch'})
+        spec = c.page(10, token).filters
+        self.assertEqual(spec, {'$or': [
+            {'version': None},
+            {'version': {'$lt': '2'}},
+            {'version': '2', 'arch': {'$gt': 'noarch'}},
+            {'version': '2', 'arch': 'noarch', '_id': {'$gt': 'u1'}}]})
+
+    def test_next_page_null_value(self):
+        c = criteria.Criteria(sort=[('arch', 1)])
+        token = c.continuation_token({'_id': 'u1'})
+        spec = c.page(10, token).filters
+        self.assertEqual(spec, {'$or': [
+            {'arch': {'$ne': None}},
+            {'arch': None, '_id': {'$gt': 'u1'}}]})
+
+    def test_token_values(self):
+        # database values survive the round trip through the token
+        unit_id = ObjectId()
+        c = criteria.Criteria()
+        token = c.continuation_token({'_id': unit_id})
+        self.assertEqual(c.page(10, token).filters, {'_id': {'$gt': unit_id}})
+
+    def test_invalid_token(self):
+        c = criteria.Criteria()
+        self.assertRaises(exceptions.InvalidValue, c.page, 10, 'not a token')
+
+    def test_token_for_other_sort(self):
+        token = criteria.Criteria().continuation_token({'_id': 'u1'})
+        c = criteria.Criteria(sort=[('name', 1)])
+        self.assertRaises(exceptions.InvalidValue, c.page, 10, token)
@@ -14,6 +14,8 @@
 
 import logging
 
+from pymongo.errors import DuplicateKeyError
+
 import base
 
 from pulp.server.db import connection
@@ -32,3 +34,48 @@ class TestDatabase(base.PulpServerTests):
 
     def test_database_name(self):
         self.assertEquals(connection._database.name, self.config.get("database", "name"))
+
+    def test_collection_cache(self):
+        collection_1 = connection.get_collection('test_collection_cache')
+        collection_2 = connection.get_collection('test_collection_cache')
+        self.assertTrue(collection_1 is collection_2)
+
+    def test_collection_cache_initialize(self):
+        collection_1 = connection.get_collection('test_collection_cache')
+        connection.initialize()
+        collection_2 = connection.get_collection('test_collection_cache')
+        self.assertFalse(collection_1 is collection_2)
+
+
+class TestBulkOperations(base.PulpServerTests):
+
+    def setUp(self):
+        super(TestBulkOperations, self).setUp()
+        self.collection = connection.get_collection('test_bulk_operations')
+
+    def tearDown(self):
+        super(TestBulkOperations, self).tearDown()
+        self.collection.drop()
+
+    def test_insert_batch(self):
+        docs = [{'key': i} for i in range(25)]
+        ids = self.collection.insert_batch(docs, batch_size=10)
+        self.assertEqual(len(ids), 25)
+        self.assertEqual(self.collection.find().count(), 25)
+
+    def test_insert_batch_empty(self):
+        self.assertEqual(self.collection.insert_batch([]), [])
+
+    def test_upsert_batch(self):
+        self.collection.insert({'key': 1, 'value': 'old'}, safe=True)
+        docs = [{'key': i, 'value': 'new'} for i in range(5)]
+        self.collection.upsert_batch(docs, ('key',), batch_size=2)
+        self.assertEqual(self.collection.find().count(), 5)
+        self.assertEqual(self.collection.find({'value': 'new'}).count(), 5)
+
+    def test_upsert_batch_error(self):
+        self.collection.ensure_index('value', unique=True)
+        self.collection.insert({'key': 0, 'value': 'taken'}, safe=True)
+        # the error on the middle document of the batch is not lost
+        docs = [{'key': 1, 'value': 'a'}, {'key': 2, 'value': 'taken'}, {'key': 3, 'value': 'b'}]
+        self.assertRaises(DuplicateKeyError, self.collection.upsert_batch, docs, ('key',))
@@ -11,10 +11,13 @@
 # have received a copy of GPLv2 along with this software; if not, see
 # http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
 
+import pickle
+
 import base
 
+from pulp.server.compat import Binary
 from pulp.server.dispatch import constants as dispatch_constants
-from pulp.server.dispatch.call import CallReport, CallRequest
+from pulp.server.dispatch.call import CallReport, CallRequest, SERIALIZATION_FORMAT_VERSION
 
 # call test api ----------------------------------------------------------------
 
@@ -138,6 +141,34 @@ class CallRequestTests(base.PulpServerTests):
         self.assertTrue(isinstance(call_request_2, CallRequest))
         self.assertTrue(call_request_2.execution_hooks[key][0] == function)
 
+    def test_serialize_format(self):
+        call_request = CallRequest(function, ['fee'], {'fie': 'foe'})
+        data = call_request.serialize()
+        self.assertEqual(SERIALIZATION_FORMAT_VERSION, data['format_version'])
+        self.assertTrue(isinstance(data['pickled_fields'], Binary))
+        for field in CallRequest.pickled_fields:
+            self.assertFalse(field in data)
+
+    def test_deserialize_legacy_format(self):
+        call_request = CallRequest(function, ['fee'], {'fie': 'foe'})
+        call_request.add_control_hook(dispatch_constants.CALL_CANCEL_CONTROL_HOOK, function)
+        # documents written before the format was versioned
+        data = {'callable_name': call_request.callable_name()}
+        for field in CallRequest.copied_fields:
+            data[field] = getattr(call_request, field)
+        for field in CallRequest.pickled_fields:
+            data[field] = unicode(pickle.dumps(getattr(call_request, field)))
+        call_request_2 = CallRequest.deserialize(data)
+        self.assertEqual(call_request.id, call_request_2.id)
+        self.assertEqual(['fee'], call_request_2.args)
+        self.assertEqual({'fie': 'foe'}, call_request_2.kwargs)
+        self.assertTrue(call_request_2.control_hooks[dispatch_constants.CALL_CANCEL_CONTROL_HOOK] is function)
+
+    def test_deserialize_unknown_format(self):
+        data = CallRequest(function).serialize()
+        data['format_version'] = SERIALIZATION_FORMAT_VERSION + 1
+        self.assertEqual(None, CallRequest.deserialize(data))
+
     def test_call_report_instantiation(self):
         try:
             call_report = CallReport()
@@ -12,6 +12,7 @@
 # http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
 
 import datetime
+import threading
 import traceback
 import unittest
 
@@ -52,6 +53,7 @@ class CoordinatorTests(base.PulpServerTests):
 
     def tearDown(self):
         super(CoordinatorTests, self).tearDown()
+        self.coordinator.call_resource_index.clear()
         self.coordinator = None
         dispatch_factory._task_queue = self._task_queue_factory
         self._task_queue_factory = None
@@ -206,7 +208,7 @@ class CoordinatorCollisionDetectionTests(CoordinatorTests):
 
         call_resources = coordinator.resource_dict_to_call_resources(resources)
         coordinator.set_call_request_id_on_call_resources(task_id, call_resources)
-        self.collection.insert(call_resources, safe=True)
+        self.coordinator.call_resource_index.add(call_resources)
 
         response, blockers, reasons, call_resources = self.coordinator._find_conflicts(resources)
 
@@ -229,7 +231,7 @@ class CoordinatorCollisionDetectionTests(CoordinatorTests):
         }
         existing_task_resources = coordinator.resource_dict_to_call_resources(existing_resources)
         coordinator.set_call_request_id_on_call_resources(task_id, existing_task_resources)
-        self.collection.insert(existing_task_resources, safe=True)
+        self.coordinator.call_resource_index.add(existing_task_resources)
 
         # delete on content unit is postponed by read
 
@@ -276,8 +278,8 @@ class CoordinatorCollisionDetectionTests(CoordinatorTests):
         task_2_resources = coordinator.resource_dict_to_call_resources(bind_2_resources)
         coordinator.set_call_request_id_on_call_resources(call_2_id, task_2_resources)
 
-        self.collection.insert(task_1_resources, safe=True)
-        self.collection.insert(task_2_resources, safe=True)
+        self.coordinator.call_resource_index.add(task_1_resources)
+        self.coordinator.call_resource_index.add(task_2_resources)
 
         # deleting the repository should be postponed by both binds
 
@@ -305,7 +307,7 @@ class CoordinatorCollisionDetectionTests(CoordinatorTests):
         }
         deletion_task_resources = coordinator.resource_dict_to_call_resources(deletion_resources)
         coordinator.set_call_request_id_on_call_resources(task_id, deletion_task_resources)
-        self.collection.insert(deletion_task_resources, safe=True)
+        self.coordinator.call_resource_index.add(deletion_task_resources)
 
         # a cds sync should be rejected by the deletion
 
@@ -324,6 +326,59 @@ class CoordinatorCollisionDetectionTests(CoordinatorTests):
         self.assertTrue(task_id in blockers)
         self.assertTrue(reasons)
 
+# call resource index tests ----------------------------------------------------
+
+def index_dummy_call():
+    pass
+
+
+class CallResourceIndexTests(base.PulpServerTests):
+
+    def setUp(self):
+        super(CallResourceIndexTests, self).setUp()
+        self.index = coordinator.CallResourceIndex()
+
+    def _call_resources(self, call_request_id, resources):
+        call_resources = coordinator.resource_dict_to_call_resources(resources)
+        coordinator.set_call_request_id_on_call_resources(call_request_id, call_resources)
+        return call_resources
+
+    def test_find(self):
+        resources = {dispatch_constants.RESOURCE_REPOSITORY_TYPE: {'repo': dispatch_constants.RESOURCE_READ_OPERATION}}
+        self.index.add(self._call_resources('call', resources))
+        other = {dispatch_constants.RESOURCE_CONSUMER_TYPE: {'repo': dispatch_constants.RESOURCE_READ_OPERATION}}
+
+        found = self.index.find(coordinator.resource_dict_to_call_resources(resources))
+        self.assertEqual(len(found), 1)
+        self.assertEqual(found[0]['call_request_id'], 'call')
+        self.assertEqual(self.index.find(coordinator.resource_dict_to_call_resources(other)), [])
+
+    def test_remove(self):
+        resources = {dispatch_constants.RESOURCE_REPOSITORY_TYPE: {'repo': dispatch_constants.RESOURCE_READ_OPERATION}}
+        self.index.add(self._call_resources('call_1', resources))
+        self.index.add(self._call_resources('call_2', resources))
+
+        self.index.remove('call_1')
+
+        found = self.index.find(coordinator.resource_dict_to_call_resources(resources))
+        self.assertEqual([r['call_request_id'] for r in found], ['call_2'])
+
+    def test_dequeue_callback(self):
+        call_request = call.CallRequest(index_dummy_call)
+        call_request.updates_resource(dispatch_constants.RESOURCE_REPOSITORY_TYPE, 'repo')
+        call_resources = coordinator.resource_dict_to_call_resources(call_request.resources)
+        coordinator.set_call_request_id_on_call_resources(call_request.id, call_resources)
+        coordinator.CALL_RESOURCE_INDEX.add(call_resources)
+
+        coordinator.coordinator_dequeue_callback(call_request, None)
+
+        self.assertEqual(coordinator.CALL_RESOURCE_INDEX.find(call_resources), [])
+
+    def tearDown(self):
+        super(CallResourceIndexTests, self).tearDown()
+        coordinator.CALL_RESOURCE_INDEX.clear()
+        CallResource.get_collection().drop()
+
 # call execution tests ---------------------------------------------------------
 
 def dummy_call(progress, success, failure):
@@ -529,6 +584,7 @@ class CoordinatorFindCallReportsTests(CoordinatorTests):
     def set_task_queue(self, task_list):
         mocked_task_queue = mock.Mock()
         mocked_task_queue.all_tasks = mock.Mock(return_value=task_list)
+        mocked_task_queue.candidate_tasks = mock.Mock(return_value=task_list)
         # this gets cleaned up by the base class tearDown method
         dispatch_factory._task_queue = mock.Mock(return_value=mocked_task_queue)
 
@@ -544,3 +600,46 @@ class CoordinatorFindCallReportsTests(CoordinatorTests):
         self.assertEqual(len(call_report_list), 1)
         self.assertEqual(call_report_list[0].schedule_id, schedule_id)
 
+
+# call report update waiting tests ---------------------------------------------
+
+class CoordinatorWaitForCallReportTests(CoordinatorFindCallReportsTests):
+
+    def setUp(self):
+        super(CoordinatorWaitForCallReportTests, self).setUp()
+        self.coordinator = coordinator.Coordinator(progress_waiters=1, progress_wait_timeout=5)
+        call_request = call.CallRequest(find_dummy_call)
+        self.task = Task(call_request)
+        self.set_task_queue([self.task])
+
+    def test_missing_call(self):
+        self.set_task_queue([])
+        self.assertEqual(self.coordinator.wait_for_call_report('foo', 1, 1), (None, None))
+
+    def test_no_version(self):
+        call_report, version = self.coordinator.wait_for_call_report(self.task.call_request.id, None, 1)
+        self.assertTrue(call_report is self.task.call_report)
+        self.assertEqual(version, self.task.version)
+
+    def test_wait_for_progress(self):
+        version = self.task.version
+        timer = threading.Timer(0.01, self.task._report_progress, [{'step': 1}])
+        timer.start()
+        call_report, new_version = self.coordinator.wait_for_call_report(self.task.call_request.id, version, 5)
+        self.assertEqual(new_version, version + 1)
+        self.assertEqual(call_report.progress, {'step': 1})
+        timer.join()
+
+    def test_wait_timeout(self):
+        version = self.task.version
+        call_report, new_version = self.coordinator.wait_for_call_report(self.task.call_request.id, version, 0.01)
+        self.assertEqual(new_version, version)
+
+    def test_too_many_waiters(self):
+        # the only waiter slot is taken, so the call report is returned
+        # without waiting on the task
+        self.coordinator.progress_waiters.acquire()
+        self.task.wait_for_update = mock.Mock()
+        call_report, version = self.coordinator.wait_for_call_report(self.task.call_request.id, self.task.version, 5)
+        self.assertFalse(self.task.wait_for_update.called)
+        self.coordinator.progress_waiters.release()
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public
+# License as published by the Free Software Foundation; either version
+# 2 of the License (GPLv2) or (at your option) any later version.
+# There is NO WARRANTY for this software, express or implied,
+# including the implied warranties of MERCHANTABILITY,
+# NON-INFRINGEMENT, or FITNESS FOR A PARTICULAR PURPOSE. You should
+# have received a copy of GPLv2 along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+
+import threading
+import time
+import unittest
+
+import mock
+
+import base
+
+from pulp.server.dispatch.executor import ExecutorRouter, ThreadPool, parse_pool_config
+
+# test data --------------------------------------------------------------------
+
+def call():
+    pass
+
+
+def call_request(name='call', tags=()):
+    request = mock.Mock()
+    request.callable_name.return_value = name
+    request.tags = list(tags)
+    return request
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.time() + timeout
+    while not predicate():
+        if time.time() > deadline:
+            raise AssertionError('timed out')
+        time.sleep(0.01)
+
+# thread pool tests ------------------------------------------------------------
+
+class ThreadPoolTests(unittest.TestCase):
+
+    def test_run(self):
+        pool = ThreadPool('test', 2)
+        done = threading.Event()
+        pool.submit(done.set)
+        done.wait(5)
+        self.assertTrue(done.isSet())
+
+    def test_worker_reuse(self):
+        pool = ThreadPool('test', 4)
+        threads = []
+        for i in range(10):
+            pool.submit(lambda: threads.append(threading.currentThread()))
+            wait_for(lambda: pool.metrics()['completed'] == i + 1)
+        self.assertEqual(1, len(set(threads)))
+        self.assertEqual(1, pool.metrics()['workers'])
+
+    def test_bounded(self):
+        pool = ThreadPool('test', 2)
+        release = threading.Event()
+        for i in range(5):
+            pool.submit(release.wait)
+        wait_for(lambda: pool.metrics()['busy_workers'] == 2)
+
+        metrics = pool.metrics()
+        self.assertEqual(2, metrics['workers'])
+        self.assertEqual(3, metrics['queue_depth'])
+        self.assertEqual(1.0, metrics['utilization'])
+
+        release.set()
+        wait_for(lambda: pool.metrics()['completed'] == 5)
+        self.assertEqual(0, pool.metrics()['queue_depth'])
+
+    def test_has_capacity(self):
+        pool = ThreadPool('test', 2)
+        release = threading.Event()
+        self.assertTrue(pool.has_capacity())
+        pool.submit(release.wait)
+        self.assertTrue(pool.has_capacity())
+        pool.submit(release.wait)
+        self.assertFalse(pool.has_capacity())
+        release.set()
+        wait_for(lambda: pool.metrics()['completed'] == 2)
+        self.assertTrue(pool.has_capacity())
+
+    def test_capacity_callback(self):
+        pool = ThreadPool('test', 1)
+        capacity = []
+        pool.capacity_callback = lambda: capacity.append(pool.has_capacity())
+        pool.submit(call)
+        wait_for(lambda: capacity)
+        self.assertEqual([True], capacity)
+
+    def test_exception(self):
+        pool = ThreadPool('test', 1)
+        def error():
+            raise Exception()
+        pool.submit(error)
+        done = threading.Event()
+        pool.submit(done.set)
+        done.wait(5)
+        self.assertTrue(done.isSet())
+
+    def test_idle_timeout(self):
+        pool = ThreadPool('test', 1, idle_timeout=0.05)
+        pool.submit(call)
+        wait_for(lambda: pool.metrics()['workers'] == 0)
+        done = threading.Event()
+        pool.submit(done.set)
+        done.wait(5)
+        self.assertTrue(done.isSet())
+
+# router tests -----------------------------------------------------------------
+
+class ExecutorRouterTests(unittest.TestCase):
+
+    def setUp(self):
+        self.default = mock.Mock()
+        self.router = ExecutorRouter(self.default)
+
+    def test_default(self):
+        self.assertTrue(self.router.executor(call_request()) is self.default)
+
+    def test_call_name(self):
+        executor = mock.Mock()
+        self.router.add(executor, call_names=['call'])
+        self.assertTrue(self.router.executor(call_request()) is executor)
+        self.assertTrue(self.router.executor(call_request('other_call')) is self.default)
+
+    def test_tags(self):
+        sync_executor = mock.Mock()
+        publish_executor = mock.Mock()
+        self.router.add(sync_executor, tags=['sync'])
+        self.router.add(publish_executor, tags=['publish'])
+        self.assertTrue(self.router.executor(call_request(tags=['publish'])) is publish_executor)
+        self.assertTrue(self.router.executor(call_request(tags=['publish', 'sync'])) is sync_executor)
+
+    def test_call_name_precedence(self):
+        tag_executor = mock.Mock()
+        name_executor = mock.Mock()
+        self.router.add(tag_executor, tags=['sync'])
+        self.router.add(name_executor, call_names=['call'])
+        self.assertTrue(self.router.executor(call_request(tags=['sync'])) is name_executor)
+
+    def test_metrics(self):
+        executor = mock.Mock()
+        self.router.add(executor, tags=['a', 'b'])
+        self.assertEqual([self.default, executor], self.router.executors())
+        self.assertEqual(2, len(self.router.metrics()))
+
+
+class PoolConfigTests(unittest.TestCase):
+
+    def test_parse(self):
+        self.assertEqual([], parse_pool_config(''))
+        self.assertEqual([('pulp:action:publish', 2), ('pulp:action:sync', 4)],
+                         parse_pool_config('pulp:action:publish=2, pulp:action:sync=4'))
+        self.assertRaises(ValueError, parse_pool_config, 'pulp:action:sync')
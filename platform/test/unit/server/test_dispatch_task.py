@@ -12,6 +12,7 @@
 # http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
 
 import datetime
+import threading
 import traceback
 import types
 
@@ -134,6 +135,13 @@ class TaskTests(base.PulpServerTests):
         self.assertTrue(self.call_report.state is dispatch_constants.CALL_CANCELED_STATE,
                         self.call_report.state)
 
+    def test_run_canceled(self):
+        self.task.cancel()
+        self.task._run()
+        self.assertEqual(self.call_request.call.call_count, 0)
+        self.assertTrue(self.call_report.state is dispatch_constants.CALL_CANCELED_STATE,
+                        self.call_report.state)
+
     def test_finish_execution_hook(self):
         hooks = [mock.Mock(), mock.Mock()]
         for h in hooks:
@@ -152,6 +160,50 @@ class TaskTests(base.PulpServerTests):
         for h in hooks:
             self.assertTrue(h.call_count == 1)
 
+# task state waiting tests -----------------------------------------------------
+
+class TaskStateWaitTests(base.PulpServerTests):
+
+    def setUp(self):
+        super(TaskStateWaitTests, self).setUp()
+        self.task = Task(CallRequest(call_without_callbacks))
+
+    def tearDown(self):
+        super(TaskStateWaitTests, self).tearDown()
+        self.task = None
+
+    def test_wait_for_current_state(self):
+        self.assertTrue(self.task.wait_for_state([dispatch_constants.CALL_WAITING_STATE]))
+
+    def test_wait_for_state_timeout(self):
+        timeout = datetime.timedelta(seconds=0.01)
+        self.assertFalse(self.task.wait_for_state(dispatch_constants.CALL_COMPLETE_STATES, timeout))
+
+    def test_wait_for_state_transition(self):
+        thread = threading.Thread(target=self.task._run)
+        thread.start()
+        timeout = datetime.timedelta(seconds=5)
+        self.assertTrue(self.task.wait_for_state(dispatch_constants.CALL_COMPLETE_STATES, timeout))
+        self.assertEqual(self.task.call_report.state, dispatch_constants.CALL_FINISHED_STATE)
+        thread.join()
+
+    def test_wait_for_update_timeout(self):
+        timeout = datetime.timedelta(seconds=0.01)
+        self.assertFalse(self.task.wait_for_update(self.task.version, timeout))
+
+    def test_wait_for_stale_version(self):
+        self.assertTrue(self.task.wait_for_update(self.task.version - 1))
+
+    def test_wait_for_progress_report(self):
+        version = self.task.version
+        timer = threading.Timer(0.01, self.task._report_progress, [{'step': 1}])
+        timer.start()
+        timeout = datetime.timedelta(seconds=5)
+        self.assertTrue(self.task.wait_for_update(version, timeout))
+        self.assertEqual(self.task.version, version + 1)
+        self.assertEqual(self.task.call_report.progress, {'step': 1})
+        timer.join()
+
 # run failure testing ----------------------------------------------------------
 
 class FailTests(base.PulpServerTests):
@@ -11,6 +11,7 @@
 # have received a copy of GPLv2 along with this software; if not, see
 # http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
 
+import datetime
 import mock
 import os
 import sys
@@ -43,6 +44,13 @@ def call_with_result(*args, **kwargs):
 def error(*args, **kwargs):
     raise Exception()
 
+BLOCKING_CALL_RELEASE = threading.Event()
+BLOCKING_CALL_COUNT = []
+
+def blocking_call(*args, **kwargs):
+    BLOCKING_CALL_COUNT.append(1)
+    BLOCKING_CALL_RELEASE.wait(5)
+
 # instantiation testing --------------------------------------------------------
 
 class TaskQueueInstantiationTests(base.PulpServerTests):
@@ -168,6 +176,19 @@ class TaskQueueControlFlowTests(TaskQueueTests):
         queued_call = collection.find({'_id': task.queued_call_id})
         self.assertFalse(queued_call is None)
 
+    def test_batch_enqueue(self):
+        tasks = [self.gen_task() for i in range(3)]
+        tasks[1].call_request.dependencies[tasks[0].call_request.id] = dispatch_constants.CALL_COMPLETE_STATES
+        self.queue.batch_enqueue(tasks)
+        collection = QueuedCall.get_collection()
+        for task in tasks:
+            self.assertTrue(task in self.queue.waiting_tasks())
+            queued_call = collection.find_one({'_id': task.queued_call_id})
+            call_request = CallRequest.deserialize(queued_call['serialized_call_request'])
+            self.assertEqual(task.call_request.id, call_request.id)
+        # dependencies on tasks earlier in the batch are kept
+        self.assertTrue(tasks[0].call_request.id in tasks[1].call_request.dependencies)
+
     def test_multi_enqueue(self):
         task_1 = self.gen_task()
         task_2 = self.gen_task()
@@ -222,6 +243,33 @@ class TaskQueueControlFlowTests(TaskQueueTests):
         self.assertTrue(task_1 in task_list)
         self.assertFalse(task_2 in task_list)
 
+    def test_get_ready_tasks_weight(self):
+        task_1 = self.gen_task()
+        task_2 = self.gen_task()
+        task_2.call_request.weight = 2
+        task_3 = self.gen_task()
+        task_3.call_request.weight = 0
+        for t in (task_1, task_2, task_3):
+            self.queue.enqueue(t)
+        task_list = self.queue._get_ready_tasks()
+        # task_2 is too heavy to run with task_1, but task_3 is weightless
+        self.assertEqual(task_list, [task_1, task_3])
+
+    def test_get_ready_tasks_unblocked(self):
+        task_1 = self.gen_async_task()
+        task_2 = self.gen_task()
+        task_3 = self.gen_task()
+        task_2.call_request.dependencies[task_1.call_request.id] = dispatch_constants.CALL_COMPLETE_STATES
+        for t in (task_1, task_2, task_3):
+            self.queue.enqueue(t)
+        self.assertEqual(self.queue._get_ready_tasks(), [task_1, task_3])
+        self.queue._run_ready_task(task_1)
+        self.wait_for_task_to_start(task_1)
+        task_1._succeeded()
+        self.wait_for_task_to_complete(task_1)
+        # task_2 keeps its place in line ahead of task_3
+        self.assertEqual(self.queue._get_ready_tasks(), [task_2, task_3])
+
     def test_run_ready_task(self):
         task = self.gen_async_task()
         self.queue.enqueue(task)
@@ -284,6 +332,54 @@ class TaskQueueControlFlowTests(TaskQueueTests):
         self.wait_for_task_to_complete(task_2)
         self.assertEqual(task_2.call_request_exit_state, dispatch_constants.CALL_SKIPPED_STATE)
 
+    def test_run_ready_task_executor(self):
+        executor = mock.Mock()
+        self.queue.add_executor(executor, tags=['executor-test'])
+        task = self.gen_task(call_with_result)
+        task.call_request.tags.append('executor-test')
+        self.queue.enqueue(task)
+        self.queue._run_ready_task(task)
+        executor.submit.assert_called_once_with(task._run)
+        # the default pool is not used
+        self.assertEqual(0, self.queue.executor_metrics()[0]['submitted'])
+
+    def test_run_ready_task_default_pool(self):
+        tasks = [self.gen_task(call_with_result) for i in range(4)]
+        for task in tasks:
+            task.call_request.weight = 0
+            self.queue.enqueue(task)
+            self.queue._run_ready_task(task)
+        for task in tasks:
+            self.wait_for_task_to_complete(task)
+        metrics = self.queue.executor_metrics()[0]
+        self.assertEqual(4, metrics['submitted'])
+        self.assertTrue(metrics['workers'] <= metrics['max_workers'])
+
+    def test_run_ready_task_saturated_pool(self):
+        BLOCKING_CALL_RELEASE.clear()
+        del BLOCKING_CALL_COUNT[:]
+        max_workers = self.queue.executor_metrics()[0]['max_workers']
+        tasks = [self.gen_task(blocking_call) for i in range(max_workers + 1)]
+        for task in tasks:
+            task.call_request.weight = 0
+            self.queue.enqueue(task)
+        try:
+            for task in tasks[:-1]:
+                self.assertTrue(self.queue._run_ready_task(task))
+            # the task queued behind the saturated pool is not started
+            self.assertFalse(self.queue._run_ready_task(tasks[-1]))
+            self.assertEqual(tasks[-1].call_report.state, dispatch_constants.CALL_WAITING_STATE)
+            self.assertTrue(tasks[-1] in self.queue.waiting_tasks())
+            # and can be canceled without a cancel control hook
+            self.assertTrue(self.queue.cancel(tasks[-1]))
+            self.assertEqual(tasks[-1].call_report.state, dispatch_constants.CALL_CANCELED_STATE)
+        finally:
+            BLOCKING_CALL_RELEASE.set()
+        for task in tasks[:-1]:
+            self.wait_for_task_to_complete(task)
+        self.assertEqual(max_workers, len(BLOCKING_CALL_COUNT))
+        self.assertEqual(0, self.queue.executor_metrics()[0]['queue_depth'])
+
     def test_task_dequeue(self):
         task = self.gen_task()
         self.queue.enqueue(task)
@@ -321,6 +417,18 @@ class TaskQueueQueryTests(TaskQueueTests):
         task_2 = self.queue.get(task_1.call_request.id)
         self.assertTrue(task_2 is task_1)
 
+    def test_get_completed(self):
+        task_1 = self.gen_task(call_with_result)
+        self.queue.enqueue(task_1)
+        self.queue._run_ready_task(task_1)
+        self.wait_for_task_to_complete(task_1)
+        task_2 = self.queue.get(task_1.call_request.id)
+        self.assertTrue(task_2 is task_1)
+        self.assertTrue(task_1 in self.queue.completed_tasks())
+
+    def test_get_missing(self):
+        self.assertTrue(self.queue.get('missing') is None)
+
     def test_find_single_tag(self):
         tag = 'TAG'
         task = self.gen_task()
@@ -353,3 +461,53 @@ class TaskQueueQueryTests(TaskQueueTests):
         self.assertTrue(task_2 in task_list, str(task_2.call_request.tags))
         self.assertFalse(task_3 in task_list)
 
+    def test_candidate_tasks_by_index(self):
+        task_1 = self.gen_task()
+        task_1.call_request.group_id = 'group'
+        task_1.call_request.tags.append('tag')
+        task_2 = self.gen_task(call_with_result)
+        task_2.call_request.group_id = 'group'
+        task_2.call_request.resources = {'repository': {'repo': dispatch_constants.RESOURCE_READ_OPERATION}}
+        task_3 = self.gen_task()
+        for t in (task_1, task_2, task_3):
+            self.queue.enqueue(t)
+        self.assertEqual(self.queue.candidate_tasks({}), [task_1, task_2, task_3])
+        self.assertEqual(self.queue.candidate_tasks({'call_request_group_id': 'group'}), [task_1, task_2])
+        self.assertEqual(self.queue.candidate_tasks({'call_request_group_id': 'group', 'tags': ['tag']}), [task_1])
+        self.assertEqual(self.queue.candidate_tasks({'resources': {'repository': ['repo']}}), [task_2])
+        self.assertEqual(self.queue.candidate_tasks({'callable_name': 'call_with_result'}), [task_2])
+        self.assertEqual(self.queue.candidate_tasks({'call_request_id': task_3.call_request.id}), [task_3])
+        self.assertEqual(self.queue.candidate_tasks({'call_request_id': 'missing'}), [])
+        self.assertEqual(self.queue.candidate_tasks({'tags': ['missing']}), [])
+
+    def test_candidate_tasks_by_state(self):
+        task_1 = self.gen_task(call_with_result)
+        task_2 = self.gen_task()
+        for t in (task_1, task_2):
+            self.queue.enqueue(t)
+        self.queue._run_ready_task(task_1)
+        self.wait_for_task_to_complete(task_1)
+        # completed tasks come first
+        self.assertEqual(self.queue.candidate_tasks({}), [task_1, task_2])
+        self.assertEqual(self.queue.candidate_tasks({'state': dispatch_constants.CALL_FINISHED_STATE}), [task_1])
+        self.assertEqual(self.queue.candidate_tasks({'state': dispatch_constants.CALL_WAITING_STATE}), [task_2])
+        self.assertEqual(self.queue.candidate_tasks({'state': dispatch_constants.CALL_RUNNING_STATE}), [])
+
+    def test_candidate_tasks_dequeued(self):
+        task = self.gen_task()
+        task.call_request.tags.append('tag')
+        self.queue.enqueue(task)
+        self.queue.dequeue(task)
+        self.assertEqual(self.queue.candidate_tasks({'tags': ['tag']}), [])
+
+    def test_candidate_tasks_purged(self):
+        task = self.gen_task()
+        task.call_request.tags.append('tag')
+        self.queue.enqueue(task)
+        self.queue._run_ready_task(task)
+        self.wait_for_task_to_complete(task)
+        self.assertEqual(self.queue.candidate_tasks({'tags': ['tag']}), [task])
+        self.queue.completed_task_cache_life = datetime.timedelta(seconds=0)
+        self.queue._purge_completed_task_cache()
+        self.assertEqual(self.queue.candidate_tasks({'tags': ['tag']}), [])
+
@@ -12,8 +12,8 @@
 # http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
 
 import smtplib
+import time
 import unittest
-import dummy_threading
 try:
     from email.parser import Parser
 except ImportError:
@@ -24,17 +24,32 @@ import mock
 
 from pulp.server.compat import json
 from pulp.server.config import config
-from pulp.server.event import data, mail
+from pulp.server.event import data, delivery, listeners, mail
 from pulp.server.managers import factory
 
 
-class TestSendEmail(unittest.TestCase):
+def wait_for_delivery(count, timeout=2):
+    # delivery queue workers send the email in their own thread
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if sum(m['delivered'] + m['failed'] for m in delivery.metrics()) >= count:
+            return
+        time.sleep(.01)
+
+
+class TestSMTPDestination(unittest.TestCase):
+    def setUp(self):
+        self.destination = mail.SMTPDestination(config.get('email', 'host'),
+                                                config.getint('email', 'port'))
+
     @mock.patch('smtplib.SMTP')
     def test_basic(self, mock_smtp):
         # send a message
-        mail._send_email('hello', 'stuff', 'someone@some.domain')
+        messages = [('hello', 'stuff', 'someone@some.domain')]
+        self.destination.deliver(messages)
         mock_smtp.assert_called_once_with(host=config.get('email', 'host'),
             port=config.getint('email', 'port'))
+        self.assertEqual(messages, [])
 
         # verify
         mock_sendmail = mock_smtp.return_value.sendmail
@@ -50,19 +65,37 @@ class TestSendEmail(unittest.TestCase):
         self.assertEqual(message.get('From', None), config.get('email', 'from'))
         self.assertEqual(message.get('To', None), 'someone@some.domain')
 
+        # the session is reused until the destination is closed
+        self.destination.deliver([('hello', 'stuff', 'someone@some.domain')])
+        self.assertEqual(mock_smtp.call_count, 1)
+        self.destination.close()
+        self.assertTrue(mock_smtp.return_value.quit.called)
+
     @mock.patch('smtplib.SMTP')
-    @mock.patch('logging.Logger.error')
-    def test_connect_failure(self, mock_error, mock_smtp):
+    def test_connect_failure(self, mock_smtp):
+        # raised so that the delivery queue retries the email
         mock_smtp.side_effect = smtplib.SMTPConnectError(123, 'aww crap')
-        mail._send_email('hello', 'stuff', 'someone@some.domain')
-        self.assertTrue(mock_error.called)
+        messages = [('hello', 'stuff', 'someone@some.domain')]
+        self.assertRaises(smtplib.SMTPConnectError, self.destination.deliver, messages)
+        self.assertEqual(len(messages), 1)
+
+    @mock.patch('smtplib.SMTP')
+    def test_disconnected(self, mock_smtp):
+        mock_smtp.return_value.sendmail.side_effect = smtplib.SMTPServerDisconnected()
+        messages = [('hello', 'stuff', 'someone@some.domain')]
+        self.assertRaises(smtplib.SMTPServerDisconnected, self.destination.deliver, messages)
+        self.assertEqual(len(messages), 1)
+        self.assertTrue(self.destination.connection is None)
 
     @mock.patch('smtplib.SMTP')
     @mock.patch('logging.Logger.error')
     def test_send_failure(self, mock_error, mock_smtp):
         mock_smtp.return_value.sendmail.side_effect = smtplib.SMTPRecipientsRefused(['someone@some.domain'])
-        mail._send_email('hello', 'stuff', 'someone@some.domain')
+        messages = [('hello', 'stuff', 'someone@some.domain')]
+        self.destination.deliver(messages)
         self.assertTrue(mock_error.called)
+        # only the email that caused the error fails
+        self.assertEqual(messages, [])
 
 
 class TestHandleEvent(unittest.TestCase):
@@ -74,25 +107,26 @@ class TestHandleEvent(unittest.TestCase):
         self.event = mock.MagicMock()
         self.event.payload = 'stuff'
         self.event.data.return_value = self.event.payload
+        delivery.reset()
 
-    # don't actually spawn a thread
-    @mock.patch('threading.Thread', new=dummy_threading.Thread)
     @mock.patch('ConfigParser.SafeConfigParser.getboolean', return_value=False)
     @mock.patch('smtplib.SMTP')
     def test_email_disabled(self, mock_smtp, mock_getbool):
         mail.handle_event(self.notifier_config, self.event)
         self.assertFalse(mock_smtp.called)
+        self.assertEqual(delivery.metrics(), [])
 
-    # don't actually spawn a thread
-    @mock.patch('threading.Thread', new=dummy_threading.Thread)
     @mock.patch('ConfigParser.SafeConfigParser.getboolean', return_value=True)
     @mock.patch('smtplib.SMTP')
     def test_email_enabled(self, mock_smtp, mock_getbool):
         mail.handle_event(self.notifier_config, self.event)
+        wait_for_delivery(2)
 
         #verify
-        self.assertEqual(mock_smtp.call_count, 2)
+        # both emails are sent over the same connection
+        self.assertEqual(mock_smtp.call_count, 1)
         mock_sendmail = mock_smtp.return_value.sendmail
+        self.assertEqual(mock_sendmail.call_count, 2)
         self.assertEqual(mock_sendmail.call_args[0][0],
             config.get('email', 'from'))
         self.assertTrue(mock_sendmail.call_args[0][1] in self.notifier_config['addresses'])
@@ -118,10 +152,13 @@ class TestSystem(unittest.TestCase):
             'event_types' : data.TYPE_REPO_SYNC_FINISHED,
             'notifier_config' : self.notifier_config,
         }
+        delivery.reset()
+        listeners.invalidate()
+
+    def tearDown(self):
+        listeners.invalidate()
 
-    # don't actually spawn a thread
-    @mock.patch('threading.Thread', new=dummy_threading.Thread)
-    # mock qpid, because it freaks out over dummy_threading
+    # mock qpid
     @mock.patch('pulp.server.managers.event.remote.TopicPublishManager')
     # don't actually get anything from the dispatch system
     @mock.patch('pulp.server.event.data.Event._get_call_report', return_value=None)
@@ -137,8 +174,9 @@ class TestSystem(unittest.TestCase):
         event = data.Event(data.TYPE_REPO_SYNC_FINISHED, 'stuff')
         factory.initialize()
         factory.event_fire_manager()._do_fire(event)
+        wait_for_delivery(2)
 
         # verify that the mail event handler was called and processed something
-        self.assertTrue(mock_smtp.return_value.sendmail.call_count, 2)
+        self.assertEqual(mock_smtp.return_value.sendmail.call_count, 2)
 
 
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public
+# License as published by the Free Software Foundation; either version
+# 2 of the License (GPLv2) or (at your option) any later version.
+# There is NO WARRANTY for this software, express or implied,
+# including the implied warranties of MERCHANTABILITY,
+# NON-INFRINGEMENT, or FITNESS FOR A PARTICULAR PURPOSE. You should
+# have received a copy of GPLv2 along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+
+import threading
+import time
+import unittest
+
+import mock
+
+import base # sets up the path
+
+from pulp.server.event import delivery, listeners
+
+
+class FakeDestination(object):
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.batches = []
+        self.closed = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def deliver(self, messages):
+        self.release.wait()
+        if self.failures:
+            self.failures -= 1
+            raise IOError('unreachable')
+        self.batches.append(list(messages))
+        del messages[:]
+
+    def close(self):
+        self.closed += 1
+
+
+def wait_for(queue, count, timeout=2):
+    # polls without time.sleep, which some tests mock
+    poll = threading.Event()
+    for i in range(int(timeout * 100)):
+        metrics = queue.metrics()
+        if metrics['delivered'] + metrics['failed'] >= count:
+            return metrics
+        poll.wait(.01)
+    return queue.metrics()
+
+
+class DeliveryQueueTests(unittest.TestCase):
+
+    def test_deliver(self):
+        destination = FakeDestination()
+        queue = delivery.DeliveryQueue('test', destination)
+        queue.put('m1')
+        metrics = wait_for(queue, 1)
+        self.assertEqual(destination.batches, [['m1']])
+        self.assertEqual(metrics['delivered'], 1)
+        self.assertEqual(metrics['queue_depth'], 0)
+        self.assertTrue(metrics['max_latency'] >= metrics['average_latency'] >= 0)
+
+    def test_batching(self):
+        destination = FakeDestination()
+        destination.release.clear()
+        queue = delivery.DeliveryQueue('test', destination, batch_size=3)
+        # the first message is taken by the worker, the rest queue up
+        queue.put(0)
+        time.sleep(.1)
+        for i in range(1, 6):
+            queue.put(i)
+        self.assertEqual(queue.metrics()['queue_depth'], 5)
+        destination.release.set()
+        wait_for(queue, 6)
+        self.assertEqual(destination.batches, [[0], [1, 2, 3], [4, 5]])
+
+    def test_full_queue_drops_oldest(self):
+        destination = FakeDestination()
+        destination.release.clear()
+        queue = delivery.DeliveryQueue('test', destination, max_size=2)
+        queue.put(0)
+        time.sleep(.1)
+        for i in range(1, 4):
+            queue.put(i)
+        destination.release.set()
+        metrics = wait_for(queue, 3)
+        self.assertEqual(metrics['dropped'], 1)
+        self.assertEqual(destination.batches, [[0], [2, 3]])
+
+    @mock.patch('time.sleep')
+    def test_retry_backoff(self, mock_sleep):
+        destination = FakeDestination(failures=2)
+        queue = delivery.DeliveryQueue('test', destination, retry_delay=1)
+        queue.put('m1')
+        metrics = wait_for(queue, 1)
+        self.assertEqual(destination.batches, [['m1']])
+        self.assertEqual(metrics['retries'], 2)
+        self.assertEqual(metrics['failed'], 0)
+        self.assertEqual([c[0][0] for c in mock_sleep.call_args_list], [1, 2])
+        # the destination is reset after each failure
+        self.assertEqual(destination.closed, 2)
+
+    @mock.patch('time.sleep')
+    def test_retry_gives_up(self, mock_sleep):
+        destination = FakeDestination(failures=10)
+        queue = delivery.DeliveryQueue('test', destination, max_retries=2)
+        queue.put('m1')
+        metrics = wait_for(queue, 1)
+        self.assertEqual(destination.batches, [])
+        self.assertEqual(metrics['retries'], 2)
+        self.assertEqual(metrics['failed'], 1)
+        self.assertEqual(metrics['delivered'], 0)
+
+    def test_idle_worker_closes_destination(self):
+        destination = FakeDestination()
+        queue = delivery.DeliveryQueue('test', destination, idle_timeout=.05)
+        queue.put('m1')
+        wait_for(queue, 1)
+        time.sleep(.2)
+        self.assertEqual(destination.closed, 1)
+        # a new worker is started for later messages
+        queue.put('m2')
+        wait_for(queue, 2)
+        self.assertEqual(destination.batches, [['m1'], ['m2']])
+
+    def test_get_queue(self):
+        delivery.reset()
+        factory = mock.Mock(return_value=FakeDestination())
+        queue = delivery.get_queue('a', factory)
+        self.assertTrue(delivery.get_queue('a', factory) is queue)
+        self.assertEqual(factory.call_count, 1)
+        self.assertEqual([m['name'] for m in delivery.metrics()], ['a'])
+        delivery.reset()
+        self.assertEqual(delivery.metrics(), [])
+
+
+class ListenerCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.docs = [{'_id': 1, 'event_types': ['a', 'b']},
+                     {'_id': 2, 'event_types': ['*']},
+                     {'_id': 3, 'event_types': 'c'}]
+        self.cache = listeners.ListenerCache(ttl=60)
+
+    @mock.patch('pulp.server.db.model.event.EventListener.get_collection')
+    def test_find(self, mock_get_collection):
+        mock_get_collection.return_value.find.return_value = self.docs
+        self.assertEqual([l['_id'] for l in self.cache.find('a')], [1, 2])
+        self.assertEqual([l['_id'] for l in self.cache.find('c')], [2, 3])
+        self.assertEqual([l['_id'] for l in self.cache.find('d')], [2])
+        self.assertEqual(mock_get_collection.return_value.find.call_count, 1)
+
+    @mock.patch('pulp.server.db.model.event.EventListener.get_collection')
+    def test_invalidate(self, mock_get_collection):
+        mock_get_collection.return_value.find.return_value = self.docs
+        self.cache.find('a')
+        self.cache.invalidate()
+        mock_get_collection.return_value.find.return_value = self.docs[:1]
+        self.assertEqual([l['_id'] for l in self.cache.find('a')], [1])
+        self.assertEqual(mock_get_collection.return_value.find.call_count, 2)
+
+    @mock.patch('time.time')
+    @mock.patch('pulp.server.db.model.event.EventListener.get_collection')
+    def test_ttl(self, mock_get_collection, mock_time):
+        mock_get_collection.return_value.find.return_value = self.docs
+        mock_time.return_value = 1000
+        self.cache.find('a')
+        mock_time.return_value = 1030
+        self.cache.find('a')
+        self.assertEqual(mock_get_collection.return_value.find.call_count, 1)
+        mock_time.return_value = 1061
+        self.cache.find('a')
+        self.assertEqual(mock_get_collection.return_value.find.call_count, 2)
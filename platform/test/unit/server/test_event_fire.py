@@ -15,7 +15,7 @@ import base
 import mock
 
 from pulp.server.db.model.event import EventListener
-from pulp.server.event import notifiers
+from pulp.server.event import listeners, notifiers
 from pulp.server.event import data as event_data
 from pulp.server.managers import factory as manager_factory
 
@@ -32,6 +32,7 @@ class EventFireManagerTests(base.PulpAsyncServerTests):
         super(EventFireManagerTests, self).tearDown()
 
         EventListener.get_collection().remove()
+        listeners.invalidate()
         notifiers.reset()
 
     # -- plumbing tests -------------------------------------------------------
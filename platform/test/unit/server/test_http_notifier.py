@@ -13,10 +13,11 @@
 
 import httplib
 import mock
+import socket
 import time
 from pulp.server.compat import json
 
-from pulp.server.event import http
+from pulp.server.event import delivery, http
 from pulp.server.event.data import Event
 
 import base
@@ -24,6 +25,10 @@ import base
 
 class TestHTTPNotifierTests(base.PulpAsyncServerTests):
 
+    def setUp(self):
+        super(TestHTTPNotifierTests, self).setUp()
+        delivery.reset()
+
     @mock.patch('pulp.server.event.http._create_connection')
     def test_handle_event(self, mock_create):
         # Setup
@@ -45,7 +50,7 @@ class TestHTTPNotifierTests(base.PulpAsyncServerTests):
 
         # Test
         http.handle_event(notifier_config, event)
-        time.sleep(.5) # handle works in a thread so give it a bit to finish
+        time.sleep(.5) # delivery works in a thread so give it a bit to finish
 
         # Verify
         self.assertEqual(1, mock_create.call_count)
@@ -113,3 +118,87 @@ class TestHTTPNotifierTests(base.PulpAsyncServerTests):
         # Test HTTP
         conn = http._create_connection('http', 'foo')
         self.assertTrue(isinstance(conn, httplib.HTTPConnection))
+        self.assertEqual(conn.timeout, http.DEFAULT_TIMEOUT)
+
+    def test_destination_reuses_connection(self):
+        # Setup
+        mock_connection = mock.Mock()
+        mock_connection.getresponse.return_value.status = httplib.OK
+        mock_connection.getresponse.return_value.will_close = False
+
+        destination = http.HTTPDestination('https:', 'localhost')
+        messages = [('/api/', {}, 'body-1'), ('/api/', {}, 'body-2')]
+
+        # Test
+        with mock.patch('pulp.server.event.http._create_connection') as mock_create:
+            mock_create.return_value = mock_connection
+            destination.deliver(messages)
+
+        # Verify
+        self.assertEqual(messages, [])
+        self.assertEqual(1, mock_create.call_count)
+        self.assertEqual(2, mock_connection.request.call_count)
+        self.assertEqual(2, mock_connection.getresponse.return_value.read.call_count)
+
+        destination.close()
+        self.assertEqual(1, mock_connection.close.call_count)
+        self.assertTrue(destination.connection is None)
+
+    def test_destination_stale_connection(self):
+        # Setup
+        stale_connection = mock.Mock()
+        stale_connection.getresponse.return_value.status = httplib.OK
+        stale_connection.getresponse.return_value.will_close = False
+        new_connection = mock.Mock()
+        new_connection.getresponse.return_value.status = httplib.OK
+
+        destination = http.HTTPDestination('https:', 'localhost')
+        messages = [('/api/', {}, 'body-1'), ('/api/', {}, 'body-2')]
+
+        # Test
+        with mock.patch('pulp.server.event.http._create_connection') as mock_create:
+            mock_create.side_effect = [stale_connection, new_connection]
+            destination.deliver(messages[:1])
+            # the server closed the idle connection without responding
+            stale_connection.getresponse.side_effect = httplib.BadStatusLine('')
+            destination.deliver(messages[1:])
+
+        # Verify
+        self.assertEqual(2, mock_create.call_count)
+        self.assertEqual('body-2', new_connection.request.call_args[1]['body'])
+
+    def test_destination_read_error_not_resent(self):
+        # Setup
+        mock_connection = mock.Mock()
+        mock_connection.getresponse.side_effect = socket.timeout()
+
+        destination = http.HTTPDestination('https:', 'localhost')
+        messages = [('/api/', {}, 'body-1')]
+
+        # Test
+        with mock.patch('pulp.server.event.http._create_connection') as mock_create:
+            mock_create.return_value = mock_connection
+            destination.deliver(messages)
+
+        # Verify
+        # the server may have received the event, so it is not sent again
+        self.assertEqual(messages, [])
+        self.assertEqual(1, mock_connection.request.call_count)
+        self.assertTrue(destination.connection is None)
+
+    def test_destination_send_error(self):
+        # Setup
+        mock_connection = mock.Mock()
+        mock_connection.request.side_effect = socket.error()
+
+        destination = http.HTTPDestination('https:', 'localhost')
+        messages = [('/api/', {}, 'body-1')]
+
+        # Test
+        with mock.patch('pulp.server.event.http._create_connection') as mock_create:
+            mock_create.return_value = mock_connection
+            # raised for the delivery queue to retry
+            self.assertRaises(socket.error, destination.deliver, messages)
+
+        # Verify
+        self.assertEqual(len(messages), 1)
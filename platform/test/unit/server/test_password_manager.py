@@ -12,9 +12,12 @@
 # have received a copy of GPLv2 along with this software; if not, see
 # http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
 
+import mock
+
 import base
 
 from pulp.server.managers import factory as manager_factory
+from pulp.server.managers.auth import password as password_manager
 
 class PasswordManagerTests(base.PulpServerTests):
     def setUp(self):
@@ -35,3 +38,19 @@ class PasswordManagerTests(base.PulpServerTests):
         password = "some password"
         hashed = self.password_manager.hash_password(password)
         self.assertTrue(self.password_manager.check_password(hashed, password))
+
+    def test_check_legacy_password(self):
+        password = "some password"
+        salt = self.password_manager.random_bytes(8)
+        hashed = self.password_manager.pbkdf_sha256(password, salt, password_manager.NUM_ITERATIONS)
+        entry = salt.encode("base64").strip() + "," + hashed.encode("base64").strip()
+        self.assertTrue(self.password_manager.check_password(entry, password))
+        self.assertFalse(self.password_manager.check_password(entry, "other password"))
+
+    def test_pbkdf2_fallback(self):
+        # known PBKDF2-HMAC-SHA256 vector, with and without hashlib's implementation
+        expected = self.password_manager.pbkdf2_sha256("password", "salt", 2)
+        with mock.patch.object(password_manager, '_pbkdf2_hmac', None):
+            self.assertEqual(expected, self.password_manager.pbkdf2_sha256("password", "salt", 2))
+        self.assertEqual('ae4d0c95af6b46d32d0adff928f06dd02a303f8ef3c251dfd6e2d85a95474c43',
+                         expected.encode('hex'))
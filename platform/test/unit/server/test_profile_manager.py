@@ -77,6 +77,23 @@ class ProfileManagerTests(base.PulpAsyncServerTests):
         self.assertEquals(profiles[1]['content_type'], self.TYPE_2)
         self.assertEquals(profiles[1]['profile'], self.PROFILE_2)
 
+    def test_find_profiles(self):
+        # Setup
+        self.populate()
+        consumer_manager = factory.consumer_manager()
+        consumer_manager.register('test-consumer-2')
+        # Test
+        manager = factory.consumer_profile_manager()
+        manager.create(self.CONSUMER_ID, self.TYPE_1, self.PROFILE_1)
+        manager.create(self.CONSUMER_ID, self.TYPE_2, self.PROFILE_2)
+        manager.create('test-consumer-2', self.TYPE_1, self.PROFILE_3)
+        profiles = manager.find_profiles([self.CONSUMER_ID, 'test-consumer-2', 'missing'])
+        # Verify
+        self.assertEquals(len(profiles), 3)
+        self.assertEquals(profiles[self.CONSUMER_ID], {self.TYPE_1:self.PROFILE_1, self.TYPE_2:self.PROFILE_2})
+        self.assertEquals(profiles['test-consumer-2'], {self.TYPE_1:self.PROFILE_3})
+        self.assertEquals(profiles['missing'], {})
+
     def test_get_profiles_none(self):
         # Setup
         self.populate()
@@ -302,6 +302,37 @@ class TestManageDB(MigrationTest):
         for package in models.get_migration_packages():
             self.assertEqual(package.current_version, 0)
 
+    @patch('pkg_resources.iter_entry_points', iter_entry_points)
+    @patch('pulp.server.db.migrate.models.pulp.server.db.migrations',
+           data.test_migration_packages.platform)
+    @patch('sys.argv', ["pulp-manage-db", "--relink-content"])
+    @patch('pulp.server.db.manage.logger')
+    @patch('pulp.server.db.manage._start_logging')
+    @patch('pulp.server.db.manage.content_types_db.all_type_ids', return_value=['rpm', 'srpm'])
+    @patch('pulp.server.db.manage.ContentQueryManager.relink_content_units', return_value=0)
+    def test_relink_content_flag(self, mocked_relink, mocked_type_ids, start_logging_mock,
+                                 logger_mock):
+        """
+        Test that the --relink-content flag relinks the content units of every type into the
+        configured storage layout.
+        """
+        manage.main()
+        self.assertEqual([c[0][0] for c in mocked_relink.call_args_list], ['rpm', 'srpm'])
+
+    @patch('pkg_resources.iter_entry_points', iter_entry_points)
+    @patch('pulp.server.db.migrate.models.pulp.server.db.migrations',
+           data.test_migration_packages.platform)
+    @patch('sys.argv', ["pulp-manage-db",])
+    @patch('pulp.server.db.manage.logger')
+    @patch('pulp.server.db.manage._start_logging')
+    @patch('pulp.server.db.manage.ContentQueryManager.relink_content_units')
+    def test_no_relink_content_flag(self, mocked_relink, start_logging_mock, logger_mock):
+        """
+        Test that content units are not relinked without the --relink-content flag.
+        """
+        manage.main()
+        self.assertFalse(mocked_relink.called)
+
 
 class TestMigrationModule(MigrationTest):
     def test___init__(self):
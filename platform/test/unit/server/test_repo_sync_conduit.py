@@ -143,6 +143,33 @@ class RepoSyncConduitTests(base.PulpServerTests):
             self.assertEqual('summary', r.summary)
             self.assertEqual('details', r.details)
 
+    def test_buffered_saves(self):
+        """
+        Tests saving units in bulk through the conduit's buffered mode.
+        """
+
+        # Setup
+        existing = self.conduit.init_unit(TYPE_1_DEF.id, {'key-1' : 'unit_0'}, {}, '/foo/bar')
+        self.conduit.save_unit(existing)
+
+        # Test
+        with self.conduit.buffered_saves(batch_size=3):
+            for i in range(0, 5):
+                unit = self.conduit.init_unit(TYPE_1_DEF.id, {'key-1' : 'unit_%d' % i}, {}, '/foo/bar')
+                self.conduit.save_unit(unit)
+
+        # Verify
+        units = self.conduit.get_units()
+        self.assertEqual(5, len(units))
+        self.assertTrue(existing.id in [u.id for u in units])
+
+        report = self.conduit.build_success_report('summary', 'details')
+        self.assertEqual(5, report.added_count)
+        self.assertEqual(1, report.updated_count)
+
+        repo = Repo.get_collection().find_one({'id' : 'repo-1'})
+        self.assertEqual(5, repo['content_unit_count'])
+
     def test_remove_unit_with_error(self):
         # Setup
         self.conduit._association_manager = mock.Mock()
@@ -148,6 +148,27 @@ class RepoUnitAssociationManagerTests(base.PulpServerTests):
         for unit in repo_units:
             self.assertTrue(unit['unit_id'] in ids)
 
+    def test_associate_all_existing(self):
+        """
+        Tests that bulk association skips existing associations and only counts
+        units that are new to the repository.
+        """
+
+        # Setup
+        self.manager.associate_unit_by_id(self.repo_id, 'type-1', 'foo', OWNER_TYPE_USER, 'admin')
+        self.manager.associate_unit_by_id(self.repo_id, 'type-1', 'bar', OWNER_TYPE_IMPORTER, 'test-importer')
+
+        # Test
+        ids = ['foo', 'bar', 'baz', 'baz']
+        self.manager.associate_all_by_ids(self.repo_id, 'type-1', ids, OWNER_TYPE_USER, 'admin')
+
+        # Verify
+        repo_units = list(RepoContentUnit.get_collection().find({'repo_id' : self.repo_id}))
+        self.assertEqual(4, len(repo_units))
+
+        repo = Repo.get_collection().find_one({'id' : self.repo_id})
+        self.assertEqual(3, repo['content_unit_count'])
+
     def test_unassociate_by_id(self):
         """
         Tests removing an association that exists by its unit ID.
@@ -399,6 +399,34 @@ class UnitAssociationQueryTests(base.PulpServerTests):
             self.assertFalse('created' in u)
             self.assertFalse('updated' in u)
 
+    @mock.patch('pulp.server.managers.repo.unit_association_query._BATCH_SIZE', 2)
+    def test_get_units_metadata_batches(self):
+        # Test
+        units = self.manager.get_units_across_types('repo-1')
+
+        # Verify
+        self.assertEqual(len(units), self.repo_1_count)
+
+        for u in units:
+            self._assert_unit_integrity(u)
+
+        self._assert_default_sort(units)
+
+    def test_get_units_iter(self):
+        # Test
+        units = self.manager.get_units_iter('repo-1')
+
+        # Verify
+        self.assertFalse(isinstance(units, list))
+
+        units = list(units)
+        self.assertEqual(len(units), self.repo_1_count)
+
+        for u in units:
+            self._assert_unit_integrity(u)
+
+        self._assert_default_sort(units)
+
     # -- get_units_by_type tests ----------------------------------------------
 
     def test_get_units_by_type_no_criteria(self):
@@ -565,6 +593,37 @@ class UnitAssociationQueryTests(base.PulpServerTests):
             self.assertFalse('md_2' in u['metadata'])
             self.assertFalse('md_3' in u['metadata'])
 
+    @mock.patch('pulp.server.managers.repo.unit_association_query._BATCH_SIZE', 2)
+    def test_get_units_by_type_association_sort_batches(self):
+        # Test
+        criteria = UnitAssociationCriteria(association_sort=[('created', association_manager.SORT_DESCENDING)],
+                                           unit_filters={'md_2' : 0})
+        units = self.manager.get_units_by_type('repo-1', 'beta', criteria)
+
+        # Verify
+        self.assertEqual(len(self.units['beta']), len(units))
+
+        for i in range(0, len(units) - 1):
+            self.assertTrue(units[i]['created'] >= units[i+1]['created'])
+
+        # Units that don't match the unit filters are kept without metadata
+        for u in units:
+            if u['metadata'] is not None:
+                self.assertEqual(u['unit_id'], u['metadata']['_id'])
+                self.assertEqual(0, u['metadata']['md_2'])
+        self.assertEqual(2, len([u for u in units if u['metadata'] is None]))
+
+    def test_get_units_by_type_iter(self):
+        # Test
+        criteria = UnitAssociationCriteria(type_ids=['beta'])
+        units = list(self.manager.get_units_iter('repo-1', criteria))
+
+        # Verify
+        self.assertEqual(len(self.units['beta']), len(units))
+
+        for u in units:
+            self._assert_unit_integrity(u)
+
     def test_get_units_by_type_not_query(self):
         """
         Mongo really doesn't like $not queries when regular expressions are
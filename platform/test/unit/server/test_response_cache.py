@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public
+# License as published by the Free Software Foundation; either version
+# 2 of the License (GPLv2) or (at your option) any later version.
+# There is NO WARRANTY for this software, express or implied,
+# including the implied warranties of MERCHANTABILITY,
+# NON-INFRINGEMENT, or FITNESS FOR A PARTICULAR PURPOSE. You should
+# have received a copy of GPLv2 along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+
+import unittest
+
+import mock
+
+import base
+
+from pulp.server.compat import json
+from pulp.server.db.model.repository import Repo
+from pulp.server.managers import factory as manager_factory
+from pulp.server.response_cache import ResponseCache, REPOSITORIES, BINDINGS
+from pulp.server.webservices.controllers import decorators
+
+# -- test cases ---------------------------------------------------------------
+
+class ResponseCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = ResponseCache(ttl=60, max_size=3)
+
+    def test_etag(self):
+        etag = self.cache.etag('/a/?x=1', (REPOSITORIES,))
+        self.assertEqual(etag, self.cache.etag('/a/?x=1', (REPOSITORIES,)))
+        self.assertTrue(etag.startswith('"') and etag.endswith('"'))
+        self.assertNotEqual(etag, self.cache.etag('/a/?x=2', (REPOSITORIES,)))
+        self.assertNotEqual(etag, self.cache.etag('/a/?x=1', (REPOSITORIES, BINDINGS)))
+
+        # versions are random per cache
+        self.assertNotEqual(etag, ResponseCache(ttl=60).etag('/a/?x=1', (REPOSITORIES,)))
+
+    def test_get_put(self):
+        etag = self.cache.etag('/a/', (REPOSITORIES,))
+        self.assertEqual(self.cache.get(etag), None)
+        self.cache.put('/a/', (REPOSITORIES,), etag, '[]')
+        self.assertEqual(self.cache.get(etag), '[]')
+
+    def test_invalidate(self):
+        repos_etag = self.cache.etag('/a/', (REPOSITORIES,))
+        self.cache.put('/a/', (REPOSITORIES,), repos_etag, '[1]')
+        bindings_etag = self.cache.etag('/b/', (BINDINGS, REPOSITORIES))
+        self.cache.put('/b/', (BINDINGS, REPOSITORIES), bindings_etag, '[2]')
+        other_etag = self.cache.etag('/c/', (BINDINGS,))
+        self.cache.put('/c/', (BINDINGS,), other_etag, '[3]')
+
+        # Test
+        self.cache.invalidate(REPOSITORIES)
+
+        # Verify
+        self.assertEqual(self.cache.get(repos_etag), None)
+        self.assertEqual(self.cache.get(bindings_etag), None)
+        self.assertNotEqual(self.cache.etag('/a/', (REPOSITORIES,)), repos_etag)
+        self.assertEqual(self.cache.get(other_etag), '[3]')
+        self.assertEqual(self.cache.etag('/c/', (BINDINGS,)), other_etag)
+
+    def test_put_after_invalidate(self):
+        # a response built while its data changed is not cached
+        etag = self.cache.etag('/a/', (REPOSITORIES,))
+        self.cache.invalidate(REPOSITORIES)
+        self.cache.put('/a/', (REPOSITORIES,), etag, '[]')
+        self.assertEqual(self.cache.get(etag), None)
+
+    @mock.patch('time.time')
+    def test_expiration(self, mock_time):
+        mock_time.return_value = 1000
+        etag = self.cache.etag('/a/', (REPOSITORIES,))
+        self.cache.put('/a/', (REPOSITORIES,), etag, '[]')
+        mock_time.return_value = 1059
+        self.assertEqual(self.cache.etag('/a/', (REPOSITORIES,)), etag)
+
+        mock_time.return_value = 1061
+        self.assertNotEqual(self.cache.etag('/a/', (REPOSITORIES,)), etag)
+        self.assertEqual(self.cache.get(etag), None)
+
+    def test_max_size(self):
+        etags = []
+        for i in range(4):
+            key = '/a/?page=%d' % i
+            etags.append(self.cache.etag(key, (REPOSITORIES,)))
+            self.cache.put(key, (REPOSITORIES,), etags[-1], str(i))
+        self.assertEqual([self.cache.get(e) for e in etags], [None, None, None, '3'])
+
+    def test_disabled(self):
+        self.assertTrue(self.cache.enabled())
+        self.assertFalse(ResponseCache(ttl=0).enabled())
+
+    def test_etag_matches(self):
+        self.assertTrue(decorators._etag_matches('"a"', '"a"'))
+        self.assertTrue(decorators._etag_matches('"a"', '"b", W/"a"'))
+        self.assertTrue(decorators._etag_matches('"a"', '*'))
+        self.assertFalse(decorators._etag_matches('"a"', '"b"'))
+        self.assertFalse(decorators._etag_matches('"a"', None))
+
+
+class CachedResponseTests(base.PulpWebserviceTests):
+
+    def clean(self):
+        super(CachedResponseTests, self).clean()
+        Repo.get_collection().remove()
+
+    def _get(self, uri, etag=None):
+        headers = dict(base.PulpWebserviceTests.HEADERS)
+        if etag is not None:
+            headers['If-None-Match'] = etag
+        return base.PulpWebserviceTests.TEST_APP.get('http://localhost' + uri, headers=headers,
+                                                      expect_errors=True)
+
+    def test_not_modified(self):
+        response = self._get('/v2/repositories/?details=true')
+        self.assertEqual(response.status, 200)
+        etag = response.header('ETag')
+
+        # Test
+        response = self._get('/v2/repositories/?details=true', etag)
+
+        # Verify
+        self.assertEqual(response.status, 304)
+        self.assertEqual(response.body, '')
+        self.assertEqual(response.header('ETag'), etag)
+
+    @mock.patch('pulp.server.webservices.controllers.repositories.RepoCollection._process_repos')
+    def test_cached(self, mock_process):
+        mock_process.side_effect = lambda repos, importers, distributors: repos
+        first = self._get('/v2/repositories/')
+
+        # Test
+        second = self._get('/v2/repositories/')
+
+        # Verify
+        self.assertEqual(second.status, 200)
+        self.assertEqual(second.body, first.body)
+        self.assertEqual(mock_process.call_count, 1)
+
+    def test_invalidated(self):
+        etag = self._get('/v2/repositories/').header('ETag')
+
+        # Test
+        manager_factory.repo_manager().create_repo('cached-repo')
+        response = self._get('/v2/repositories/', etag)
+
+        # Verify
+        self.assertEqual(response.status, 200)
+        self.assertNotEqual(response.header('ETag'), etag)
+        self.assertEqual([r['id'] for r in json.loads(response.body)], ['cached-repo'])
@@ -68,3 +68,59 @@ class TestGetQueryResultsFromGet(unittest.TestCase):
         self.controller._get_query_results_from_get()
         self.assertTrue('id' in self.mock_query_method.call_args[0][0].fields)
 
+
+
+class TestPaging(unittest.TestCase):
+    def setUp(self):
+        self.mock_query_method = mock.MagicMock()
+        self.controller = SearchController(self.mock_query_method)
+
+    def _post(self, **params):
+        params.setdefault('criteria', {})
+        self.controller.params = mock.MagicMock(return_value=params)
+        return self.controller._get_query_results_from_post()
+
+    def test_page(self):
+        self.mock_query_method.return_value = [{'_id': 1}, {'_id': 2}, {'_id': 3}]
+        items = self._post(page_size=2)
+        self.assertEqual(items, [{'_id': 1}, {'_id': 2}])
+        self.assertEqual(self.mock_query_method.call_args[0][0].limit, 3)
+        # the next page starts after the last item returned
+        self.mock_query_method.return_value = [{'_id': 3}]
+        self._post(page_size=2, page_token=self.controller._continuation)
+        self.assertEqual(self.mock_query_method.call_args[0][0].filters, {'_id': {'$gt': 2}})
+
+    def test_last_page(self):
+        self.mock_query_method.return_value = [{'_id': 1}, {'_id': 2}]
+        self._post(page_size=2)
+        self.assertTrue(self.controller._continuation is None)
+
+    @mock.patch('pulp.server.webservices.controllers.base.JSONController.ok')
+    def test_ok(self, mock_ok):
+        self.mock_query_method.return_value = [{'_id': 1}, {'_id': 2}]
+        items = self._post(page_size=5)
+        self.controller.ok(items)
+        mock_ok.assert_called_once_with({'results': items, 'continuation': None})
+
+    @mock.patch('pulp.server.webservices.controllers.base.JSONController.ok')
+    def test_ok_not_paged(self, mock_ok):
+        self.mock_query_method.return_value = [{'_id': 1}]
+        items = self._post()
+        self.controller.ok(items)
+        mock_ok.assert_called_once_with(items)
+
+    @mock.patch('web.input', return_value={'field':[], 'page_size':'10'})
+    def test_get(self, mock_input):
+        self.controller._get_query_results_from_get()
+        self.assertEqual(self.mock_query_method.call_args[0][0].limit, 11)
+
+    def test_invalid_page_size(self):
+        for page_size in ('a', 0, True, 1000000):
+            self.assertRaises(exceptions.InvalidValue, self._post, page_size=page_size)
+
+    def test_token_without_page_size(self):
+        self.assertRaises(exceptions.MissingValue, self._post, page_token='abc')
+
+    def test_page_size_with_limit(self):
+        self.assertRaises(exceptions.InvalidValue, self._post, page_size=10,
+                          criteria={'limit': 10})
@@ -12,11 +12,13 @@
 # have received a copy of GPLv2 along with this software; if not, see
 # http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
 
+import mock
+
 import base
 
 import pulp.plugins.types.database as types_db
 from pulp.plugins.types.model import TypeDefinition
-from pulp.server.db.model.content import ContentType
+from pulp.server.db.model.content import ContentType, ContentTypesVersion
 import pulp.server.db.connection as pulp_db
 
 # -- constants -----------------------------------------------------------------
@@ -260,6 +262,129 @@ class TypesDatabaseTests(base.PulpServerTests):
         # Verify
         self.assertTrue(indexes is None)
 
+    def test_type_search_indexes(self):
+        """
+        Tests retrieving the search indexes on a type.
+        """
+
+        # Setup
+        types_db.update_database([DEF_3])
+
+        # Test
+        indexes = types_db.type_search_indexes(DEF_3.id)
+
+        # Verify
+        self.assertEqual(DEF_3.search_indexes, indexes)
+        self.assertTrue(types_db.type_search_indexes('not_there') is None)
+
+    # -- type registry tests -------------------------------------------------
+
+    def _change_from_other_process(self, type_id, display_name):
+        # changes the definition and version stamp without telling this
+        # process's registry
+        ContentType.get_collection().update({'id': type_id},
+                                            {'$set': {'display_name': display_name}},
+                                            safe=True)
+        ContentTypesVersion.get_collection().update({'_id': types_db.TYPES_VERSION_ID},
+                                                    {'$inc': {'version': 1}},
+                                                    upsert=True, safe=True)
+
+    def test_registry_serves_from_memory(self):
+        """
+        Tests lookups do not query the types collection once it is loaded.
+        """
+
+        # Setup
+        types_db.update_database([DEF_1, DEF_2])
+        types_db.TYPE_REGISTRY.load()
+
+        # Test
+        with mock.patch.object(ContentType, 'get_collection') as mock_get_collection:
+            type_def = types_db.type_definition(DEF_1.id)
+            unit_key = types_db.type_units_unit_key(DEF_2.id)
+            type_ids = types_db.all_type_ids()
+
+        # Verify
+        self.assertEqual(DEF_1.display_name, type_def['display_name'])
+        self.assertEqual(DEF_2.unit_key, unit_key)
+        self.assertEqual(set([DEF_1.id, DEF_2.id]), set(type_ids))
+        self.assertEqual(0, mock_get_collection.call_count)
+
+    def test_registry_reloaded_on_update(self):
+        """
+        Tests the registry reflects changes made through this module.
+        """
+
+        # Setup
+        type_def = TypeDefinition('rpm', 'RPM', 'RPM Packages', ['name'], ['name'], [])
+        types_db.update_database([type_def])
+        self.assertEqual('RPM', types_db.type_definition('rpm')['display_name'])
+
+        # Test
+        type_def.display_name = 'new-name'
+        types_db.update_database([type_def])
+
+        # Verify
+        self.assertEqual('new-name', types_db.type_definition('rpm')['display_name'])
+
+        types_db.clean()
+        self.assertTrue(types_db.type_definition('rpm') is None)
+        self.assertEqual([], types_db.all_type_ids())
+
+    def test_registry_version_check(self):
+        """
+        Tests changes made by another process are picked up once the check
+        interval passes.
+        """
+
+        # Setup
+        types_db.update_database([DEF_1])
+        registry = types_db.TypeRegistry(check_interval=60)
+        registry.load()
+
+        # Test
+        self._change_from_other_process(DEF_1.id, 'new-name')
+
+        # Verify
+        self.assertEqual(DEF_1.display_name, registry.definition(DEF_1.id)['display_name'])
+        registry.check_interval = 0
+        self.assertEqual('new-name', registry.definition(DEF_1.id)['display_name'])
+
+    def test_registry_unknown_type_checks_version(self):
+        """
+        Tests a type added by another process is found as soon as it is
+        looked up.
+        """
+
+        # Setup
+        registry = types_db.TypeRegistry(check_interval=60)
+        registry.load()
+        self.assertTrue(registry.definition(DEF_1.id) is None)
+
+        # Test
+        types_db.update_database([DEF_1])
+
+        # Verify
+        self.assertEqual(DEF_1.id, registry.definition(DEF_1.id)['id'])
+
+    def test_type_definition_copy(self):
+        """
+        Tests changes to a returned definition do not change the registry.
+        """
+
+        # Setup
+        types_db.update_database([DEF_1])
+
+        # Test
+        type_def = types_db.type_definition(DEF_1.id)
+        type_def['display_name'] = 'changed'
+        all_defs = types_db.all_type_definitions()
+        all_defs[0].pop('_id')
+
+        # Verify
+        self.assertEqual(DEF_1.display_name, types_db.type_definition(DEF_1.id)['display_name'])
+        self.assertTrue('_id' in types_db.all_type_definitions()[0])
+
     # -- utility method tests ------------------------------------------------
 
     def test_create_or_update_type_collection(self):
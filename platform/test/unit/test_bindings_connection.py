@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public
+# License as published by the Free Software Foundation; either version
+# 2 of the License (GPLv2) or (at your option) any later version.
+# There is NO WARRANTY for this software, express or implied,
+# including the implied warranties of MERCHANTABILITY,
+# NON-INFRINGEMENT, or FITNESS FOR A PARTICULAR PURPOSE. You should
+# have received a copy of GPLv2 along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+
+import httplib
+import socket
+import unittest
+
+import mock
+from M2Crypto import SSL
+
+import base
+
+from pulp.bindings import exceptions
+from pulp.bindings.server import HTTPSServerWrapper, PulpConnection
+
+
+def mock_response(status=200, body='{"a": 1}', will_close=False):
+    response = mock.Mock()
+    response.status = status
+    response.read.return_value = body
+    response.will_close = will_close
+    return response
+
+
+class HTTPSServerWrapperTests(unittest.TestCase):
+
+    def setUp(self):
+        self.pulp_connection = PulpConnection('localhost', username='admin', password='admin')
+        self.wrapper = self.pulp_connection.server_wrapper
+
+        patcher = mock.patch('pulp.bindings.server.httpslib.HTTPSConnection')
+        self.mock_connection_class = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_connection_class.side_effect = self._new_connection
+        self.connections = []
+
+    def _new_connection(self, *args, **kwargs):
+        connection = mock.Mock()
+        connection.getresponse.return_value = mock_response()
+        self.connections.append(connection)
+        return connection
+
+    def test_request(self):
+        status, body = self.wrapper.request('GET', '/pulp/api/v2/repositories/', None)
+
+        self.assertEqual(status, 200)
+        self.assertEqual(body, {'a': 1})
+        connection = self.connections[0]
+        headers = connection.request.call_args[1]['headers']
+        self.assertTrue(headers['Authorization'].startswith('Basic '))
+        self.assertFalse('Authorization' in self.pulp_connection.headers)
+
+    def test_connection_reused(self):
+        for i in range(3):
+            self.wrapper.request('GET', '/pulp/api/v2/repositories/', None)
+
+        self.assertEqual(len(self.connections), 1)
+        self.assertEqual(self.connections[0].request.call_count, 3)
+
+    def test_ssl_session_resumed(self):
+        pool = self.wrapper.connection_pool(None)
+        first, reused = pool.acquire()
+        second, reused = pool.acquire()
+        pool.release(first, mock_response())
+
+        third, reused = pool.acquire(reuse=False)
+
+        self.assertFalse(reused)
+        third.set_session.assert_called_once_with(first.get_session.return_value)
+
+    def test_will_close(self):
+        self.mock_connection_class.side_effect = None
+        self.mock_connection_class.return_value.getresponse.return_value = mock_response(will_close=True)
+        sock = self.mock_connection_class.return_value.sock
+
+        self.wrapper.request('GET', '/pulp/api/v2/repositories/', None)
+        self.wrapper.request('GET', '/pulp/api/v2/repositories/', None)
+
+        self.assertEqual(self.mock_connection_class.call_count, 2)
+        self.assertEqual(sock.close.call_count, 1)
+
+    def test_stale_connection(self):
+        self.wrapper.request('GET', '/pulp/api/v2/repositories/', None)
+        self.connections[0].getresponse.side_effect = httplib.BadStatusLine('')
+
+        status, body = self.wrapper.request('GET', '/pulp/api/v2/repositories/', None)
+
+        self.assertEqual(status, 200)
+        self.assertEqual(len(self.connections), 2)
+        self.assertEqual(self.connections[1].request.call_count, 1)
+
+    def test_stale_connection_send_error(self):
+        self.wrapper.request('POST', '/pulp/api/v2/repositories/', '{}')
+        self.connections[0].request.side_effect = httplib.CannotSendRequest()
+
+        status, body = self.wrapper.request('POST', '/pulp/api/v2/repositories/', '{}')
+
+        self.assertEqual(status, 200)
+        self.assertEqual(len(self.connections), 2)
+        self.assertEqual(self.connections[1].request.call_count, 1)
+
+    def test_read_error_not_retried(self):
+        self.wrapper.request('POST', '/pulp/api/v2/repositories/', '{}')
+        self.connections[0].getresponse.side_effect = socket.timeout()
+
+        # the server may have processed the request, so it is not sent again
+        self.assertRaises(socket.timeout, self.wrapper.request,
+                          'POST', '/pulp/api/v2/repositories/', '{}')
+        self.assertEqual(len(self.connections), 1)
+        self.assertEqual(self.connections[0].request.call_count, 2)
+
+    def test_new_connection_error_not_retried(self):
+        self.mock_connection_class.side_effect = None
+        self.mock_connection_class.return_value.getresponse.side_effect = httplib.BadStatusLine('')
+
+        self.assertRaises(httplib.BadStatusLine, self.wrapper.request, 'GET', '/', None)
+        self.assertEqual(self.mock_connection_class.call_count, 1)
+
+    def test_expired_certificate(self):
+        self.mock_connection_class.side_effect = None
+        self.mock_connection_class.return_value.getresponse.side_effect = \
+            SSL.SSLError('sslv3 alert certificate expired')
+
+        self.assertRaises(exceptions.PermissionsException, self.wrapper.request, 'GET', '/', None)
+
+    @mock.patch('pulp.bindings.server._create_ssl_context')
+    @mock.patch('pulp.bindings.server._modification_time')
+    def test_certificate_change(self, mock_mtime, mock_create_context):
+        mock_mtime.return_value = 1
+        self.pulp_connection.username = self.pulp_connection.password = None
+        self.pulp_connection.cert_filename = 'cert.pem'
+
+        self.wrapper.request('GET', '/', None)
+        self.wrapper.request('GET', '/', None)
+        self.assertEqual(mock_create_context.call_count, 1)
+        self.assertEqual(len(self.connections), 1)
+
+        # a new login replaces the certificate
+        mock_mtime.return_value = 2
+        self.wrapper.request('GET', '/', None)
+        self.assertEqual(mock_create_context.call_count, 2)
+        self.assertEqual(len(self.connections), 2)
+        mock_create_context.assert_called_with('cert.pem', self.pulp_connection.timeout)
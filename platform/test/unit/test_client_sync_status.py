@@ -133,7 +133,7 @@ class StatusTests(base.PulpClientTests):
         mock_create.return_value = mock_spinner
 
         # Side effect call to simulate polling a number of times before it completes
-        def poll(task_id):
+        def poll(task_id, version=None, wait=None):
             task = Task(TASK_TEMPLATE)
 
             # Wait for the first 2 polls
@@ -162,6 +162,41 @@ class StatusTests(base.PulpClientTests):
         self.assertEqual(2, mock_spinner.next.call_count)
         self.assertEqual(11, self.renderer.display_report.call_count)
 
+    @mock.patch('pulp.bindings.tasks.TasksAPI.get_task')
+    @mock.patch('pulp.client.extensions.core.PulpPrompt.create_spinner')
+    def test_internal_display_task_status_waits_for_updates(self, mock_create, mock_get):
+        # Setup
+        self.config['output']['poll_frequency_in_seconds'] = 0 # no need to wait
+
+        def poll(task_id, version=None, wait=None):
+            task = Task(TASK_TEMPLATE)
+            task.version = mock_get.call_count
+            if mock_get.call_count < 2:
+                task.state = STATE_WAITING
+            elif mock_get.call_count < 4:
+                task.state = STATE_RUNNING
+            else:
+                task.state = STATE_FINISHED
+            return Response(200, task)
+
+        mock_get.side_effect = poll
+
+        # Test
+        status._display_task_status(self.context, self.renderer, 'ro')
+
+        # Verify
+        self.assertEqual(4, mock_get.call_count)
+        self.assertEqual((('ro',), {}), mock_get.call_args_list[0])
+
+        # Waiting tasks are checked at the poll frequency to keep the spinner moving
+        self.assertEqual((('default-id',), {'version' : 1, 'wait' : 0}), mock_get.call_args_list[1])
+
+        # Running tasks are long polled
+        self.assertEqual((('default-id',), {'version' : 2, 'wait' : status.PROGRESS_WAIT_IN_SECONDS}),
+                         mock_get.call_args_list[2])
+        self.assertEqual((('default-id',), {'version' : 3, 'wait' : status.PROGRESS_WAIT_IN_SECONDS}),
+                         mock_get.call_args_list[3])
+
     @mock.patch('pulp.bindings.tasks.TasksAPI.get_task')
     @mock.patch('pulp.client.commands.repo.status.status._display_status')
     def test_display_task_status(self, mock_display, mock_get):
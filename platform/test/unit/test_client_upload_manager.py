@@ -180,6 +180,7 @@ class UploadManagerTests(unittest.TestCase):
     def test_upload_multiple_passes(self):
         # Setup
         self.upload_manager.chunk_size = 100
+        self.upload_manager.window = 1 # one chunk at a time, in order
         self.upload_manager.initialize()
         upload_id = self.upload_manager.initialize_upload(TEST_RPM_FILENAME, 'repo-1', 'type-1', {'k' : 'v'}, 'm-1')
 
@@ -232,6 +233,120 @@ class UploadManagerTests(unittest.TestCase):
         tracker = self.upload_manager._get_tracker_file_by_id(upload_id)
         self.assertEqual(rpm_size, tracker.offset)
 
+    def test_upload_window(self):
+        # Setup
+        self.upload_manager.chunk_size = 100
+        self.upload_manager.window = 4
+        self.upload_manager.initialize()
+        upload_id = self.upload_manager.initialize_upload(TEST_RPM_FILENAME, 'repo-1', 'type-1', {'k' : 'v'}, 'm-1')
+
+        mock_callback = mock.Mock()
+
+        # Test
+        self.upload_manager.upload(upload_id, mock_callback.update_status)
+
+        # Verify
+        rpm_size = os.path.getsize(TEST_RPM_FILENAME)
+        num_upload_calls = int(math.ceil(float(rpm_size) / float(self.upload_manager.chunk_size)))
+
+        # Chunks may be uploaded in any order but all of them must be sent
+        f = open(TEST_RPM_FILENAME, 'r')
+        contents = f.read()
+        f.close()
+
+        uploaded = {}
+        for single_call_args in self.mock_upload_bindings.upload_segment.call_args_list:
+            upload_id_arg, offset, body = single_call_args[0]
+            self.assertEqual(upload_id, upload_id_arg)
+            self.assertEqual(contents[offset:offset + self.upload_manager.chunk_size], body)
+            uploaded[offset] = body
+        self.assertEqual(num_upload_calls, len(uploaded))
+        self.assertEqual(contents, ''.join([uploaded[o] for o in sorted(uploaded)]))
+
+        self.assertEqual(num_upload_calls, mock_callback.update_status.call_count)
+        self.assertEqual(rpm_size, mock_callback.update_status.call_args[0][0])
+
+        tracker = upload_util.UploadTracker.load(self.upload_manager._tracker_filename(upload_id))
+        self.assertEqual(rpm_size, tracker.offset)
+        self.assertEqual({}, tracker.completed_segments)
+        self.assertTrue(tracker.is_finished_uploading)
+
+    def test_upload_resume_out_of_order(self):
+        # Setup
+        self.upload_manager.chunk_size = 100
+        self.upload_manager.window = 4
+        self.upload_manager.initialize()
+        upload_id = self.upload_manager.initialize_upload(TEST_RPM_FILENAME, 'repo-1', 'type-1', {'k' : 'v'}, 'm-1')
+
+        # Fail the third chunk; the others are still sent
+        def upload_segment(upload_id, offset, data):
+            if offset == 200:
+                raise Exception()
+            return Response(200, {})
+        self.mock_upload_bindings.upload_segment.side_effect = upload_segment
+
+        self.assertRaises(Exception, self.upload_manager.upload, upload_id)
+
+        tracker = upload_util.UploadTracker.load(self.upload_manager._tracker_filename(upload_id))
+        self.assertEqual(200, tracker.offset)
+        self.assertFalse(tracker.is_finished_uploading)
+        self.assertFalse(tracker.is_running)
+        sent = [c[0][1] for c in self.mock_upload_bindings.upload_segment.call_args_list]
+        self.assertTrue(200 in sent)
+
+        # Test
+        self.mock_upload_bindings.upload_segment.reset_mock()
+        self.mock_upload_bindings.upload_segment.side_effect = None
+        self.upload_manager.upload(upload_id)
+
+        # Verify only the chunks not yet uploaded are sent
+        resent = [c[0][1] for c in self.mock_upload_bindings.upload_segment.call_args_list]
+        self.assertTrue(200 in resent)
+        self.assertEqual(set(), set(resent) & (set(sent) - set([200])))
+
+        tracker = self.upload_manager._get_tracker_file_by_id(upload_id)
+        self.assertEqual(os.path.getsize(TEST_RPM_FILENAME), tracker.offset)
+        self.assertTrue(tracker.is_finished_uploading)
+
+    def test_upload_many(self):
+        # Setup
+        self.mock_upload_bindings.initialize_upload.side_effect = [
+            Response(201, {'upload_id' : 'u-%d' % i, '_href' : '/v2/uploads/u-%d/' % i}) for i in range(3)]
+        self.upload_manager.chunk_size = 1000
+        self.upload_manager.initialize()
+        upload_ids = [self.upload_manager.initialize_upload(TEST_RPM_FILENAME, 'repo-1', 'type-1', {'k' : 'v'}, 'm-1')
+                      for i in range(3)]
+
+        mock_callback = mock.Mock()
+
+        # Test
+        failures = self.upload_manager.upload_many(upload_ids, mock_callback.update_status, concurrency=2)
+
+        # Verify
+        self.assertEqual({}, failures)
+        rpm_size = os.path.getsize(TEST_RPM_FILENAME)
+        for upload_id in upload_ids:
+            tracker = self.upload_manager._get_tracker_file_by_id(upload_id)
+            self.assertTrue(tracker.is_finished_uploading)
+            self.assertEqual(rpm_size, tracker.offset)
+
+        finished = [c[0][0] for c in mock_callback.update_status.call_args_list if c[0][1] == rpm_size]
+        self.assertEqual(sorted(upload_ids), sorted(finished))
+
+    def test_tracker_remaining_segments(self):
+        tracker = upload_util.UploadTracker('f')
+        tracker.offset = 100
+        tracker.completed_segments = {200 : 300, 350 : 400}
+
+        segments = tracker.remaining_segments(500, 100)
+
+        self.assertEqual([(100, 200), (300, 350), (400, 500)], segments)
+        self.assertEqual(250, tracker.uploaded_bytes())
+
+        tracker.segment_uploaded(100, 200)
+        self.assertEqual(300, tracker.offset)
+        self.assertEqual({350 : 400}, tracker.completed_segments)
+
     def test_upload_concurrent_upload(self):
         # Setup
         self.upload_manager.initialize()
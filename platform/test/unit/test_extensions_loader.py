@@ -13,7 +13,9 @@
 
 # Python
 import os
+import shutil
 import sys
+import tempfile
 import unittest
 
 import mock
@@ -21,6 +23,7 @@ import mock
 from pulp.client.extensions import loader
 from pulp.client.extensions.core import PulpCli, PulpPrompt, ClientContext
 from pulp.client.extensions import decorator
+from pulp.common.compat import json
 
 # -- test data ----------------------------------------------------------------
 
@@ -208,3 +211,111 @@ class ExtensionLoaderTests(unittest.TestCase):
             pass
         self.assertEqual(getattr(foo, loader.PRIORITY_VAR), loader.DEFAULT_PRIORITY)
 
+
+class ExtensionManifestTests(unittest.TestCase):
+
+    def setUp(self):
+        super(ExtensionManifestTests, self).setUp()
+        self.working_dir = tempfile.mkdtemp(prefix='extensions-manifest-')
+        self.manifest_filename = os.path.join(self.working_dir, 'user', 'admin-extensions.manifest')
+
+    def tearDown(self):
+        super(ExtensionManifestTests, self).tearDown()
+        shutil.rmtree(self.working_dir)
+
+    def _load(self, args):
+        prompt = PulpPrompt()
+        cli = PulpCli(prompt)
+        context = ClientContext(None, None, None, prompt, None, cli=cli)
+        loader.load_extensions(VALID_SET, context, 'admin', args=args,
+                               manifest_filename=self.manifest_filename)
+        return sorted(cli.root_section.subsections.keys())
+
+    def _manifest(self):
+        f = open(self.manifest_filename)
+        try:
+            return json.load(f)
+        finally:
+            f.close()
+
+    @mock.patch('pkg_resources.iter_entry_points', return_value=())
+    def test_manifest_written(self, mock_entry):
+        # Test
+        sections = self._load(['section-2'])
+
+        # Verify
+        self.assertEqual(sections, ['section-1', 'section-2', 'section-3'])
+        manifest = self._manifest()
+        self.assertEqual(manifest['sections'], {'section-1' : ['ext1'],
+                                                'section-2' : ['ext2'],
+                                                'section-3' : ['ext3']})
+        self.assertEqual(manifest['always'], ['ext4'])
+
+    @mock.patch('pkg_resources.iter_entry_points', return_value=())
+    def test_loads_needed_packs(self, mock_entry):
+        self._load(['section-2'])
+
+        # Test
+        mock_load_pack = mock.Mock()
+        with mock.patch('pulp.client.extensions.loader._load_pack', mock_load_pack):
+            self._load(['section-2', 'command'])
+
+        # Verify
+        loaded = [c[0][1].__name__ for c in mock_load_pack.call_args_list]
+        self.assertEqual(loaded, ['ext4', 'ext2'])
+
+    @mock.patch('pkg_resources.iter_entry_points', return_value=())
+    def test_unknown_command_loads_all(self, mock_entry):
+        self._load(['section-2'])
+
+        # Test
+        self.assertEqual(self._load(['section-9']), ['section-1', 'section-2', 'section-3'])
+        self.assertEqual(self._load([]), ['section-1', 'section-2', 'section-3'])
+        self.assertEqual(self._load(None), ['section-1', 'section-2', 'section-3'])
+
+    @mock.patch('pkg_resources.iter_entry_points', autospec=True)
+    def test_entry_points(self, mock_iter):
+        def add_section(context):
+            context.cli.create_section('section-ep', 'entry point section')
+        entry_point = mock.MagicMock()
+        entry_point.__str__.return_value = 'ep = pkg.module:initialize'
+        entry_point.dist = None
+        entry_point.load.return_value = add_section
+        mock_iter.return_value = [entry_point]
+        self._load(['section-ep'])
+        self.assertEqual(self._manifest()['sections']['section-ep'],
+                         ['entry point ep = pkg.module:initialize'])
+
+        # Test
+        sections = self._load(['section-ep'])
+
+        # Verify
+        self.assertEqual(sections, ['section-ep'])
+
+    @mock.patch('pkg_resources.iter_entry_points', return_value=())
+    @mock.patch('pulp.client.extensions.loader._fingerprint')
+    def test_installed_extensions_changed(self, mock_fingerprint, mock_entry):
+        mock_fingerprint.return_value = 'a'
+        self._load(['section-2'])
+
+        # Test
+        mock_fingerprint.return_value = 'b'
+        sections = self._load(['section-2'])
+
+        # Verify
+        self.assertEqual(sections, ['section-1', 'section-2', 'section-3'])
+        self.assertEqual(self._manifest()['fingerprint'], 'b')
+
+    @mock.patch('pkg_resources.iter_entry_points', return_value=())
+    def test_corrupt_manifest(self, mock_entry):
+        os.makedirs(os.path.dirname(self.manifest_filename))
+        f = open(self.manifest_filename, 'w')
+        f.write('{"fingerprint"')
+        f.close()
+
+        # Test
+        sections = self._load(['section-2'])
+
+        # Verify
+        self.assertEqual(sections, ['section-1', 'section-2', 'section-3'])
+        self.assertEqual(self._manifest()['always'], ['ext4'])
@@ -35,6 +35,23 @@ class TestSearchAPI(unittest.TestCase):
         ret = self.api.search()
         self.assertEqual(ret, self.api.server.POST.return_value.response_body)
 
+    def test_follows_pages(self):
+        pages = [{'results': [1, 2], 'continuation': 'token1'},
+                 {'results': [3], 'continuation': None}]
+        bodies = []
+        def post(path, body):
+            bodies.append(dict(body))
+            return mock.MagicMock(response_body=pages[len(bodies) - 1])
+        self.api.server.POST.side_effect = post
+
+        ret = self.api.search(sort=[('name', 'ascending')])
+
+        self.assertEqual(ret, [1, 2, 3])
+        self.assertEqual(bodies[0], {'criteria': {'sort': [('name', 'ascending')]},
+                                     'page_size': SearchAPI.PAGE_SIZE})
+        self.assertEqual(bodies[1]['page_token'], 'token1')
+        self.assertEqual(len(bodies), 2)
+
     def test_invalid_kwargs(self):
         self.assertRaises(ValueError, self.api.search, foo=True)
 
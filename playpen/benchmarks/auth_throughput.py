@@ -0,0 +1,103 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public
+# License as published by the Free Software Foundation; either version
+# 2 of the License (GPLv2) or (at your option) any later version.
+# There is NO WARRANTY for this software, express or implied,
+# including the implied warranties of MERCHANTABILITY,
+# NON-INFRINGEMENT, or FITNESS FOR A PARTICULAR PURPOSE. You should
+# have received a copy of GPLv2 along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+
+"""
+Throughput of the authentication step of REST requests.
+
+Authenticates a temporary user repeatedly with a password and with an admin
+client certificate, once with the credential cache disabled (every request
+runs the key derivation or certificate verification) and once with it enabled.
+Also reports the cost of a single password hash with the legacy and the
+PBKDF2 key derivation.
+
+Requires a configured pulp server, with its CA certificate and key readable,
+and a running database.
+"""
+
+import optparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../platform/src'))
+
+from pulp.server.auth import credential_cache
+from pulp.server.db import connection
+from pulp.server.managers import factory as manager_factory
+from pulp.server.managers.auth import password
+
+LOGIN = 'auth-throughput-benchmark'
+PASSWORD = 'benchmark'
+
+
+def time_calls(call, requests):
+    start = time.time()
+    for i in range(requests):
+        if call() is None:
+            raise RuntimeError('authentication failed')
+    return time.time() - start
+
+
+def report(label, elapsed, requests):
+    print '%-20s %8.1f requests/s (%.1fus per request)' % (
+        label, requests / elapsed, elapsed / requests * 1000000)
+
+
+def parse_args():
+    parser = optparse.OptionParser()
+    parser.add_option('--requests', type='int', default=1000,
+                      help='number of authenticated requests per run [default: %default]')
+    return parser.parse_args()[0]
+
+
+def main():
+    opts = parse_args()
+    connection.initialize()
+    manager_factory.initialize()
+
+    user_manager = manager_factory.user_manager()
+    auth_manager = manager_factory.authentication_manager()
+    cert_gen_manager = manager_factory.cert_generation_manager()
+
+    user = user_manager.create_user(LOGIN, PASSWORD)
+    try:
+        key, cert_pem = cert_gen_manager.make_admin_user_cert(user)
+
+        calls = (
+            ('password', lambda: auth_manager.check_username_password(LOGIN, PASSWORD)),
+            ('certificate', lambda: auth_manager.check_user_cert(cert_pem)),
+        )
+        for ttl in (0, 300):
+            credential_cache.CREDENTIAL_CACHE.ttl = ttl
+            credential_cache.invalidate()
+            print 'credential cache %s' % (ttl and 'enabled' or 'disabled')
+            for label, call in calls:
+                report(label, time_calls(call, opts.requests), opts.requests)
+
+        manager = password.PasswordManager()
+        start = time.time()
+        manager.pbkdf_sha256(PASSWORD, 'saltsalt', password.NUM_ITERATIONS)
+        legacy = time.time() - start
+        start = time.time()
+        manager.pbkdf2_sha256(PASSWORD, 'saltsalt', password.NUM_ITERATIONS)
+        pbkdf2 = time.time() - start
+        print 'key derivation, %d iterations' % password.NUM_ITERATIONS
+        print '%-20s %8.2fms' % ('legacy', legacy * 1000)
+        print '%-20s %8.2fms' % ('pbkdf2', pbkdf2 * 1000)
+    finally:
+        user_manager.delete_user(LOGIN)
+
+
+if __name__ == '__main__':
+    main()
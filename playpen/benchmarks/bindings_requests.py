@@ -0,0 +1,85 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public
+# License as published by the Free Software Foundation; either version
+# 2 of the License (GPLv2) or (at your option) any later version.
+# There is NO WARRANTY for this software, express or implied,
+# including the implied warranties of MERCHANTABILITY,
+# NON-INFRINGEMENT, or FITNESS FOR A PARTICULAR PURPOSE. You should
+# have received a copy of GPLv2 along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+
+"""
+Latency of sequential REST calls made through pulp.bindings.
+
+Makes the same number of GET /v2/repositories/ calls with a new connection,
+SSL context and full TLS handshake per call (the bindings' former behavior)
+and with the pooled keep-alive connections. Needs a running pulp server;
+authenticates with a username and password or with the client certificate
+written by "pulp-admin login".
+"""
+
+import optparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../platform/src'))
+
+from pulp.bindings.server import HTTPSServerWrapper, PulpConnection
+
+
+class UnpooledServerWrapper(HTTPSServerWrapper):
+    """
+    Opens a new connection, with a newly loaded SSL context, for every call.
+    """
+
+    def connection_pool(self, cert_filename):
+        self._pool = None
+        return HTTPSServerWrapper.connection_pool(self, cert_filename)
+
+
+def time_calls(connection, calls):
+    latencies = []
+    for i in range(calls):
+        start = time.time()
+        connection.GET('/v2/repositories/')
+        latencies.append(time.time() - start)
+    return latencies
+
+
+def report(label, latencies):
+    latencies.sort()
+    total = sum(latencies)
+    print '%-10s %8.1f calls/s  median %6.2fms  p99 %6.2fms' % (
+        label, len(latencies) / total, latencies[len(latencies) / 2] * 1000,
+        latencies[int(len(latencies) * .99)] * 1000)
+
+
+def parse_args():
+    parser = optparse.OptionParser()
+    parser.add_option('--host', default='localhost', help='pulp server [default: %default]')
+    parser.add_option('--port', type='int', default=443, help='[default: %default]')
+    parser.add_option('--username', help='authenticate with a username and password')
+    parser.add_option('--password')
+    parser.add_option('--cert', default=os.path.expanduser('~/.pulp/user-cert.pem'),
+                      help='client certificate, if no username is given [default: %default]')
+    parser.add_option('--calls', type='int', default=1000,
+                      help='number of calls per run [default: %default]')
+    return parser.parse_args()[0]
+
+
+def main():
+    opts = parse_args()
+    for label, wrapper_class in (('unpooled', UnpooledServerWrapper), ('pooled', HTTPSServerWrapper)):
+        connection = PulpConnection(opts.host, opts.port, username=opts.username,
+                                    password=opts.password, cert_filename=opts.cert)
+        connection.server_wrapper = wrapper_class(connection)
+        report(label, time_calls(connection, opts.calls))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public
+# License as published by the Free Software Foundation; either version
+# 2 of the License (GPLv2) or (at your option) any later version.
+# There is NO WARRANTY for this software, express or implied,
+# including the implied warranties of MERCHANTABILITY,
+# NON-INFRINGEMENT, or FITNESS FOR A PARTICULAR PURPOSE. You should
+# have received a copy of GPLv2 along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+
+"""
+Cost of persisting call requests.
+
+Compares the size and (de)serialization time of call requests in the current
+serialization format with the legacy format of one protocol 0 pickle per
+field, for call requests carrying a large keyword argument. With --enqueue,
+also measures task queue enqueue throughput, one task at a time and with
+batch_enqueue; this needs a configured pulp server and a running database.
+"""
+
+import optparse
+import os
+import pickle
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../platform/src'))
+
+from pulp.server.compat import BSON
+from pulp.server.dispatch import pickling
+from pulp.server.dispatch.call import CallRequest
+
+
+def call(*args, **kwargs):
+    pass
+
+
+def legacy_serialize(call_request):
+    data = {'callable_name': call_request.callable_name()}
+    for field in call_request.copied_fields:
+        data[field] = getattr(call_request, field)
+    for field in call_request.pickled_fields:
+        data[field] = pickle.dumps(getattr(call_request, field))
+    return data
+
+
+def gen_call_request(units):
+    unit_list = [{'name': 'unit-%d' % i, 'version': '1.0', 'arch': 'noarch'} for i in range(units)]
+    return CallRequest(call, ['repo-id'], {'units': unit_list, 'config': {'verify': True}},
+                       principal={'login': 'benchmark'})
+
+
+def time_calls(func, arg, calls):
+    start = time.time()
+    for i in range(calls):
+        func(arg)
+    return time.time() - start
+
+
+def compare_formats(opts):
+    call_request = gen_call_request(opts.units)
+    print 'call request with %d units, %d iterations' % (opts.units, opts.calls)
+    for label, serialize in (('legacy', legacy_serialize), ('current', CallRequest.serialize)):
+        data = serialize(call_request)
+        encoded = BSON.encode(data)
+        decoded = BSON.decode(encoded)
+        serialize_time = time_calls(serialize, call_request, opts.calls)
+        deserialize_time = time_calls(CallRequest.deserialize, decoded, opts.calls)
+        print '%-8s %8d bytes  serialize %7.1fus  deserialize %7.1fus' % (
+            label, len(encoded), serialize_time / opts.calls * 1000000,
+            deserialize_time / opts.calls * 1000000)
+
+
+def enqueue_throughput(opts):
+    from pulp.server.db import connection
+    from pulp.server.db.model.dispatch import QueuedCall
+    from pulp.server.dispatch.task import Task
+    from pulp.server.dispatch.taskqueue import TaskQueue
+
+    connection.initialize()
+    # the queue is not started: only the cost of enqueueing is measured
+    queue = TaskQueue(1)
+    try:
+        tasks = [Task(gen_call_request(opts.units)) for i in range(opts.calls)]
+        start = time.time()
+        for task in tasks:
+            queue.enqueue(task)
+        single = time.time() - start
+
+        tasks = [Task(gen_call_request(opts.units)) for i in range(opts.calls)]
+        start = time.time()
+        queue.batch_enqueue(tasks)
+        batch = time.time() - start
+    finally:
+        QueuedCall.get_collection().remove(safe=True)
+
+    print 'enqueue        %8.1f tasks/s' % (opts.calls / single)
+    print 'batch_enqueue  %8.1f tasks/s' % (opts.calls / batch)
+
+
+def parse_args():
+    parser = optparse.OptionParser()
+    parser.add_option('--units', type='int', default=1000,
+                      help='number of units in the call request kwargs [default: %default]')
+    parser.add_option('--calls', type='int', default=500,
+                      help='number of call requests to serialize or enqueue [default: %default]')
+    parser.add_option('--enqueue', action='store_true', default=False,
+                      help='also measure task queue enqueue throughput (needs a database)')
+    return parser.parse_args()[0]
+
+
+def main():
+    opts = parse_args()
+    pickling.initialize()
+    compare_formats(opts)
+    if opts.enqueue:
+        enqueue_throughput(opts)
+
+
+if __name__ == '__main__':
+    main()
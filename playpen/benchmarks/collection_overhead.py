@@ -0,0 +1,83 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public
+# License as published by the Free Software Foundation; either version
+# 2 of the License (GPLv2) or (at your option) any later version.
+# There is NO WARRANTY for this software, express or implied,
+# including the implied warranties of MERCHANTABILITY,
+# NON-INFRINGEMENT, or FITNESS FOR A PARTICULAR PURPOSE. You should
+# have received a copy of GPLv2 along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+
+"""
+Per-request overhead of getting collection handles.
+
+A typical REST request calls Model.get_collection() several times through the
+managers. This compares the cached handles returned by the connection module
+with building a new PulpCollection for every call, as was done before handles
+were cached.
+
+Requires a configured pulp server and a running database.
+"""
+
+import optparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../platform/src'))
+
+from pulp.server import config
+from pulp.server.db import connection
+from pulp.server.db.model.auth import Permission, User
+from pulp.server.db.model.consumer import Bind, Consumer
+from pulp.server.db.model.repository import Repo, RepoDistributor, RepoImporter
+
+# collections touched by a "GET /v2/repositories/?details=true" or a bind
+REQUEST_MODELS = (User, Permission, Repo, RepoImporter, RepoDistributor, Consumer, Bind)
+
+
+def uncached_get_collection(model):
+    retries = config.config.getint('database', 'operation_retries')
+    collection = connection.PulpCollection(connection.database(), model.collection_name, retries=retries)
+    for index in model.unique_indices + model.search_indices:
+        if isinstance(index, basestring):
+            index = (index,)
+        collection.ensure_index([(i, -1) for i in index], background=True)
+    return collection
+
+
+def time_requests(get_collection, requests):
+    start = time.time()
+    for i in range(requests):
+        for model in REQUEST_MODELS:
+            get_collection(model)
+    return time.time() - start
+
+
+def parse_args():
+    parser = optparse.OptionParser()
+    parser.add_option('--requests', type='int', default=10000,
+                      help='number of simulated requests [default: %default]')
+    return parser.parse_args()[0]
+
+
+def main():
+    opts = parse_args()
+    connection.initialize()
+
+    uncached = time_requests(uncached_get_collection, opts.requests)
+    cached = time_requests(lambda m: m.get_collection(), opts.requests)
+
+    calls = opts.requests * len(REQUEST_MODELS)
+    print 'collections per request: %d' % len(REQUEST_MODELS)
+    print 'uncached: %.3fs (%.1fus per request)' % (uncached, uncached / opts.requests * 1000000)
+    print 'cached:   %.3fs (%.1fus per request)' % (cached, cached / opts.requests * 1000000)
+    print 'total get_collection calls: %d' % calls
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public
+# License as published by the Free Software Foundation; either version
+# 2 of the License (GPLv2) or (at your option) any later version.
+# There is NO WARRANTY for this software, express or implied,
+# including the implied warranties of MERCHANTABILITY,
+# NON-INFRINGEMENT, or FITNESS FOR A PARTICULAR PURPOSE. You should
+# have received a copy of GPLv2 along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+
+"""
+Throughput of init_unit on an importer conduit.
+
+Initializes the same number of units, each with a relative path that is just
+a file name, in the flat and the sharded storage layouts: with the former
+behavior of checking for, and creating, the parent directory on every call,
+with the cached directories and with the batched init_units call.
+--create-files also creates an empty file for every unit and reports the
+average time to stat a sample of them, which shows the cost of large
+directories.
+
+Uses a temporary storage directory; does not need a database.
+"""
+
+import optparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../platform/src'))
+
+from pulp.plugins.conduits.mixins import AddUnitMixin
+from pulp.server import config
+from pulp.server.managers import factory
+from pulp.server.managers.content import query
+
+TYPE_ID = 'rpm'
+
+
+class UncachedQueryManager(query.ContentQueryManager):
+    """
+    Checks for the parent directories of every unit, as was done before the
+    existing directories were cached.
+    """
+
+    def request_content_unit_file_path(self, content_type, relative_path):
+        unit_path = self.content_unit_file_path(content_type, relative_path)
+        unit_dir = os.path.dirname(unit_path)
+        if not os.path.exists(unit_dir):
+            os.makedirs(unit_dir)
+        return unit_path
+
+
+def relative_paths(units):
+    return ['package-%d-1.0-1.noarch.rpm' % i for i in range(units)]
+
+
+def time_init_unit(conduit, paths):
+    start = time.time()
+    for path in paths:
+        conduit.init_unit(TYPE_ID, {'name': path}, {}, path)
+    return time.time() - start
+
+
+def time_init_units(conduit, paths, batch_size=1000):
+    start = time.time()
+    for i in range(0, len(paths), batch_size):
+        conduit.init_units(TYPE_ID, [({'name': p}, {}, p) for p in paths[i:i + batch_size]])
+    return time.time() - start
+
+
+def time_lookups(conduit, paths, lookups):
+    units = conduit.init_units(TYPE_ID, [({'name': p}, {}, p) for p in paths])
+    for unit in units:
+        open(unit.storage_path, 'w').close()
+    sample = random.sample(units, min(lookups, len(units)))
+    start = time.time()
+    for unit in sample:
+        os.stat(unit.storage_path)
+    return time.time() - start, len(sample)
+
+
+def parse_args():
+    parser = optparse.OptionParser()
+    parser.add_option('--units', type='int', default=1000000,
+                      help='number of units initialized per run [default: %default]')
+    parser.add_option('--create-files', action='store_true', default=False,
+                      help='create a file for each unit and time looking them up')
+    parser.add_option('--lookups', type='int', default=100000,
+                      help='number of files looked up with --create-files [default: %default]')
+    parser.add_option('--dir', default=None,
+                      help='parent of the temporary storage directory [default: system temp dir]')
+    return parser.parse_args()[0]
+
+
+def main():
+    opts = parse_args()
+    factory.initialize()
+    conduit = AddUnitMixin('bench-repo', 'bench-importer', 'importer', 'bench-importer')
+    paths = relative_paths(opts.units)
+
+    for layout in (query.STORAGE_LAYOUT_FLAT, query.STORAGE_LAYOUT_SHARDED):
+        storage_dir = tempfile.mkdtemp(prefix='init-unit-', dir=opts.dir)
+        try:
+            config.config.set('server', 'storage_dir', storage_dir)
+            config.config.set('server', 'storage_layout', layout)
+
+            factory.register_manager(factory.TYPE_CONTENT_QUERY, UncachedQueryManager)
+            uncached = time_init_unit(conduit, paths)
+            factory.register_manager(factory.TYPE_CONTENT_QUERY, query.ContentQueryManager)
+            query._known_dirs.clear()
+            cached = time_init_unit(conduit, paths)
+            query._known_dirs.clear()
+            batched = time_init_units(conduit, paths)
+
+            for label, elapsed in (('uncached', uncached), ('cached', cached), ('batched', batched)):
+                print '%-8s %-9s %10.0f units/s' % (layout, label, opts.units / elapsed)
+            if opts.create_files:
+                elapsed, lookups = time_lookups(conduit, paths, opts.lookups)
+                print '%-8s %-9s %10.1fus per stat' % (layout, 'lookup', elapsed / lookups * 1000000)
+        finally:
+            shutil.rmtree(storage_dir)
+
+
+if __name__ == '__main__':
+    main()
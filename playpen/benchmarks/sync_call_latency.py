@@ -0,0 +1,137 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public
+# License as published by the Free Software Foundation; either version
+# 2 of the License (GPLv2) or (at your option) any later version.
+# There is NO WARRANTY for this software, express or implied,
+# including the implied warranties of MERCHANTABILITY,
+# NON-INFRINGEMENT, or FITNESS FOR A PARTICULAR PURPOSE. You should
+# have received a copy of GPLv2 along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+
+"""
+Latency of synchronous calls executed through the dispatch coordinator.
+
+Runs short calls, with the resources of a repository update and of a consumer
+bind, through Coordinator.execute_call (the path taken by execute_sync_ok in
+the REST API) and prints a latency histogram for each. Pass --poll-interval to
+replace the coordinator's task state notification with the old polling loop
+and compare the two.
+
+Requires a configured pulp server and a running database. The calls
+themselves do nothing, so no repositories or consumers are created.
+"""
+
+import datetime
+import optparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../platform/src'))
+
+from pulp.server.db import connection
+from pulp.server.dispatch import constants as dispatch_constants
+from pulp.server.dispatch import coordinator
+from pulp.server.dispatch import factory as dispatch_factory
+from pulp.server.dispatch.call import CallRequest
+from pulp.server.exceptions import OperationTimedOut
+from pulp.server.managers import factory as manager_factory
+
+BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500) # milliseconds
+
+
+def noop(*args, **kwargs):
+    pass
+
+
+def repo_update_call_request():
+    call_request = CallRequest(noop, ['benchmark-repo'])
+    call_request.updates_resource(dispatch_constants.RESOURCE_REPOSITORY_TYPE, 'benchmark-repo')
+    return call_request
+
+
+def consumer_bind_call_request():
+    call_request = CallRequest(noop, ['benchmark-consumer', 'benchmark-repo'])
+    call_request.reads_resource(dispatch_constants.RESOURCE_REPOSITORY_TYPE, 'benchmark-repo')
+    call_request.updates_resource(dispatch_constants.RESOURCE_CONSUMER_TYPE, 'benchmark-consumer')
+    return call_request
+
+
+def polling_wait_for_task(poll_interval):
+    """
+    The coordinator's original wait_for_task implementation
+    """
+    def wait_for_task(task, states, poll_interval=poll_interval, timeout=None):
+        start = datetime.datetime.now()
+        while task.call_report.state not in states:
+            time.sleep(poll_interval)
+            if timeout is None:
+                continue
+            if datetime.datetime.now() - start < timeout:
+                continue
+            raise OperationTimedOut(timeout)
+    return wait_for_task
+
+
+def measure(call_request_factory, iterations):
+    latencies = []
+    for i in range(iterations):
+        call_request = call_request_factory()
+        start = time.time()
+        dispatch_factory.coordinator().execute_call(call_request)
+        latencies.append((time.time() - start) * 1000)
+    return latencies
+
+
+def print_histogram(name, latencies):
+    latencies = sorted(latencies)
+    print '%s: %d calls, median %.1fms, 95th percentile %.1fms, max %.1fms' % \
+        (name, len(latencies), latencies[len(latencies) / 2],
+         latencies[int(len(latencies) * 0.95)], latencies[-1])
+    lower = 0
+    for upper in BUCKETS + (None,):
+        if upper is None:
+            count = len([l for l in latencies if l >= lower])
+            label = '>= %dms' % lower
+        else:
+            count = len([l for l in latencies if lower <= l < upper])
+            label = '< %dms' % upper
+        print '  %-10s %6d %s' % (label, count, '#' * (60 * count / len(latencies)))
+        if upper is not None:
+            lower = upper
+    print
+
+
+def parse_args():
+    parser = optparse.OptionParser()
+    parser.add_option('--iterations', type='int', default=200,
+                      help='number of calls of each kind [default: %default]')
+    parser.add_option('--poll-interval', type='float', default=None,
+                      help='poll the task state at this interval, in seconds, '
+                           'instead of waiting for notification')
+    return parser.parse_args()[0]
+
+
+def main():
+    opts = parse_args()
+
+    connection.initialize()
+    manager_factory.initialize()
+    dispatch_factory.initialize()
+
+    if opts.poll_interval is not None:
+        coordinator.wait_for_task = polling_wait_for_task(opts.poll_interval)
+
+    try:
+        print_histogram('repo update', measure(repo_update_call_request, opts.iterations))
+        print_histogram('consumer bind', measure(consumer_bind_call_request, opts.iterations))
+    finally:
+        dispatch_factory.finalize()
+
+
+if __name__ == '__main__':
+    main()
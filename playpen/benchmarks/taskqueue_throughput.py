@@ -0,0 +1,129 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 Red Hat, Inc.
+#
+# This software is licensed to you under the GNU General Public
+# License as published by the Free Software Foundation; either version
+# 2 of the License (GPLv2) or (at your option) any later version.
+# There is NO WARRANTY for this software, express or implied,
+# including the implied warranties of MERCHANTABILITY,
+# NON-INFRINGEMENT, or FITNESS FOR A PARTICULAR PURPOSE. You should
+# have received a copy of GPLv2 along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+
+"""
+Benchmark of the task queue's scheduling overhead.
+
+Enqueues a large number of tasks (50k by default), a fraction of which depend
+on a previously queued task, then drives the dispatcher algorithm until every
+task has completed. The tasks complete synchronously and the queued call
+collection is replaced with a no-op, so the numbers reflect only the time spent
+in the task queue's bookkeeping (the part that holds the task queue lock).
+
+Requires a pulp server configuration in /etc/pulp, but no database or
+initialized managers.
+"""
+
+import optparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../platform/src'))
+
+from pulp.server.db.model.dispatch import QueuedCall
+from pulp.server.dispatch import constants as dispatch_constants
+from pulp.server.dispatch.call import CallRequest
+from pulp.server.dispatch.task import Task
+from pulp.server.dispatch.taskqueue import TaskQueue
+
+
+class NullCollection(object):
+
+    def save(self, *args, **kwargs):
+        pass
+
+    def remove(self, *args, **kwargs):
+        pass
+
+
+class SynchronousTask(Task):
+    """
+    Task that completes as soon as it is run, without starting a new thread
+    """
+
+    def run(self):
+        self.call_report.state = dispatch_constants.CALL_RUNNING_STATE
+        self._succeeded()
+
+
+PRINCIPAL = {'login': 'benchmark'}
+
+
+def noop():
+    pass
+
+
+def parse_args():
+    parser = optparse.OptionParser()
+    parser.add_option('--tasks', type='int', default=50000,
+                      help='number of tasks to enqueue [default: %default]')
+    parser.add_option('--threshold', type='int', default=9,
+                      help='task queue concurrency threshold [default: %default]')
+    parser.add_option('--dependent', type='float', default=0.1,
+                      help='fraction of tasks depending on an earlier task [default: %default]')
+    parser.add_option('--zero-weight', type='float', default=0.1,
+                      help='fraction of tasks with a weight of 0 [default: %default]')
+    return parser.parse_args()[0]
+
+
+def main():
+    opts = parse_args()
+
+    QueuedCall.get_collection = classmethod(lambda cls: NullCollection())
+
+    queue = TaskQueue(opts.threshold)
+
+    tasks = []
+    for i in range(opts.tasks):
+        weight = 1
+        if random.random() < opts.zero_weight:
+            weight = 0
+        call_request = CallRequest(noop, principal=PRINCIPAL, weight=weight)
+        if tasks and random.random() < opts.dependent:
+            call_request.depends_on(random.choice(tasks).call_request.id)
+        tasks.append(SynchronousTask(call_request))
+
+    start = time.time()
+    queue.batch_enqueue(tasks)
+    enqueue_time = time.time() - start
+
+    start = time.time()
+    for task in tasks:
+        queue.get(task.call_request.id)
+    get_time = time.time() - start
+
+    passes = 0
+    start = time.time()
+    while True:
+        ready_tasks = queue._get_ready_tasks()
+        if not ready_tasks:
+            break
+        passes += 1
+        for task in ready_tasks:
+            queue._run_ready_task(task)
+    dispatch_time = time.time() - start
+
+    incomplete = len(queue.waiting_tasks()) + len(queue.running_tasks())
+
+    print 'tasks:              %d' % opts.tasks
+    print 'enqueue:            %.3fs (%.0f tasks/s)' % (enqueue_time, opts.tasks / enqueue_time)
+    print 'get by id:          %.3fs (%.0f lookups/s)' % (get_time, opts.tasks / get_time)
+    print 'dispatch:           %.3fs over %d passes (%.0f tasks/s)' % (dispatch_time, passes, opts.tasks / dispatch_time)
+    print 'incomplete tasks:   %d' % incomplete
+
+
+if __name__ == '__main__':
+    main()